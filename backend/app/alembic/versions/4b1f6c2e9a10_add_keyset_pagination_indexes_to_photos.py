@@ -0,0 +1,28 @@
+"""add keyset pagination indexes to photos
+
+Revision ID: 4b1f6c2e9a10
+Revises: a372208da709
+Create Date: 2026-10-17 10:12:41.482913
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4b1f6c2e9a10'
+down_revision = 'a372208da709'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_photos_session_id_id', 'photos', ['session_id', 'id'], unique=False)
+    op.create_index('ix_photos_photographer_id_id', 'photos', ['photographer_id', 'id'], unique=False)
+    op.create_index(op.f('ix_photo_sessions_album_id'), 'photo_sessions', ['album_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_photo_sessions_album_id'), table_name='photo_sessions')
+    op.drop_index('ix_photos_photographer_id_id', table_name='photos')
+    op.drop_index('ix_photos_session_id_id', table_name='photos')
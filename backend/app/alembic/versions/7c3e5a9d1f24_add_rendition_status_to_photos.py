@@ -0,0 +1,31 @@
+"""add rendition_status to photos
+
+Revision ID: 7c3e5a9d1f24
+Revises: 4b1f6c2e9a10
+Create Date: 2026-10-17 12:40:09.117532
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c3e5a9d1f24'
+down_revision = '4b1f6c2e9a10'
+branch_labels = None
+depends_on = None
+
+rendition_status = sa.Enum('PENDING', 'PROCESSING', 'READY', 'FAILED', name='renditionstatus')
+
+
+def upgrade() -> None:
+    rendition_status.create(op.get_bind(), checkfirst=True)
+    # Las fotos existentes quedan pendientes para que el worker genere sus versiones.
+    op.add_column('photos', sa.Column('rendition_status', rendition_status, nullable=False, server_default='PENDING'))
+    op.create_index(op.f('ix_photos_rendition_status'), 'photos', ['rendition_status'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_photos_rendition_status'), table_name='photos')
+    op.drop_column('photos', 'rendition_status')
+    rendition_status.drop(op.get_bind(), checkfirst=True)
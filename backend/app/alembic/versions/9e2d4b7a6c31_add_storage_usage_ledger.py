@@ -0,0 +1,37 @@
+"""add storage usage ledger
+
+Revision ID: 9e2d4b7a6c31
+Revises: 7c3e5a9d1f24
+Create Date: 2026-10-17 15:02:44.381205
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9e2d4b7a6c31'
+down_revision = '7c3e5a9d1f24'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('storage_usage',
+    sa.Column('photographer_id', sa.Integer(), nullable=False),
+    sa.Column('album_id', sa.Integer(), nullable=False),
+    sa.Column('rendition', sa.String(length=20), nullable=False),
+    sa.Column('total_bytes', sa.BigInteger(), nullable=False),
+    sa.Column('object_count', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('photographer_id', 'album_id', 'rendition')
+    )
+    op.add_column('photos', sa.Column('size_bytes', sa.BigInteger(), nullable=True))
+    op.add_column('photos', sa.Column('rendition_sizes', sa.JSON(), nullable=True))
+    # El ledger arranca vacío: correr POST /usage/reconcile después de migrar.
+
+
+def downgrade() -> None:
+    op.drop_column('photos', 'rendition_sizes')
+    op.drop_column('photos', 'size_bytes')
+    op.drop_table('storage_usage')
@@ -0,0 +1,46 @@
+"""add daily sales rollups
+
+Revision ID: a9d3f1c6e2b8
+Revises: f7a2c5e8d1b6
+Create Date: 2026-10-18 19:05:31.664210
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a9d3f1c6e2b8'
+down_revision = 'f7a2c5e8d1b6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('daily_sales',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('orders', sa.Integer(), nullable=False),
+    sa.Column('photos_sold', sa.Integer(), nullable=False),
+    sa.Column('gross_revenue', sa.Float(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('day')
+    )
+    op.create_table('daily_photographer_sales',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('photographer_id', sa.Integer(), nullable=False),
+    sa.Column('album_id', sa.Integer(), nullable=False),
+    sa.Column('orders', sa.Integer(), nullable=False),
+    sa.Column('photos_sold', sa.Integer(), nullable=False),
+    sa.Column('gross_sales', sa.Float(), nullable=False),
+    sa.Column('net_earnings', sa.Float(), nullable=False),
+    sa.Column('earned_photo_fraction', sa.Float(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['photographer_id'], ['photographers.id'], ),
+    sa.PrimaryKeyConstraint('day', 'photographer_id', 'album_id')
+    )
+    # Las tablas arrancan vacías: correr `python rebuild_sales_rollups.py` después de migrar.
+
+
+def downgrade() -> None:
+    op.drop_table('daily_photographer_sales')
+    op.drop_table('daily_sales')
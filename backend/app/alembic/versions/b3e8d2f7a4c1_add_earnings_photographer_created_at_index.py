@@ -0,0 +1,27 @@
+"""add earnings photographer created_at index
+
+Revision ID: b3e8d2f7a4c1
+Revises: a9d3f1c6e2b8
+Create Date: 2026-10-19 09:41:17.208356
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b3e8d2f7a4c1'
+down_revision = 'a9d3f1c6e2b8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_earnings_photographer_id_created_at', 'earnings', ['photographer_id', 'created_at'],
+        unique=False, postgresql_include=['amount', 'earned_photo_fraction', 'order_id'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_earnings_photographer_id_created_at', table_name='earnings')
@@ -0,0 +1,40 @@
+"""earnings keyset pagination index
+
+Revision ID: c6f1a8e3d9b2
+Revises: b3e8d2f7a4c1
+Create Date: 2026-10-19 16:22:08.513940
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c6f1a8e3d9b2'
+down_revision = 'b3e8d2f7a4c1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # created_at es la clave del cursor: los earnings sin fecha toman la de su orden.
+    op.execute("""
+        UPDATE earnings SET created_at = COALESCE(orders.created_at, now())
+        FROM orders
+        WHERE orders.id = earnings.order_id AND earnings.created_at IS NULL
+    """)
+    op.alter_column('earnings', 'created_at', existing_type=sa.DateTime(), nullable=False)
+    op.create_index(
+        'ix_earnings_photographer_id_created_at_id', 'earnings', ['photographer_id', 'created_at', 'id'],
+        unique=False, postgresql_include=['amount', 'earned_photo_fraction', 'order_id'],
+    )
+    op.drop_index('ix_earnings_photographer_id_created_at', table_name='earnings')
+
+
+def downgrade() -> None:
+    op.create_index(
+        'ix_earnings_photographer_id_created_at', 'earnings', ['photographer_id', 'created_at'],
+        unique=False, postgresql_include=['amount', 'earned_photo_fraction', 'order_id'],
+    )
+    op.drop_index('ix_earnings_photographer_id_created_at_id', table_name='earnings')
+    op.alter_column('earnings', 'created_at', existing_type=sa.DateTime(), nullable=True)
@@ -0,0 +1,46 @@
+"""add payment notifications inbox
+
+Revision ID: c8a3e6f4b2d7
+Revises: b5f1c8e2d0a4
+Create Date: 2026-10-17 20:05:12.318840
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c8a3e6f4b2d7'
+down_revision = 'b5f1c8e2d0a4'
+branch_labels = None
+depends_on = None
+
+notification_status = sa.Enum('PENDING', 'PROCESSING', 'PROCESSED', 'FAILED', name='notificationstatus')
+
+
+def upgrade() -> None:
+    op.create_table('payment_notifications',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('payment_id', sa.String(length=64), nullable=False),
+    sa.Column('status', notification_status, nullable=False),
+    sa.Column('received_count', sa.Integer(), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('next_attempt_at', sa.DateTime(), nullable=False),
+    sa.Column('payment_status', sa.String(length=30), nullable=True),
+    sa.Column('order_id', sa.Integer(), nullable=True),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.Column('processed_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('payment_id')
+    )
+    op.create_index(op.f('ix_payment_notifications_id'), 'payment_notifications', ['id'], unique=False)
+    op.create_index('ix_payment_notifications_status_next_attempt_at', 'payment_notifications', ['status', 'next_attempt_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_payment_notifications_status_next_attempt_at', table_name='payment_notifications')
+    op.drop_index(op.f('ix_payment_notifications_id'), table_name='payment_notifications')
+    op.drop_table('payment_notifications')
+    notification_status.drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,43 @@
+"""add unique cart item per photo
+
+Revision ID: d2b7e9a4c1f3
+Revises: c8a3e6f4b2d7
+Create Date: 2026-10-17 21:40:27.503118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2b7e9a4c1f3'
+down_revision = 'c8a3e6f4b2d7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Fusiona los items repetidos (misma foto en el mismo carrito) en el de menor id antes de crear la restricción.
+    op.execute("""
+        UPDATE cart_items AS keep
+        SET quantity = dup.quantity
+        FROM (
+            SELECT min(id) AS id, sum(coalesce(quantity, 1)) AS quantity
+            FROM cart_items
+            GROUP BY cart_id, photo_id
+            HAVING count(*) > 1
+        ) AS dup
+        WHERE keep.id = dup.id
+    """)
+    op.execute("""
+        DELETE FROM cart_items AS extra
+        USING cart_items AS keep
+        WHERE extra.cart_id = keep.cart_id
+          AND extra.photo_id = keep.photo_id
+          AND extra.id > keep.id
+    """)
+    op.create_unique_constraint('uq_cart_items_cart_id_photo_id', 'cart_items', ['cart_id', 'photo_id'])
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_cart_items_cart_id_photo_id', 'cart_items', type_='unique')
@@ -0,0 +1,33 @@
+"""add unique earning per order item and order_items.order_id index
+
+Revision ID: d8b4f2c7e1a5
+Revises: c6f1a8e3d9b2
+Create Date: 2026-10-20 11:07:52.381604
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd8b4f2c7e1a5'
+down_revision = 'c6f1a8e3d9b2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Earnings repetidos para el mismo ítem (p. ej. un webhook procesado dos veces): se queda el de menor id.
+    op.execute("""
+        DELETE FROM earnings AS extra
+        USING earnings AS keep
+        WHERE extra.order_item_id = keep.order_item_id
+          AND extra.id > keep.id
+    """)
+    op.create_unique_constraint('uq_earnings_order_item_id', 'earnings', ['order_item_id'])
+    op.create_index(op.f('ix_order_items_order_id'), 'order_items', ['order_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_order_items_order_id'), table_name='order_items')
+    op.drop_constraint('uq_earnings_order_item_id', 'earnings', type_='unique')
@@ -0,0 +1,32 @@
+"""requeue renditions of non-JPEG photos under .jpg keys
+
+Revision ID: e2a7c9f4b6d3
+Revises: d8b4f2c7e1a5
+Create Date: 2026-10-21 09:14:36.502118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2a7c9f4b6d3'
+down_revision = 'd8b4f2c7e1a5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Las versiones de originales no JPEG ahora se guardan como <prefijo><nombre>.jpg: el worker las
+    # vuelve a generar y las anteriores (JPEG con extensión .png, etc.) quedan para el GC de huérfanos.
+    op.execute("""
+        UPDATE photos SET rendition_status = 'PENDING'
+        WHERE lower(object_name) NOT LIKE '%.jpg' AND lower(object_name) NOT LIKE '%.jpeg'
+    """)
+
+
+def downgrade() -> None:
+    op.execute("""
+        UPDATE photos SET rendition_status = 'PENDING'
+        WHERE lower(object_name) NOT LIKE '%.jpg' AND lower(object_name) NOT LIKE '%.jpeg'
+    """)
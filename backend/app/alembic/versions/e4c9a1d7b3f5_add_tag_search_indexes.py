@@ -0,0 +1,46 @@
+"""add tag search indexes
+
+Revision ID: e4c9a1d7b3f5
+Revises: d2b7e9a4c1f3
+Create Date: 2026-10-18 10:12:44.930217
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e4c9a1d7b3f5'
+down_revision = 'd2b7e9a4c1f3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Tags repetidos sin distinguir mayúsculas ("Ruta 40" / "ruta 40"): se queda el de menor id.
+    op.execute("""
+        CREATE TEMPORARY TABLE tag_merges ON COMMIT DROP AS
+        SELECT t.id AS old_id, keep.id AS new_id
+        FROM tags AS t
+        JOIN (SELECT lower(name) AS lname, min(id) AS id FROM tags GROUP BY lower(name) HAVING count(*) > 1) AS keep
+          ON lower(t.name) = keep.lname AND t.id <> keep.id
+    """)
+    for table, owner in (("photo_tags", "photo_id"), ("album_tags", "album_id")):
+        op.execute(f"""
+            INSERT INTO {table} ({owner}, tag_id)
+            SELECT DISTINCT {table}.{owner}, tag_merges.new_id
+            FROM {table} JOIN tag_merges ON {table}.tag_id = tag_merges.old_id
+            ON CONFLICT DO NOTHING
+        """)
+        op.execute(f"DELETE FROM {table} WHERE tag_id IN (SELECT old_id FROM tag_merges)")
+    op.execute("DELETE FROM tags WHERE id IN (SELECT old_id FROM tag_merges)")
+
+    op.drop_index('ix_tags_name', table_name='tags')
+    op.create_index('uq_tags_lower_name', 'tags', [sa.text('lower(name)')], unique=True)
+    op.create_index('ix_photo_tags_tag_id_photo_id', 'photo_tags', ['tag_id', 'photo_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_photo_tags_tag_id_photo_id', table_name='photo_tags')
+    op.drop_index('uq_tags_lower_name', table_name='tags')
+    op.create_index('ix_tags_name', 'tags', ['name'], unique=True)
@@ -0,0 +1,35 @@
+"""add trigram search indexes
+
+Revision ID: f7a2c5e8d1b6
+Revises: e4c9a1d7b3f5
+Create Date: 2026-10-18 16:40:07.215384
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f7a2c5e8d1b6'
+down_revision = 'e4c9a1d7b3f5'
+branch_labels = None
+depends_on = None
+
+TRIGRAM_INDEXES = (
+    ('ix_photos_filename_trgm', 'photos', 'filename'),
+    ('ix_photos_description_trgm', 'photos', 'description'),
+    ('ix_photo_sessions_event_name_trgm', 'photo_sessions', 'event_name'),
+    ('ix_photo_sessions_location_trgm', 'photo_sessions', 'location'),
+    ('ix_tags_name_trgm', 'tags', 'name'),
+)
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, table, column in TRIGRAM_INDEXES:
+        op.create_index(name, table, [column], unique=False, postgresql_using='gin', postgresql_ops={column: 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(TRIGRAM_INDEXES):
+        op.drop_index(name, table_name=table)
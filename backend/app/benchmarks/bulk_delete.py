@@ -0,0 +1,50 @@
+# backend/app/benchmarks/bulk_delete.py
+"""
+Deleting the storage objects of N photos (original + renditions): one delete_object
+per key (previous behaviour) vs. delete_files (delete_objects batches of 1000 in parallel).
+Uploads tiny placeholder objects first, so run it against a dev bucket.
+
+    python -m benchmarks.bulk_delete --photos 3000
+"""
+import argparse
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from services.renditions import rendition_keys
+from services.storage import storage_service
+from benchmarks.common import timer
+
+
+def upload_placeholders(count: int) -> list[str]:
+    keys = []
+    for _ in range(count):
+        object_name = f"photos/bench-{uuid.uuid4()}.jpg"
+        keys.extend([object_name, *rendition_keys(object_name)])
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        list(executor.map(lambda key: storage_service.s3_client.put_object(
+            Bucket=storage_service.bucket_name, Key=key, Body=b"x"), keys))
+    return keys
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--photos", type=int, default=3000)
+    args = parser.parse_args()
+    results = {}
+
+    keys = upload_placeholders(args.photos)
+    with timer(results, "delete_object per key"):
+        for key in keys:
+            storage_service.s3_client.delete_object(Bucket=storage_service.bucket_name, Key=key)
+
+    keys = upload_placeholders(args.photos)
+    with timer(results, "delete_files batches"):
+        failed = storage_service.delete_files(keys)
+
+    for name, elapsed in results.items():
+        print(f"{name:<24} {len(keys):>6} keys  {elapsed:8.2f}s  ({len(keys) / elapsed:,.0f} keys/sec)")
+    print(f"failed keys: {len(failed)}")
+
+
+if __name__ == "__main__":
+    main()
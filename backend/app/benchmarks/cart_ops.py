@@ -0,0 +1,93 @@
+# backend/app/benchmarks/cart_ops.py
+"""
+Cart mutations through CartService, the way the /cart endpoints call them (including the
+CartSchema serialization of the returned cart): ops/sec and SQL statements per operation for add (new photo), add (same photo again), update,
+delete and empty, on a fresh guest cart per round.
+
+    python -m benchmarks.cart_ops --rounds 200 --items 10
+"""
+import argparse
+import time
+import uuid
+from datetime import datetime
+
+from sqlalchemy import event
+
+from benchmarks.common import create_bench_photographer, summarize
+from db.session import SessionLocal, engine
+from models.cart import CartItemCreateSchema, CartSchema
+from models.photo import Photo
+from models.photo_session import PhotoSession
+from services.cart import CartService
+
+
+class StatementCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args, **kwargs):
+        self.count += 1
+
+
+def create_photos(db, count: int) -> list[int]:
+    photographer = create_bench_photographer(db)
+    session = PhotoSession(event_name="bench cart", event_date=datetime.utcnow(), location="bench",
+                           photographer_id=photographer.id)
+    db.add(session)
+    db.flush()
+    photos = [
+        Photo(filename=f"cart_{i}.jpg", price=1000, object_name=f"photos/bench-cart-{uuid.uuid4()}.jpg",
+              photographer_id=photographer.id, session_id=session.id)
+        for i in range(count)
+    ]
+    db.add_all(photos)
+    db.commit()
+    return [p.id for p in photos]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--items", type=int, default=10, help="Distinct photos added to each cart.")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    counter = StatementCounter()
+    samples: dict[str, list[float]] = {"add": [], "add_again": [], "update": [], "delete": [], "empty": []}
+    statements: dict[str, int] = {op: 0 for op in samples}
+    try:
+        photo_ids = create_photos(db, args.items)
+        event.listen(engine, "before_cursor_execute", counter)
+        service = CartService(db)
+
+        def timed(op: str, call):
+            start_count = counter.count
+            start = time.perf_counter()
+            result = CartSchema.model_validate(call())
+            samples[op].append(time.perf_counter() - start)
+            statements[op] += counter.count - start_count
+            return result
+
+        started = time.perf_counter()
+        for _ in range(args.rounds):
+            guest_id = f"bench-{uuid.uuid4()}"
+            for photo_id in photo_ids:
+                cart = timed("add", lambda: service.add_item_to_cart(None, guest_id, CartItemCreateSchema(photo_id=photo_id)))
+            cart = timed("add_again", lambda: service.add_item_to_cart(None, guest_id, CartItemCreateSchema(photo_id=photo_ids[0])))
+            item_id = cart.items[0].id
+            timed("update", lambda: service.update_cart_item(None, guest_id, item_id, 3))
+            timed("delete", lambda: service.delete_cart_item(None, guest_id, item_id))
+            timed("empty", lambda: service.empty_cart(None, guest_id))
+        elapsed = time.perf_counter() - started
+        event.remove(engine, "before_cursor_execute", counter)
+
+        total_ops = sum(len(s) for s in samples.values())
+        print(f"{total_ops} cart ops in {elapsed:.2f}s -> {total_ops / elapsed:.0f} ops/sec")
+        for op, op_samples in samples.items():
+            print(f"{op:<10} {statements[op] / len(op_samples):5.1f} statements/op  {summarize(op_samples)}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
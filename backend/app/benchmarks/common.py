@@ -0,0 +1,60 @@
+# backend/app/benchmarks/common.py
+"""
+Helpers shared by the benchmark scripts. Each script is run from backend/app, e.g.:
+
+    docker compose exec backend python -m benchmarks.finalize_uploads
+
+They write to the configured database, so run them against a dev/staging copy.
+"""
+import statistics
+import time
+import uuid
+from contextlib import contextmanager
+
+from sqlalchemy.orm import Session
+
+from core.permissions import Permissions
+from models.permission import Permission
+from models.photographer import Photographer
+from models.role import Role
+from models.user import User
+
+
+@contextmanager
+def timer(results: dict, key: str):
+    start = time.perf_counter()
+    yield
+    results[key] = time.perf_counter() - start
+
+
+def full_access_user() -> User:
+    """Transient admin-like user (never persisted) to call services that check permissions."""
+    role = Role(name="bench", permissions=[Permission(name=Permissions.FULL_ACCESS.value)])
+    return User(id=None, email="bench@example.com", role=role)
+
+
+def create_bench_photographer(db: Session) -> Photographer:
+    photographer = Photographer(
+        name=f"bench-{uuid.uuid4().hex[:8]}",
+        commission_percentage=10.0,
+        contact_info="bench@example.com",
+    )
+    db.add(photographer)
+    db.commit()
+    db.refresh(photographer)
+    return photographer
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(samples: list[float]) -> str:
+    return (
+        f"n={len(samples)} mean={statistics.mean(samples) * 1000:.2f}ms "
+        f"p50={percentile(samples, 50) * 1000:.2f}ms p99={percentile(samples, 99) * 1000:.2f}ms"
+    )
@@ -0,0 +1,79 @@
+# backend/app/benchmarks/finalize_uploads.py
+"""
+Compares the old per-row completion (create_photo + refresh per file) with the bulk
+INSERT ... RETURNING path of PhotoService.finalize_photo_uploads.
+
+    python -m benchmarks.finalize_uploads --sizes 100 1000 10000
+"""
+import argparse
+import uuid
+from datetime import datetime
+
+from db.session import SessionLocal
+from models.photo import Photo, PhotoCreateSchema
+from models.photo_session import PhotoSession
+from models.photographer import Photographer
+from services.photos import PhotoService, PhotoCompletionRequest
+from benchmarks.common import timer, full_access_user, create_bench_photographer
+
+
+def _requests(photographer_id: int, size: int) -> list[PhotoCompletionRequest]:
+    return [
+        PhotoCompletionRequest(
+            object_name=f"photos/bench-{uuid.uuid4()}.jpg",
+            original_filename=f"bench_{i}.jpg",
+            price=1000.0,
+            photographer_id=photographer_id,
+        )
+        for i in range(size)
+    ]
+
+
+def per_row(service: PhotoService, photographer_id: int, size: int):
+    """The previous behaviour: one commit + refresh + schema per photo."""
+    session = PhotoSession(event_name="bench per-row", event_date=datetime.now(), location="bench",
+                           photographer_id=photographer_id)
+    service._save_and_refresh(session)
+    for request in _requests(photographer_id, size):
+        photo = service.create_photo(PhotoCreateSchema(
+            filename=request.original_filename,
+            price=request.price,
+            object_name=request.object_name,
+            photographer_id=photographer_id,
+            session_id=session.id,
+        ))
+        service._generate_presigned_urls(photo)
+
+
+def bulk(service: PhotoService, photographer: Photographer, size: int):
+    service.finalize_photo_uploads(_requests(photographer.id, size), full_access_user())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    photographer = create_bench_photographer(db)
+    try:
+        service = PhotoService(db)
+        print(f"{'photos':>8} {'per-row (s)':>12} {'bulk (s)':>10} {'speedup':>8}")
+        for size in args.sizes:
+            results = {}
+            with timer(results, "per_row"):
+                per_row(service, photographer.id, size)
+            with timer(results, "bulk"):
+                bulk(service, photographer, size)
+            print(f"{size:>8} {results['per_row']:>12.3f} {results['bulk']:>10.3f} {results['per_row'] / results['bulk']:>7.1f}x")
+    finally:
+        db.rollback()
+        db.query(Photo).filter(Photo.photographer_id == photographer.id).delete(synchronize_session=False)
+        db.query(PhotoSession).filter(PhotoSession.photographer_id == photographer.id).delete(synchronize_session=False)
+        db.query(Photographer).filter(Photographer.id == photographer.id).delete(synchronize_session=False)
+        db.commit()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
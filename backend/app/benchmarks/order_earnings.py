@@ -0,0 +1,93 @@
+# backend/app/benchmarks/order_earnings.py
+"""
+Recording the earnings of a paid order with N items: one Earning per item through the
+ORM after reloading items -> photo -> photographer (previous behaviour) vs.
+OrderService.process_earnings_for_order (one INSERT ... SELECT). Everything runs in a
+transaction that is rolled back at the end, so the database is left as it was.
+
+    python -m benchmarks.order_earnings --items 1000 --orders 5
+"""
+import argparse
+import statistics
+import time
+
+from sqlalchemy import insert
+from sqlalchemy.orm import joinedload
+
+from benchmarks.common import create_bench_photographer, summarize
+from models.earning import Earning
+from models.order import Order, OrderItem, PaymentMethod
+from models.photo import Photo
+
+
+def create_order(db, photo_ids: list[int]) -> Order:
+    order = Order(total=1000.0 * len(photo_ids), payment_method=PaymentMethod.MP)
+    db.add(order)
+    db.flush()
+    db.execute(insert(OrderItem), [
+        {"order_id": order.id, "photo_id": photo_id, "quantity": 1, "price": 1000.0} for photo_id in photo_ids
+    ])
+    return order
+
+
+def per_item_earnings(db, order: Order) -> None:
+    """What process_earnings_for_order did before: reload the order and add one Earning per item."""
+    order = db.query(Order).options(
+        joinedload(Order.items).joinedload(OrderItem.photo).joinedload(Photo.photographer)
+    ).filter(Order.id == order.id).first()
+    for item in order.items:
+        photographer = item.photo.photographer
+        item_price = item.price * item.quantity
+        commission = photographer.commission_percentage
+        db.add(Earning(
+            photographer_id=photographer.id,
+            order_id=order.id,
+            order_item_id=item.id,
+            amount=item_price - item_price * (commission / 100.0),
+            commission_applied=commission,
+            earned_photo_fraction=(1 - commission / 100.0) * item.quantity,
+        ))
+    db.flush()
+
+
+def main() -> None:
+    from db.session import SessionLocal
+    from services.orders import OrderService
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=1000)
+    parser.add_argument("--orders", type=int, default=5, help="Orders measured with each approach.")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    photographer = create_bench_photographer(db) # se confirma; el resto se revierte
+    try:
+        photo_ids = list(db.scalars(insert(Photo).returning(Photo.id), [
+            {"filename": f"bench-earnings-{i}.jpg", "price": 1000.0, "object_name": f"photos/bench-earnings-{i}.jpg",
+             "photographer_id": photographer.id}
+            for i in range(args.items)
+        ]))
+        service = OrderService(db)
+        approaches = {
+            "ORM per item": lambda order: per_item_earnings(db, order),
+            "INSERT ... SELECT": lambda order: service.process_earnings_for_order(order),
+        }
+        for name, record in approaches.items():
+            samples = []
+            for _ in range(args.orders):
+                order = create_order(db, photo_ids)
+                db.expunge_all() # como en el webhook: la orden no está cargada en la sesión
+                start = time.perf_counter()
+                record(order)
+                samples.append(time.perf_counter() - start)
+            print(f"{name:<18} {args.items:>5} items  {summarize(samples)}  "
+                  f"({args.items / statistics.mean(samples):,.0f} items/sec)")
+    finally:
+        db.rollback()
+        db.delete(db.merge(photographer))
+        db.commit()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+# backend/app/benchmarks/photo_search.py
+"""
+Latency of AsyncPhotoService.search_text (/photos/search/text) on a generated race
+catalog: bib numbers in descriptions, camera filenames, events/locations and tags.
+Postgres only (pg_trgm). The data set is generated with set-based INSERT ... SELECT,
+so a million photos take about a minute; it is reused by later runs.
+
+    python -m benchmarks.photo_search --seed 1000000
+    python -m benchmarks.photo_search --repeat 20 --explain
+    python -m benchmarks.photo_search --cleanup
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import event, text
+
+from benchmarks.common import create_bench_photographer, summarize
+
+BENCH_MARK = "bench-search" # en photo_sessions.description, que la búsqueda no mira
+SESSIONS = 2000
+BIBS = 20000
+RACES = ["Maratón de Bariloche", "Trail El Chaltén", "Ultra Fiord", "Cruce Tandilia", "Desafío Ruta 40",
+         "Patagonia Run", "Medio Maratón Ushuaia", "K42 Villa La Angostura"]
+PLACES = ["San Carlos de Bariloche", "El Chaltén", "Puerto Natales", "Ushuaia", "Villa La Angostura",
+          "San Martín de los Andes", "El Calafate", "Esquel", "Puerto Madryn", "Trevelin"]
+TAGS = ["largada", "llegada", "podio", "hidratación", "bosque", "nieve", "lago", "cumbre", "puente", "equipo"]
+
+QUERIES = [
+    ("bib", "4521"),
+    ("filename", "DSC0123457"),
+    ("tag", "podio"),
+    ("bib + location", "4521 bariloche"),
+    ("event + year", "chaltén 2024"),
+    ("location (broad)", "ushuaia"),
+]
+
+
+def seed(photos: int) -> None:
+    from db.session import SessionLocal
+    from services.tags import TagService
+
+    db = SessionLocal()
+    try:
+        photographer = create_bench_photographer(db)
+        tag_ids = [tag.id for tag in TagService(db).get_or_create_tags(TAGS)]
+        db.execute(text("""
+            INSERT INTO photo_sessions (event_name, description, event_date, location, photographer_id)
+            SELECT (:races)[1 + s % cardinality(:races)] || ' ' || (2019 + s % 6), :mark,
+                   now() - s * interval '1 day', (:places)[1 + s % cardinality(:places)], :photographer_id
+            FROM generate_series(0, :sessions - 1) AS s
+        """), {"races": RACES, "places": PLACES, "mark": BENCH_MARK, "sessions": SESSIONS, "photographer_id": photographer.id})
+        db.execute(text("""
+            INSERT INTO photos (filename, description, price, object_name, photographer_id, session_id, rendition_status)
+            SELECT 'DSC' || lpad(g::text, 7, '0') || '.jpg',
+                   CASE WHEN g % 10 < 7 THEN 'Dorsal ' || (1 + (g::bigint * 7919) % :bibs) END,
+                   1000, 'photos/bench-search-' || g || '.jpg', :photographer_id, s.id, 'READY'
+            FROM generate_series(1, :photos) AS g
+            JOIN (SELECT id, row_number() OVER (ORDER BY id) - 1 AS rn FROM photo_sessions WHERE description = :mark) AS s
+              ON s.rn = g % :sessions
+        """), {"photos": photos, "bibs": BIBS, "mark": BENCH_MARK, "sessions": SESSIONS, "photographer_id": photographer.id})
+        db.execute(text("""
+            INSERT INTO photo_tags (photo_id, tag_id)
+            SELECT photos.id, (:tag_ids)[1 + photos.id % cardinality(:tag_ids)]
+            FROM photos JOIN photo_sessions ON photo_sessions.id = photos.session_id
+            WHERE photo_sessions.description = :mark AND photos.id % 4 = 0
+        """), {"tag_ids": tag_ids, "mark": BENCH_MARK})
+        db.commit()
+        db.execute(text("ANALYZE photos, photo_sessions, photo_tags, tags"))
+        print(f"Seeded {photos} photos in {SESSIONS} sessions, 1 of 4 tagged.")
+    finally:
+        db.close()
+
+
+def cleanup() -> None:
+    from db.session import SessionLocal
+
+    db = SessionLocal()
+    try:
+        bench_photos = "SELECT photos.id FROM photos JOIN photo_sessions ON photo_sessions.id = photos.session_id WHERE photo_sessions.description = :mark"
+        db.execute(text(f"DELETE FROM photo_tags WHERE photo_id IN ({bench_photos})"), {"mark": BENCH_MARK})
+        db.execute(text(f"DELETE FROM photos WHERE id IN ({bench_photos})"), {"mark": BENCH_MARK})
+        db.execute(text("DELETE FROM photo_sessions WHERE description = :mark"), {"mark": BENCH_MARK})
+        db.commit()
+        print("Removed the generated photos and sessions.")
+    finally:
+        db.close()
+
+
+async def run(repeat: int, limit: int, explain: bool) -> None:
+    from db.session import AsyncSessionLocal
+    from services.photos import AsyncPhotoService
+
+    async with AsyncSessionLocal() as db:
+        total = (await db.execute(text("SELECT count(*) FROM photos"))).scalar_one()
+        print(f"{total} photos")
+        # Búsqueda dentro de una carrera: la sesión de una foto del dorsal 4521.
+        session_id = (await db.execute(text(
+            "SELECT session_id FROM photos WHERE description = 'Dorsal 4521' ORDER BY id LIMIT 1"
+        ))).scalar_one()
+        service = AsyncPhotoService(db)
+        runs = [(name, q, {}) for name, q in QUERIES]
+        runs += [(f"{name} in session", q, {"session_id": session_id}) for name, q in QUERIES if name in ("bib", "location (broad)")]
+        for name, q, filters in runs:
+            first = await service.search_text(q, limit=limit, **filters) # calienta caché y obtiene el cursor
+            for page_name, cursor in ((name, None), (f"{name}, page 2", first.next_cursor)):
+                if page_name != name and cursor is None:
+                    continue
+                samples = []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    page = await service.search_text(q, cursor=cursor, limit=limit, **filters)
+                    samples.append(time.perf_counter() - start)
+                print(f"{page_name:<28} q={q!r:<18} {len(page.items):>3} items  {summarize(samples)}")
+            if explain:
+                await print_plan(db, service, q, limit, filters)
+
+
+async def print_plan(db, service, q: str, limit: int, filters: dict) -> None:
+    """EXPLAIN ANALYZE of the ranking query (the statement search_text runs first)."""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    sync_engine = db.get_bind()
+    event.listen(sync_engine, "before_cursor_execute", capture)
+    try:
+        await service.search_text(q, limit=limit, **filters)
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", capture)
+    statement, parameters = statements[0]
+    raw = await db.connection()
+    driver = await raw.get_raw_connection()
+    rows = await driver.driver_connection.fetch(f"EXPLAIN (ANALYZE, BUFFERS) {statement}", *parameters)
+    print("\n".join(row[0] for row in rows))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seed", type=int, metavar="PHOTOS", help="Generate this many photos before measuring.")
+    parser.add_argument("--cleanup", action="store_true", help="Remove the generated data and exit.")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=24)
+    parser.add_argument("--explain", action="store_true", help="Print EXPLAIN ANALYZE of each ranking query.")
+    args = parser.parse_args()
+
+    if args.cleanup:
+        cleanup()
+        return
+    if args.seed:
+        seed(args.seed)
+    asyncio.run(run(args.repeat, args.limit, args.explain))
+
+
+if __name__ == "__main__":
+    main()
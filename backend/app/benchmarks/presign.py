@@ -0,0 +1,46 @@
+# backend/app/benchmarks/presign.py
+"""
+Presigned GET URL signatures/sec: one-by-one uncached signing (previous behaviour)
+vs. the batch API, cold and warm cache. Signing is local, no S3 round trip.
+
+    python -m benchmarks.presign --keys 5000
+"""
+import argparse
+import uuid
+
+from services.storage import storage_service
+from benchmarks.common import timer
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--keys", type=int, default=5000)
+    args = parser.parse_args()
+
+    keys = [f"photos/{uuid.uuid4()}.jpg" for _ in range(args.keys)]
+    results = {}
+
+    storage_service.url_cache.clear()
+    with timer(results, "uncached single"):
+        for key in keys:
+            storage_service.s3_client.generate_presigned_url(
+                'get_object', Params={'Bucket': storage_service.bucket_name, 'Key': key}, ExpiresIn=3600
+            )
+
+    storage_service.url_cache.clear()
+    with timer(results, "batch (cold cache)"):
+        storage_service.generate_presigned_get_urls(keys)
+
+    with timer(results, "batch (warm cache)"):
+        storage_service.generate_presigned_get_urls(keys)
+
+    with timer(results, "single (warm cache)"):
+        for key in keys:
+            storage_service.generate_presigned_get_url(key)
+
+    for name, elapsed in results.items():
+        print(f"{name:<22} {args.keys / elapsed:>12,.0f} signatures/sec ({elapsed:.3f}s)")
+
+
+if __name__ == "__main__":
+    main()
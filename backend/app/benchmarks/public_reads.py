@@ -0,0 +1,167 @@
+# backend/app/benchmarks/public_reads.py
+"""
+Load test for the public read endpoints (/albums/, /albums/{id}, /sessions/, /tags/,
+/combos/, /photos/, /photos/by-ids and /orders/public/{public_id}) against a running
+server: req/s and latency percentiles with N concurrent clients. Run it against two
+builds (or two RESPONSE_CACHE_BACKEND settings) with the same data and the same uvicorn
+flags to compare them. `--if-none-match` resends the last ETag, like a browser revalidating.
+
+    python -m benchmarks.public_reads --seed                 # once, creates the data set
+    python -m benchmarks.public_reads --base-url http://localhost:8000 --concurrency 100 --duration 20
+    python -m benchmarks.public_reads --only album sessions tags combos --if-none-match
+"""
+import argparse
+import asyncio
+import random
+import time
+import uuid
+from datetime import datetime
+
+import httpx
+
+from benchmarks.common import create_bench_photographer, percentile
+
+SEED_ALBUMS = 5
+SEED_PHOTOS_PER_ALBUM = 200
+
+
+def seed() -> None:
+    from db.session import SessionLocal
+    from models.album import Album
+    from models.order import Order, OrderItem, PaymentMethod
+    from models.photo import Photo
+    from models.photo_session import PhotoSession
+
+    db = SessionLocal()
+    try:
+        photographer = create_bench_photographer(db)
+        for a in range(SEED_ALBUMS):
+            album = Album(name=f"bench-album-{uuid.uuid4().hex[:6]}", default_photo_price=1000)
+            db.add(album)
+            db.flush()
+            session = PhotoSession(event_name=f"bench {a}", event_date=datetime.utcnow(), location="bench",
+                                   photographer_id=photographer.id, album_id=album.id)
+            db.add(session)
+            db.flush()
+            photos = [
+                Photo(filename=f"bench_{i}.jpg", price=1000, object_name=f"photos/bench-{uuid.uuid4()}.jpg",
+                      photographer_id=photographer.id, session_id=session.id)
+                for i in range(SEED_PHOTOS_PER_ALBUM)
+            ]
+            db.add_all(photos)
+            db.flush()
+            order = Order(total=1000 * 10, payment_method=PaymentMethod.MP, customer_email="bench@example.com")
+            db.add(order)
+            db.flush()
+            db.add_all([OrderItem(order_id=order.id, photo_id=p.id, quantity=1, price=1000) for p in photos[:10]])
+        db.commit()
+        print(f"Seeded {SEED_ALBUMS} albums with {SEED_PHOTOS_PER_ALBUM} photos and one 10-item order each.")
+    finally:
+        db.close()
+
+
+def load_targets() -> tuple[list[int], list[str], list[int]]:
+    from db.session import SessionLocal
+    from models.album import Album
+    from models.order import Order
+    from models.photo import Photo
+
+    db = SessionLocal()
+    try:
+        photo_ids = [row[0] for row in db.query(Photo.id).order_by(Photo.id.desc()).limit(1000).all()]
+        public_ids = [str(row[0]) for row in db.query(Order.public_id).order_by(Order.id.desc()).limit(50).all()]
+        album_ids = [row[0] for row in db.query(Album.id).order_by(Album.id.desc()).limit(1).all()]
+        return photo_ids, public_ids, album_ids
+    finally:
+        db.close()
+
+
+def make_requests(photo_ids: list[int], public_ids: list[str], album_ids: list[int]):
+    def albums(client, headers):
+        return client.get("/albums/", params={"summary": True, "limit": 20}, headers=headers)
+
+    def album(client, headers):
+        return client.get(f"/albums/{album_ids[0]}", headers=headers)
+
+    def sessions(client, headers):
+        return client.get("/sessions/", headers=headers)
+
+    def tags(client, headers):
+        return client.get("/tags/", headers=headers)
+
+    def combos(client, headers):
+        return client.get("/combos/", headers=headers)
+
+    def photos(client, headers):
+        return client.get("/photos/", params={"pagination": "cursor", "limit": 24}, headers=headers)
+
+    def by_ids(client, headers):
+        return client.post("/photos/by-ids", json={"photo_ids": random.sample(photo_ids, min(24, len(photo_ids)))})
+
+    def public_order(client, headers):
+        return client.get(f"/orders/public/{random.choice(public_ids)}", headers=headers)
+
+    endpoints = {"albums": albums, "sessions": sessions, "tags": tags, "combos": combos, "photos": photos, "by-ids": by_ids}
+    if album_ids:
+        endpoints["album"] = album
+    if public_ids:
+        endpoints["orders/public"] = public_order
+    return endpoints
+
+
+async def run(base_url: str, name: str, request, concurrency: int, duration: float, if_none_match: bool = False) -> None:
+    latencies: list[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        async def worker():
+            nonlocal errors
+            etags: dict[str, str] = {}
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                try:
+                    response = await request(client, {"If-None-Match": etags[name]} if name in etags else {})
+                    ok = response.status_code in (200, 304)
+                    if if_none_match and "etag" in response.headers:
+                        etags[name] = response.headers["etag"]
+                except httpx.TransportError:
+                    ok = False
+                latencies.append(time.perf_counter() - start)
+                if not ok:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    print(
+        f"{name:<14} {len(latencies) / elapsed:8.1f} req/s  p50={percentile(latencies, 50) * 1000:7.1f}ms  "
+        f"p99={percentile(latencies, 99) * 1000:7.1f}ms  errors={errors}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seed", action="store_true")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--only", nargs="*", help="Endpoint names to run (default: all).")
+    parser.add_argument("--if-none-match", action="store_true", help="Revalidate with the last ETag received.")
+    args = parser.parse_args()
+
+    if args.seed:
+        seed()
+        return
+
+    photo_ids, public_ids, album_ids = load_targets()
+    for name, request in make_requests(photo_ids, public_ids, album_ids).items():
+        if args.only and name not in args.only:
+            continue
+        asyncio.run(run(args.base_url, name, request, args.concurrency, args.duration, args.if_none_match))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,8 @@
+import random
+from datetime import timedelta
+
+
+def backoff_delay(attempts: int, base_seconds: float, max_seconds: float) -> timedelta:
+    """Exponential backoff with jitter for the attempt number `attempts` (1 = first failure)."""
+    delay = min(base_seconds * 2 ** (attempts - 1), max_seconds)
+    return timedelta(seconds=delay * random.uniform(0.8, 1.2))
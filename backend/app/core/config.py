@@ -1,5 +1,10 @@
+import logging
+
+from pydantic import model_validator
 from pydantic_settings import BaseSettings
 
+logger = logging.getLogger(__name__)
+
 class Settings(BaseSettings):
     # Database settings
     POSTGRES_USER: str = "root"
@@ -7,11 +12,29 @@ class Settings(BaseSettings):
     POSTGRES_DB: str = "fotopatagonia"
     POSTGRES_HOST: str = "db"
     ENVIRONMENT: str | None = None
+
+    # Pool de conexiones (por proceso: con `uvicorn --workers 2` el máximo es el doble).
+    # DB_POOL_SIZE/DB_MAX_OVERFLOW son el presupuesto total del proceso: la parte async
+    # (lecturas públicas con asyncpg) sale de ahí y el engine sync usa el resto, así que un
+    # proceso nunca abre más de DB_POOL_SIZE + DB_MAX_OVERFLOW conexiones.
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_ASYNC_POOL_SIZE: int = 3 # parte de DB_POOL_SIZE para el engine async
+    DB_ASYNC_MAX_OVERFLOW: int = 2 # parte de DB_MAX_OVERFLOW para el engine async
+    DB_POOL_TIMEOUT: int = 30 # segundos esperando una conexión libre antes de fallar
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_PGBOUNCER_MODE: bool = False # True = sin pool propio, lo maneja PgBouncer
     
     @property
     def DATABASE_URL(self) -> str:
         return f"postgresql://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_HOST}/{self.POSTGRES_DB}"
 
+    @property
+    def ASYNC_DATABASE_URL(self) -> str:
+        # Mismo servidor, driver asyncpg (lo usan las lecturas públicas async y Alembic).
+        return f"postgresql+asyncpg://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_HOST}/{self.POSTGRES_DB}"
+
     # JWT settings
     SECRET_KEY: str = "a_super_secret_key_that_should_be_changed"
     ALGORITHM: str = "HS256"
@@ -25,6 +48,32 @@ class Settings(BaseSettings):
     S3_PUBLIC_URL: str | None = None
     S3_REGION: str | None = None
     STORAGE_ALLOWED_ORIGINS: str | None = None
+    PRESIGNED_URL_CACHE_SIZE: int = 10000 # 0 desactiva la caché de URLs firmadas
+    # Una URL firmada se reemplaza cuando le quedan menos de estos segundos. Las respuestas
+    # cacheadas embeben URLs firmadas, así que RESPONSE_CACHE_TTL_SECONDS se acota a la mitad.
+    PRESIGNED_URL_REFRESH_MARGIN_SECONDS: int = 300
+
+    # Rendition worker (thumb / preview / marca de agua)
+    RENDITION_WORKERS: int | None = None # None = un proceso por núcleo
+    RENDITION_BATCH_SIZE: int = 32
+    RENDITION_POLL_SECONDS: int = 10
+    RENDITION_WATERMARK_TEXT: str = "Fotos Patagonia"
+    STORAGE_DELETE_CONCURRENCY: int = 4 # lotes de delete_objects en paralelo
+    ORPHAN_GC_GRACE_HOURS: int = 72 # no se borran objetos sin foto más nuevos que esto
+    PRINCIPAL_CACHE_SIZE: int = 10000 # 0 desactiva la caché de usuarios autenticados
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+
+    # Caché de respuestas públicas (álbumes, sesiones, tags, combos): "local" (LRU por proceso),
+    # "redis" (compartida entre workers, cualquier servidor compatible con Redis) o "none"
+    RESPONSE_CACHE_BACKEND: str = "local"
+    # TTL de las respuestas cacheadas: 120 s por defecto. También acota lo que tarda en verse un
+    # cambio hecho fuera de los servicios. Como /albums y /sessions embeben URLs firmadas, al
+    # arrancar se recorta a PRESIGNED_URL_REFRESH_MARGIN_SECONDS // 2 (150 s con el margen por
+    # defecto, con un warning en el log): un valor mayor, p. ej. 300, queda en ese máximo.
+    RESPONSE_CACHE_TTL_SECONDS: int = 120
+    RESPONSE_CACHE_MAX_ENTRIES: int = 1000
+    RESPONSE_CACHE_MAX_BYTES: int = 64 * 1024 * 1024 # solo backend local
+    REDIS_URL: str = "redis://localhost:6379/0"
 
     FIRST_SUPERUSER_EMAIL: str = "admin@example.com" # Provide a default value
     FIRST_SUPERUSER_PASSWORD: str = "changeme" # Provide a default value
@@ -36,11 +85,58 @@ class Settings(BaseSettings):
     MERCADOPAGO_PENDING_URL: str = "https://somosfotospatagonia.com/checkout/success"
     MERCADOPAGO_NOTIFICATION_URL: str = "https://somosfotospatagonia.com/api/checkout/mercadopago/webhook"
 
+    # Cliente de pagos: "mercadopago", o "fake" para pruebas de carga sin salir a internet
+    PAYMENT_GATEWAY: str = "mercadopago"
+    PAYMENT_GATEWAY_FAKE_LATENCY_MS: float = 0
+    MP_HTTP_POOL_SIZE: int = 20 # conexiones keep-alive a la API de pagos por proceso
+    MP_CONNECT_TIMEOUT_SECONDS: float = 3.05
+    MP_READ_TIMEOUT_SECONDS: float = 10
+    MP_MAX_RETRIES: int = 2
+    MP_RETRY_BACKOFF_SECONDS: float = 0.3
+
+    # Webhook inbox worker (payment_worker.py)
+    MP_WEBHOOK_BATCH_SIZE: int = 50
+    MP_WEBHOOK_CONCURRENCY: int = 8 # consultas simultáneas a la API de pagos
+    MP_WEBHOOK_POLL_SECONDS: float = 0.5
+    MP_WEBHOOK_MAX_ATTEMPTS: int = 10
+    MP_WEBHOOK_RETRY_BASE_SECONDS: int = 5
+    MP_WEBHOOK_RETRY_MAX_SECONDS: int = 600
+    MP_PAYMENT_CACHE_SIZE: int = 10000 # 0 desactiva la caché de pagos ya resueltos
+    MP_PAYMENT_CACHE_TTL_SECONDS: int = 300
+
     FRONTEND_URL: str = "http://localhost:3001"
 
     EMAIL_FROM: str = "Fotos Patagonia <hola@somosfotospatagonia.com>"
     RESEND_API_KEY: str = ""
 
+    # Email outbox dispatcher (email_worker.py)
+    EMAIL_DISPATCH_BATCH_SIZE: int = 50
+    EMAIL_DISPATCH_CONCURRENCY: int = 2 # envíos simultáneos a Resend (su límite por defecto es 2 req/s)
+    EMAIL_POLL_SECONDS: int = 2
+    EMAIL_MAX_ATTEMPTS: int = 8
+    EMAIL_RETRY_BASE_SECONDS: int = 30 # se duplica en cada reintento
+    EMAIL_RETRY_MAX_SECONDS: int = 3600
+
+    @model_validator(mode="after")
+    def check_async_pool_budget(self):
+        # Cada engine necesita al menos una conexión fija (pool_size=0 en QueuePool es "sin límite").
+        if not 1 <= self.DB_ASYNC_POOL_SIZE < self.DB_POOL_SIZE:
+            raise ValueError("DB_ASYNC_POOL_SIZE must be between 1 and DB_POOL_SIZE - 1")
+        if not 0 <= self.DB_ASYNC_MAX_OVERFLOW <= self.DB_MAX_OVERFLOW:
+            raise ValueError("DB_ASYNC_MAX_OVERFLOW must be between 0 and DB_MAX_OVERFLOW")
+        return self
+
+    @model_validator(mode="after")
+    def clamp_response_cache_ttl(self):
+        max_ttl = self.PRESIGNED_URL_REFRESH_MARGIN_SECONDS // 2
+        if self.RESPONSE_CACHE_TTL_SECONDS > max_ttl:
+            logger.warning(
+                "RESPONSE_CACHE_TTL_SECONDS=%s exceeds half of PRESIGNED_URL_REFRESH_MARGIN_SECONDS=%s; using %s",
+                self.RESPONSE_CACHE_TTL_SECONDS, self.PRESIGNED_URL_REFRESH_MARGIN_SECONDS, max_ttl,
+            )
+            self.RESPONSE_CACHE_TTL_SECONDS = max_ttl
+        return self
+
     @property
     def storage_allowed_origins(self) -> list[str]:
         """
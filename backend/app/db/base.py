@@ -1,3 +1,11 @@
+from sqlalchemy import DDL, Index, event
 from sqlalchemy.ext.declarative import declarative_base
 
 Base = declarative_base()
+
+# Índices de trigramas (búsqueda de texto, ILIKE '%...%'): solo existen en Postgres.
+event.listen(Base.metadata, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"))
+
+def trigram_index(name: str, column) -> Index:
+    """GIN pg_trgm index on `column`, so `column ILIKE '%term%'` doesn't scan the table. Skipped outside Postgres."""
+    return Index(name, column, postgresql_using="gin", postgresql_ops={column.name: "gin_trgm_ops"}).ddl_if(dialect="postgresql")
@@ -0,0 +1,44 @@
+from datetime import date, timedelta
+
+from sqlalchemy import Date, cast, func, literal_column, type_coerce
+from sqlalchemy.orm import Session
+
+DATE_BUCKETS = ("day", "week", "month")
+
+
+def date_bucket(db: Session, column, bucket: str):
+    """
+    SQL expression with the first day (a date) of the day / week (starting on Monday) /
+    month bucket of `column`. date_trunc in Postgres, date() modifiers in SQLite (tests).
+    The bucket goes inline, not as a bind parameter, so the same expression can be
+    repeated in SELECT and GROUP BY.
+    """
+    if bucket not in DATE_BUCKETS:
+        raise ValueError(f"Unknown date bucket '{bucket}'.")
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return cast(func.date_trunc(literal_column(f"'{bucket}'"), column), Date)
+    if dialect == "sqlite":
+        modifiers = {"day": [], "week": ["'weekday 0'", "'-6 days'"], "month": ["'start of month'"]}[bucket]
+        return type_coerce(func.date(column, *map(literal_column, modifiers)), Date)
+    raise NotImplementedError(f"Date buckets are not supported for dialect '{dialect}'.")
+
+
+def bucket_start(day: date, bucket: str) -> date:
+    """Python counterpart of `date_bucket` for a single date."""
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())
+    if bucket == "month":
+        return day.replace(day=1)
+    return day
+
+
+def iter_buckets(first: date, last: date, bucket: str):
+    """Start dates of every bucket from the one containing `first` to the one containing `last`."""
+    current, last = bucket_start(first, bucket), bucket_start(last, bucket)
+    while current <= last:
+        yield current
+        if bucket == "month":
+            current = (current.replace(day=28) + timedelta(days=4)).replace(day=1)
+        else:
+            current += timedelta(days=7 if bucket == "week" else 1)
@@ -0,0 +1,101 @@
+import os
+import threading
+import time
+from collections import deque
+
+from sqlalchemy import exc, event
+from sqlalchemy.pool import QueuePool
+
+class PoolMetrics:
+    """
+    Per-process connection pool counters: how long requests wait for a connection,
+    how often the pool runs into overflow and how many checkouts time out.
+    """
+    def __init__(self, window: int = 1000):
+        self._lock = threading.Lock()
+        self._recent_waits: deque[float] = deque(maxlen=window)
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.checkouts = 0
+            self.timeouts = 0
+            self.connects = 0
+            self.invalidations = 0
+            self.total_wait = 0.0
+            self.max_wait = 0.0
+            self.peak_checked_out = 0
+            self._recent_waits.clear()
+
+    def record_wait(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+                self.total_wait += seconds
+                self.max_wait = max(self.max_wait, seconds)
+                self._recent_waits.append(seconds)
+
+    def increment(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def record_checked_out(self, checked_out: int):
+        with self._lock:
+            self.peak_checked_out = max(self.peak_checked_out, checked_out)
+
+    def snapshot(self, pool) -> dict:
+        with self._lock:
+            recent = sorted(self._recent_waits)
+            p95 = recent[min(len(recent) - 1, int(len(recent) * 0.95))] if recent else 0.0
+            data = {
+                "pid": os.getpid(),
+                "pool_class": type(pool).__name__,
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "avg_wait_ms": (self.total_wait / self.checkouts * 1000) if self.checkouts else 0.0,
+                "p95_wait_ms": p95 * 1000,
+                "max_wait_ms": self.max_wait * 1000,
+                "peak_checked_out": self.peak_checked_out,
+            }
+        if isinstance(pool, QueuePool):
+            data.update({
+                "pool_size": pool.size(),
+                "max_overflow": pool._max_overflow,
+                "checked_in": pool.checkedin(),
+                "checked_out": pool.checkedout(),
+                "overflow": max(pool.overflow(), 0),
+            })
+        return data
+
+pool_metrics = PoolMetrics()
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that times how long each checkout waits for a free connection."""
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            pool_metrics.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        pool_metrics.record_wait(time.perf_counter() - start)
+        return connection
+
+def instrument_engine(engine):
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        pool_metrics.increment("connects")
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        pool = engine.pool
+        if isinstance(pool, QueuePool):
+            pool_metrics.record_checked_out(pool.checkedout())
+
+    @event.listens_for(engine, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        pool_metrics.increment("invalidations")
@@ -1,6 +1,44 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 from core.config import settings
+from db.pool_metrics import InstrumentedQueuePool, instrument_engine
 
-engine = create_engine(settings.DATABASE_URL)
+def _engine_options(pool_size: int, max_overflow: int, poolclass=InstrumentedQueuePool) -> dict:
+    if settings.DB_PGBOUNCER_MODE:
+        # PgBouncer (transaction pooling) ya mantiene el pool: cada checkout abre una
+        # conexión barata contra PgBouncer y la devuelve al terminar.
+        return {"poolclass": NullPool}
+    options = {
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    if poolclass is not None:
+        options["poolclass"] = poolclass
+    return options
+
+# El presupuesto de conexiones del proceso (DB_POOL_SIZE + DB_MAX_OVERFLOW) se reparte
+# entre los dos engines: el async se queda con DB_ASYNC_* y el sync con el resto.
+engine = create_engine(settings.DATABASE_URL, **_engine_options(
+    settings.DB_POOL_SIZE - settings.DB_ASYNC_POOL_SIZE,
+    settings.DB_MAX_OVERFLOW - settings.DB_ASYNC_MAX_OVERFLOW,
+))
+instrument_engine(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Engine async (asyncpg) para los endpoints públicos de solo lectura: no ocupan un hilo
+# del threadpool mientras esperan a la base. Tiene su propio pool (DB_ASYNC_*), aparte del sync.
+_async_connect_args = {}
+if settings.DB_PGBOUNCER_MODE:
+    # En transaction pooling los prepared statements de asyncpg no sobreviven entre transacciones.
+    _async_connect_args = {"statement_cache_size": 0, "prepared_statement_cache_size": 0}
+async_engine = create_async_engine(
+    settings.ASYNC_DATABASE_URL,
+    connect_args=_async_connect_args,
+    **_engine_options(settings.DB_ASYNC_POOL_SIZE, settings.DB_ASYNC_MAX_OVERFLOW, poolclass=None),
+)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
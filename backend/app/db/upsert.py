@@ -0,0 +1,17 @@
+from sqlalchemy.orm import Session
+
+
+def upsert_insert(db: Session, table):
+    """
+    Returns a dialect-specific INSERT for `table` that supports
+    `.on_conflict_do_update()` / `.on_conflict_do_nothing()` and `.excluded`.
+    Postgres in production, SQLite in the test suite.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"Upsert is not supported for dialect '{dialect}'.")
+    return insert(table)
@@ -1,14 +1,15 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, lazyload
 from pydantic import BaseModel
 from typing import Optional
 
-from db.session import SessionLocal
+from sqlalchemy.ext.asyncio import AsyncSession
+from db.session import SessionLocal, AsyncSessionLocal
 from core.config import settings
 from models.user import User
-from services.users import UserService
+from services.principals import PrincipalService
 
 reusable_oauth2 = OAuth2PasswordBearer(tokenUrl="/auth/login", auto_error=False)
 
@@ -22,6 +23,23 @@ def get_db():
     finally:
         db.close()
 
+async def get_async_db() -> AsyncSession:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def _load_authenticated_user(db: Session, user_id: int) -> User | None:
+    """
+    Resolves the principal (permissions, photographer) from the cache, and loads only the
+    users row itself: the role -> permissions -> photographer joins are skipped.
+    """
+    principal = PrincipalService(db).get_principal(user_id)
+    if principal is None:
+        return None
+    user = db.get(User, user_id, options=[lazyload(User.role)])
+    if user is not None:
+        user.principal = principal
+    return user
+
 def get_current_user_or_guest(
     db: Session = Depends(get_db),
     token: Optional[str] = Depends(reusable_oauth2)
@@ -46,7 +64,7 @@ def get_current_user_or_guest(
         # El token es inválido. Tratamos como invitado.
         return User(id=None, role="guest")
     
-    user = UserService(db).get_user(user_id=token_data.user_id)
+    user = _load_authenticated_user(db, token_data.user_id)
     if not user:
         # El usuario del token ya no existe. Tratamos como invitado.
         return User(id=None, role="guest")
@@ -79,7 +97,7 @@ def get_current_user(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",)
     
-    user = UserService(db).get_user(user_id=token_data.user_id)
+    user = _load_authenticated_user(db, token_data.user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
@@ -99,7 +117,7 @@ def PermissionChecker(required_permissions: List[Permissions], require_all: bool
                         Si es False, el usuario debe tener AL MENOS UNO de los permisos.
     """
     def permission_checker_dependency(current_user: User = Depends(get_current_user)):
-        user_permissions = {p.name for p in current_user.role.permissions}
+        user_permissions = current_user.permission_names
 
         # El rol de Admin con FULL_ACCESS tiene acceso a todo.
         if Permissions.FULL_ACCESS.value in user_permissions:
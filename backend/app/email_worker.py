@@ -0,0 +1,134 @@
+import argparse
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, Executor
+from datetime import datetime
+
+from sqlalchemy import select, update
+
+from core.config import settings
+from db.session import SessionLocal
+from models.email_outbox import EmailOutbox, EmailStatus
+from services.email_outbox import retry_delay
+from services.email_service import deliver_email
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class EmailDispatcher:
+    """
+    Delivers the emails queued in the outbox. Rows are claimed in batches with
+    FOR UPDATE SKIP LOCKED, so several dispatchers can run side by side; the executor's
+    size is the number of simultaneous calls to the email provider. Failed sends are
+    retried with exponential backoff until EMAIL_MAX_ATTEMPTS.
+    """
+    def __init__(self, executor: Executor, session_factory=SessionLocal, batch_size: int = settings.EMAIL_DISPATCH_BATCH_SIZE,
+                 max_attempts: int = settings.EMAIL_MAX_ATTEMPTS):
+        self.executor = executor
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+
+    def _claim_batch(self, db) -> list[tuple]:
+        rows = db.execute(
+            select(EmailOutbox.id, EmailOutbox.to_email, EmailOutbox.subject, EmailOutbox.body, EmailOutbox.html, EmailOutbox.attempts)
+            .where(EmailOutbox.status == EmailStatus.PENDING, EmailOutbox.next_attempt_at <= datetime.utcnow())
+            .order_by(EmailOutbox.next_attempt_at, EmailOutbox.id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        ).all()
+        if rows:
+            db.execute(
+                update(EmailOutbox)
+                .where(EmailOutbox.id.in_([row.id for row in rows]))
+                .values(status=EmailStatus.SENDING)
+            )
+        db.commit()
+        return [tuple(row) for row in rows]
+
+    def run_once(self) -> int:
+        """Delivers one batch. Returns how many emails were claimed."""
+        db = self.session_factory()
+        try:
+            batch = self._claim_batch(db)
+            if not batch:
+                return 0
+
+            futures = {
+                email_id: self.executor.submit(deliver_email, to_email, subject, body, html)
+                for email_id, to_email, subject, body, html, _ in batch
+            }
+            now = datetime.utcnow()
+            updates, sent, retried, failed = [], 0, 0, 0
+            for email_id, to_email, _, _, _, attempts in batch:
+                try:
+                    provider_message_id = futures[email_id].result()
+                    updates.append({"id": email_id, "status": EmailStatus.SENT, "attempts": attempts + 1,
+                                    "sent_at": now, "provider_message_id": provider_message_id, "last_error": None})
+                    sent += 1
+                except Exception as e:
+                    attempts += 1
+                    logger.warning(f"Could not send email {email_id} to {to_email} (attempt {attempts}): {e}")
+                    if attempts >= self.max_attempts:
+                        updates.append({"id": email_id, "status": EmailStatus.FAILED, "attempts": attempts, "last_error": str(e)})
+                        failed += 1
+                    else:
+                        updates.append({"id": email_id, "status": EmailStatus.PENDING, "attempts": attempts, "last_error": str(e),
+                                        "next_attempt_at": now + retry_delay(attempts)})
+                        retried += 1
+
+            db.execute(update(EmailOutbox), updates)
+            db.commit()
+            logger.info(f"Emails: {sent} sent, {retried} to retry, {failed} failed.")
+            return len(batch)
+        finally:
+            db.close()
+
+    def requeue(self, statuses: list[EmailStatus]) -> int:
+        """Puts emails in the given statuses back in the queue (e.g. after a crash or a provider outage)."""
+        db = self.session_factory()
+        try:
+            values = {"status": EmailStatus.PENDING, "next_attempt_at": datetime.utcnow()}
+            if EmailStatus.FAILED in statuses:
+                values["attempts"] = 0
+            result = db.execute(update(EmailOutbox).where(EmailOutbox.status.in_(statuses)).values(**values))
+            db.commit()
+            return result.rowcount
+        finally:
+            db.close()
+
+    def run_forever(self, poll_seconds: int = settings.EMAIL_POLL_SECONDS):
+        while True:
+            # Un lote completo suele significar que hay más pendientes: se sigue sin esperar.
+            if self.run_once() < self.batch_size:
+                time.sleep(poll_seconds)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Delivers the emails queued in the outbox.")
+    parser.add_argument("--concurrency", type=int, default=settings.EMAIL_DISPATCH_CONCURRENCY)
+    parser.add_argument("--once", action="store_true", help="Deliver a single batch and exit.")
+    parser.add_argument("--requeue-stuck", action="store_true", help="Requeue emails left in 'sending' by a crashed worker.")
+    parser.add_argument("--retry-failed", action="store_true", help="Requeue emails that ran out of attempts.")
+    args = parser.parse_args()
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        dispatcher = EmailDispatcher(executor)
+        statuses = []
+        if args.requeue_stuck:
+            statuses.append(EmailStatus.SENDING)
+        if args.retry_failed:
+            statuses.append(EmailStatus.FAILED)
+        if statuses:
+            logger.info(f"Requeued {dispatcher.requeue(statuses)} emails.")
+
+        logger.info("Email worker started.")
+        if args.once:
+            dispatcher.run_once()
+        else:
+            dispatcher.run_forever()
+
+
+if __name__ == "__main__":
+    main()
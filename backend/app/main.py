@@ -19,6 +19,7 @@ from models.order import Order, OrderItem
 from routers import auth, users, roles, photographers, sessions, albums, photos, cart, discounts, checkout, orders, saved_carts, storage, testing, tags, combos, earnings, admin
 
 from core.config import settings
+from middleware.response_cache import ResponseCacheMiddleware
 
 # Rebuild Pydantic models to resolve forward references
 AlbumSchema.model_rebuild()
@@ -31,6 +32,8 @@ Base.metadata.create_all(bind=engine)
 
 app = FastAPI()
 
+# Antes que CORS, para que las respuestas servidas desde la caché también lleven sus headers.
+app.add_middleware(ResponseCacheMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.storage_allowed_origins,
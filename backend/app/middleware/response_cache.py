@@ -0,0 +1,117 @@
+import asyncio
+import re
+from urllib.parse import parse_qsl, urlencode
+
+from services.response_cache import ALBUMS, SESSIONS, PHOTOS, TAGS, COMBOS, CachedResponse, response_cache
+
+# Rutas públicas que no dependen del usuario, y qué escrituras las invalidan.
+CACHED_ROUTES = (
+    (re.compile(r"^/albums/(\d+)?$"), (ALBUMS, SESSIONS, PHOTOS, TAGS, COMBOS)),
+    (re.compile(r"^/sessions/(\d+)?$"), (SESSIONS, ALBUMS, PHOTOS, TAGS)),
+    (re.compile(r"^/tags/(\d+)?$"), (TAGS,)),
+    (re.compile(r"^/combos/(\d+)?$"), (COMBOS,)),
+)
+
+def match_route(path: str) -> tuple[str, ...] | None:
+    for pattern, namespaces in CACHED_ROUTES:
+        if pattern.match(path):
+            return namespaces
+    return None
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip().removeprefix("W/") for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+class ResponseCacheMiddleware:
+    """
+    Serves GET requests of CACHED_ROUTES from response_cache: a hit sends the stored JSON
+    bytes without touching the router, the database or Pydantic. Successful responses
+    are stored on the way out. Both carry an ETag, and a matching If-None-Match gets a
+    304 without a body. Concurrent misses of the same entry in this process wait for the
+    first one instead of building the same response in parallel.
+    """
+    def __init__(self, app, cache=response_cache):
+        self.app = app
+        self.cache = cache
+        self._inflight: dict[tuple[str, str], asyncio.Future] = {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET" or not self.cache.enabled:
+            return await self.app(scope, receive, send)
+        namespaces = match_route(scope["path"])
+        if namespaces is None:
+            return await self.app(scope, receive, send)
+
+        query = urlencode(sorted(parse_qsl(scope["query_string"].decode("latin-1"), keep_blank_values=True)))
+        key = f"{scope['path']}?{query}"
+        headers = dict(scope["headers"])
+        if_none_match = headers.get(b"if-none-match", b"").decode("latin-1") or None
+
+        try:
+            cached, versions = await self.cache.lookup(key, namespaces)
+        except Exception:
+            # Sin caché (p. ej. Redis caído) se responde igual, desde la base.
+            return await self.app(scope, receive, send)
+        if cached is not None:
+            return await self._send_cached(send, cached, if_none_match, b"HIT")
+
+        inflight_key = (key, versions)
+        leader = self._inflight.get(inflight_key)
+        if leader is not None:
+            cached = await asyncio.shield(leader)
+            if cached is not None:
+                return await self._send_cached(send, cached, if_none_match, b"HIT")
+            return await self.app(scope, receive, send)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[inflight_key] = future
+        cached = None
+        try:
+            cached = await self._build(scope, receive, send, key, versions)
+        finally:
+            del self._inflight[inflight_key]
+            future.set_result(cached)
+        if cached is not None:
+            await self._send_cached(send, cached, if_none_match, b"MISS")
+
+    async def _build(self, scope, receive, send, key: str, versions: str) -> CachedResponse | None:
+        """Runs the endpoint and stores its response. Responses that can't be cached are sent here and give None."""
+        start, chunks = None, []
+
+        async def capture(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        await self.app(scope, receive, capture)
+
+        body = b"".join(chunks)
+        response_headers = dict(start["headers"])
+        media_type = response_headers.get(b"content-type", b"").decode("latin-1")
+        if start["status"] != 200 or not media_type.startswith("application/json"):
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+            return None
+
+        try:
+            cached = await self.cache.store(key, versions, body, media_type)
+        except Exception:
+            cached = CachedResponse(body=body, etag="", media_type=media_type)
+        return cached
+
+    @staticmethod
+    async def _send_cached(send, cached: CachedResponse, if_none_match: str | None, cache_status: bytes):
+        headers = [(b"cache-control", b"no-cache"), (b"x-cache", cache_status)]
+        if cached.etag:
+            headers.append((b"etag", cached.etag.encode()))
+        if cached.etag and etag_matches(if_none_match, cached.etag):
+            await send({"type": "http.response.start", "status": 304, "headers": headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+        headers += [(b"content-type", cached.media_type.encode()), (b"content-length", str(len(cached.body)).encode())]
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        await send({"type": "http.response.body", "body": cached.body})
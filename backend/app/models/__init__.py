@@ -4,12 +4,16 @@ from .cart import Cart, CartItem
 from .combo import Combo
 from .discount import Discount
 from .earning import Earning
+from .email_outbox import EmailOutbox
 from .order import Order, OrderItem
+from .payment_notification import PaymentNotification
 from .permission import Permission
 from .photo_session import PhotoSession
 from .photo import Photo
 from .photographer import Photographer
 from .role import Role
+from .sales_rollup import DailySales, DailyPhotographerSales
 from .saved_cart import SavedCart
+from .storage_usage import StorageUsage
 from .tag import Tag
 from .user import User
\ No newline at end of file
@@ -42,6 +42,14 @@ class AlbumSchema(AlbumInDBBaseSchema):
         # Filtra la lista de sesiones, manteniendo solo aquellas que tienen fotos.
         return [session for session in v if session.photos]
 
+class AlbumSummarySchema(AlbumInDBBaseSchema):
+    """Album listing entry with aggregated counters instead of the nested photos."""
+    tags: List[TagSchema] = []
+    combos: List[ComboSchema] = []
+    session_count: int = 0
+    photo_count: int = 0
+    cover_object_name: Optional[str] = None
+
 # SQLAlchemy model
 class Album(Base):
     __tablename__ = "albums"
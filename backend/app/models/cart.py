@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from typing import List, Optional
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Integer, String, ForeignKey, UniqueConstraint
 from sqlalchemy.orm import relationship
 from db.base import Base
 from .user import UserSchema
@@ -60,6 +60,10 @@ class Cart(Base):
 
 class CartItem(Base):
     __tablename__ = "cart_items"
+    __table_args__ = (
+        # Una fila por foto y carrito: agregar la misma foto suma cantidad (upsert en CartService).
+        UniqueConstraint("cart_id", "photo_id", name="uq_cart_items_cart_id_photo_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     cart_id = Column(Integer, ForeignKey("carts.id"))
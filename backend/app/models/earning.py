@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, Integer, Float, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, Float, ForeignKey, DateTime, Index, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from db.base import Base
@@ -23,6 +23,17 @@ class EarningSchema(BaseModel):
 
 class Earning(Base):
     __tablename__ = "earnings"
+    __table_args__ = (
+        # Listado por cursor (created_at, id) y series/resúmenes por rango de fechas de un
+        # fotógrafo. En Postgres incluye las columnas que se agregan, así las series se
+        # resuelven con un index-only scan.
+        Index(
+            "ix_earnings_photographer_id_created_at_id", "photographer_id", "created_at", "id",
+            postgresql_include=["amount", "earned_photo_fraction", "order_id"],
+        ),
+        # Un earning por ítem vendido: record_earnings inserta con ON CONFLICT DO NOTHING.
+        UniqueConstraint("order_item_id", name="uq_earnings_order_item_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     photographer_id = Column(Integer, ForeignKey("photographers.id"), nullable=False)
@@ -31,7 +42,7 @@ class Earning(Base):
     amount = Column(Float, nullable=False)
     commission_applied = Column(Float, nullable=False) # Porcentaje de comisión usado
     earned_photo_fraction = Column(Float, nullable=False) # Nuevo campo
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False) # clave del cursor, no puede ser NULL
 
     photographer = relationship("Photographer", back_populates="earnings")
     order_item = relationship("OrderItem")
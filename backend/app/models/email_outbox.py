@@ -0,0 +1,35 @@
+from enum import Enum
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, Index, Enum as SQLAlchemyEnum
+from db.base import Base
+from datetime import datetime
+
+class EmailStatus(str, Enum):
+    PENDING = "pending" # Esperando al dispatcher (o a su próximo reintento)
+    SENDING = "sending"
+    SENT = "sent"
+    FAILED = "failed" # Se agotaron los reintentos
+
+# SQLAlchemy model
+class EmailOutbox(Base):
+    """
+    Transactional outbox: emails are written in the same transaction as the change that
+    triggers them (e.g. an order being paid) and delivered later by email_worker.py.
+    """
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        Index("ix_email_outbox_status_next_attempt_at", "status", "next_attempt_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    dedupe_key = Column(String(100), unique=True, nullable=True) # p. ej. "order_confirmation:42"
+    to_email = Column(String(255), nullable=False)
+    subject = Column(String(255), nullable=False)
+    body = Column(Text, nullable=False)
+    html = Column(Boolean, default=False, nullable=False)
+    status = Column(SQLAlchemyEnum(EmailStatus), default=EmailStatus.PENDING, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    next_attempt_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    last_error = Column(Text, nullable=True)
+    provider_message_id = Column(String(100), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    sent_at = Column(DateTime, nullable=True)
@@ -66,9 +66,20 @@ class OrderBaseSchema(BaseModel):
 class OrderCreateSchema(OrderBaseSchema):
     user_id: Optional[int] = None
     guest_id: Optional[str] = None
-    discount_id: Optional[int] = None
+    discount_id: Optional[int] = None # no se acepta al crear: el descuento llega por su código
+    discount_code: Optional[str] = None
+    override_total: Optional[float] = None # total fijado a mano por el personal (requiere EDIT_ORDER)
+    items: List[OrderItemCreateSchema]
+
+class OrderQuoteRequestSchema(BaseModel):
     items: List[OrderItemCreateSchema]
 
+class OrderQuoteSchema(BaseModel):
+    items: List[OrderItemCreateSchema] # con el precio unitario calculado por el servidor
+    digital_subtotal: float
+    prints_subtotal: float
+    subtotal: float
+
 class OrderUpdateSchema(OrderBaseSchema):
     customer_email: Optional[str] = None
     total: Optional[float] = None
@@ -129,7 +140,7 @@ class OrderItem(Base):
     __tablename__ = "order_items"
 
     id = Column(Integer, primary_key=True, index=True)
-    order_id = Column(Integer, ForeignKey("orders.id"))
+    order_id = Column(Integer, ForeignKey("orders.id"), index=True) # ítems de una orden (earnings, rollups, detalle)
     photo_id = Column(Integer, ForeignKey("photos.id"))
     price = Column(Float, nullable=False)
     quantity = Column(Integer, default=1)
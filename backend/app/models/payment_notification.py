@@ -0,0 +1,35 @@
+from enum import Enum
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index, Enum as SQLAlchemyEnum
+from db.base import Base
+from datetime import datetime
+
+class NotificationStatus(str, Enum):
+    PENDING = "pending" # Recibida, falta consultar el pago en Mercado Pago
+    PROCESSING = "processing"
+    PROCESSED = "processed"
+    FAILED = "failed" # Se agotaron los reintentos
+
+# SQLAlchemy model
+class PaymentNotification(Base):
+    """
+    Webhook inbox: one row per Mercado Pago payment. The webhook only records the
+    notification; payment_worker.py fetches the payment and updates the order. Repeated
+    notifications for the same payment only bump received_count.
+    """
+    __tablename__ = "payment_notifications"
+    __table_args__ = (
+        Index("ix_payment_notifications_status_next_attempt_at", "status", "next_attempt_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    payment_id = Column(String(64), unique=True, nullable=False)
+    status = Column(SQLAlchemyEnum(NotificationStatus), default=NotificationStatus.PENDING, nullable=False)
+    received_count = Column(Integer, default=1, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    next_attempt_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    payment_status = Column(String(30), nullable=True) # status del pago en Mercado Pago (approved, pending, ...)
+    order_id = Column(Integer, nullable=True)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    processed_at = Column(DateTime, nullable=True)
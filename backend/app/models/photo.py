@@ -1,11 +1,19 @@
 from pydantic import BaseModel, root_validator
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, Text
+from enum import Enum
+from sqlalchemy import Column, Integer, BigInteger, String, Float, ForeignKey, Text, Index, JSON, Enum as SQLAlchemyEnum
 from sqlalchemy.orm import relationship
 from typing import List, Optional
-from db.base import Base
+from db.base import Base, trigram_index
 from .photographer import PhotographerSchema
 from .tag import TagSchema
 from services.storage import storage_service
+from services.renditions import rendition_key
+
+class RenditionStatus(str, Enum):
+    PENDING = "pending" # Falta generar thumb/preview/marca de agua en el servidor
+    PROCESSING = "processing"
+    READY = "ready"
+    FAILED = "failed"
 
 # Pydantic models (Schemas)
 class PhotoBaseSchema(BaseModel):
@@ -30,6 +38,7 @@ class PhotoInDBBaseSchema(PhotoBaseSchema):
     session_id: int
     album_id: Optional[int] = None   # 👈 NUEVO
     tags: List[TagSchema] = []
+    rendition_status: RenditionStatus = RenditionStatus.PENDING
 
     class Config:
         from_attributes = True
@@ -61,16 +70,23 @@ class PublicPhotoSchema(PhotoSchema):
         # Accedemos a sus atributos directamente.
         object_name = getattr(values, 'object_name', None)
         if object_name:
-            # TODO: Cuando haya marcas de agua, generar una URL diferente para watermark_url
-            # Por ahora, ambos apuntan al original para que la app no se rompa.
             url = storage_service.generate_presigned_get_url(object_name)
             setattr(values, 'url', url)
-            setattr(values, 'watermark_url', url) # Apunta al mismo por ahora
+            # Mientras el worker no generó las versiones, se sigue usando el original.
+            if getattr(values, 'rendition_status', None) == RenditionStatus.READY:
+                setattr(values, 'watermark_url', storage_service.generate_presigned_get_url(rendition_key(object_name, "web")))
+            else:
+                setattr(values, 'watermark_url', url)
         return values
 
 # SQLAlchemy model
 class Photo(Base):
     __tablename__ = "photos"
+    __table_args__ = (
+        # Índices para la paginación por cursor (id DESC) filtrando por sesión o fotógrafo.
+        Index("ix_photos_session_id_id", "session_id", "id"),
+        Index("ix_photos_photographer_id_id", "photographer_id", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     filename = Column(String(255), nullable=False)
@@ -79,6 +95,9 @@ class Photo(Base):
     object_name = Column(Text, nullable=False)
     photographer_id = Column(Integer, ForeignKey("photographers.id"))
     session_id = Column(Integer, ForeignKey("photo_sessions.id"))
+    rendition_status = Column(SQLAlchemyEnum(RenditionStatus), default=RenditionStatus.PENDING, nullable=False, index=True)
+    size_bytes = Column(BigInteger, nullable=True) # Tamaño del original, si se conoce
+    rendition_sizes = Column(JSON, nullable=True) # {"thumb": bytes, "preview": bytes, "web": bytes}
 
     photographer = relationship("Photographer", back_populates="photos")
     session = relationship("PhotoSession", back_populates="photos")
@@ -86,6 +105,10 @@ class Photo(Base):
     order_items = relationship("OrderItem", back_populates="photo")
     tags = relationship("Tag", secondary="photo_tags", back_populates="photos")
 
+# Búsqueda por texto (números de dorsal, nombres de archivo): ver AsyncPhotoService.search_text.
+trigram_index("ix_photos_filename_trgm", Photo.filename)
+trigram_index("ix_photos_description_trgm", Photo.description)
+
 # Import schemas for forward references and rebuild
 from .photo_session import PhotoSessionSchema
 PhotoSchema.model_rebuild()
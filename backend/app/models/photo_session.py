@@ -2,7 +2,7 @@ from pydantic import BaseModel
 from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
 from sqlalchemy.orm import relationship
 from typing import Optional
-from db.base import Base
+from db.base import Base, trigram_index
 from datetime import datetime
 from models.photographer import PhotographerSchema
 
@@ -44,12 +44,15 @@ class PhotoSession(Base):
     event_date = Column(DateTime, nullable=False)
     location = Column(String(255), nullable=False)
     photographer_id = Column(Integer, ForeignKey("photographers.id"))
-    album_id = Column(Integer, ForeignKey("albums.id"), nullable=True)
+    album_id = Column(Integer, ForeignKey("albums.id"), nullable=True, index=True)
 
     photographer = relationship("Photographer")
     album = relationship("Album", back_populates="sessions")
     photos = relationship("Photo", back_populates="session")
 
+trigram_index("ix_photo_sessions_event_name_trgm", PhotoSession.event_name)
+trigram_index("ix_photo_sessions_location_trgm", PhotoSession.location)
+
 # Import schemas for forward references and rebuild
 from .album import AlbumInSessionSchema
 from .photo import PhotoSchema
@@ -0,0 +1,35 @@
+from sqlalchemy import Column, Integer, Float, Date, DateTime, ForeignKey
+from db.base import Base
+from datetime import datetime
+
+# SQLAlchemy models
+class DailySales(Base):
+    """
+    Paid orders per day (UTC date of the payment), kept up to date by mark_order_as_paid.
+    Backs the global totals of the admin dashboard; rebuilt by rebuild_sales_rollups.py.
+    """
+    __tablename__ = "daily_sales"
+
+    day = Column(Date, primary_key=True)
+    orders = Column(Integer, nullable=False, default=0)
+    photos_sold = Column(Integer, nullable=False, default=0)
+    gross_revenue = Column(Float, nullable=False, default=0) # Suma de Order.total (con descuentos)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class DailyPhotographerSales(Base):
+    """
+    Sold items and earnings per day, photographer and album (0 = photo without album, so
+    the composite key can be used as an upsert conflict target, like storage_usage).
+    `orders` counts the orders that included this photographer's photos of that album.
+    """
+    __tablename__ = "daily_photographer_sales"
+
+    day = Column(Date, primary_key=True)
+    photographer_id = Column(Integer, ForeignKey("photographers.id"), primary_key=True)
+    album_id = Column(Integer, primary_key=True, default=0)
+    orders = Column(Integer, nullable=False, default=0)
+    photos_sold = Column(Integer, nullable=False, default=0)
+    gross_sales = Column(Float, nullable=False, default=0) # precio * cantidad de los ítems
+    net_earnings = Column(Float, nullable=False, default=0) # lo que le corresponde al fotógrafo
+    earned_photo_fraction = Column(Float, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,36 @@
+from pydantic import BaseModel
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime
+from db.base import Base
+from datetime import datetime
+from typing import List, Optional
+
+# Pydantic models (Schemas)
+class StorageUsageBreakdownSchema(BaseModel):
+    key: str | int
+    total_bytes: int
+    object_count: int
+
+class StorageUsageSchema(BaseModel):
+    total_size_bytes: int
+    readable_size: str
+    object_count: int
+    by_photographer: List[StorageUsageBreakdownSchema] = []
+    by_album: List[StorageUsageBreakdownSchema] = []
+    by_rendition: List[StorageUsageBreakdownSchema] = []
+    updated_at: Optional[datetime] = None
+
+# SQLAlchemy model
+class StorageUsage(Base):
+    """
+    Usage ledger: bytes and object counts kept up to date incrementally when uploads are
+    finalized, renditions are generated and photos are deleted. 0 means "no photographer"
+    / "no album" so the composite key can be used as an upsert conflict target.
+    """
+    __tablename__ = "storage_usage"
+
+    photographer_id = Column(Integer, primary_key=True, default=0)
+    album_id = Column(Integer, primary_key=True, default=0)
+    rendition = Column(String(20), primary_key=True) # original, thumb, preview, web, untracked
+    total_bytes = Column(BigInteger, nullable=False, default=0)
+    object_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -1,7 +1,7 @@
 from pydantic import BaseModel
-from sqlalchemy import Column, Integer, String, Table, ForeignKey
+from sqlalchemy import Column, Integer, String, Table, ForeignKey, Index, func
 from sqlalchemy.orm import relationship
-from db.base import Base
+from db.base import Base, trigram_index
 
 # Association table for Photos and Tags
 photo_tags = Table(
@@ -9,6 +9,8 @@ photo_tags = Table(
     Base.metadata,
     Column("photo_id", Integer, ForeignKey("photos.id"), primary_key=True),
     Column("tag_id", Integer, ForeignKey("tags.id"), primary_key=True),
+    # La PK (photo_id, tag_id) sirve para "tags de una foto"; este, para "fotos de un tag" (búsqueda).
+    Index("ix_photo_tags_tag_id_photo_id", "tag_id", "photo_id"),
 )
 
 # Association table for Albums and Tags
@@ -40,7 +42,7 @@ class Tag(Base):
     __tablename__ = "tags"
 
     id = Column(Integer, primary_key=True, index=True)
-    name = Column(String(50), unique=True, index=True, nullable=False)
+    name = Column(String(50), nullable=False) # único sin distinguir mayúsculas: ver uq_tags_lower_name
 
     # Many-to-Many relationships
     photos = relationship(
@@ -53,3 +55,7 @@ class Tag(Base):
         secondary=album_tags,
         back_populates="tags"
     )
+
+# Los tags se buscan y se deduplican por lower(name).
+Index("uq_tags_lower_name", func.lower(Tag.name), unique=True)
+trigram_index("ix_tags_name_trgm", Tag.name)
@@ -45,4 +45,20 @@ class User(Base):
     role = relationship("Role", lazy="joined")
     photographer = relationship("Photographer", back_populates="user", uselist=False)
     carts = relationship("Cart", back_populates="user")
-    orders = relationship("Order", back_populates="user")
\ No newline at end of file
+    orders = relationship("Order", back_populates="user")
+
+    # Principal cacheado (services/principals.py); lo asigna deps.get_current_user.
+    principal = None
+
+    @property
+    def permission_names(self) -> frozenset[str]:
+        if self.principal is not None:
+            return self.principal.permissions
+        # Usuarios invitados tienen role="guest" (string), sin permisos.
+        return frozenset(p.name for p in (getattr(self.role, "permissions", None) or []))
+
+    @property
+    def photographer_id(self) -> int | None:
+        if self.principal is not None:
+            return self.principal.photographer_id
+        return self.photographer.id if self.photographer else None
\ No newline at end of file
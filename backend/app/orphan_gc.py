@@ -0,0 +1,34 @@
+import argparse
+import json
+import logging
+import sys
+
+from core.config import settings
+from db.session import SessionLocal
+from services.storage_gc import StorageGCService
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Deletes bucket objects that no photo references.")
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would be deleted.")
+    parser.add_argument("--grace-hours", type=int, default=settings.ORPHAN_GC_GRACE_HOURS,
+                        help="Keep unreferenced objects newer than this (uploads still in progress).")
+    parser.add_argument("--prefix", default="photos/")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        report = StorageGCService(db).collect(dry_run=args.dry_run, grace_hours=args.grace_hours, prefix=args.prefix)
+    except Exception as e:
+        logger.error(f"Orphan GC failed: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+    print(json.dumps(report.model_dump(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
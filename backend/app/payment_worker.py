@@ -0,0 +1,148 @@
+import argparse
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, Executor
+from datetime import datetime
+
+from sqlalchemy import select, update
+
+from core.backoff import backoff_delay
+from core.config import settings
+from db.session import SessionLocal
+from models.payment_notification import PaymentNotification, NotificationStatus
+from services.payment_notifications import FINAL_PAYMENT_STATUSES, PaymentNotificationService, fetch_payment
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class PaymentNotificationProcessor:
+    """
+    Drains the Mercado Pago webhook inbox. Notifications are claimed in batches with
+    FOR UPDATE SKIP LOCKED; the payments are fetched from Mercado Pago in the executor
+    (its size bounds the concurrent calls) and the orders are updated one by one, each
+    in its own transaction. Failed lookups are retried with exponential backoff.
+    """
+    def __init__(self, executor: Executor, session_factory=SessionLocal, batch_size: int = settings.MP_WEBHOOK_BATCH_SIZE,
+                 max_attempts: int = settings.MP_WEBHOOK_MAX_ATTEMPTS):
+        self.executor = executor
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+
+    def _claim_batch(self, db) -> list[tuple]:
+        rows = db.execute(
+            select(PaymentNotification.id, PaymentNotification.payment_id, PaymentNotification.received_count, PaymentNotification.attempts)
+            .where(PaymentNotification.status == NotificationStatus.PENDING, PaymentNotification.next_attempt_at <= datetime.utcnow())
+            .order_by(PaymentNotification.next_attempt_at, PaymentNotification.id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        ).all()
+        if rows:
+            db.execute(
+                update(PaymentNotification)
+                .where(PaymentNotification.id.in_([row.id for row in rows]))
+                .values(status=NotificationStatus.PROCESSING)
+            )
+        db.commit()
+        return [tuple(row) for row in rows]
+
+    def _schedule_retry(self, db, notification_id: int, attempts: int, error: Exception):
+        attempts += 1
+        values = {"attempts": attempts, "last_error": str(error)}
+        if attempts >= self.max_attempts:
+            values["status"] = NotificationStatus.FAILED
+        else:
+            values["status"] = NotificationStatus.PENDING
+            values["next_attempt_at"] = datetime.utcnow() + backoff_delay(
+                attempts, settings.MP_WEBHOOK_RETRY_BASE_SECONDS, settings.MP_WEBHOOK_RETRY_MAX_SECONDS
+            )
+        db.execute(update(PaymentNotification).where(PaymentNotification.id == notification_id).values(**values))
+        db.commit()
+
+    def _mark_processed(self, db, notification_id: int, claimed_count: int, payment: dict, order_id: int | None):
+        values = {"status": NotificationStatus.PROCESSED, "payment_status": payment.get("status"), "order_id": order_id,
+                  "processed_at": datetime.utcnow(), "last_error": None}
+        stmt = update(PaymentNotification).where(PaymentNotification.id == notification_id)
+        if payment.get("status") in FINAL_PAYMENT_STATUSES:
+            db.execute(stmt.values(**values))
+        # Si llegó otra notificación mientras se procesaba, el pago pudo haber cambiado: se vuelve a consultar.
+        elif db.execute(stmt.where(PaymentNotification.received_count == claimed_count).values(**values)).rowcount == 0:
+            db.execute(stmt.values(**values, status=NotificationStatus.PENDING, next_attempt_at=datetime.utcnow()))
+        db.commit()
+
+    def run_once(self) -> int:
+        """Processes one batch. Returns how many notifications were claimed."""
+        db = self.session_factory()
+        try:
+            batch = self._claim_batch(db)
+            if not batch:
+                return 0
+
+            futures = {notification_id: self.executor.submit(fetch_payment, payment_id) for notification_id, payment_id, _, _ in batch}
+            service = PaymentNotificationService(db)
+            processed, retried = 0, 0
+            for notification_id, payment_id, received_count, attempts in batch:
+                try:
+                    payment = futures[notification_id].result()
+                    order_id = service.apply_payment(payment_id, payment)
+                except Exception as e:
+                    db.rollback()
+                    logger.warning(f"Could not process payment {payment_id} (attempt {attempts + 1}): {e}")
+                    self._schedule_retry(db, notification_id, attempts, e)
+                    retried += 1
+                    continue
+                self._mark_processed(db, notification_id, received_count, payment, order_id)
+                processed += 1
+
+            logger.info(f"Payment notifications: {processed} processed, {retried} to retry.")
+            return len(batch)
+        finally:
+            db.close()
+
+    def requeue(self, statuses: list[NotificationStatus]) -> int:
+        """Puts notifications in the given statuses back in the queue (e.g. after a crash or an API outage)."""
+        db = self.session_factory()
+        try:
+            values = {"status": NotificationStatus.PENDING, "next_attempt_at": datetime.utcnow()}
+            if NotificationStatus.FAILED in statuses:
+                values["attempts"] = 0
+            result = db.execute(update(PaymentNotification).where(PaymentNotification.status.in_(statuses)).values(**values))
+            db.commit()
+            return result.rowcount
+        finally:
+            db.close()
+
+    def run_forever(self, poll_seconds: float = settings.MP_WEBHOOK_POLL_SECONDS):
+        while True:
+            if self.run_once() < self.batch_size:
+                time.sleep(poll_seconds)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Processes the Mercado Pago webhook inbox.")
+    parser.add_argument("--concurrency", type=int, default=settings.MP_WEBHOOK_CONCURRENCY)
+    parser.add_argument("--once", action="store_true", help="Process a single batch and exit.")
+    parser.add_argument("--requeue-stuck", action="store_true", help="Requeue notifications left in 'processing' by a crashed worker.")
+    parser.add_argument("--retry-failed", action="store_true", help="Requeue notifications that ran out of attempts.")
+    args = parser.parse_args()
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        processor = PaymentNotificationProcessor(executor)
+        statuses = []
+        if args.requeue_stuck:
+            statuses.append(NotificationStatus.PROCESSING)
+        if args.retry_failed:
+            statuses.append(NotificationStatus.FAILED)
+        if statuses:
+            logger.info(f"Requeued {processor.requeue(statuses)} notifications.")
+
+        logger.info("Payment worker started.")
+        if args.once:
+            processor.run_once()
+        else:
+            processor.run_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+import argparse
+import logging
+import sys
+from datetime import date
+
+from db.session import SessionLocal
+from services.sales_rollups import SalesRollupService
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Recomputes the daily sales rollups behind the admin dashboard.")
+    parser.add_argument("--since", type=date.fromisoformat, default=None,
+                        help="Only rebuild days from this date on (YYYY-MM-DD). By default, all of them.")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        SalesRollupService(db).rebuild(since=args.since)
+    except Exception as e:
+        logger.error(f"Sales rollup rebuild failed: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
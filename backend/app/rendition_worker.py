@@ -0,0 +1,156 @@
+import argparse
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, Executor
+
+from sqlalchemy import select, update
+
+from core.config import settings
+from db.session import SessionLocal
+from models.photo import Photo, RenditionStatus
+from models.photo_session import PhotoSession
+from services.renditions import process_photo
+from services.response_cache import PHOTOS, invalidate_on_commit
+from services.storage_usage import StorageUsageService
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class RenditionPipeline:
+    """
+    Picks up finalized photos whose renditions are pending and generates them in a
+    process pool. Photos are claimed with FOR UPDATE SKIP LOCKED, so several worker
+    containers can run side by side without processing the same photo twice.
+    """
+    def __init__(self, executor: Executor, session_factory=SessionLocal, batch_size: int = settings.RENDITION_BATCH_SIZE):
+        self.executor = executor
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+
+    def _claim_batch(self, db) -> list[tuple[int, str]]:
+        rows = db.execute(
+            select(Photo.id, Photo.object_name)
+            .where(Photo.rendition_status == RenditionStatus.PENDING)
+            .order_by(Photo.id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        ).all()
+        if rows:
+            db.execute(
+                update(Photo)
+                .where(Photo.id.in_([row.id for row in rows]))
+                .values(rendition_status=RenditionStatus.PROCESSING)
+            )
+        db.commit()
+        return [(row.id, row.object_name) for row in rows]
+
+    def _set_status(self, db, photo_ids: list[int], new_status: RenditionStatus):
+        if photo_ids:
+            db.execute(update(Photo).where(Photo.id.in_(photo_ids)).values(rendition_status=new_status))
+
+    def _record_ready(self, db, sizes_by_photo: dict[int, dict[str, int]]):
+        """
+        Marks photos as ready, stores their rendition sizes and updates the storage usage
+        ledger in the same transaction. Original sizes unknown at upload time are filled in here.
+        """
+        if not sizes_by_photo:
+            return
+        usage_service = StorageUsageService(db)
+        deltas = usage_service.new_deltas()
+        updates = []
+        rows = (
+            db.query(Photo.id, Photo.photographer_id, PhotoSession.album_id, Photo.size_bytes, Photo.rendition_sizes)
+            .outerjoin(PhotoSession, PhotoSession.id == Photo.session_id)
+            .filter(Photo.id.in_(sizes_by_photo.keys()))
+            .all()
+        )
+        for photo_id, photographer_id, album_id, size_bytes, previous_sizes in rows:
+            sizes = dict(sizes_by_photo[photo_id])
+            original_size = sizes.pop("original", None)
+            if size_bytes is None and original_size is not None:
+                usage_service.add_delta(deltas, photographer_id, album_id, "original", original_size, 0)
+                size_bytes = original_size
+            for kind, size in sizes.items():
+                # Si se regeneran, solo se suma la diferencia con la versión anterior.
+                previous = (previous_sizes or {}).get(kind)
+                usage_service.add_delta(deltas, photographer_id, album_id, kind, size - (previous or 0), 0 if previous is not None else 1)
+            updates.append({"id": photo_id, "rendition_status": RenditionStatus.READY, "size_bytes": size_bytes, "rendition_sizes": sizes})
+
+        db.execute(update(Photo), updates)
+        usage_service.record(deltas)
+
+    def run_once(self) -> int:
+        """Processes one batch. Returns how many photos were claimed."""
+        db = self.session_factory()
+        try:
+            batch = self._claim_batch(db)
+            if not batch:
+                return 0
+
+            futures = {photo_id: self.executor.submit(process_photo, object_name) for photo_id, object_name in batch}
+            sizes_by_photo, failed = {}, []
+            for photo_id, future in futures.items():
+                try:
+                    sizes_by_photo[photo_id] = future.result()
+                except Exception as e:
+                    logger.error(f"Could not generate renditions for photo ID {photo_id}: {e}")
+                    failed.append(photo_id)
+
+            self._record_ready(db, sizes_by_photo)
+            self._set_status(db, failed, RenditionStatus.FAILED)
+            # El estado de las versiones sale en PhotoSchema (solo llega a la API con RESPONSE_CACHE_BACKEND=redis).
+            invalidate_on_commit(db, PHOTOS)
+            db.commit()
+            logger.info(f"Renditions: {len(sizes_by_photo)} ready, {len(failed)} failed.")
+            return len(batch)
+        finally:
+            db.close()
+
+    def requeue(self, statuses: list[RenditionStatus]) -> int:
+        """Puts photos in the given statuses back in the queue (e.g. after a crash or a failed batch)."""
+        db = self.session_factory()
+        try:
+            result = db.execute(
+                update(Photo).where(Photo.rendition_status.in_(statuses)).values(rendition_status=RenditionStatus.PENDING)
+            )
+            db.commit()
+            return result.rowcount
+        finally:
+            db.close()
+
+    def run_forever(self, poll_seconds: int = settings.RENDITION_POLL_SECONDS):
+        while True:
+            if self.run_once() == 0:
+                time.sleep(poll_seconds)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Server-side thumbnail / preview / watermark generation.")
+    parser.add_argument("--workers", type=int, default=settings.RENDITION_WORKERS)
+    parser.add_argument("--once", action="store_true", help="Process a single batch and exit.")
+    parser.add_argument("--requeue-stuck", action="store_true", help="Requeue photos left in 'processing' by a crashed worker.")
+    parser.add_argument("--retry-failed", action="store_true", help="Requeue photos whose renditions failed.")
+    args = parser.parse_args()
+
+    # spawn: cada proceso crea su propio cliente de S3 en vez de heredar el del padre.
+    with ProcessPoolExecutor(max_workers=args.workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        pipeline = RenditionPipeline(executor)
+        statuses = []
+        if args.requeue_stuck:
+            statuses.append(RenditionStatus.PROCESSING)
+        if args.retry_failed:
+            statuses.append(RenditionStatus.FAILED)
+        if statuses:
+            logger.info(f"Requeued {pipeline.requeue(statuses)} photos.")
+
+        logger.info("Rendition worker started.")
+        if args.once:
+            pipeline.run_once()
+        else:
+            pipeline.run_forever()
+
+
+if __name__ == "__main__":
+    main()
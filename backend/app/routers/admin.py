@@ -4,7 +4,11 @@ from sqlalchemy.orm import Session
 
 from deps import get_db, PermissionChecker
 from services.admin import AdminService
-from schemas.admin import AdminDashboardSchema, RecentSessionInfo
+from schemas.admin import AdminDashboardSchema, RecentSessionInfo, DbPoolMetricsSchema, PaymentGatewayMetricsSchema
+from db.pool_metrics import pool_metrics
+from services.payment_gateway import gateway_metrics
+from core.config import settings
+from db.session import engine
 from schemas.statistics import PhotoSaleStat
 from models.user import User
 from core.permissions import Permissions
@@ -48,10 +52,38 @@ def get_photographer_stats(
     Only accessible by the photographer themselves or an admin.
     """
     # Check if the current user is an admin or the photographer themselves
-    is_admin = Permissions.VIEW_ANY_EARNINGS in [p.name for p in current_user.role.permissions]
+    is_admin = Permissions.VIEW_ANY_EARNINGS.value in current_user.permission_names
     
     if not is_admin and current_user.photographer_id != photographer_id:
         raise HTTPException(status_code=403, detail="Not authorized to view these statistics")
 
     return AdminService(db).get_photo_sales_statistics(photographer_id)
 
+@router.get("/metrics/db-pool", response_model=DbPoolMetricsSchema)
+def get_db_pool_metrics(
+    reset: bool = False,
+    current_user: User = Depends(PermissionChecker([Permissions.FULL_ACCESS]))
+):
+    """
+    Connection pool usage of the worker process that answers (one pool per uvicorn worker):
+    checked-out connections, overflow in use, time spent waiting for a connection and timeouts.
+    With reset=true the counters start over after this snapshot, e.g. right before publishing a gallery.
+    """
+    snapshot = pool_metrics.snapshot(engine.pool)
+    if reset:
+        pool_metrics.reset()
+    return snapshot
+
+@router.get("/metrics/payment-gateway", response_model=PaymentGatewayMetricsSchema)
+def get_payment_gateway_metrics(
+    reset: bool = False,
+    current_user: User = Depends(PermissionChecker([Permissions.FULL_ACCESS]))
+):
+    """
+    Latency histograms (per operation) and retries of the calls to the payments API made
+    by the worker process that answers. The webhook worker keeps its own counters.
+    """
+    snapshot = gateway_metrics.snapshot(settings.PAYMENT_GATEWAY)
+    if reset:
+        gateway_metrics.reset()
+    return snapshot
@@ -1,21 +1,30 @@
 from fastapi import APIRouter, Depends, status
-from typing import List
+from fastapi.responses import StreamingResponse
+from typing import List, Union
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
-from deps import get_db, PermissionChecker
-from services.albums import AlbumService
-from models.album import AlbumCreateSchema, AlbumUpdateSchema, AlbumSchema
+from deps import get_db, get_async_db, PermissionChecker
+from services.albums import AlbumService, AsyncAlbumService
+from models.album import AlbumCreateSchema, AlbumUpdateSchema, AlbumSchema, AlbumSummarySchema
 from models.user import User
 from core.permissions import Permissions
+from schemas.pagination import PaginatedResponse
 
 router = APIRouter(prefix="/albums", tags=["albums"],)
 
 class TagRequest(BaseModel):
     tag_names: List[str]
 
-@router.get("/", response_model=List[AlbumSchema])
-def list_albums(db: Session = Depends(get_db)):
-    return AlbumService(db).list_albums()
+@router.get("/", response_model=Union[PaginatedResponse[AlbumSummarySchema], List[AlbumSchema]])
+async def list_albums(summary: bool = False, offset: int = 0, limit: int = 20, db: AsyncSession = Depends(get_async_db)):
+    """
+    Lists albums. With `summary=true` returns a paginated list with per-album counters
+    and a cover instead of every session and photo.
+    """
+    if summary:
+        return await AsyncAlbumService(db).list_album_summaries(offset=offset, limit=limit)
+    return await AsyncAlbumService(db).list_albums()
 
 @router.post("/", response_model=AlbumSchema, status_code=status.HTTP_201_CREATED)
 def create_album(
@@ -31,6 +40,15 @@ def get_album(album_id: int, db: Session = Depends(get_db)):
     album = AlbumService(db).get_album(album_id)
     return album
 
+@router.get("/{album_id}/stream")
+def stream_album(album_id: int, chunk_size: int = 200, db: Session = Depends(get_db)):
+    """
+    Same content as GET /albums/{album_id}, streamed as NDJSON session by session:
+    one `album` line, then `session` and `photos` lines (up to `chunk_size` photos each).
+    """
+    lines = AlbumService(db).stream_album(album_id, chunk_size=max(1, min(chunk_size, 1000)))
+    return StreamingResponse(lines, media_type="application/x-ndjson")
+
 @router.put("/{album_id}", response_model=AlbumSchema)
 def update_album(
     album_id: int,
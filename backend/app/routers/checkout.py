@@ -1,9 +1,11 @@
 from fastapi import APIRouter, Depends, status, Request
 from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from deps import get_db, get_current_user
+from deps import get_db, get_async_db, get_current_user, get_current_user_or_guest
 from services.checkout import CheckoutService
-from models.order import OrderCreateSchema, OrderSchema
+from services.payment_notifications import AsyncPaymentInboxService
+from models.order import OrderCreateSchema, OrderQuoteRequestSchema, OrderQuoteSchema, OrderSchema
 from models.user import User
 
 router = APIRouter(
@@ -20,7 +22,11 @@ def create_mercadopago_preference(payload: CreatePreferencePayload, db: Session
 
 @router.post("/mercadopago/webhook", status_code=status.HTTP_200_OK)
 @router.post("/mercadopago/webhook/", status_code=status.HTTP_200_OK, include_in_schema=False)
-async def mercadopago_webhook(request: Request, db: Session = Depends(get_db)):
+async def mercadopago_webhook(request: Request, db: AsyncSession = Depends(get_async_db)):
+    """
+    Stores the notification in the webhook inbox and acknowledges it right away;
+    payment_worker.py fetches the payment and marks the order as paid.
+    """
     query_params = request.query_params
     print(f"Webhook received. Query Params: {query_params}")
 
@@ -44,10 +50,9 @@ async def mercadopago_webhook(request: Request, db: Session = Depends(get_db)):
         print("Webhook received, but contained no processable payment ID.")
         return {"status": "request ignored, no valid data"}
         
-    webhook_data = {"type": "payment", "data": {"id": payment_id}}
-    print(f"Processing payment webhook for ID: {payment_id}")
-
-    return CheckoutService(db).mercadopago_webhook(webhook_data=webhook_data)
+    print(f"Queueing payment webhook for ID: {payment_id}")
+    await AsyncPaymentInboxService(db).record(str(payment_id))
+    return {"status": "webhook received"}
 
 @router.get("/status")
 def get_checkout_status(db: Session = Depends(get_db)):
@@ -57,6 +62,15 @@ def get_checkout_status(db: Session = Depends(get_db)):
 def register_local_sale(db: Session = Depends(get_db)):
     return CheckoutService(db).register_local_sale()
 
+@router.post("/quote", response_model=OrderQuoteSchema)
+def quote_order(quote_in: OrderQuoteRequestSchema, db: Session = Depends(get_db)):
+    """Prices a cart as create-order would, without creating the order."""
+    return CheckoutService(db).quote_order(quote_in=quote_in)
+
 @router.post("/create-order", response_model=OrderSchema, status_code=status.HTTP_201_CREATED)
-def create_order(order_in: OrderCreateSchema, db: Session = Depends(get_db)):
-    return CheckoutService(db).create_order(order_in=order_in)
+def create_order(
+    order_in: OrderCreateSchema,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user_or_guest),
+):
+    return CheckoutService(db).create_order(order_in=order_in, current_user=current_user)
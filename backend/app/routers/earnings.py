@@ -1,12 +1,13 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Literal
 from datetime import date
 
 from deps import get_db, PermissionChecker
 from services.photographers import PhotographerService
 from models.user import User
 from core.permissions import Permissions
+from schemas.photographer import EarningsTimeseriesSchema
 
 router = APIRouter(
     prefix="/earnings",
@@ -28,3 +29,25 @@ def get_all_earnings_summaries(
         start_date=start_date,
         end_date=end_date,
     )
+
+@router.get("/timeseries", response_model=EarningsTimeseriesSchema)
+def get_earnings_timeseries(
+    bucket: Literal["day", "week", "month"] = "day",
+    start_date: date | None = None,
+    end_date: date | None = None,
+    source: Literal["earnings", "rollups"] = "earnings",
+    db: Session = Depends(get_db),
+    current_user: User = Depends(PermissionChecker([Permissions.VIEW_ANY_EARNINGS]))
+):
+    """
+    Earnings, earned photo fraction and orders of all photographers per day, week or month.
+    Restricted to users with 'view_any_earnings' permission.
+    """
+    return PhotographerService(db).get_earnings_timeseries(
+        photographer_id=None,
+        current_user=current_user,
+        bucket=bucket,
+        start_date=start_date,
+        end_date=end_date,
+        source=source,
+    )
@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends, status, Query
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
-from deps import get_db, get_current_user, PermissionChecker
-from services.orders import OrderService
+from sqlalchemy.ext.asyncio import AsyncSession
+from deps import get_db, get_async_db, get_current_user, PermissionChecker
+from services.orders import OrderService, AsyncOrderService
 from models.user import User
 from models.order import OrderUpdateSchema, OrderStatus, PaymentMethod, OrderSchema, PublicOrderSchema
 from core.permissions import Permissions
@@ -37,15 +38,15 @@ def get_order_details(
     return OrderService(db).get_order_details(order_id)
 
 @router.get("/public/{public_id}", response_model=PublicOrderSchema)
-def get_public_order_details(
+async def get_public_order_details(
     public_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Public endpoint to get order details using the public ID (UUID).
     This does not require authentication.
     """
-    return OrderService(db).get_order_by_public_id(public_id)
+    return await AsyncOrderService(db).get_order_by_public_id(public_id)
     
 @router.put("/{order_id}/status")
 def update_order_status(
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Query, status
 from sqlalchemy.orm import Session
 from deps import get_db, PermissionChecker
 from services.photographers import PhotographerService
@@ -54,25 +54,45 @@ def delete_photographer(
 # Earnings Endpoints
 
 from datetime import date
-from typing import List
+from typing import List, Literal, Union
 from models.earning import EarningSchema
-from schemas.photographer import PhotoEarningSummary
-from schemas.pagination import PaginatedResponse
+from schemas.photographer import PhotoEarningSummary, EarningsTimeseriesSchema
+from schemas.pagination import PaginatedResponse, CountedCursorPage
 from services.photographers import EarningsSummarySchema
 
-@router.get("/{photographer_id}/earnings", response_model=PaginatedResponse[EarningSchema])
+@router.get("/{photographer_id}/earnings", response_model=Union[CountedCursorPage[EarningSchema], PaginatedResponse[EarningSchema]])
 def get_photographer_earnings(
     photographer_id: int,
     skip: int = 0,
     limit: int = 15,
     start_date: date | None = None,
     end_date: date | None = None,
+    pagination: Literal["offset", "cursor"] = "offset",
+    cursor: str | None = Query(None, description="Opaque `next_cursor` returned by the previous page."),
+    total: Literal["none", "estimate", "exact"] = Query("none", description="Total to include in the first cursor page."),
     db: Session = Depends(get_db),
     current_user: User = Depends(PermissionChecker(
         [Permissions.VIEW_OWN_EARNINGS, Permissions.VIEW_ANY_EARNINGS], require_all=False
     ))
 ):
-    return PhotographerService(db).get_photographer_earnings(
+    """
+    Earnings of the photographer, newest first.
+    With `pagination=cursor` (or when a `cursor` is sent) the response is a page with
+    `items` and `next_cursor`, paginated by keyset instead of OFFSET; `total` adds the
+    exact or estimated number of earnings to the first page.
+    """
+    service = PhotographerService(db)
+    if pagination == "cursor" or cursor:
+        return service.get_photographer_earnings_by_cursor(
+            photographer_id=photographer_id,
+            current_user=current_user,
+            cursor=cursor,
+            limit=limit,
+            start_date=start_date,
+            end_date=end_date,
+            total=total
+        )
+    return service.get_photographer_earnings(
         photographer_id=photographer_id,
         current_user=current_user,
         skip=skip,
@@ -98,6 +118,31 @@ def get_photographer_earnings_summary(
         end_date=end_date
     )
 
+@router.get("/{photographer_id}/earnings/timeseries", response_model=EarningsTimeseriesSchema)
+def get_photographer_earnings_timeseries(
+    photographer_id: int,
+    bucket: Literal["day", "week", "month"] = "day",
+    start_date: date | None = None,
+    end_date: date | None = None,
+    source: Literal["earnings", "rollups"] = "earnings",
+    db: Session = Depends(get_db),
+    current_user: User = Depends(PermissionChecker(
+        [Permissions.VIEW_OWN_EARNINGS, Permissions.VIEW_ANY_EARNINGS], require_all=False
+    ))
+):
+    """
+    Earnings, earned photo fraction and orders of the photographer per day, week or
+    month, ready to chart.
+    """
+    return PhotographerService(db).get_earnings_timeseries(
+        photographer_id=photographer_id,
+        current_user=current_user,
+        bucket=bucket,
+        start_date=start_date,
+        end_date=end_date,
+        source=source
+    )
+
 @router.get("/{photographer_id}/earnings/summary_by_photo", response_model=PaginatedResponse[PhotoEarningSummary])
 def get_earnings_summary_by_photo(
     photographer_id: int,
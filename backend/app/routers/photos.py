@@ -1,13 +1,15 @@
-from fastapi import APIRouter, Depends, status, HTTPException
+from fastapi import APIRouter, Depends, status, HTTPException, Query
 from sqlalchemy.orm import Session
-from typing import List
-from deps import get_db, PermissionChecker
-from services.photos import PhotoService, PhotoCompletionRequest
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Literal, Union
+from deps import get_db, get_async_db, PermissionChecker
+from services.photos import PhotoService, AsyncPhotoService, PhotoCompletionRequest
 from models.photo import PhotoSchema, PhotoUpdateSchema
 from services.storage import storage_service
 from pydantic import BaseModel
 from models.user import User
 from core.permissions import Permissions
+from schemas.pagination import CursorPage
 
 router = APIRouter(
     prefix="/photos",
@@ -34,6 +36,20 @@ def get_presigned_url(object_name: str, db: Session = Depends(get_db)):
     url = photo_service.generate_presigned_view_url(object_name)
     return {"url": url}
 
+class PresignedUrlsRequest(BaseModel):
+    object_names: List[str]
+
+class PresignedUrlsResponse(BaseModel):
+    urls: dict[str, str]
+
+@router.post("/presigned-urls", response_model=PresignedUrlsResponse)
+def get_presigned_urls(request: PresignedUrlsRequest, db: Session = Depends(get_db)):
+    """
+    Batch version of /presigned-url/: signs GET URLs for many objects in one request.
+    Objects that don't belong to a known photo are left out of the response.
+    """
+    return {"urls": PhotoService(db).generate_presigned_view_urls(request.object_names)}
+
 @router.post("/complete-upload", response_model=List[PhotoSchema], status_code=status.HTTP_201_CREATED)
 def complete_upload(
     request: BulkPhotoCompletionRequest,
@@ -60,20 +76,68 @@ def complete_upload(
             detail=f"Failed to finalize photo uploads: {str(e)}"
         )
 
-@router.get("/", response_model=List[PhotoSchema])
-def list_photos(offset: int = 0, limit: int = 10, db: Session = Depends(get_db)):
-    return PhotoService(db).list_photos(offset=offset, limit=limit)
+@router.get("/", response_model=Union[CursorPage[PhotoSchema], List[PhotoSchema]])
+async def list_photos(
+    offset: int = 0,
+    limit: int = 10,
+    pagination: Literal["offset", "cursor"] = "offset",
+    cursor: str | None = Query(None, description="Opaque `next_cursor` returned by the previous page."),
+    album_id: int | None = None,
+    session_id: int | None = None,
+    photographer_id: int | None = None,
+    tag_id: int | None = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Lists photos, newest first.
+    With `pagination=cursor` (or when a `cursor` is sent) the response is a page with
+    `items` and `next_cursor`, paginated by keyset instead of OFFSET.
+    """
+    filters = dict(album_id=album_id, session_id=session_id, photographer_id=photographer_id, tag_id=tag_id)
+    photo_service = AsyncPhotoService(db)
+    if pagination == "cursor" or cursor:
+        return await photo_service.list_photos_by_cursor(cursor=cursor, limit=limit, **filters)
+    return await photo_service.list_photos(offset=offset, limit=limit, **filters)
+
+@router.get("/search", response_model=CursorPage[PhotoSchema])
+async def search_photos_by_tags(
+    tags: List[str] = Query(..., description="Tag names (case-insensitive). Repeat the parameter for several tags."),
+    match: Literal["all", "any"] = "all",
+    cursor: str | None = Query(None, description="Opaque `next_cursor` returned by the previous page."),
+    limit: int = 24,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Photos with all (`match=all`) or any (`match=any`) of the given tags, newest first,
+    paginated by cursor.
+    """
+    return await AsyncPhotoService(db).search_by_tags(tag_names=tags, match=match, cursor=cursor, limit=limit)
+
+@router.get("/search/text", response_model=CursorPage[PhotoSchema])
+async def search_photos_by_text(
+    q: str = Query(..., min_length=2, max_length=100, description="Words to find: bib number, filename, description, tag, event or location."),
+    cursor: str | None = Query(None, description="Opaque `next_cursor` returned by the previous page."),
+    limit: int = 24,
+    album_id: int | None = None,
+    session_id: int | None = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Photos matching every word of `q` in their filename, description, tags or session
+    (event name / location), best matches first, paginated by cursor. `album_id` /
+    `session_id` search inside one album or session (e.g. a bib within a race).
+    """
+    return await AsyncPhotoService(db).search_text(q=q, cursor=cursor, limit=limit, album_id=album_id, session_id=session_id)
 
 class PhotoIdsRequest(BaseModel):
     photo_ids: List[int]
 
 @router.post("/by-ids", response_model=List[PhotoSchema])
-def get_photos_by_ids(request: PhotoIdsRequest, db: Session = Depends(get_db)):
+async def get_photos_by_ids(request: PhotoIdsRequest, db: AsyncSession = Depends(get_async_db)):
     """
     Retrieves a list of photos by their specific IDs.
     """
-    photo_service = PhotoService(db)
-    return photo_service.get_photos_by_ids(photo_ids=request.photo_ids)
+    return await AsyncPhotoService(db).get_photos_by_ids(photo_ids=request.photo_ids)
 
 
 @router.get("/{photo_id}", response_model=PhotoSchema)
@@ -120,14 +184,15 @@ def bulk_delete_photos(
     """
     result = PhotoService(db).bulk_delete_photos(photo_ids=request.photo_ids, current_user=current_user)
     
-    # If there were partial permissions issues, it might be good to reflect that in the response
+    # If there were partial permissions or storage issues, it might be good to reflect that in the response
     if result["errors"]:
         # A 207 Multi-Status would be more accurate, but for simplicity, we can use 400 or 200 with details.
         # Let's return a 200 OK but with a clear message about what happened.
         return {
-            "message": "Partial success: Some photos were not deleted due to permission issues.",
+            "message": "Partial success: Some photos or storage files could not be deleted.",
             "deleted_count": result["deleted_count"],
-            "errors": result["errors"]
+            "errors": result["errors"],
+            "storage_errors": result["storage_errors"]
         }
         
     return {"message": f"Successfully deleted {result['deleted_count']} photos."}
@@ -3,6 +3,9 @@ from sqlalchemy.orm import Session
 from typing import List
 from deps import get_db, PermissionChecker
 from services.sessions import SessionService
+from services.photos import PhotoService
+from models.photo import PhotoSchema
+from schemas.pagination import CursorPage
 from models.photo_session import PhotoSessionSchema, PhotoSessionCreateSchema, PhotoSessionUpdateSchema
 from core.permissions import Permissions
 from models.user import User
@@ -28,6 +31,15 @@ def create_session(
 def get_session(session_id: int, db: Session = Depends(get_db)):
     return SessionService(db).get_session(session_id=session_id)
 
+@router.get("/{session_id}/photos", response_model=CursorPage[PhotoSchema])
+def list_session_photos(session_id: int, cursor: str | None = None, limit: int = 50, db: Session = Depends(get_db)):
+    """
+    Returns the photos of a session page by page (keyset pagination), so album
+    listings can load photos on demand instead of embedding them.
+    """
+    SessionService(db).get_session(session_id=session_id)
+    return PhotoService(db).list_photos_by_cursor(cursor=cursor, limit=limit, session_id=session_id)
+
 @router.put("/{session_id}", response_model=PhotoSessionSchema)
 def update_session(
     session_id: int,
@@ -1,9 +1,15 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, BackgroundTasks
+from sqlalchemy.orm import Session
 from typing import List
+import logging
 from pydantic import BaseModel
 
 from services.storage import storage_service, FileInfo, PresignedURLData
-from deps import PermissionChecker
+from deps import PermissionChecker, get_db
+from db.session import SessionLocal
+from services.storage_usage import StorageUsageService
+from services.storage_gc import StorageGCService, OrphanGCReport
+from models.storage_usage import StorageUsageSchema
 from core.permissions import Permissions
 from models.user import User
 
@@ -36,37 +42,59 @@ def request_upload_urls(
             detail=f"Failed to prepare upload URLs: {str(e)}"
         )
 
-@router.get("/usage", response_model=dict)
+@router.get("/usage", response_model=StorageUsageSchema)
 def get_storage_usage(
+    db: Session = Depends(get_db),
     current_user: User = Depends(PermissionChecker([Permissions.FULL_ACCESS]))
 ):
     """
-    Get the total used space in the storage bucket.
+    Get the used space in the storage bucket, from the usage ledger
+    (total and broken down by photographer, album and rendition type).
     """
+    return StorageUsageService(db).get_usage()
+
+def _reconcile_storage_usage():
+    db = SessionLocal()
     try:
-        return storage_service.get_bucket_usage()
-    except HTTPException as e:
-        raise e
+        StorageUsageService(db).reconcile()
     except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to get bucket usage: {str(e)}"
-        )
+        logging.error(f"Storage usage reconciliation failed: {e}")
+    finally:
+        db.close()
 
-@router.delete("/cleanup", response_model=dict)
-def cleanup_old_files(
+@router.post("/usage/reconcile", status_code=status.HTTP_202_ACCEPTED)
+def reconcile_storage_usage(
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(PermissionChecker([Permissions.FULL_ACCESS]))
+):
+    """
+    Rebuilds the usage ledger from a full bucket listing, in the background.
+    """
+    background_tasks.add_task(_reconcile_storage_usage)
+    return {"message": "Storage usage reconciliation started."}
+
+@router.delete("/cleanup", response_model=OrphanGCReport)
+def cleanup_orphan_files(
     days_older: int,
+    dry_run: bool = False,
+    db: Session = Depends(get_db),
     current_user: User = Depends(PermissionChecker([Permissions.FULL_ACCESS]))
 ):
     """
-    Delete files from the storage bucket that are older than a specified number of days.
+    Delete files from the storage bucket that no photo references and are older than
+    a specified number of days. Files of existing photos are never touched.
+    With dry_run=true nothing is deleted and only the report is returned.
+    For very large buckets prefer the orphan_gc.py job.
     """
+    if days_older <= 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Number of days must be positive."
+        )
     try:
-        return storage_service.delete_old_files(days_older)
-    except HTTPException as e:
-        raise e
+        return StorageGCService(db).collect(dry_run=dry_run, grace_hours=days_older * 24)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to cleanup old files: {str(e)}"
+            detail=f"Failed to cleanup orphan files: {str(e)}"
         )
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List
+from typing import Dict, List, Optional
 
 class AdminCommissionSummary(BaseModel):
     """Summary of commissions for a single photographer."""
@@ -37,3 +37,39 @@ class RecentSession(BaseModel):
 
     class Config:
         orm_mode = True
+
+class DbPoolMetricsSchema(BaseModel):
+    """Connection pool state and counters of the worker process that served the request."""
+    pid: int
+    pool_class: str
+    checkouts: int
+    timeouts: int
+    connects: int
+    invalidations: int
+    avg_wait_ms: float
+    p95_wait_ms: float
+    max_wait_ms: float
+    peak_checked_out: int
+    # Solo con el pool propio (no en modo PgBouncer)
+    pool_size: Optional[int] = None
+    max_overflow: Optional[int] = None
+    checked_in: Optional[int] = None
+    checked_out: Optional[int] = None
+    overflow: Optional[int] = None
+
+class LatencyHistogramSchema(BaseModel):
+    count: int
+    errors: int
+    avg_ms: float
+    p50_ms: float # límite superior del bucket (aproximado)
+    p95_ms: float
+    p99_ms: float
+    max_ms: float
+    buckets: Dict[str, int] # "<=ms" -> llamadas acumuladas
+
+class PaymentGatewayMetricsSchema(BaseModel):
+    """Latency of the payment gateway calls made by the worker process that served the request."""
+    pid: int
+    gateway: str
+    retries: int
+    operations: Dict[str, LatencyHistogramSchema]
@@ -1,5 +1,8 @@
+import base64
+import json
+from fastapi import HTTPException, status
 from pydantic import BaseModel
-from typing import List, TypeVar, Generic
+from typing import Any, List, Optional, TypeVar, Generic
 
 T = TypeVar('T')
 
@@ -9,3 +12,38 @@ class PaginatedResponse(BaseModel, Generic[T]):
 
     class Config:
         from_attributes = True
+
+class CursorPage(BaseModel, Generic[T]):
+    """
+    Page for keyset (cursor) pagination. `next_cursor` is opaque for the client:
+    it only has to be sent back as-is to get the next page, and is None on the last one.
+    """
+    items: List[T]
+    next_cursor: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+class CountedCursorPage(CursorPage[T], Generic[T]):
+    """
+    CursorPage that can also carry the total number of rows (only on the first page, when
+    requested). `total_is_estimate` is True when it comes from the planner's estimate.
+    """
+    total: Optional[int] = None
+    total_is_estimate: bool = False
+
+def encode_cursor(*values: Any) -> str:
+    """Encodes the keyset values of the last row of a page into an opaque cursor."""
+    raw = json.dumps(list(values), default=str, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str, size: int = 1) -> list:
+    """Decodes a cursor created by encode_cursor, validating the number of values."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        values = None
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor.")
+    return values
@@ -1,5 +1,6 @@
 from pydantic import BaseModel
-from typing import List
+from typing import List, Literal
+from datetime import date
 
 class PhotoEarningSummary(BaseModel):
     photo_id: int
@@ -9,3 +10,17 @@ class PhotoEarningSummary(BaseModel):
 
     class Config:
         from_attributes = True
+
+class EarningsTimeseriesPoint(BaseModel):
+    bucket_start: date # primer día del día / semana (lunes) / mes
+    earnings: float
+    earned_photo_fraction: float
+    orders: int
+
+class EarningsTimeseriesSchema(BaseModel):
+    photographer_id: int | None # None = todos los fotógrafos
+    bucket: Literal["day", "week", "month"]
+    source: Literal["earnings", "rollups"]
+    start_date: date | None
+    end_date: date | None
+    points: List[EarningsTimeseriesPoint]
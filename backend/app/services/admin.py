@@ -4,7 +4,7 @@ from services.base import BaseService
 from models.order import Order, OrderItem, PaymentStatus
 from models.photo import Photo
 from models.photographer import Photographer
-from models.earning import Earning
+from services.sales_rollups import SalesRollupService
 from schemas.admin import AdminDashboardSchema, AdminCommissionSummary, RecentSessionInfo
 from schemas.statistics import PhotoSaleStat
 from typing import List
@@ -13,54 +13,17 @@ class AdminService(BaseService):
     def get_dashboard_summary(self) -> AdminDashboardSchema:
         """
         Calculates and returns a global summary for the admin dashboard.
+        Reads the daily sales rollups (see SalesRollupService), so the cost doesn't grow
+        with the number of orders or items.
         """
-        db = self.db
+        rollups = SalesRollupService(self.db)
 
         # --- 1. Global Stats ---
-        # Query on paid orders only
-        global_stats_query = db.query(
-            func.count(Order.id).label("total_orders"),
-            func.sum(Order.total).label("total_gross_revenue"),
-            func.sum(OrderItem.quantity).label("total_photos_sold")
-        ).join(OrderItem, Order.id == OrderItem.order_id)\
-         .filter(Order.payment_status == PaymentStatus.PAID)
-        
-        global_stats = global_stats_query.first()
+        global_stats = rollups.get_totals()
 
         # --- 2. Per-Photographer Stats ---
-        # To get gross sales and commissions, we join several tables.
-        # We calculate gross sales from OrderItems and net earnings from Earnings.
         # Commission = Gross Sales - Net Earnings.
-        
-        # Subquery to get gross sales per photographer
-        gross_sales_subquery = db.query(
-            Photographer.id.label("photographer_id"),
-            func.sum(OrderItem.price * OrderItem.quantity).label("gross_sales")
-        ).join(Photo, Photographer.id == Photo.photographer_id)\
-         .join(OrderItem, Photo.id == OrderItem.photo_id)\
-         .join(Order, OrderItem.order_id == Order.id)\
-         .filter(Order.payment_status == PaymentStatus.PAID)\
-         .group_by(Photographer.id)\
-         .subquery()
-
-        # Subquery to get net earnings per photographer
-        net_earnings_subquery = db.query(
-            Earning.photographer_id.label("photographer_id"),
-            func.sum(Earning.amount).label("net_earnings")
-        ).group_by(Earning.photographer_id)\
-         .subquery()
-        
-        # Main query to combine the data
-        commission_summary_query = db.query(
-            Photographer.id,
-            Photographer.name,
-            gross_sales_subquery.c.gross_sales,
-            net_earnings_subquery.c.net_earnings
-        ).outerjoin(gross_sales_subquery, Photographer.id == gross_sales_subquery.c.photographer_id)\
-         .outerjoin(net_earnings_subquery, Photographer.id == net_earnings_subquery.c.photographer_id)\
-         .order_by(Photographer.name)
-        
-        photographer_stats = commission_summary_query.all()
+        photographer_stats = rollups.get_photographer_totals()
 
         commissions_by_photographer: List[AdminCommissionSummary] = []
         total_commissions = 0.0
@@ -81,9 +44,9 @@ class AdminService(BaseService):
 
         # --- 3. Assemble final schema ---
         return AdminDashboardSchema(
-            total_photos_sold=global_stats.total_photos_sold or 0,
-            total_orders=global_stats.total_orders or 0,
-            total_gross_revenue=round(global_stats.total_gross_revenue or 0, 2),
+            total_photos_sold=global_stats.photos_sold,
+            total_orders=global_stats.orders,
+            total_gross_revenue=round(global_stats.gross_revenue, 2),
             total_commissions=round(total_commissions, 2),
             commissions_by_photographer=commissions_by_photographer
         )
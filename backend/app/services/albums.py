@@ -1,18 +1,73 @@
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy import func, select
 from fastapi import HTTPException, status
-from typing import List
+from typing import Iterator, List
+import json
 
-from .base import BaseService
-from models.album import Album, AlbumCreateSchema, AlbumUpdateSchema
+from .base import BaseService, AsyncBaseService
+from services.response_cache import ALBUMS, TAGS, invalidate_on_commit
+from models.album import Album, AlbumCreateSchema, AlbumUpdateSchema, AlbumSchema, AlbumSummarySchema
 from models.tag import Tag
 from models.user import User
+from services.tags import TagService
 from core.permissions import Permissions
-from models.photo_session import PhotoSession
+from models.photo_session import PhotoSession, PhotoSessionInDBBaseSchema
 from models.tag import Tag
 from models.combo import Combo
 from models.photo import Photo, PhotoSchema
-from services.photos import PhotoService # Import PhotoService
+from services.photos import PhotoService, PHOTO_LOAD_OPTIONS # Import PhotoService
 from services.storage import storage_service # Import storage_service for direct use
+from schemas.pagination import PaginatedResponse
+
+# Árbol completo que serializa AlbumSchema (sesiones -> fotos), para la lectura async.
+ALBUM_TREE_LOAD_OPTIONS = (
+    selectinload(Album.sessions).options(
+        joinedload(PhotoSession.photographer),
+        joinedload(PhotoSession.album),
+        selectinload(PhotoSession.photos).options(*PHOTO_LOAD_OPTIONS),
+    ),
+    selectinload(Album.tags),
+    selectinload(Album.combos),
+)
+
+def _album_summaries_stmt(offset: int, limit: int):
+    stats = (
+        select(
+            PhotoSession.album_id.label("album_id"),
+            func.count(func.distinct(Photo.session_id)).label("session_count"),
+            func.count(Photo.id).label("photo_count"),
+            func.max(Photo.id).label("cover_photo_id"),
+        )
+        .join(Photo, Photo.session_id == PhotoSession.id)
+        .where(PhotoSession.album_id.isnot(None))
+        .group_by(PhotoSession.album_id)
+        .subquery()
+    )
+    return (
+        select(
+            Album,
+            func.coalesce(stats.c.session_count, 0),
+            func.coalesce(stats.c.photo_count, 0),
+            Photo.object_name,
+        )
+        .outerjoin(stats, stats.c.album_id == Album.id)
+        .outerjoin(Photo, Photo.id == stats.c.cover_photo_id)
+        .options(selectinload(Album.tags), selectinload(Album.combos))
+        .order_by(Album.id.desc())
+        .offset(offset)
+        .limit(limit)
+    )
+
+def _album_summaries_page(rows, total: int) -> PaginatedResponse[AlbumSummarySchema]:
+    items = [
+        AlbumSummarySchema.model_validate(album).model_copy(update={
+            "session_count": session_count,
+            "photo_count": photo_count,
+            "cover_object_name": cover_object_name,
+        })
+        for album, session_count, photo_count, cover_object_name in rows
+    ]
+    return PaginatedResponse(total=total, items=items)
 
 class AlbumService(BaseService):
     def _populate_photo_urls(self, album: Album) -> Album:
@@ -30,6 +85,16 @@ class AlbumService(BaseService):
         
         return [self._populate_photo_urls(album) for album in albums]
 
+    def list_album_summaries(self, offset: int = 0, limit: int = 20) -> PaginatedResponse[AlbumSummarySchema]:
+        """
+        Returns a page of albums with session/photo counters and a cover object_name,
+        computed in a single aggregate query. Photos are not loaded; they are fetched
+        per session on demand (GET /sessions/{session_id}/photos).
+        """
+        rows = self.db.execute(_album_summaries_stmt(offset, limit)).all()
+        total = self.db.query(func.count(Album.id)).scalar()
+        return _album_summaries_page(rows, total)
+
     def get_album(self, album_id: int) -> Album:
         """Returns a specific album by its ID with populated photo URLs."""
         album = (
@@ -45,7 +110,60 @@ class AlbumService(BaseService):
 
         return self._populate_photo_urls(album)
 
+    def stream_album(self, album_id: int, chunk_size: int = 200) -> Iterator[str]:
+        """
+        Streams an album as NDJSON lines: first the album itself, then for each session
+        with photos a `session` line followed by `photos` lines of up to `chunk_size` photos.
+        Photos are read with `yield_per` and expunged once serialized, so neither the
+        identity map nor the time-to-first-byte grow with the size of the album.
+        The album lookup runs eagerly so a missing album is still a plain 404.
+        """
+        album = (
+            self.db.query(Album)
+            .options(selectinload(Album.tags), selectinload(Album.combos))
+            .filter(Album.id == album_id)
+            .first()
+        )
+        if not album:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Album not found")
+        album_line = AlbumSummarySchema.model_validate(album).model_dump(
+            mode="json", exclude={"session_count", "photo_count", "cover_object_name"}
+        )
+
+        def _lines() -> Iterator[str]:
+            yield json.dumps({"type": "album", "data": album_line}) + "\n"
+
+            sessions = (
+                self.db.query(PhotoSession)
+                .options(joinedload(PhotoSession.photographer))
+                .filter(PhotoSession.album_id == album_id)
+                .order_by(PhotoSession.event_date, PhotoSession.id)
+                .all()
+            )
+            for session in sessions:
+                photos_stmt = (
+                    select(Photo)
+                    .options(selectinload(Photo.tags))
+                    .where(Photo.session_id == session.id)
+                    .order_by(Photo.id)
+                    .execution_options(yield_per=chunk_size)
+                )
+                session_sent = False
+                for partition in self.db.execute(photos_stmt).scalars().partitions():
+                    if not session_sent:
+                        # Igual que AlbumSchema, las sesiones sin fotos no se envían.
+                        session_data = PhotoSessionInDBBaseSchema.model_validate(session).model_dump(mode="json")
+                        yield json.dumps({"type": "session", "data": session_data}) + "\n"
+                        session_sent = True
+                    items = [PhotoSchema.model_validate(photo).model_dump(mode="json") for photo in partition]
+                    for photo in partition:
+                        self.db.expunge(photo)
+                    yield json.dumps({"type": "photos", "session_id": session.id, "data": items}) + "\n"
+
+        return _lines()
+
     def create_album(self, album_in: AlbumCreateSchema) -> Album:
+     invalidate_on_commit(self.db, ALBUMS)
      data = album_in.model_dump(exclude={"session_ids", "tag_ids", "combo_ids"})
      db_album = Album(**data)
      if album_in.session_ids:
@@ -60,6 +178,7 @@ class AlbumService(BaseService):
      return self._save_and_refresh(db_album)
 
     def update_album(self, album_id: int, album_in: AlbumUpdateSchema) -> Album:
+     invalidate_on_commit(self.db, ALBUMS)
      db_album = self.get_album(album_id) # get_album now populates URLs, which is fine
      data = album_in.model_dump(exclude_unset=True)
 
@@ -83,31 +202,34 @@ class AlbumService(BaseService):
      return self._populate_photo_urls(updated_album)
 
     def delete_album(self, album_id: int):
+        invalidate_on_commit(self.db, ALBUMS)
         db_album = self.get_album(album_id)
         self.db.delete(db_album)
         self.db.commit()
         return None
 
     def set_tags_for_album(self, album_id: int, tag_names: List[str], current_user: User) -> Album:
+        invalidate_on_commit(self.db, ALBUMS, TAGS)
         db_album = self.get_album(album_id)
-        user_permissions = {p.name for p in current_user.role.permissions}
+        user_permissions = current_user.permission_names
 
         can_edit_any = Permissions.EDIT_ANY_ALBUM.value in user_permissions
 
         if not can_edit_any:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You do not have permission to edit tags for this album.")
 
-        db_album.tags.clear()
-        
-        for tag_name in tag_names:
-            if not tag_name.strip():
-                continue
-            tag = self.db.query(Tag).filter(Tag.name.ilike(tag_name.strip())).first()
-            if not tag:
-                tag = Tag(name=tag_name.strip())
-                self.db.add(tag)
-
-            db_album.tags.append(tag)
-            
+        db_album.tags = TagService(self.db).get_or_create_tags(tag_names)
+
         updated_album = self._save_and_refresh(db_album)
-        return self._populate_photo_urls(updated_album)
\ No newline at end of file
+        return self._populate_photo_urls(updated_album)
+
+class AsyncAlbumService(AsyncBaseService):
+    """Async versions of the public album listings (AsyncSession / asyncpg)."""
+    async def list_albums(self) -> List[AlbumSchema]:
+        result = await self.db.execute(select(Album).options(*ALBUM_TREE_LOAD_OPTIONS))
+        return [AlbumSchema.model_validate(album) for album in result.unique().scalars()]
+
+    async def list_album_summaries(self, offset: int = 0, limit: int = 20) -> PaginatedResponse[AlbumSummarySchema]:
+        rows = (await self.db.execute(_album_summaries_stmt(offset, limit))).all()
+        total = await self.db.scalar(select(func.count(Album.id)))
+        return _album_summaries_page(rows, total)
@@ -1,3 +1,4 @@
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 class BaseService():
@@ -15,4 +16,9 @@ class BaseService():
         self.db.delete(obj)
         self.db.commit()
         self.db.flush()
-        return None
\ No newline at end of file
+        return None
+
+class AsyncBaseService():
+    """Base for the async (AsyncSession) read paths of the public endpoints."""
+    def __init__(self, db: AsyncSession):
+        self.db = db
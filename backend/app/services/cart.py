@@ -1,107 +1,150 @@
+from sqlalchemy import select, update, delete, literal
 from sqlalchemy.orm import Session, joinedload
+from db.upsert import upsert_insert
 from models.cart import Cart, CartItem, CartItemCreateSchema
+from models.photo import Photo
+from models.saved_cart import SavedCart
+from services.photos import PHOTO_LOAD_OPTIONS
 from fastapi import HTTPException
 
+# Todo lo que serializa CartSchema, en una sola consulta (más la de tags).
+CART_LOAD_OPTIONS = (
+    joinedload(Cart.items).joinedload(CartItem.photo).options(*PHOTO_LOAD_OPTIONS),
+)
+
 class CartService:
+    """
+    Cart mutations are single statements filtered by the cart owner (user_id or guest_id),
+    so they never load the cart first; the updated cart is read once at the end.
+    """
     def __init__(self, db: Session):
         self.db = db
 
-    def get_or_create_cart(self, user_id: int | None = None, guest_id: str | None = None) -> Cart:
+    @staticmethod
+    def _owner_filter(user_id: int | None, guest_id: str | None):
         if user_id is None and guest_id is None:
             raise ValueError("Se requiere user_id o guest_id")
+        return Cart.user_id == user_id if user_id else Cart.guest_id == guest_id
+
+    def _owned_cart_ids(self, user_id: int | None, guest_id: str | None):
+        return select(Cart.id).where(self._owner_filter(user_id, guest_id)).scalar_subquery()
+
+    def _load_cart(self, user_id: int | None, guest_id: str | None) -> Cart | None:
+        return self.db.execute(
+            select(Cart)
+            .options(*CART_LOAD_OPTIONS)
+            .where(self._owner_filter(user_id, guest_id))
+            .execution_options(populate_existing=True)
+        ).unique().scalar_one_or_none()
+
+    def _create_cart(self, user_id: int | None, guest_id: str | None):
+        # ON CONFLICT DO NOTHING: si dos requests crean el mismo carrito a la vez, gana uno y el otro lo reutiliza.
+        owner = {"user_id": user_id} if user_id else {"guest_id": guest_id}
+        self.db.execute(
+            upsert_insert(self.db, Cart.__table__).values(**owner).on_conflict_do_nothing(index_elements=list(owner))
+        )
 
-        query = self.db.query(Cart).options(joinedload(Cart.items).joinedload(CartItem.photo))
-        
-        if user_id:
-            cart = query.filter(Cart.user_id == user_id).first()
-        else: # guest_id is not None
-            cart = query.filter(Cart.guest_id == guest_id).first()
-        
-        if not cart:
-            if user_id:
-                cart = Cart(user_id=user_id)
-            else:
-                cart = Cart(guest_id=guest_id)
-            self.db.add(cart)
+    def get_or_create_cart(self, user_id: int | None = None, guest_id: str | None = None) -> Cart:
+        cart = self._load_cart(user_id, guest_id)
+        if cart is None:
+            self._create_cart(user_id, guest_id)
             self.db.commit()
-            self.db.refresh(cart)
-            # Re-fetch with relationships
-            cart = query.filter(Cart.id == cart.id).first()
-            
+            cart = self._load_cart(user_id, guest_id)
         return cart
 
+    def _upsert_item(self, user_id: int | None, guest_id: str | None, item: CartItemCreateSchema) -> int:
+        table = CartItem.__table__
+        stmt = upsert_insert(self.db, table).from_select(
+            ["cart_id", "photo_id", "quantity"],
+            select(Cart.id, literal(item.photo_id), literal(item.quantity)).where(self._owner_filter(user_id, guest_id)),
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["cart_id", "photo_id"],
+            set_={"quantity": table.c.quantity + stmt.excluded.quantity},
+        )
+        return self.db.execute(stmt).rowcount
+
     def add_item_to_cart(self, user_id: int | None, guest_id: str | None, item: CartItemCreateSchema):
-        cart = self.get_or_create_cart(user_id, guest_id)
-        cart_item = self.db.query(CartItem).filter(CartItem.cart_id == cart.id, CartItem.photo_id == item.photo_id).first()
-
-        if cart_item:
-            cart_item.quantity += item.quantity
-        else:
-            cart_item = CartItem(cart_id=cart.id, photo_id=item.photo_id, quantity=item.quantity)
-            self.db.add(cart_item)
-        
+        # La foto se busca antes (por PK): así cualquier otro IntegrityError no se disfraza de 404.
+        if self.db.scalar(select(Photo.id).where(Photo.id == item.photo_id)) is None:
+            raise HTTPException(status_code=404, detail="Photo not found")
+        if self._upsert_item(user_id, guest_id, item) == 0:
+            # Todavía no hay carrito: se crea (ON CONFLICT DO NOTHING si otro request se adelantó)
+            # y se repite el upsert en la misma transacción.
+            self._create_cart(user_id, guest_id)
+            self._upsert_item(user_id, guest_id, item)
         self.db.commit()
-        self.db.refresh(cart)
-        return self.get_or_create_cart(user_id, guest_id) # Re-fetch
+        return self._load_cart(user_id, guest_id)
 
     def update_cart_item(self, user_id: int | None, guest_id: str | None, item_id: int, quantity: int):
-        cart = self.get_or_create_cart(user_id, guest_id)
-        cart_item = self.db.query(CartItem).filter(CartItem.id == item_id, CartItem.cart_id == cart.id).first()
-
-        if not cart_item:
+        if quantity <= 0:
+            return self.delete_cart_item(user_id, guest_id, item_id)
+
+        result = self.db.execute(
+            update(CartItem)
+            .where(CartItem.id == item_id, CartItem.cart_id == self._owned_cart_ids(user_id, guest_id))
+            .values(quantity=quantity)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 0:
             raise HTTPException(status_code=404, detail="Cart item not found")
 
-        if quantity <= 0:
-            self.db.delete(cart_item)
-        else:
-            cart_item.quantity = quantity
-        
         self.db.commit()
-        self.db.refresh(cart)
-        return self.get_or_create_cart(user_id, guest_id)
+        return self._load_cart(user_id, guest_id)
 
     def delete_cart_item(self, user_id: int | None, guest_id: str | None, item_id: int):
-        cart = self.get_or_create_cart(user_id, guest_id)
-        cart_item = self.db.query(CartItem).filter(CartItem.id == item_id, CartItem.cart_id == cart.id).first()
-
-        if not cart_item:
+        result = self.db.execute(
+            delete(CartItem)
+            .where(CartItem.id == item_id, CartItem.cart_id == self._owned_cart_ids(user_id, guest_id))
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 0:
             raise HTTPException(status_code=404, detail="Cart item not found")
 
-        self.db.delete(cart_item)
         self.db.commit()
-        self.db.refresh(cart)
-        return self.get_or_create_cart(user_id, guest_id)
-
-    def empty_cart(self, user_id: int | None, guest_id: str | None):
-        cart = self.get_or_create_cart(user_id, guest_id)
-        for item in cart.items:
-            self.db.delete(item)
-        
+        return self._load_cart(user_id, guest_id)
+
+    def empty_cart(self, user_id: int | None = None, guest_id: str | None = None):
+        self.db.execute(
+            delete(CartItem)
+            .where(CartItem.cart_id == self._owned_cart_ids(user_id, guest_id))
+            .execution_options(synchronize_session=False)
+        )
         self.db.commit()
-        self.db.refresh(cart)
         return self.get_or_create_cart(user_id, guest_id)
 
     def transfer_guest_cart_to_user(self, guest_id: str, user_id: int):
-        guest_cart = self.db.query(Cart).options(joinedload(Cart.items)).filter(Cart.guest_id == guest_id).first()
-        if not guest_cart:
+        """
+        Moves the guest cart into the user's cart with a fixed number of statements, whatever
+        the cart size: photos already in the user cart add up their quantities. The guest cart
+        row is locked first, so a concurrent merge of the same guest (another tab) waits and
+        then finds nothing to move instead of adding the items twice.
+        """
+        guest_cart_id = self.db.execute(
+            select(Cart.id).where(Cart.guest_id == guest_id).with_for_update()
+        ).scalar_one_or_none()
+        if guest_cart_id is None:
             return
 
-        user_cart = self.get_or_create_cart(user_id=user_id)
-
-        # Si el carrito del usuario ya tiene items, fusionamos
-        for guest_item in guest_cart.items:
-            # Buscamos si el mismo producto ya existe en el carrito del usuario
-            user_item = self.db.query(CartItem).filter(
-                CartItem.cart_id == user_cart.id,
-                CartItem.photo_id == guest_item.photo_id
-            ).first()
-
-            if user_item:
-                # Si existe, sumamos las cantidades
-                user_item.quantity += guest_item.quantity
-            else:
-                # Si no existe, lo movemos al carrito del usuario
-                guest_item.cart_id = user_cart.id
-        
-        self.db.delete(guest_cart)
+        self._create_cart(user_id, None)
+        user_cart_id = select(Cart.id).where(Cart.user_id == user_id).scalar_subquery()
+
+        table = CartItem.__table__
+        stmt = upsert_insert(self.db, table).from_select(
+            ["cart_id", "photo_id", "quantity"],
+            select(user_cart_id, table.c.photo_id, table.c.quantity)
+            .where(table.c.cart_id == guest_cart_id)
+            .order_by(table.c.photo_id), # mismo orden de bloqueo si dos merges tocan el mismo carrito de usuario
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["cart_id", "photo_id"],
+            set_={"quantity": table.c.quantity + stmt.excluded.quantity},
+        )
+        self.db.execute(stmt)
+
+        self.db.execute(delete(CartItem).where(CartItem.cart_id == guest_cart_id).execution_options(synchronize_session=False))
+        self.db.execute(
+            update(SavedCart).where(SavedCart.cart_id == guest_cart_id).values(cart_id=None).execution_options(synchronize_session=False)
+        )
+        self.db.execute(delete(Cart).where(Cart.id == guest_cart_id).execution_options(synchronize_session=False))
         self.db.commit()
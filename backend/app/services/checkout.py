@@ -1,18 +1,28 @@
-import mercadopago
 from fastapi import HTTPException, status
+from sqlalchemy import insert
 from sqlalchemy.orm import Session, joinedload
-
-from models.order import Order, OrderItem, OrderCreateSchema, PaymentMethod
+from sqlalchemy.orm.attributes import set_committed_value
+
+from models.order import (
+    Order, OrderItem, OrderItemCreateSchema, OrderCreateSchema, OrderQuoteRequestSchema, OrderQuoteSchema,
+    OrderSchema, OrderStatus, PaymentStatus,
+)
+from models.user import User
+from core.permissions import Permissions
 from services.base import BaseService
+from services.payment_gateway import PaymentGatewayError, get_payment_gateway
+from services.pricing import PricingService
 from core.config import settings
 
 
 class CheckoutService(BaseService):
     def create_mercadopago_preference(self, order_id: int):
-        if not settings.MERCADOPAGO_ACCESS_TOKEN:
+        try:
+            gateway = get_payment_gateway()
+        except PaymentGatewayError as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Mercado Pago access token is not configured."
+                detail=str(e)
             )
 
         # 1. Fetch the order with its items and photos
@@ -46,9 +56,21 @@ class CheckoutService(BaseService):
         if not preference_items:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cannot create payment for an empty order.")
 
-        try:
-            sdk = mercadopago.SDK(settings.MERCADOPAGO_ACCESS_TOKEN)
+        # Mercado Pago cobra la suma de los ítems: si el total de la orden no coincide
+        # (descuento o total fijado por el personal), se cobra una sola línea por order.total.
+        items_total = round(sum(item.price * item.quantity for item in order.items), 2)
+        if round(order.total, 2) != items_total:
+            if order.total <= 0:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cannot create payment for an order with a zero total.")
+            preference_items = [{
+                "title": f"Pedido #{order.id}",
+                "description": f"{sum(item.quantity for item in order.items)} foto(s) de Somos Fotos Patagonia",
+                "quantity": 1,
+                "unit_price": round(order.total, 2),
+                "currency_id": "ARS"
+            }]
 
+        try:
             # URLs are now sourced from config
             back_urls = {
                 "success": settings.MERCADOPAGO_SUCCESS_URL,
@@ -74,15 +96,7 @@ class CheckoutService(BaseService):
             
             print("Sending data to Mercado Pago:", preference_data) # DEBUGGING
 
-            preference_response = sdk.preference().create(preference_data)
-            
-            if preference_response["status"] != 201:
-                raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail=f"Error creating Mercado Pago preference: {preference_response.get('response', {}).get('message', 'Unknown error')}"
-                )
-
-            preference = preference_response["response"]
+            preference = gateway.create_preference(preference_data)
             return {
                 "preference_id": preference["id"],
                 "init_point": preference["init_point"]
@@ -95,77 +109,6 @@ class CheckoutService(BaseService):
                 detail="Could not create payment preference due to an internal error."
             )
 
-    def mercadopago_webhook(self, webhook_data: dict):
-        """
-        Handles incoming webhooks from Mercado Pago.
-        For production, it's crucial to verify the X-Signature header to ensure the request is from Mercado Pago.
-        """
-        print("Received Mercado Pago webhook:", webhook_data)
-
-        if webhook_data.get("type") != "payment":
-            return {"status": "webhook ignored, not a payment type"}
-        
-        payment_id = webhook_data.get("data", {}).get("id")
-        if not payment_id:
-            return {"status": "webhook ignored, no payment id"}
-
-        if not settings.MERCADOPAGO_ACCESS_TOKEN:
-            print(f"ERROR: Received webhook for payment {payment_id}, but Mercado Pago is not configured.")
-            raise HTTPException(status_code=500, detail="Mercado Pago is not configured")
-
-        try:
-            sdk = mercadopago.SDK(settings.MERCADOPAGO_ACCESS_TOKEN)
-            payment_info = sdk.payment().get(payment_id)
-
-            if payment_info["status"] != 200:
-                print(f"❌ Could not fetch payment info for ID {payment_id}.")
-                # Devolvemos 200 para que MP no reintente una llamada fallida a su propia API.
-                return {"status": "error fetching payment info from Mercado Pago"}
-
-            payment = payment_info["response"]
-            
-            if payment["status"] == "approved":
-                external_reference = payment.get("external_reference")
-                if not external_reference:
-                    print(f"ERROR: Payment {payment_id} approved but has no external_reference (order_id).")
-                    return {"status": "error, missing external_reference"}
-
-                try:
-                    order_id = int(external_reference)
-                except (ValueError, TypeError):
-                    print(f"ERROR: external_reference '{external_reference}' is not a valid order ID.")
-                    return {"status": "error, invalid external_reference"}
-
-                print(f"✅ Payment with ID {payment_id} was approved for Order ID: {order_id}")
-                
-                # --- Usar el servicio de órdenes para marcar como pagada ---
-                from services.orders import OrderService
-
-                try:
-                    order_service = OrderService(self.db)
-                    order_service.mark_order_as_paid(
-                        order_id=order_id,
-                        payment_method=PaymentMethod.MP,
-                        external_payment_id=str(payment_id)
-                    )
-                    print(f"   Order {order_id} successfully updated to 'paid'.")
-                except HTTPException as e:
-                    # Si la orden no se encuentra o ya fue pagada, no es un error crítico para MP.
-                    print(f"NOTE: Could not mark order {order_id} as paid. Reason: {e.detail}")
-                except Exception as e:
-                    print(f"CRITICAL: An unexpected error occurred while updating order {order_id}: {e}")
-                    # Levantar excepción para que MP sepa que algo falló y debe reintentar.
-                    raise HTTPException(status_code=500, detail="Failed to update order in database.")
-
-            else:
-                print(f"ℹ️ Payment with ID {payment_id} has status: {payment['status']}.")
-
-        except Exception as e:
-            print(f"Error processing webhook for payment {payment_id}: {e}")
-            raise HTTPException(status_code=500, detail="Internal server error processing webhook.")
-        
-        return {"status": "webhook processed"}
-
     def get_checkout_status(self):
         # Business logic for querying payment status
         return {"message": "CheckoutService: Get checkout status logic"}
@@ -174,39 +117,83 @@ class CheckoutService(BaseService):
         # Business logic for registering a local sale
         return {"message": "CheckoutService: Register local sale logic"}
 
-    def create_order(self, order_in: OrderCreateSchema) -> Order:
+    def quote_order(self, quote_in: OrderQuoteRequestSchema) -> OrderQuoteSchema:
+        """
+        Prices a cart with the same rules as create_order (combos per album, print packs),
+        so the cart shows what the order will cost. Nothing is stored.
+        """
+        quote = PricingService(self.db).quote(quote_in.items)
+        items = [
+            OrderItemCreateSchema(photo_id=line.photo.id, price=line.price, quantity=line.quantity, format=line.format)
+            for line in quote.items
+        ]
+        digital_subtotal = round(sum(item.price * item.quantity for item in items if item.format is None), 2)
+        return OrderQuoteSchema(
+            items=items,
+            digital_subtotal=digital_subtotal,
+            prints_subtotal=round(quote.subtotal - digital_subtotal, 2),
+            subtotal=quote.subtotal,
+        )
+
+    def create_order(self, order_in: OrderCreateSchema, current_user: User | None = None) -> OrderSchema:
+        """
+        Creates a pending order priced on the server (see PricingService): the `price` of
+        the items and the `total` sent by the client are ignored. The photos are read in
+        one IN query and the items are inserted in one statement; the response is built
+        from those rows before committing, so nothing is read back afterwards. A discount
+        is only applied from its code, never from a bare discount_id. Staff who can edit
+        orders may set the total by hand with `override_total` (local sales).
+        """
+        if order_in.discount_id is not None:
+            # Los ids de descuento son secuenciales: aceptarlos regalaría cualquier descuento activo.
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="El descuento se aplica con su código (discount_code), no con discount_id."
+            )
+        quote = PricingService(self.db).quote(order_in.items, discount_code=order_in.discount_code)
+        total = quote.total
+        if order_in.override_total is not None:
+            # Mismo permiso que PUT /orders/{id}, que ya permite cambiar el total después.
+            permissions = current_user.permission_names if current_user else frozenset()
+            if not {Permissions.EDIT_ORDER.value, Permissions.FULL_ACCESS.value} & permissions:
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail="No tienes permiso para fijar el total de la orden."
+                )
+            if order_in.override_total < 0:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="The order total cannot be negative.")
+            total = round(order_in.override_total, 2)
+
         db_order = Order(
             user_id=order_in.user_id,
             guest_id=order_in.guest_id,
             customer_email=order_in.customer_email,
-            total=order_in.total,
+            total=total,
             payment_method=order_in.payment_method,
-            payment_status=order_in.payment_status,
-            order_status=order_in.order_status,
+            # Una orden nueva siempre queda pendiente; el pago la confirma (mark_order_as_paid).
+            payment_status=PaymentStatus.PENDING,
+            order_status=OrderStatus.PENDING,
             external_payment_id=order_in.external_payment_id,
-            discount_id=order_in.discount_id
+            discount_id=quote.discount.id if quote.discount else None
         )
         self.db.add(db_order)
         self.db.flush()  # Flush to get the order ID
 
-        for item_in in order_in.items:
-            db_order_item = OrderItem(
-                order_id=db_order.id,
-                photo_id=item_in.photo_id,
-                price=item_in.price,
-                quantity=item_in.quantity,
-                format=item_in.format
-            )
-            self.db.add(db_order_item)
-        
+        items = self.db.scalars(insert(OrderItem).returning(OrderItem, sort_by_parameter_order=True), [
+            {
+                "order_id": db_order.id,
+                "photo_id": line.photo.id,
+                "price": line.price,
+                "quantity": line.quantity,
+                "format": line.format,
+            }
+            for line in quote.items
+        ]).all()
+        for item, line in zip(items, quote.items):
+            set_committed_value(item, "photo", line.photo)
+        set_committed_value(db_order, "items", items)
+        set_committed_value(db_order, "discount", quote.discount)
+
+        order = OrderSchema.model_validate(db_order)
         self.db.commit()
-        self.db.refresh(db_order)
-
-        # Re-fetch the order with all relationships loaded for proper serialization
-        order = self.db.query(Order).options(
-            joinedload(Order.user),
-            joinedload(Order.items).joinedload(OrderItem.photo),
-            joinedload(Order.discount)
-        ).filter(Order.id == db_order.id).first()
-        
         return order
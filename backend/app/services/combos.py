@@ -4,6 +4,7 @@ from typing import List
 
 from models.combo import Combo, ComboCreateSchema, ComboUpdateSchema
 from services.base import BaseService
+from services.response_cache import COMBOS, invalidate_on_commit
 
 class ComboService(BaseService):
     def list_combos(self) -> List[Combo]:
@@ -19,6 +20,7 @@ class ComboService(BaseService):
 
     def create_combo(self, combo_in: ComboCreateSchema) -> Combo:
         """Creates a new combo record in the database."""
+        invalidate_on_commit(self.db, COMBOS)
         # Check if combo with the same name already exists (case-insensitive)
         existing_combo = self.db.query(Combo).filter(Combo.name.ilike(combo_in.name)).first()
         if existing_combo:
@@ -32,6 +34,7 @@ class ComboService(BaseService):
 
     def update_combo(self, combo_id: int, combo_in: ComboUpdateSchema) -> Combo:
         """Updates an existing combo record."""
+        invalidate_on_commit(self.db, COMBOS)
         combo = self.get_combo(combo_id)
         
         # Check if new name is already taken by another combo
@@ -51,6 +54,7 @@ class ComboService(BaseService):
 
     def delete_combo(self, combo_id: int) -> None:
         """Deletes a combo record."""
+        invalidate_on_commit(self.db, COMBOS)
         combo = self.get_combo(combo_id)
         self.db.delete(combo)
         self.db.commit()
@@ -0,0 +1,32 @@
+from datetime import datetime, timedelta
+
+from core.backoff import backoff_delay
+from core.config import settings
+from db.upsert import upsert_insert
+from models.email_outbox import EmailOutbox, EmailStatus
+from services.base import BaseService
+
+
+def retry_delay(attempts: int) -> timedelta:
+    return backoff_delay(attempts, settings.EMAIL_RETRY_BASE_SECONDS, settings.EMAIL_RETRY_MAX_SECONDS)
+
+
+class EmailOutboxService(BaseService):
+    def enqueue(self, to_email: str, subject: str, body: str, html: bool = False, dedupe_key: str | None = None) -> bool:
+        """
+        Queues an email for email_worker.py. Does not commit: the row is written in the
+        caller's transaction, so the email exists if and only if that transaction commits.
+        Returns False when an email with the same `dedupe_key` was already queued.
+        """
+        stmt = upsert_insert(self.db, EmailOutbox.__table__).values(
+            dedupe_key=dedupe_key,
+            to_email=to_email,
+            subject=subject,
+            body=body,
+            html=html,
+            status=EmailStatus.PENDING,
+            attempts=0,
+            next_attempt_at=datetime.utcnow(),
+            created_at=datetime.utcnow(),
+        ).on_conflict_do_nothing(index_elements=["dedupe_key"])
+        return self.db.execute(stmt).rowcount > 0
@@ -2,44 +2,60 @@ import resend
 from core.config import settings
 
 
-def send_email(
+class EmailDeliveryError(Exception):
+    pass
+
+
+def deliver_email(
     to_email: str,
     subject: str,
     body: str,
     html: bool = False
-):
-    print("--- Attempting to send email via Resend API ---")
-    print(f"To: {to_email}")
-    print(f"Subject: {subject}")
-
+) -> str:
+    """
+    Sends an email through the Resend API and returns the Resend ID. Raises on any
+    failure so the caller (the outbox dispatcher) can retry it.
+    """
     if not settings.RESEND_API_KEY:
-        print("CRITICAL: RESEND_API_KEY is not configured. Skipping email sending.")
-        return
+        raise EmailDeliveryError("RESEND_API_KEY is not configured.")
 
     if not settings.EMAIL_FROM:
-        print("CRITICAL: EMAIL_FROM is not configured. Skipping email sending.")
-        return
+        raise EmailDeliveryError("EMAIL_FROM is not configured.")
 
-    try:
-        resend.api_key = settings.RESEND_API_KEY
-        params = {
-            "from": settings.EMAIL_FROM,
-            "to": [to_email],
-            "subject": subject,
-        }
+    resend.api_key = settings.RESEND_API_KEY
+    params = {
+        "from": settings.EMAIL_FROM,
+        "to": [to_email],
+        "subject": subject,
+    }
 
-        if html:
-            params["html"] = body
-        else:
-            params["text"] = body
+    if html:
+        params["html"] = body
+    else:
+        params["text"] = body
 
-        print("DEBUG: Sending email with params:", {"from": params["from"], "to": params["to"], "subject": params["subject"]})
+    email = resend.Emails.send(params)
+    return email["id"]
 
-        email = resend.Emails.send(params)
 
-        print(f"SUCCESS: Email sent successfully to {to_email}. Resend ID: {email['id']}")
+def send_email(
+    to_email: str,
+    subject: str,
+    body: str,
+    html: bool = False
+):
+    print("--- Attempting to send email via Resend API ---")
+    print(f"To: {to_email}")
+    print(f"Subject: {subject}")
+
+    try:
+        email_id = deliver_email(to_email, subject, body, html=html)
+        print(f"SUCCESS: Email sent successfully to {to_email}. Resend ID: {email_id}")
+
+    except EmailDeliveryError as e:
+        print(f"CRITICAL: {e} Skipping email sending.")
 
     except Exception as e:
         print(f"CRITICAL: Failed to send email to {to_email} via Resend. Error: {e}")
         # Opcional: podrías relanzar la excepción si quieres que el proceso que llama se entere del error.
-        # raise e
\ No newline at end of file
+        # raise e
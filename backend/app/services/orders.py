@@ -1,60 +1,77 @@
-from sqlalchemy.orm import Session, joinedload
+import uuid
+from datetime import datetime
+from sqlalchemy import select, literal, DateTime
+from sqlalchemy.orm import Session, joinedload, selectinload
 from fastapi import HTTPException, status
-from models.order import Order, OrderItem, OrderStatus, OrderUpdateSchema, PaymentMethod, PaymentStatus
+from models.order import Order, OrderItem, OrderStatus, OrderUpdateSchema, PaymentMethod, PaymentStatus, PublicOrderSchema
 from models.earning import Earning
-from models.photo import Photo
-from services.base import BaseService
+from models.photo import Photo, RenditionStatus
+from models.photographer import Photographer
+from services.base import BaseService, AsyncBaseService
+from db.upsert import upsert_insert
+from models.user import User
 from models.photo_session import PhotoSession # Importar PhotoSession
 from services.email_service import send_email
+from services.email_outbox import EmailOutboxService
+from services.sales_rollups import SalesRollupService
 from services.cart import CartService # Importar CartService
+from services.storage import storage_service
+from services.renditions import rendition_key
+from services.photos import PHOTO_LOAD_OPTIONS
 from core.config import settings
 
-def process_earnings_for_order_item(db: Session, order_item: OrderItem):
+def _public_order_object_names(order: Order) -> list[str]:
+    """Keys that PublicPhotoSchema signs item by item while serializing a public order."""
+    object_names = []
+    for item in order.items:
+        if item.photo:
+            object_names.append(item.photo.object_name)
+            if item.photo.rendition_status == RenditionStatus.READY:
+                object_names.append(rendition_key(item.photo.object_name, "web"))
+    return object_names
+
+def record_earnings(db: Session, *item_filters) -> int:
     """
-    Calculates and records the earning for a photographer based on a sold OrderItem.
-    This is now safe against missing photos or photographers.
+    Records the photographer's earning of every OrderItem matching `item_filters` with a
+    single INSERT INTO earnings ... SELECT over order_items, photos and photographers.
+    Items whose photo is missing or has no photographer are skipped. Items that already
+    have an earning are left as they are (ON CONFLICT (order_item_id) DO NOTHING), so
+    recording an order twice is harmless. Returns the number of earnings inserted.
+    No commit here, as it should be part of a larger transaction.
     """
-    # Ensure photo is loaded
-    if not order_item.photo:
-        db.refresh(order_item, attribute_names=['photo'])
-
-    # If photo is still None (e.g., data integrity issue), log and skip.
-    if not order_item.photo:
-        print(f"WARNING: Skipping earning for OrderItem ID {order_item.id} because its associated Photo ID {order_item.photo_id} could not be found.")
-        return
-
-    # Ensure photographer is loaded
-    if not order_item.photo.photographer:
-        db.refresh(order_item.photo, attribute_names=['photographer'])
-        
-    # If photographer is still not loaded, log and skip.
-    if not order_item.photo.photographer:
-        print(f"WARNING: Skipping earning for OrderItem ID {order_item.id} because the associated Photo ID {order_item.photo.id} has no photographer.")
-        return
-
-    photographer = order_item.photo.photographer
-    item_price = order_item.price * order_item.quantity
-    commission_percentage = photographer.commission_percentage
-    
-    # Monetary earning calculation
-    commission_amount = item_price * (commission_percentage / 100.0)
-    earned_amount = item_price - commission_amount
-
-    # Photo fraction earning calculation
-    photographer_fraction = 1 - (commission_percentage / 100.0)
-    earned_photo_fraction = photographer_fraction * order_item.quantity
-
-    new_earning = Earning(
-        photographer_id=photographer.id,
-        order_id=order_item.order_id, # Link to the order
-        order_item_id=order_item.id,
-        amount=earned_amount,
-        commission_applied=commission_percentage,
-        earned_photo_fraction=earned_photo_fraction
+    item_price = OrderItem.price * OrderItem.quantity
+    commission_percentage = Photographer.commission_percentage
+    earnings = (
+        select(
+            Photographer.id,
+            OrderItem.order_id,
+            OrderItem.id,
+            item_price - item_price * (commission_percentage / 100.0), # monto neto
+            commission_percentage,
+            (1 - commission_percentage / 100.0) * OrderItem.quantity, # fracción de foto
+            literal(datetime.utcnow(), type_=DateTime),
+        )
+        .join(Photo, Photo.id == OrderItem.photo_id)
+        .join(Photographer, Photographer.id == Photo.photographer_id)
+        .where(*item_filters)
     )
-    db.add(new_earning)
-    # No commit here, as it should be part of a larger transaction
-    return new_earning
+    stmt = upsert_insert(db, Earning.__table__).from_select(
+        ["photographer_id", "order_id", "order_item_id", "amount", "commission_applied", "earned_photo_fraction", "created_at"],
+        earnings,
+    ).on_conflict_do_nothing(index_elements=["order_item_id"])
+    return db.execute(stmt).rowcount
+
+def process_earnings_for_order_item(db: Session, order_item: OrderItem):
+    """
+    Calculates and records the earning for a photographer based on a sold OrderItem
+    (see record_earnings). Returns None when the item's photo or photographer is missing.
+    """
+    db.flush() # el ítem tiene que estar en la base
+    record_earnings(db, OrderItem.id == order_item.id)
+    earning = db.query(Earning).filter(Earning.order_item_id == order_item.id).first()
+    if not earning:
+        print(f"WARNING: Skipping earning for OrderItem ID {order_item.id} because its Photo ID {order_item.photo_id} or its photographer could not be found.")
+    return earning
 
 class OrderService(BaseService):
     def _build_order_confirmation_email_content(self, order: Order) -> tuple[str, str]:
@@ -186,32 +203,43 @@ class OrderService(BaseService):
         ).filter(Order.public_id == public_id).first()
         if not order:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Order not found")
+        # Firma en lote las URLs que PublicPhotoSchema va a pedir ítem por ítem al serializar.
+        storage_service.generate_presigned_get_urls(_public_order_object_names(order))
         return order
         
-    def process_earnings_for_order(self, order: Order):
+    def process_earnings_for_order(self, order: Order) -> int:
         """
-        Calculates and records earnings for all items in an order by calling
-        process_earnings_for_order_item for each item.
+        Records the earnings of all items in an order with one INSERT ... SELECT
+        (see record_earnings), without loading the items, photos or photographers.
+        Returns the number of earnings inserted.
         """
-        # Ensure items and their photos/photographers are loaded
-        order = self.db.query(Order).options(
-            joinedload(Order.items).joinedload(OrderItem.photo).joinedload(Photo.photographer)
-        ).filter(Order.id == order.id).first()
-
-        if not order or not order.items:
-            return
-
-        for item in order.items:
-            process_earnings_for_order_item(self.db, item)
-        
+        self.db.flush() # los ítems de una orden recién creada tienen que estar en la base
         # The commit will be handled by the calling function (e.g., mark_order_as_paid)
-        return
+        return record_earnings(self.db, OrderItem.order_id == order.id)
+
+    def _lock_order(self, order_id: int) -> Order:
+        """
+        Locks the order row (SELECT ... FOR UPDATE) until the transaction ends and reloads its
+        columns, so concurrent changes to the same order (a webhook confirmation and a manual
+        status update, an edit and a delete) run one after the other on fresh data.
+        """
+        order = self.db.scalars(
+            select(Order)
+            .where(Order.id == order_id)
+            .with_for_update(of=Order)
+            .execution_options(populate_existing=True)
+        ).first()
+        if not order:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Order not found")
+        return order
 
     def mark_order_as_paid(self, order_id: int, payment_method: PaymentMethod, external_payment_id: str | None = None) -> Order:
         """
-        Marks an order as paid, processes earnings, and sends a confirmation email.
+        Marks an order as paid, processes earnings, and queues the confirmation email.
         This is the central function for confirming a payment.
         """
+        # Con la fila bloqueada, una segunda confirmación espera y ve la orden ya pagada.
+        self._lock_order(order_id)
         order = self.get_order_details(order_id)
         if order.payment_status == PaymentStatus.PAID:
             raise HTTPException(
@@ -226,21 +254,10 @@ class OrderService(BaseService):
             order.external_payment_id = external_payment_id
         
         self.process_earnings_for_order(order)
+        SalesRollupService(self.db).record_paid_order(order.id)
 
-        self._save_and_refresh(order)
-
-        # --- Vaciar el carrito asociado a la orden ---
-        cart_service = CartService(self.db)
-        if order.user_id:
-            cart_service.empty_cart(user_id=order.user_id, guest_id=None)
-            print(f"INFO: Cart for user {order.user_id} emptied after order {order.id} was paid.")
-        elif order.guest_id:
-            cart_service.empty_cart(guest_id=order.guest_id)
-            print(f"INFO: Cart for guest {order.guest_id} emptied after order {order.id} was paid.")
-        else:
-            print(f"WARNING: Order {order.id} paid but no user_id or guest_id found to empty a cart.")
-        
-        # --- Send confirmation email ---
+        # --- Queue confirmation email ---
+        # Se escribe en el outbox dentro de la misma transacción que el pago; lo envía email_worker.py.
         email_to = None
         if order.customer_email:
             email_to = order.customer_email
@@ -251,14 +268,28 @@ class OrderService(BaseService):
 
         if email_to:
             subject, email_body = self._build_order_confirmation_email_content(order)
-            send_email(
+            EmailOutboxService(self.db).enqueue(
                 to_email=email_to,
                 subject=subject,
                 body=email_body,
-                html=True
+                html=True,
+                dedupe_key=f"order_confirmation:{order.id}"
             )
         else:
             print(f"WARNING: Order ID {order.id} marked as paid but has no email associated (customer_email or user.email). Could not send confirmation email.")
+
+        self._save_and_refresh(order)
+
+        # --- Vaciar el carrito asociado a la orden ---
+        cart_service = CartService(self.db)
+        if order.user_id:
+            cart_service.empty_cart(user_id=order.user_id, guest_id=None)
+            print(f"INFO: Cart for user {order.user_id} emptied after order {order.id} was paid.")
+        elif order.guest_id:
+            cart_service.empty_cart(guest_id=order.guest_id)
+            print(f"INFO: Cart for guest {order.guest_id} emptied after order {order.id} was paid.")
+        else:
+            print(f"WARNING: Order {order.id} paid but no user_id or guest_id found to empty a cart.")
         
         return order
 
@@ -281,10 +312,19 @@ class OrderService(BaseService):
         return order
 
     def edit_order(self, order_id: int, order_in: OrderUpdateSchema) -> Order:
+        self._lock_order(order_id)
         order = self.get_order_details(order_id)
         update_data = order_in.model_dump(exclude_unset=True)
+        # El total y el estado de pago cambian lo que la orden aporta a los rollups del dashboard:
+        # se descuenta lo que aportaba antes de editarla y se vuelve a sumar con los valores nuevos.
+        affects_rollups = bool(update_data.keys() & {"total", "payment_status"})
+        rollups = SalesRollupService(self.db)
+        if affects_rollups:
+            rollups.remove_paid_order(order.id)
         for field, value in update_data.items():
             setattr(order, field, value)
+        if affects_rollups:
+            rollups.record_paid_order(order.id)
         self._save_and_refresh(order)
         return order
 
@@ -311,18 +351,42 @@ class OrderService(BaseService):
         return {"message": f"Email successfully sent to {recipient}"}
 
     def delete_order(self, order_id: int):
-        # Primero, eliminar las ganancias asociadas para evitar problemas de clave externa
+        order = self._lock_order(order_id)
+
+        # Sacar la orden de los rollups mientras todavía existen sus ítems y ganancias
+        SalesRollupService(self.db).remove_paid_order(order.id)
+
+        # Eliminar las ganancias asociadas para evitar problemas de clave externa
         self.db.query(Earning).filter(Earning.order_id == order_id).delete(synchronize_session=False)
 
         # Ahora, eliminar la orden
-        order = self.db.query(Order).filter(Order.id == order_id).first()
-        if not order:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Order not found")
-        
         self.db.delete(order)
         self.db.commit()
         return {"message": "Order and associated earnings deleted successfully"}
 
     def generate_qr_code(self, order_id: int):
         # Business logic for generating QR code for an order
-        return {"message": f"OrderService: Generate QR code for order {order_id} logic"}
\ No newline at end of file
+        return {"message": f"OrderService: Generate QR code for order {order_id} logic"}
+
+class AsyncOrderService(AsyncBaseService):
+    """Async version of the public order lookup (AsyncSession / asyncpg)."""
+    async def get_order_by_public_id(self, public_id: str) -> PublicOrderSchema:
+        try:
+            public_id = uuid.UUID(public_id)
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Order not found")
+        result = await self.db.execute(
+            select(Order)
+            .options(
+                joinedload(Order.user).selectinload(User.photographer),
+                selectinload(Order.items).joinedload(OrderItem.photo).options(*PHOTO_LOAD_OPTIONS),
+                joinedload(Order.discount),
+            )
+            .where(Order.public_id == public_id)
+        )
+        order = result.unique().scalars().first()
+        if not order:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Order not found")
+        # La firma (CPU) va al threadpool; al serializar, PublicPhotoSchema las toma de la caché.
+        await storage_service.agenerate_presigned_get_urls(_public_order_object_names(order))
+        return PublicOrderSchema.model_validate(order)
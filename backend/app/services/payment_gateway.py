@@ -0,0 +1,251 @@
+import bisect
+import itertools
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+
+import mercadopago
+import requests
+from mercadopago.config import RequestOptions
+from mercadopago.http import HttpClient
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+
+from core.config import settings
+
+class PaymentGatewayError(Exception):
+    def __init__(self, message: str, status_code: int | None = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram (cumulative counts, Prometheus style)."""
+    BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BUCKETS_MS) + 1) # el último es +Inf
+        self.total = 0
+        self.errors = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, elapsed_ms: float, error: bool):
+        self.counts[bisect.bisect_left(self.BUCKETS_MS, elapsed_ms)] += 1
+        self.total += 1
+        self.errors += int(error)
+        self.sum_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket that holds the q-quantile, capped at the slowest call seen."""
+        if not self.total:
+            return 0.0
+        rank = q * self.total
+        for upper, cumulative in zip(self.BUCKETS_MS, itertools.accumulate(self.counts)):
+            if cumulative >= rank:
+                return min(float(upper), self.max_ms)
+        return self.max_ms
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.total,
+            "errors": self.errors,
+            "avg_ms": self.sum_ms / self.total if self.total else 0.0,
+            "p50_ms": self.quantile(0.50),
+            "p95_ms": self.quantile(0.95),
+            "p99_ms": self.quantile(0.99),
+            "max_ms": self.max_ms,
+            "buckets": {str(upper): count for upper, count in zip(self.BUCKETS_MS, itertools.accumulate(self.counts))},
+        }
+
+class GatewayMetrics:
+    """Per-process latency histograms of the payment gateway calls, by operation."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._histograms: dict[str, LatencyHistogram] = {}
+            self.retries = 0
+
+    def observe(self, operation: str, elapsed_ms: float, error: bool = False):
+        with self._lock:
+            self._histograms.setdefault(operation, LatencyHistogram()).observe(elapsed_ms, error)
+
+    def increment_retries(self):
+        with self._lock:
+            self.retries += 1
+
+    def snapshot(self, gateway_name: str) -> dict:
+        with self._lock:
+            return {
+                "pid": os.getpid(),
+                "gateway": gateway_name,
+                "retries": self.retries,
+                "operations": {operation: histogram.snapshot() for operation, histogram in self._histograms.items()},
+            }
+
+gateway_metrics = GatewayMetrics()
+
+class PaymentGateway(ABC):
+    """
+    Payments provider used by checkout and by the webhook worker. The public methods
+    record the latency of every call (retries included) in gateway_metrics.
+    """
+    name = "base"
+
+    def create_preference(self, preference_data: dict) -> dict:
+        """Creates a checkout preference. Returns at least `id` and `init_point`."""
+        return self._observed("create_preference", self._create_preference, preference_data)
+
+    def get_payment(self, payment_id: str) -> dict:
+        """Returns the payment as the provider reports it (`status`, `external_reference`, ...)."""
+        return self._observed("get_payment", self._get_payment, payment_id)
+
+    def _observed(self, operation: str, call, *args):
+        start = time.perf_counter()
+        error = False
+        try:
+            return call(*args)
+        except Exception:
+            error = True
+            raise
+        finally:
+            gateway_metrics.observe(operation, (time.perf_counter() - start) * 1000, error)
+
+    @abstractmethod
+    def _create_preference(self, preference_data: dict) -> dict:
+        ...
+
+    @abstractmethod
+    def _get_payment(self, payment_id: str) -> dict:
+        ...
+
+class _CountingRetry(Retry):
+    def increment(self, *args, **kwargs):
+        retry = super().increment(*args, **kwargs) # lanza MaxRetryError cuando no quedan reintentos
+        gateway_metrics.increment_retries()
+        return retry
+
+class PooledHttpClient(HttpClient):
+    """
+    HttpClient for the Mercado Pago SDK that reuses one requests.Session (keep-alive
+    connection pool) for the whole process, instead of a new session and TLS handshake
+    per call. Timeouts and retries come from settings; the SDK's per-call ones are ignored.
+    """
+    def __init__(self, pool_maxsize: int, connect_timeout: float, read_timeout: float, max_retries: int, backoff_factor: float):
+        self.timeout = (connect_timeout, read_timeout)
+        retry = _CountingRetry(
+            total=max_retries,
+            # Los errores de conexión se reintentan siempre (el request no llegó a salir); los 5xx/429
+            # solo en GET, para no crear dos preferencias con un POST que quizás sí se procesó.
+            connect=max_retries,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset({"GET"}),
+            backoff_factor=backoff_factor,
+            raise_on_status=False,
+        )
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize, max_retries=retry))
+
+    def request(self, method, url, maxretries=None, retry_on=None, backoff_factor=None, **kwargs):
+        kwargs["timeout"] = self.timeout
+        try:
+            api_result = self.session.request(method, url, **kwargs)
+        except requests.RequestException as e:
+            raise PaymentGatewayError(f"Mercado Pago request failed: {e}") from e
+        response = {"status": api_result.status_code, "response": None}
+        if api_result.status_code != 204 and api_result.content:
+            try:
+                response["response"] = api_result.json()
+            except ValueError:
+                raise PaymentGatewayError("Invalid JSON in Mercado Pago response.", api_result.status_code)
+        return response
+
+class MercadoPagoGateway(PaymentGateway):
+    name = "mercadopago"
+
+    def __init__(self, access_token: str):
+        http_client = PooledHttpClient(
+            pool_maxsize=settings.MP_HTTP_POOL_SIZE,
+            connect_timeout=settings.MP_CONNECT_TIMEOUT_SECONDS,
+            read_timeout=settings.MP_READ_TIMEOUT_SECONDS,
+            max_retries=settings.MP_MAX_RETRIES,
+            backoff_factor=settings.MP_RETRY_BACKOFF_SECONDS,
+        )
+        self.sdk = mercadopago.SDK(access_token, http_client=http_client, request_options=RequestOptions(max_retries=0))
+
+    def _create_preference(self, preference_data: dict) -> dict:
+        result = self.sdk.preference().create(preference_data)
+        if result["status"] != 201:
+            message = (result.get("response") or {}).get("message", "Unknown error")
+            raise PaymentGatewayError(f"Error creating Mercado Pago preference: {message}", result["status"])
+        return result["response"]
+
+    def _get_payment(self, payment_id: str) -> dict:
+        result = self.sdk.payment().get(payment_id)
+        if result["status"] != 200:
+            raise PaymentGatewayError(f"Could not fetch payment info for ID {payment_id} (HTTP {result['status']}).", result["status"])
+        return result["response"]
+
+class FakePaymentGateway(PaymentGateway):
+    """
+    In-memory gateway for tests and offline load tests of checkout (PAYMENT_GATEWAY=fake).
+    Preferences always succeed; payments have to be registered with register_payment.
+    """
+    name = "fake"
+
+    def __init__(self, latency_ms: float = 0):
+        self.latency_ms = latency_ms
+        self.preferences: dict[str, dict] = {}
+        self.payments: dict[str, dict] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def register_payment(self, payment_id: str, status: str, external_reference: str | None):
+        with self._lock:
+            self.payments[str(payment_id)] = {"id": payment_id, "status": status, "external_reference": external_reference}
+
+    def _create_preference(self, preference_data: dict) -> dict:
+        self._simulate_latency()
+        with self._lock:
+            preference_id = f"fake-pref-{next(self._ids)}"
+            self.preferences[preference_id] = preference_data
+        return {"id": preference_id, "init_point": f"{settings.FRONTEND_URL}/checkout/fake/{preference_id}"}
+
+    def _get_payment(self, payment_id: str) -> dict:
+        self._simulate_latency()
+        with self._lock:
+            payment = self.payments.get(str(payment_id))
+        if payment is None:
+            raise PaymentGatewayError(f"Could not fetch payment info for ID {payment_id} (HTTP 404).", 404)
+        return dict(payment)
+
+    def _simulate_latency(self):
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+
+_gateway: PaymentGateway | None = None
+_gateway_lock = threading.Lock()
+
+def get_payment_gateway() -> PaymentGateway:
+    """Process-wide gateway (and connection pool), created on first use."""
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                if settings.PAYMENT_GATEWAY == "fake":
+                    _gateway = FakePaymentGateway(latency_ms=settings.PAYMENT_GATEWAY_FAKE_LATENCY_MS)
+                elif not settings.MERCADOPAGO_ACCESS_TOKEN:
+                    raise PaymentGatewayError("Mercado Pago access token is not configured.")
+                else:
+                    _gateway = MercadoPagoGateway(settings.MERCADOPAGO_ACCESS_TOKEN)
+    return _gateway
+
+def set_payment_gateway(gateway: PaymentGateway | None):
+    """Replaces the process-wide gateway (None = build it again from settings on next use)."""
+    global _gateway
+    with _gateway_lock:
+        _gateway = gateway
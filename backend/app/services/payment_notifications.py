@@ -0,0 +1,138 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+from fastapi import HTTPException
+from sqlalchemy import and_, case, literal, or_
+
+from core.config import settings
+from db.upsert import upsert_insert
+from models.order import PaymentMethod
+from models.payment_notification import PaymentNotification, NotificationStatus
+from services.base import BaseService, AsyncBaseService
+from services.payment_gateway import get_payment_gateway
+
+# Estados de un pago de Mercado Pago que ya no cambian (salvo devoluciones, que no se procesan acá).
+FINAL_PAYMENT_STATUSES = frozenset({"approved", "rejected", "cancelled", "refunded", "charged_back"})
+
+class PaymentStatusCache:
+    """
+    Thread-safe TTL + LRU cache of payments that reached a final status, keyed by payment
+    id. Payments still pending are never cached: their next notification must see the change.
+    """
+    def __init__(self, max_entries: int = 10000, ttl: int = 300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple[dict, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, payment_id: str) -> dict | None:
+        with self._lock:
+            entry = self._entries.get(payment_id)
+            if entry is None:
+                return None
+            payment, valid_until = entry
+            if valid_until <= time.monotonic():
+                del self._entries[payment_id]
+                return None
+            self._entries.move_to_end(payment_id)
+            return payment
+
+    def set(self, payment_id: str, payment: dict):
+        if self.max_entries <= 0 or self.ttl <= 0 or payment.get("status") not in FINAL_PAYMENT_STATUSES:
+            return
+        with self._lock:
+            self._entries[payment_id] = (payment, time.monotonic() + self.ttl)
+            self._entries.move_to_end(payment_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+payment_status_cache = PaymentStatusCache(
+    max_entries=settings.MP_PAYMENT_CACHE_SIZE,
+    ttl=settings.MP_PAYMENT_CACHE_TTL_SECONDS,
+)
+
+def fetch_payment(payment_id: str) -> dict:
+    """Returns the payment's `status` and `external_reference` (the order id) from Mercado Pago."""
+    payment = payment_status_cache.get(payment_id)
+    if payment is not None:
+        return payment
+
+    response = get_payment_gateway().get_payment(payment_id)
+    payment = {"status": response.get("status"), "external_reference": response.get("external_reference")}
+    payment_status_cache.set(payment_id, payment)
+    return payment
+
+class AsyncPaymentInboxService(AsyncBaseService):
+    async def record(self, payment_id: str):
+        """
+        Stores a webhook notification. A repeated notification only bumps received_count,
+        unless the payment was processed while it was still pending: then it is queued
+        again, since Mercado Pago notifies again when the payment changes status.
+        """
+        table = PaymentNotification.__table__
+        now = datetime.utcnow()
+        pending = literal(NotificationStatus.PENDING, type_=table.c.status.type)
+        reopen = and_(
+            table.c.status == NotificationStatus.PROCESSED,
+            or_(table.c.payment_status.is_(None), table.c.payment_status.not_in(FINAL_PAYMENT_STATUSES)),
+        )
+        stmt = upsert_insert(self.db, table).values(
+            payment_id=payment_id,
+            status=NotificationStatus.PENDING,
+            received_count=1,
+            attempts=0,
+            next_attempt_at=now,
+            created_at=now,
+            updated_at=now,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["payment_id"],
+            set_={
+                "received_count": table.c.received_count + 1,
+                "status": case((reopen, pending), else_=table.c.status),
+                "next_attempt_at": case((reopen, now), else_=table.c.next_attempt_at),
+                "updated_at": now,
+            },
+        )
+        await self.db.execute(stmt)
+        await self.db.commit()
+
+class PaymentNotificationService(BaseService):
+    def apply_payment(self, payment_id: str, payment: dict) -> int | None:
+        """
+        Marks the order of an approved payment as paid. Returns the order id, or None when
+        the payment has no valid external_reference. Unexpected errors propagate so the
+        notification is retried.
+        """
+        from services.orders import OrderService
+
+        external_reference = payment.get("external_reference")
+        try:
+            order_id = int(external_reference)
+        except (ValueError, TypeError):
+            print(f"ERROR: Payment {payment_id} has an invalid external_reference '{external_reference}' (order_id).")
+            return None
+
+        if payment.get("status") != "approved":
+            print(f"ℹ️ Payment with ID {payment_id} for Order ID {order_id} has status: {payment.get('status')}.")
+            return order_id
+
+        print(f"✅ Payment with ID {payment_id} was approved for Order ID: {order_id}")
+        try:
+            OrderService(self.db).mark_order_as_paid(
+                order_id=order_id,
+                payment_method=PaymentMethod.MP,
+                external_payment_id=str(payment_id)
+            )
+            print(f"   Order {order_id} successfully updated to 'paid'.")
+        except HTTPException as e:
+            # Si la orden no se encuentra o ya fue pagada, no hay nada que reintentar.
+            self.db.rollback()
+            print(f"NOTE: Could not mark order {order_id} as paid. Reason: {e.detail}")
+        return order_id
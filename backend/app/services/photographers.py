@@ -1,16 +1,19 @@
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import func, select, tuple_
 from services.base import BaseService
 from fastapi import HTTPException, status
 from models.photographer import Photographer, PhotographerCreateSchema, PhotographerUpdateSchema
 from models.earning import Earning, EarningSchema
 from models.user import User
 from core.permissions import Permissions
-from datetime import date, timedelta
+from datetime import date, datetime, timedelta
 from typing import List
 from pydantic import BaseModel
-from schemas.pagination import PaginatedResponse
-from schemas.photographer import PhotoEarningSummary
+from schemas.pagination import PaginatedResponse, CountedCursorPage, encode_cursor, decode_cursor
+from schemas.photographer import PhotoEarningSummary, EarningsTimeseriesPoint, EarningsTimeseriesSchema
+from db.dates import date_bucket, iter_buckets
+from db.counts import estimated_count
+from models.sales_rollup import DailyPhotographerSales
 
 from models.order import OrderItem
 from models.photo import Photo
@@ -35,9 +38,12 @@ class EarningsSummarySchema(BaseModel):
 
 from models.user import User, UserCreateSchema
 from services.users import UserService
+from services.principals import principal_cache
 from models.role import Role
 
 class PhotographerService(BaseService):
+    MAX_EARNINGS_PAGE_SIZE = 100
+
     def __init__(self, db: Session):
         self.db = db
     ############################################################################
@@ -79,8 +85,10 @@ class PhotographerService(BaseService):
             **photographer_data,
             user_id=new_user.id
         )
-        
-        return self._save_and_refresh(new_ph)
+
+        new_ph = self._save_and_refresh(new_ph)
+        principal_cache.invalidate_user(new_user.id)
+        return new_ph
     ############################################################################
     def get_photographer(self, ph_id: int):
         ph = self.db.query(Photographer).filter(Photographer.id==ph_id).first()
@@ -100,12 +108,17 @@ class PhotographerService(BaseService):
                 detail="Photographer not found"
             )
         
+        previous_user_id = ph.user_id
         updated_data = ph_in.model_dump(exclude_unset=True)
         
         for field, value in updated_data.items():
             setattr(ph, field, value)
         
-        return self._save_and_refresh(ph)
+        ph = self._save_and_refresh(ph)
+        # El principal guarda el photographer_id de su usuario.
+        principal_cache.invalidate_user(previous_user_id)
+        principal_cache.invalidate_user(ph.user_id)
+        return ph
     ############################################################################
     def delete_photographer(self, ph_id: int):
         ph = self.db.query(Photographer).filter(Photographer.id==ph_id).first()
@@ -115,7 +128,9 @@ class PhotographerService(BaseService):
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Photographer not found"
             )
-        return self._delete_and_refresh(ph)
+        user_id = ph.user_id
+        self._delete_and_refresh(ph)
+        principal_cache.invalidate_user(user_id)
 
     ############################################################################
     # Earnings Methods
@@ -123,8 +138,7 @@ class PhotographerService(BaseService):
 
     def _check_earnings_permission(self, photographer_id: int, current_user: User):
         """Helper to check if a user can view earnings for a specific photographer."""
-        # Normalizar permisos (pueden venir vacíos si el rol no tiene relaciones cargadas)
-        user_permissions = {p.name for p in (current_user.role.permissions or [])}
+        user_permissions = current_user.permission_names
 
         # El permiso FULL_ACCESS habilita ver cualquier earning
         has_full_access = Permissions.FULL_ACCESS.value in user_permissions
@@ -134,12 +148,41 @@ class PhotographerService(BaseService):
         if has_full_access or can_view_any:
             return
 
-        if not can_view_own or not current_user.photographer or photographer_id != current_user.photographer.id:
+        if not can_view_own or current_user.photographer_id is None or photographer_id != current_user.photographer_id:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="You do not have permission to view these earnings."
             )
 
+    @staticmethod
+    def _earnings_filters(photographer_id: int, start_date: date | None, end_date: date | None) -> list:
+        """WHERE conditions for a photographer's earnings within a date range."""
+        filters = [Earning.photographer_id == photographer_id]
+        if start_date:
+            filters.append(Earning.created_at >= start_date)
+        if end_date:
+            filters.append(Earning.created_at < end_date + timedelta(days=1))
+        return filters
+
+    def _earnings_with_filenames(self, page):
+        """
+        Rows (earning, photo_filename) of `page`, a subquery over earnings that is already
+        ordered and limited: the photo filename is only joined for that page.
+        """
+        earning = aliased(Earning, page)
+        return self.db.execute(
+            select(earning, Photo.filename.label("photo_filename"))
+            .outerjoin(OrderItem, OrderItem.id == earning.order_item_id)
+            .outerjoin(Photo, Photo.id == OrderItem.photo_id)
+            .order_by(earning.created_at.desc(), earning.id.desc())
+        ).all()
+
+    @staticmethod
+    def _earning_schema(earning: Earning, photo_filename: str | None) -> EarningSchema:
+        schema = EarningSchema.model_validate(earning)
+        schema.photo_filename = photo_filename
+        return schema
+
     def get_photographer_earnings(
         self,
         photographer_id: int,
@@ -153,31 +196,77 @@ class PhotographerService(BaseService):
         Returns a paginated list of earnings for a photographer within a date range.
         """
         self._check_earnings_permission(photographer_id, current_user)
+        filters = self._earnings_filters(photographer_id, start_date, end_date)
 
-        query = self.db.query(Earning).options(
-            joinedload(Earning.order_item).joinedload(OrderItem.photo)
-        ).filter(Earning.photographer_id == photographer_id)
+        # El total y los ids de la página salen solo del índice (index-only scan), sin los
+        # joins del listado; las filas completas se leen después para esa página.
+        total = self.db.scalar(select(func.count(Earning.id)).where(*filters))
+        page_ids = (
+            select(Earning.id)
+            .where(*filters)
+            .order_by(Earning.created_at.desc(), Earning.id.desc())
+            .offset(skip)
+            .limit(limit)
+            .subquery()
+        )
+        page = select(Earning).join(page_ids, page_ids.c.id == Earning.id).subquery()
+        rows = self._earnings_with_filenames(page)
 
-        if start_date:
-            query = query.filter(Earning.created_at >= start_date)
-        if end_date:
-            query = query.filter(Earning.created_at < end_date + timedelta(days=1))
+        return PaginatedResponse(total=total, items=[self._earning_schema(row[0], row.photo_filename) for row in rows])
 
-        total = query.count()
-        earnings = query.order_by(Earning.created_at.desc()).offset(skip).limit(limit).all()
+    def get_photographer_earnings_by_cursor(
+        self,
+        photographer_id: int,
+        current_user: User,
+        cursor: str | None = None,
+        limit: int = 15,
+        start_date: date | None = None,
+        end_date: date | None = None,
+        total: str = "none",
+    ) -> CountedCursorPage[EarningSchema]:
+        """
+        Keyset pagination over a photographer's earnings, newest first. Each page seeks by
+        (created_at, id) < cursor on ix_earnings_photographer_id_created_at_id, so deep
+        pages cost the same as the first one.
+        total="exact" counts the earnings in the range and total="estimate" takes the
+        planner's estimate instead (exact outside Postgres); either is only computed for
+        the first page.
+        """
+        self._check_earnings_permission(photographer_id, current_user)
+        limit = max(1, min(limit, self.MAX_EARNINGS_PAGE_SIZE))
+        filters = self._earnings_filters(photographer_id, start_date, end_date)
 
-        result_schemas = []
-        for earning in earnings:
-            schema = EarningSchema.from_orm(earning)
-            if earning.order_item and earning.order_item.photo:
-                schema.photo_filename = earning.order_item.photo.filename
-            result_schemas.append(schema)
+        stmt = select(Earning).where(*filters)
+        if cursor:
+            last_created_at, last_id = decode_cursor(cursor, size=2)
+            try:
+                last_created_at, last_id = datetime.fromisoformat(last_created_at), int(last_id)
+            except (TypeError, ValueError):
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor.")
+            stmt = stmt.where(tuple_(Earning.created_at, Earning.id) < (last_created_at, last_id))
+        # Se pide una fila extra para saber si existe una página siguiente sin hacer un COUNT.
+        rows = self._earnings_with_filenames(
+            stmt.order_by(Earning.created_at.desc(), Earning.id.desc()).limit(limit + 1).subquery()
+        )
+        has_more = len(rows) > limit
+        rows = rows[:limit]
 
-        return PaginatedResponse(total=total, items=result_schemas)
+        page = CountedCursorPage[EarningSchema](
+            items=[self._earning_schema(row[0], row.photo_filename) for row in rows],
+            next_cursor=encode_cursor(rows[-1][0].created_at, rows[-1][0].id) if has_more else None,
+        )
+        if total != "none" and not cursor:
+            estimate = estimated_count(self.db, select(Earning.id).where(*filters)) if total == "estimate" else None
+            if estimate is not None:
+                page.total, page.total_is_estimate = estimate, True
+            else:
+                page.total = self.db.scalar(select(func.count(Earning.id)).where(*filters))
+        return page
 
     def get_earnings_summary_by_photo(self, photographer_id: int, current_user: User, skip: int = 0, limit: int = 15) -> PaginatedResponse[PhotoEarningSummary]:
         """
         Returns a paginated summary of earnings grouped by photo.
+        The number of photos comes from count(*) OVER () in the same grouped query.
         """
         self._check_earnings_permission(photographer_id, current_user)
 
@@ -185,15 +274,26 @@ class PhotographerService(BaseService):
             Photo.id.label("photo_id"),
             Photo.filename.label("photo_filename"),
             func.sum(OrderItem.quantity).label("times_sold"),
-            func.sum(Earning.amount).label("total_earnings")
+            func.sum(Earning.amount).label("total_earnings"),
+            func.count().over().label("total")
         ).select_from(Earning)\
          .join(Earning.order_item)\
          .join(OrderItem.photo)\
          .filter(Earning.photographer_id == photographer_id)\
          .group_by(Photo.id, Photo.filename)
 
-        total = summary_query.count()
-        results = summary_query.order_by(func.sum(Earning.amount).desc()).offset(skip).limit(limit).all()
+        results = summary_query.order_by(func.sum(Earning.amount).desc(), Photo.id).offset(skip).limit(limit).all()
+
+        if results:
+            total = results[0].total
+        elif skip:
+            total = self.db.query(func.count(func.distinct(OrderItem.photo_id)))\
+                .select_from(Earning)\
+                .join(Earning.order_item)\
+                .filter(Earning.photographer_id == photographer_id)\
+                .scalar()
+        else:
+            total = 0
 
         return PaginatedResponse(total=total, items=results)
 
@@ -267,6 +367,82 @@ class PhotographerService(BaseService):
             ]
         )
 
+    def get_earnings_timeseries(
+        self,
+        photographer_id: int | None,
+        current_user: User,
+        bucket: str = "day",
+        start_date: date | None = None,
+        end_date: date | None = None,
+        source: str = "earnings",
+    ) -> EarningsTimeseriesSchema:
+        """
+        Earnings, earned photo fraction and orders per day / week / month for one
+        photographer (or all of them with photographer_id=None), with one grouped query.
+        Buckets without sales between the first and the last one come back as zeros.
+
+        source="earnings" aggregates the earnings rows through the
+        (photographer_id, created_at) index. source="rollups" sums daily_photographer_sales
+        instead, which costs one row per day and album no matter how many items were sold;
+        there `orders` counts an order once per photographer and album it included.
+        """
+        if photographer_id is not None:
+            self._check_earnings_permission(photographer_id, current_user)
+
+        if source == "rollups":
+            day = DailyPhotographerSales.day
+            bucket_start = date_bucket(self.db, day, bucket).label("bucket_start")
+            query = select(
+                bucket_start,
+                func.sum(DailyPhotographerSales.net_earnings).label("earnings"),
+                func.sum(DailyPhotographerSales.earned_photo_fraction).label("earned_photo_fraction"),
+                func.sum(DailyPhotographerSales.orders).label("orders"),
+            )
+            if photographer_id is not None:
+                query = query.where(DailyPhotographerSales.photographer_id == photographer_id)
+            if start_date:
+                query = query.where(day >= start_date)
+            if end_date:
+                query = query.where(day <= end_date)
+        else:
+            bucket_start = date_bucket(self.db, Earning.created_at, bucket).label("bucket_start")
+            query = select(
+                bucket_start,
+                func.sum(Earning.amount).label("earnings"),
+                func.sum(Earning.earned_photo_fraction).label("earned_photo_fraction"),
+                func.count(Earning.order_id.distinct()).label("orders"),
+            )
+            if photographer_id is not None:
+                query = query.where(Earning.photographer_id == photographer_id)
+            if start_date:
+                query = query.where(Earning.created_at >= start_date)
+            if end_date:
+                query = query.where(Earning.created_at < end_date + timedelta(days=1))
+
+        rows = {row.bucket_start: row for row in self.db.execute(query.group_by(bucket_start)).all()}
+
+        points = []
+        if rows or (start_date and end_date):
+            first = start_date or min(rows)
+            last = end_date or max(rows)
+            for start in iter_buckets(first, last, bucket):
+                row = rows.get(start)
+                points.append(EarningsTimeseriesPoint(
+                    bucket_start=start,
+                    earnings=(row.earnings or 0) if row else 0,
+                    earned_photo_fraction=(row.earned_photo_fraction or 0) if row else 0,
+                    orders=(row.orders or 0) if row else 0,
+                ))
+
+        return EarningsTimeseriesSchema(
+            photographer_id=photographer_id,
+            bucket=bucket,
+            source=source,
+            start_date=start_date,
+            end_date=end_date,
+            points=points,
+        )
+
     def get_all_earnings_summaries(
         self,
         start_date: date | None = None,
@@ -1,19 +1,23 @@
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session, joinedload, selectinload
 from fastapi import HTTPException, status
 from models.photo import Photo, PhotoCreateSchema, PhotoUpdateSchema, PhotoSchema
 from models.photo_session import PhotoSession
-from models.tag import Tag
-from services.base import BaseService
+from models.photographer import Photographer, PhotographerSchema
+from models.tag import Tag, photo_tags
+from services.base import BaseService, AsyncBaseService
+from services.response_cache import PHOTOS, SESSIONS, TAGS, invalidate_on_commit
 from services.storage import storage_service
+from services.renditions import resolve_original, rendition_keys
+from services.storage_usage import StorageUsageService
+from services.tags import TagService
 from pydantic import BaseModel
 from typing import List
-from sqlalchemy import select
+from sqlalchemy import select, exists, insert, func, literal, union_all, or_, and_, cast, Integer
 from models.user import User
 from core.permissions import Permissions
 from datetime import datetime
-from services.sessions import SessionService
-from models.photo_session import PhotoSessionCreateSchema as SessionCreateSchema
-from sqlalchemy.exc import NoResultFound
+from sqlalchemy.exc import NoResultFound, SQLAlchemyError
+from schemas.pagination import CursorPage, encode_cursor, decode_cursor
 
 class PhotoCompletionRequest(BaseModel):
     object_name: str
@@ -21,9 +25,20 @@ class PhotoCompletionRequest(BaseModel):
     description: str | None = None
     price: float
     photographer_id: int
+    size_bytes: int | None = None # Tamaño del archivo subido; si falta lo completa el worker de versiones
+
+# Todo lo que PhotoSchema serializa, cargado de antemano (en async no hay lazy loading).
+PHOTO_LOAD_OPTIONS = (
+    joinedload(Photo.photographer),
+    joinedload(Photo.session).joinedload(PhotoSession.album),
+    selectinload(Photo.tags),
+)
 
 class PhotoService(BaseService):
-    def _apply_album_default_price(self, photo: Photo) -> Photo:
+    MAX_CURSOR_PAGE_SIZE = 100
+
+    @staticmethod
+    def _apply_album_default_price(photo: Photo) -> Photo:
         """
         Si la foto no tiene precio propio, hereda el del álbum.
         """
@@ -32,75 +47,126 @@ class PhotoService(BaseService):
                 photo.price = photo.session.album.default_photo_price
         return photo
 
-    def _generate_presigned_urls(self, photo: Photo) -> PhotoSchema:
+    @staticmethod
+    def _generate_presigned_urls(photo: Photo) -> PhotoSchema:
         """
         Validates a Photo object against the PhotoSchema. 
         URL generation is now a front-end concern using the object_name.
         """
-        photo = self._apply_album_default_price(photo)
+        photo = PhotoService._apply_album_default_price(photo)
         return PhotoSchema.model_validate(photo)
 
-    def _is_thumbnail_object(self, object_name: str) -> bool:
-        return object_name.startswith("photos/thumb_")
-
-    def _resolve_original_from_thumb(self, thumb_object_name: str) -> str:
-        # photos/thumb_<uuid>.ext -> photos/<uuid>.ext
-        base = thumb_object_name[len("photos/") :]
-        if not base.startswith("thumb_"):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid thumbnail name."
-            )
-        return f"photos/{base[len('thumb_'):]}"
-
     def ensure_object_belongs_to_photo(self, object_name: str) -> Photo:
         """
         Validates that the requested object belongs to a known photo.
-        Thumbnails must map to an existing original photo; originals must exist in DB.
+        Renditions (thumb_/preview_/wm_) must map to an existing original photo; originals must exist in DB.
         """
-        if self._is_thumbnail_object(object_name):
-            original_object_name = self._resolve_original_from_thumb(object_name)
-            photo = (
-                self.db.query(Photo)
-                .filter(Photo.object_name == original_object_name)
-                .first()
-            )
-            if not photo:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="Thumbnail not associated to any photo."
-                )
-            return photo
-
+        kind, original_object_name = resolve_original(object_name)
         photo = (
             self.db.query(Photo)
-            .filter(Photo.object_name == object_name)
+            .filter(Photo.object_name == original_object_name)
             .first()
         )
         if not photo:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
-                detail="Photo not found."
+                detail="Thumbnail not associated to any photo." if kind else "Photo not found."
             )
         return photo
 
     def generate_presigned_view_url(self, object_name: str) -> str:
         """
         Allows GET presigned URLs only for:
-        - thumbnails that belong to a known photo (preview use-case)
+        - renditions (thumb, preview, watermarked web) that belong to a known photo
         - originals that belong to a known photo (download flow)
         """
         self.ensure_object_belongs_to_photo(object_name)
         return storage_service.generate_presigned_get_url(object_name)
 
-    def list_photos(self, offset: int = 0, limit: int = 10) -> List[PhotoSchema]:
+    def generate_presigned_view_urls(self, object_names: List[str]) -> dict[str, str]:
+        """
+        Batch version of generate_presigned_view_url: validates every object against the
+        photos table in one query and signs them in one call. Unknown objects are omitted.
+        """
+        originals_by_name = {name: resolve_original(name)[1] for name in object_names}
+        if not originals_by_name:
+            return {}
+
+        known = {
+            name for (name,) in self.db.query(Photo.object_name)
+            .filter(Photo.object_name.in_(set(originals_by_name.values())))
+            .all()
+        }
+        allowed = [name for name, original in originals_by_name.items() if original in known]
+        return storage_service.generate_presigned_get_urls(allowed)
+
+    @staticmethod
+    def _apply_photo_filters(
+        query,
+        album_id: int | None = None,
+        session_id: int | None = None,
+        photographer_id: int | None = None,
+        tag_id: int | None = None,
+    ):
+        """
+        Applies the optional catalog filters shared by offset and cursor listings.
+        Works on both legacy queries and select() statements (sync and async paths).
+        """
+        if album_id is not None:
+            query = query.filter(
+                Photo.session_id.in_(select(PhotoSession.id).where(PhotoSession.album_id == album_id))
+            )
+        if session_id is not None:
+            query = query.filter(Photo.session_id == session_id)
+        if photographer_id is not None:
+            query = query.filter(Photo.photographer_id == photographer_id)
+        if tag_id is not None:
+            query = query.filter(
+                exists().where(photo_tags.c.photo_id == Photo.id, photo_tags.c.tag_id == tag_id)
+            )
+        return query
+
+    def _photos_query(self):
+        return self.db.query(Photo).options(*PHOTO_LOAD_OPTIONS)
+
+    @classmethod
+    def _cursor_limit_and_last_id(cls, cursor: str | None, limit: int) -> tuple[int, int | None]:
+        limit = max(1, min(limit, cls.MAX_CURSOR_PAGE_SIZE))
+        if not cursor:
+            return limit, None
+        try:
+            return limit, int(decode_cursor(cursor)[0])
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor.")
+
+    @staticmethod
+    def _cursor_page(photos: List[Photo], limit: int) -> CursorPage[PhotoSchema]:
+        has_more = len(photos) > limit
+        photos = photos[:limit]
+        return CursorPage[PhotoSchema](
+            items=[PhotoService._generate_presigned_urls(p) for p in photos],
+            next_cursor=encode_cursor(photos[-1].id) if has_more else None,
+        )
+
+    def list_photos(self, offset: int = 0, limit: int = 10, **filters) -> List[PhotoSchema]:
         """Returns a list of all photos with presigned URLs."""
-        photos = self.db.query(Photo).options(
-            joinedload(Photo.photographer),
-            joinedload(Photo.session).joinedload(PhotoSession.album)
-        ).order_by(Photo.id.desc()).offset(offset).limit(limit).all()
+        query = self._apply_photo_filters(self._photos_query(), **filters)
+        photos = query.order_by(Photo.id.desc()).offset(offset).limit(limit).all()
         return [self._generate_presigned_urls(p) for p in photos]
 
+    def list_photos_by_cursor(self, cursor: str | None = None, limit: int = 10, **filters) -> CursorPage[PhotoSchema]:
+        """
+        Keyset pagination over photos, newest first. Instead of skipping an OFFSET prefix,
+        each page seeks by `id < cursor`, so deep pages cost the same as the first one.
+        """
+        limit, last_id = self._cursor_limit_and_last_id(cursor, limit)
+        query = self._apply_photo_filters(self._photos_query(), **filters)
+        if last_id is not None:
+            query = query.filter(Photo.id < last_id)
+        # Se pide una fila extra para saber si existe una página siguiente sin hacer un COUNT.
+        photos = query.order_by(Photo.id.desc()).limit(limit + 1).all()
+        return self._cursor_page(photos, limit)
+
     def get_photo(self, photo_id: int) -> PhotoSchema:
         """Returns a specific photo by its ID with presigned URLs."""
         photo = (
@@ -123,35 +189,29 @@ class PhotoService(BaseService):
         if not photo_ids:
             return []
         
-        photos = (
-            self.db.query(Photo)
-            .options(
-                joinedload(Photo.photographer),
-                joinedload(Photo.session).joinedload(PhotoSession.album),
-            )
-            .filter(Photo.id.in_(photo_ids))
-            .all()
-        )
+        photos = self._photos_query().filter(Photo.id.in_(photo_ids)).all()
         return [self._generate_presigned_urls(p) for p in photos]
 
 
     def create_photo(self, photo_in: PhotoCreateSchema) -> Photo:
         """Creates a new photo record in the database."""
+        invalidate_on_commit(self.db, PHOTOS)
         db_photo = Photo(**photo_in.model_dump())
         return self._save_and_refresh(db_photo)
 
     def update_photo(self, photo_id: int, photo_in: PhotoUpdateSchema, current_user: User) -> PhotoSchema:
         """Updates an existing photo record, checking for ownership."""
+        invalidate_on_commit(self.db, PHOTOS)
         db_photo_q = self.db.query(Photo).filter(Photo.id == photo_id).first()
         if not db_photo_q:
              raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Photo not found")
 
-        user_permissions = {p.name for p in current_user.role.permissions}
+        user_permissions = current_user.permission_names
         can_edit_any = Permissions.EDIT_ANY_PHOTO.value in user_permissions
         can_edit_own = Permissions.EDIT_OWN_PHOTO.value in user_permissions
 
         if not can_edit_any:
-            if not can_edit_own or not current_user.photographer or db_photo_q.photographer_id != current_user.photographer.id:
+            if not can_edit_own or current_user.photographer_id is None or db_photo_q.photographer_id != current_user.photographer_id:
                 raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You do not have permission to edit this photo.")
 
         update_data = photo_in.model_dump(exclude_unset=True)
@@ -165,16 +225,17 @@ class PhotoService(BaseService):
         """
         Deletes a photo record and its corresponding file from storage.
         """
+        invalidate_on_commit(self.db, PHOTOS)
         photo_to_delete = self.db.query(Photo).filter(Photo.id == photo_id).first()
         if not photo_to_delete:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Photo not found for deletion.")
 
-        user_permissions = {p.name for p in current_user.role.permissions}
+        user_permissions = current_user.permission_names
 
         if Permissions.FULL_ACCESS.value not in user_permissions:
             can_delete_any = Permissions.DELETE_ANY_PHOTO.value in user_permissions
             can_delete_own = Permissions.DELETE_OWN_PHOTO.value in user_permissions
-            is_owner = current_user.photographer and photo_to_delete.photographer_id == current_user.photographer.id
+            is_owner = current_user.photographer_id is not None and photo_to_delete.photographer_id == current_user.photographer_id
 
             if not can_delete_any and not (can_delete_own and is_owner):
                 raise HTTPException(
@@ -182,19 +243,21 @@ class PhotoService(BaseService):
                     detail="You do not have permission to delete this photo."
                 )
         
-        try:
-            storage_service.delete_file(photo_to_delete.object_name)
-        except Exception as e:
-            print(f"Error deleting file from storage for photo ID {photo_id}: {e}")
-            
+        storage_errors = storage_service.delete_files([photo_to_delete.object_name, *rendition_keys(photo_to_delete.object_name)])
+        for key, reason in storage_errors.items():
+            print(f"Error deleting file {key} from storage for photo ID {photo_id}: {reason}")
+
+
+        StorageUsageService(self.db).record_photo_removal([photo_to_delete.id])
         self.db.delete(photo_to_delete)
         self.db.commit()
 
     def bulk_delete_photos(self, photo_ids: List[int], current_user: User):
+        invalidate_on_commit(self.db, PHOTOS)
         if not photo_ids:
             return {"deleted_count": 0, "errors": []}
 
-        user_permissions = {p.name for p in current_user.role.permissions}
+        user_permissions = current_user.permission_names
         has_full_access = Permissions.FULL_ACCESS.value in user_permissions
         can_delete_any = Permissions.DELETE_ANY_PHOTO.value in user_permissions
         can_delete_own = Permissions.DELETE_OWN_PHOTO.value in user_permissions
@@ -215,7 +278,7 @@ class PhotoService(BaseService):
             if has_full_access or can_delete_any:
                 valid_photos_to_delete.append(photo)
             else:
-                is_owner = current_user.photographer and photo.photographer_id == current_user.photographer.id
+                is_owner = current_user.photographer_id is not None and photo.photographer_id == current_user.photographer_id
                 if can_delete_own and is_owner:
                     valid_photos_to_delete.append(photo)
                 else:
@@ -226,25 +289,27 @@ class PhotoService(BaseService):
                 raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="; ".join(errors))
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No valid photos found to delete.")
 
-        db_ids_to_delete = []
-        for photo in valid_photos_to_delete:
-            try:
-                storage_service.delete_file(photo.object_name)
-            except Exception as e:
-                print(f"Error deleting file for photo ID {photo.id} from storage: {e}")
-            db_ids_to_delete.append(photo.id)
-            
+        # Originales y sus versiones derivadas, en lotes de delete_objects.
+        keys = [key for photo in valid_photos_to_delete for key in (photo.object_name, *rendition_keys(photo.object_name))]
+        storage_errors = storage_service.delete_files(keys)
+        for key, reason in storage_errors.items():
+            errors.append(f"Could not delete {key} from storage: {reason}")
+
+        # Las filas se borran igual: un objeto que quedó en el bucket sin foto lo recoge la limpieza de huérfanos.
+        db_ids_to_delete = [photo.id for photo in valid_photos_to_delete]
+        StorageUsageService(self.db).record_photo_removal(db_ids_to_delete)
         self.db.query(Photo).filter(Photo.id.in_(db_ids_to_delete)).delete(synchronize_session=False)
         self.db.commit()
 
-        return {"deleted_count": len(db_ids_to_delete), "errors": errors}
+        return {"deleted_count": len(db_ids_to_delete), "errors": errors, "storage_errors": storage_errors}
 
     def set_tags_for_photo(self, photo_id: int, tag_names: List[str], current_user: User) -> PhotoSchema:
+        invalidate_on_commit(self.db, PHOTOS, TAGS)
         db_photo = self.db.query(Photo).filter(Photo.id == photo_id).first()
         if not db_photo:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Photo not found.")
 
-        user_permissions = {p.name for p in current_user.role.permissions}
+        user_permissions = current_user.permission_names
         
         # El admin con FULL_ACCESS puede saltarse las comprobaciones de propiedad
         if Permissions.FULL_ACCESS.value not in user_permissions:
@@ -252,85 +317,267 @@ class PhotoService(BaseService):
             can_edit_own = Permissions.EDIT_OWN_PHOTO.value in user_permissions
 
             if not can_edit_any:
-                is_owner = current_user.photographer and db_photo.photographer_id == current_user.photographer.id
+                is_owner = current_user.photographer_id is not None and db_photo.photographer_id == current_user.photographer_id
                 if not (can_edit_own and is_owner):
                     raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You do not have permission to edit tags for this photo.")
 
-        db_photo.tags.clear()
-        
-        for tag_name in tag_names:
-            if not tag_name.strip():
-                continue
-            tag = self.db.query(Tag).filter(Tag.name.ilike(tag_name.strip())).first()
-            if not tag:
-                tag = Tag(name=tag_name.strip())
-                self.db.add(tag)
-            db_photo.tags.append(tag)
-            
+        db_photo.tags = TagService(self.db).get_or_create_tags(tag_names)
+
         updated_photo = self._save_and_refresh(db_photo)
         return self._generate_presigned_urls(updated_photo)
 
     def finalize_photo_uploads(self, completion_requests: List[PhotoCompletionRequest], current_user: User, album_id: int | None = None) -> List[PhotoSchema]:
+        """
+        Registers a batch of uploaded files. The whole batch is validated up front and then
+        written in a single transaction: one batch session plus one multi-row
+        INSERT ... RETURNING for the photos, serialized straight from the returned rows.
+        """
+        invalidate_on_commit(self.db, PHOTOS, SESSIONS)
         from models.album import Album  # Importación local para evitar la dependencia circular
 
-        created_photos_schemas = []
-        user_permissions = {p.name for p in current_user.role.permissions}
-        can_edit_any = Permissions.EDIT_ANY_PHOTO.value in user_permissions or Permissions.FULL_ACCESS.value in user_permissions
-
         if not completion_requests:
             return []
-        
+
+        user_permissions = current_user.permission_names
+        can_edit_any = Permissions.EDIT_ANY_PHOTO.value in user_permissions or Permissions.FULL_ACCESS.value in user_permissions
+
+        # Validación del lote completo antes de escribir nada en la base.
+        if not can_edit_any:
+            own_photographer_id = current_user.photographer_id
+            for photo_data in completion_requests:
+                if photo_data.photographer_id != own_photographer_id:
+                    raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=f"Permission denied for photographer ID {photo_data.photographer_id}.")
+
+        photographer_ids = {photo_data.photographer_id for photo_data in completion_requests}
+        photographers = {
+            p.id: PhotographerSchema.model_validate(p)
+            for p in self.db.query(Photographer).filter(Photographer.id.in_(photographer_ids)).all()
+        }
+        missing_ids = photographer_ids - photographers.keys()
+        if missing_ids:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Photographer not found: {', '.join(map(str, sorted(missing_ids)))}")
+
         # Determinar el precio por defecto del álbum si existe
         default_price = None
         if album_id:
             album = self.db.query(Album).filter(Album.id == album_id).first()
-            if album and album.default_photo_price is not None:
-                default_price = album.default_photo_price
-
-        photographer_id = completion_requests[0].photographer_id
+            if not album:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Album not found")
+            default_price = album.default_photo_price
 
         try:
-            session_service = SessionService(self.db)
-            new_session_data = SessionCreateSchema(
+            batch_session = PhotoSession(
                 event_name=f"Carga de fotos {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
                 description="Sesión generada automáticamente para un lote de carga de fotos.",
                 event_date=datetime.now(),
                 location="Carga en línea",
-                photographer_id=photographer_id,
-                album_id=album_id
+                photographer_id=completion_requests[0].photographer_id,
+                album_id=album_id,
             )
-            new_session = session_service.create_session(session_in=new_session_data)
-            batch_session_id = new_session.id
-        except Exception as e:
-            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Failed to create photo session for batch: {str(e)}")
-
-        for photo_data in completion_requests:
-            if not can_edit_any:
-                if not current_user.photographer or photo_data.photographer_id != current_user.photographer.id:
-                    raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=f"Permission denied for photographer ID {photo_data.photographer_id}.")
-            try:
-                # Usar el precio por defecto si está disponible; de lo contrario, usar el precio del request o 0
-                price_to_use = default_price if default_price is not None else photo_data.price
-
-                photo_in = PhotoCreateSchema(
-                    filename=photo_data.original_filename,
-                    description=photo_data.description,
-                    price=price_to_use,
-                    object_name=photo_data.object_name,
-                    photographer_id=photo_data.photographer_id,
-                    session_id=batch_session_id,
-                )
-                
-                created_photo = self.create_photo(photo_in=photo_in)
-                created_photos_schemas.append(self._generate_presigned_urls(created_photo))
-
-            except Exception as e:
-                raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Failed to create photo record for {photo_data.original_filename}: {str(e)}")
-        
-        return created_photos_schemas
+            self.db.add(batch_session)
+            self.db.flush()
+            batch_session_id = batch_session.id
+
+            # Usar el precio por defecto si está disponible; de lo contrario, usar el precio del request
+            rows = [
+                {
+                    "filename": photo_data.original_filename,
+                    "description": photo_data.description,
+                    "price": default_price if default_price is not None else photo_data.price,
+                    "object_name": photo_data.object_name,
+                    "photographer_id": photo_data.photographer_id,
+                    "session_id": batch_session_id,
+                    "size_bytes": photo_data.size_bytes,
+                }
+                for photo_data in completion_requests
+            ]
+            inserted = self.db.execute(
+                insert(Photo).returning(
+                    Photo.id, Photo.filename, Photo.description, Photo.price,
+                    Photo.object_name, Photo.photographer_id, Photo.session_id,
+                    Photo.rendition_status,
+                    sort_by_parameter_order=True,
+                ),
+                rows,
+            ).all()
+
+            usage_service = StorageUsageService(self.db)
+            deltas = usage_service.new_deltas()
+            for photo_data in completion_requests:
+                usage_service.add_delta(deltas, photo_data.photographer_id, album_id, "original", photo_data.size_bytes or 0)
+            usage_service.record(deltas)
+            self.db.commit()
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Failed to create photo records for batch: {str(e)}")
+
+        return [
+            PhotoSchema(
+                **row._mapping,
+                photographer=photographers[row.photographer_id],
+                album_id=album_id,
+                tags=[],
+            )
+            for row in inserted
+        ]
 
     def download_photo(self, photo_id: int):
         return {"message": f"PhotoService: Download photo {photo_id} logic"}
 
     def request_presigned_urls(self):
         return {"message": "PhotoService: Request presigned URLs logic"}
+
+class AsyncPhotoService(AsyncBaseService):
+    """
+    Async versions of the public PhotoService reads, on AsyncSession (asyncpg). Same
+    filters, ordering and schemas as the sync ones; every relationship the schema needs
+    is eager-loaded with PHOTO_LOAD_OPTIONS.
+    """
+    def _photos_select(self, **filters):
+        return PhotoService._apply_photo_filters(select(Photo).options(*PHOTO_LOAD_OPTIONS), **filters)
+
+    async def list_photos(self, offset: int = 0, limit: int = 10, **filters) -> List[PhotoSchema]:
+        result = await self.db.execute(
+            self._photos_select(**filters).order_by(Photo.id.desc()).offset(offset).limit(limit)
+        )
+        return [PhotoService._generate_presigned_urls(p) for p in result.unique().scalars()]
+
+    async def list_photos_by_cursor(self, cursor: str | None = None, limit: int = 10, **filters) -> CursorPage[PhotoSchema]:
+        limit, last_id = PhotoService._cursor_limit_and_last_id(cursor, limit)
+        stmt = self._photos_select(**filters)
+        if last_id is not None:
+            stmt = stmt.where(Photo.id < last_id)
+        result = await self.db.execute(stmt.order_by(Photo.id.desc()).limit(limit + 1))
+        return PhotoService._cursor_page(list(result.unique().scalars()), limit)
+
+    async def search_by_tags(self, tag_names: List[str], match: str = "all", cursor: str | None = None,
+                             limit: int = 24) -> CursorPage[PhotoSchema]:
+        """
+        Photos tagged with all (or any) of `tag_names`, case-insensitive, newest first by
+        cursor. The page of ids is answered from photo_tags alone (ix_photo_tags_tag_id_photo_id,
+        names through uq_tags_lower_name) and only those photos are loaded.
+        """
+        limit, last_id = PhotoService._cursor_limit_and_last_id(cursor, limit)
+        names = {name.strip().lower() for name in tag_names if name.strip()}
+        if not names:
+            return CursorPage[PhotoSchema](items=[])
+
+        ids = (
+            select(photo_tags.c.photo_id)
+            .where(photo_tags.c.tag_id.in_(select(Tag.id).where(func.lower(Tag.name).in_(names))))
+            .group_by(photo_tags.c.photo_id)
+        )
+        if match == "all":
+            # Un nombre que no existe deja la cuenta corta: la búsqueda da vacío, como corresponde.
+            ids = ids.having(func.count() == len(names))
+        if last_id is not None:
+            ids = ids.where(photo_tags.c.photo_id < last_id)
+        page_ids = (await self.db.scalars(ids.order_by(photo_tags.c.photo_id.desc()).limit(limit + 1))).all()
+        if not page_ids:
+            return CursorPage[PhotoSchema](items=[])
+
+        result = await self.db.execute(
+            select(Photo).options(*PHOTO_LOAD_OPTIONS).where(Photo.id.in_(page_ids)).order_by(Photo.id.desc())
+        )
+        return PhotoService._cursor_page(list(result.unique().scalars()), limit)
+
+    # Peso de cada campo en el ranking; word_similarity (Postgres) suma hasta 99 dentro del mismo peso.
+    TEXT_MATCH_SCORE = 300   # filename / description de la foto (números de dorsal)
+    TAG_MATCH_SCORE = 200
+    SESSION_MATCH_SCORE = 100  # event_name / location de la sesión
+    MAX_SEARCH_TERMS = 5
+
+    @staticmethod
+    def _like_pattern(term: str) -> str:
+        escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        return f"%{escaped}%"
+
+    def _similarity_bonus(self, term: str, *columns):
+        """0-99 by pg_trgm word_similarity of `term` against the best of `columns`: exact bibs/words rank first. 0 outside Postgres."""
+        if self.db.get_bind().dialect.name != "postgresql":
+            return literal(0)
+        similarity = func.greatest(*[func.word_similarity(term, func.coalesce(column, "")) for column in columns])
+        return cast(func.round(similarity * 99), Integer)
+
+    async def search_text(self, q: str, cursor: str | None = None, limit: int = 24, **filters) -> CursorPage[PhotoSchema]:
+        """
+        Photos where every word of `q` appears (case-insensitive substring) in the photo
+        filename or description, one of its tags, or its session event_name/location.
+        Ranked by where each word matched (photo text > tag > session) and how close the
+        match is, then newest first; the cursor carries (score, id). Each field is matched
+        with ILIKE '%word%', which the pg_trgm GIN indexes answer in Postgres. `filters`
+        (album_id, session_id, ...) are the ones of list_photos and narrow every branch.
+        """
+        limit = max(1, min(limit, PhotoService.MAX_CURSOR_PAGE_SIZE))
+        last_score = last_id = None
+        if cursor:
+            try:
+                last_score, last_id = (int(value) for value in decode_cursor(cursor, size=2))
+            except (TypeError, ValueError):
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor.")
+        terms = list(dict.fromkeys(q.lower().split()))[:self.MAX_SEARCH_TERMS]
+        if not terms:
+            return CursorPage[PhotoSchema](items=[])
+
+        # Por palabra: mejor puntaje de cada foto que la contiene. Sesiones y tags se puntúan una vez
+        # cada uno (son pocos) y después se unen a sus fotos por índice.
+        per_term = []
+        for index, term in enumerate(terms):
+            pattern = self._like_pattern(term)
+            sessions = (
+                select(PhotoSession.id, (self.SESSION_MATCH_SCORE + self._similarity_bonus(term, PhotoSession.event_name, PhotoSession.location)).label("score"))
+                .where(or_(PhotoSession.event_name.ilike(pattern, escape="\\"), PhotoSession.location.ilike(pattern, escape="\\")))
+                .cte(f"matching_sessions_{index}")
+                .prefix_with("MATERIALIZED", dialect="postgresql") # si no, Postgres la aplana y calcula la similitud por foto
+            )
+            tags = (
+                select(Tag.id, (self.TAG_MATCH_SCORE + self._similarity_bonus(term, Tag.name)).label("score"))
+                .where(Tag.name.ilike(pattern, escape="\\"))
+                .cte(f"matching_tags_{index}")
+                .prefix_with("MATERIALIZED", dialect="postgresql")
+            )
+            tagged = select(photo_tags.c.photo_id, tags.c.score).join(tags, tags.c.id == photo_tags.c.tag_id)
+            if any(value is not None for value in filters.values()):
+                tagged = PhotoService._apply_photo_filters(tagged.join(Photo, Photo.id == photo_tags.c.photo_id), **filters)
+            matches = union_all(
+                PhotoService._apply_photo_filters(
+                    select(Photo.id.label("photo_id"), (self.TEXT_MATCH_SCORE + self._similarity_bonus(term, Photo.filename, Photo.description)).label("score"))
+                    .where(or_(Photo.filename.ilike(pattern, escape="\\"), Photo.description.ilike(pattern, escape="\\"))),
+                    **filters,
+                ),
+                tagged,
+                PhotoService._apply_photo_filters(select(Photo.id, sessions.c.score).join(sessions, sessions.c.id == Photo.session_id), **filters),
+            ).subquery()
+            per_term.append(
+                select(matches.c.photo_id, func.max(matches.c.score).label("score")).group_by(matches.c.photo_id).subquery()
+            )
+
+        # La foto tiene que contener todas las palabras: join entre los resultados de cada una.
+        first = per_term[0]
+        photo_id = first.c.photo_id
+        score = sum((matches.c.score for matches in per_term[1:]), first.c.score)
+        ranked = select(photo_id, score.label("score")).select_from(first)
+        for matches in per_term[1:]:
+            ranked = ranked.join(matches, matches.c.photo_id == photo_id)
+        if last_id is not None:
+            ranked = ranked.where(or_(score < last_score, and_(score == last_score, photo_id < last_id)))
+        rows = (await self.db.execute(ranked.order_by(score.desc(), photo_id.desc()).limit(limit + 1))).all()
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        if not rows:
+            return CursorPage[PhotoSchema](items=[])
+        result = await self.db.execute(
+            select(Photo).options(*PHOTO_LOAD_OPTIONS).where(Photo.id.in_([row.photo_id for row in rows]))
+        )
+        photos = {photo.id: photo for photo in result.unique().scalars()}
+        return CursorPage[PhotoSchema](
+            items=[PhotoService._generate_presigned_urls(photos[row.photo_id]) for row in rows],
+            next_cursor=encode_cursor(rows[-1].score, rows[-1].photo_id) if has_more else None,
+        )
+
+    async def get_photos_by_ids(self, photo_ids: List[int]) -> List[PhotoSchema]:
+        if not photo_ids:
+            return []
+        result = await self.db.execute(select(Photo).options(*PHOTO_LOAD_OPTIONS).where(Photo.id.in_(photo_ids)))
+        return [PhotoService._generate_presigned_urls(p) for p in result.unique().scalars()]
@@ -0,0 +1,178 @@
+import math
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import List
+
+from fastapi import HTTPException, status
+from sqlalchemy import select
+
+from models.combo import Combo, album_combos
+from models.discount import Discount
+from models.order import OrderItemCreateSchema
+from models.photo import Photo
+from services.base import BaseService
+from services.discounts import DiscountService
+from services.photos import PHOTO_LOAD_OPTIONS
+
+# Mismas reglas que resolveAutoCombosWithFullAlbum en el frontend: el combo "álbum completo"
+# desde 11 fotos; si no, combos por cantidad (de mayor a menor) desde 3 fotos.
+FULL_ALBUM_MIN_PHOTOS = 11
+QUANTITY_COMBO_MIN_PHOTOS = 3
+
+# Formatos de impresión de frontend/lib/print-formats.ts, por el nombre que llega en
+# OrderItem.format: (precio por pack, fotos por pack). Mantener sincronizado.
+PRINT_FORMATS = {
+    "Polaroid": (1250.0, 2),
+    "Polaroid Mini": (833.33, 6),
+    "Estándar 10x15": (5000.0, 1),
+    "Mediana 15x20": (5000.0, 1),
+}
+
+@dataclass
+class PricedItem:
+    photo: Photo
+    price: float # precio unitario cobrado (con el combo o el pack ya repartido)
+    quantity: int
+    format: str | None
+
+@dataclass
+class OrderQuote:
+    items: List[PricedItem]
+    subtotal: float
+    discount: Discount | None
+    total: float
+
+def resolve_combos(photo_count: int, combos: List[Combo]) -> tuple[float, int]:
+    """(price of the combos that apply to `photo_count` photos, number of photos they cover)."""
+    full_album = next((combo for combo in combos if combo.isFullAlbum), None)
+    if full_album and photo_count >= FULL_ALBUM_MIN_PHOTOS:
+        return full_album.price, photo_count
+    if photo_count < QUANTITY_COMBO_MIN_PHOTOS:
+        return 0.0, 0
+
+    remaining, total = photo_count, 0.0
+    for combo in sorted((c for c in combos if not c.isFullAlbum and c.totalPhotos > 0), key=lambda c: -c.totalPhotos):
+        count = remaining // combo.totalPhotos
+        if count:
+            total += count * combo.price
+            remaining -= count * combo.totalPhotos
+    return total, photo_count - remaining
+
+class PricingService(BaseService):
+    """
+    Prices an order on the server from the current photo prices (or the album's
+    default_photo_price), the album combos, the print formats and the discount, so
+    the prices and total sent by the client are never trusted.
+    """
+
+    def _load_photos(self, photo_ids: set[int]) -> dict[int, Photo]:
+        """All the photos of the order in one IN query, with what PhotoSchema serializes."""
+        photos = self.db.scalars(
+            select(Photo).options(*PHOTO_LOAD_OPTIONS).where(Photo.id.in_(photo_ids))
+        ).unique().all()
+        photos = {photo.id: photo for photo in photos}
+        missing_ids = photo_ids - photos.keys()
+        if missing_ids:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Photo not found: {', '.join(map(str, sorted(missing_ids)))}")
+        return photos
+
+    def _combos_by_album(self, album_ids: set[int]) -> dict[int, List[Combo]]:
+        combos = defaultdict(list)
+        if album_ids:
+            rows = self.db.execute(
+                select(album_combos.c.album_id, Combo)
+                .join(Combo, Combo.id == album_combos.c.combo_id)
+                .where(album_combos.c.album_id.in_(album_ids), Combo.active.is_(True))
+                .order_by(Combo.id)
+            ).all()
+            for album_id, combo in rows:
+                combos[album_id].append(combo)
+        return combos
+
+    def _get_valid_discount(self, code: str) -> Discount:
+        """
+        The discount with this code, if it is active and has not expired (as
+        /discounts/validate). Only the code is accepted: ids are sequential and guessable.
+        """
+        discount = DiscountService(self.db).find_by_code(code.strip().upper())
+        if not discount:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Código de descuento inválido")
+        if not discount.is_active:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="El código de descuento no está activo")
+        if discount.expires_at is not None:
+            expires_at = discount.expires_at
+            if expires_at.tzinfo is None:
+                expires_at = expires_at.replace(tzinfo=timezone.utc)
+            if expires_at <= datetime.now(timezone.utc):
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="El código de descuento está vencido")
+        return discount
+
+    @staticmethod
+    def _unit_price(photo: Photo) -> float:
+        """The photo's own price, or the default price of its album."""
+        price = photo.price
+        if price is None and photo.session and photo.session.album:
+            price = photo.session.album.default_photo_price
+        if price is None:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Photo {photo.id} has no price.")
+        return float(price)
+
+    def quote(self, items: List[OrderItemCreateSchema], discount_code: str | None = None) -> OrderQuote:
+        """
+        Prices every item: digital photos at their unit price, except the ones covered
+        by the combos of their album (the most expensive first), which share the combo
+        price; prints by format at the price of the packs they need. The discount (by
+        its code) is applied to the order total.
+        """
+        if not items:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cannot create an empty order.")
+        photos = self._load_photos({item.photo_id for item in items})
+
+        digital_by_album = defaultdict(list)
+        prints_by_format = defaultdict(list)
+        digital_photo_ids = set()
+        for item in items:
+            if item.quantity < 1:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid quantity for photo {item.photo_id}.")
+            photo = photos[item.photo_id]
+            if item.format is None:
+                # Una descarga por foto: repetirla solo serviría para alcanzar un combo.
+                if item.quantity != 1 or item.photo_id in digital_photo_ids:
+                    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Photo {item.photo_id} can only be bought once as a digital download.")
+                digital_photo_ids.add(item.photo_id)
+                album_id = photo.session.album_id if photo.session else None
+                digital_by_album[album_id].append(PricedItem(photo=photo, price=self._unit_price(photo), quantity=1, format=None))
+            else:
+                if item.format not in PRINT_FORMATS:
+                    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unknown print format '{item.format}'.")
+                prints_by_format[item.format].append(PricedItem(photo=photo, price=0.0, quantity=item.quantity, format=item.format))
+
+        combos = self._combos_by_album({album_id for album_id in digital_by_album if album_id is not None})
+        for album_id, lines in digital_by_album.items():
+            combo_price, covered = resolve_combos(len(lines), combos.get(album_id, []))
+            if covered:
+                for line in sorted(lines, key=lambda line: -line.price)[:covered]:
+                    line.price = combo_price / covered
+
+        for format_name, lines in prints_by_format.items():
+            pack_price, pack_size = PRINT_FORMATS[format_name]
+            units = sum(line.quantity for line in lines)
+            unit_price = math.ceil(units / pack_size) * pack_price / units
+            for line in lines:
+                line.price = unit_price
+
+        # Mismo orden en el que llegaron los ítems.
+        priced = [line for lines in digital_by_album.values() for line in lines] + \
+                 [line for lines in prints_by_format.values() for line in lines]
+        position = {(item.photo_id, item.format): index for index, item in enumerate(items)}
+        priced.sort(key=lambda line: position[(line.photo.id, line.format)])
+
+        subtotal = round(sum(line.price * line.quantity for line in priced), 2)
+        discount = self._get_valid_discount(discount_code) if discount_code and discount_code.strip() else None
+        total = subtotal
+        if discount and discount.percentage:
+            total = subtotal * (1 - discount.percentage / 100.0)
+        elif discount and discount.value:
+            total = max(0.0, subtotal - discount.value)
+        return OrderQuote(items=priced, subtotal=subtotal, discount=discount, total=round(total, 2))
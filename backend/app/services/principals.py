@@ -0,0 +1,108 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import FrozenSet, Optional
+
+from pydantic import BaseModel
+from sqlalchemy import select
+
+from core.config import settings
+from models.photographer import Photographer
+from models.permission import Permission
+from models.role import Role, role_permissions
+from models.user import User
+from services.base import BaseService
+
+# Pydantic models for service contract
+class Principal(BaseModel):
+    """What authorization needs to know about a user, resolved once and cached."""
+    user_id: int
+    role_id: Optional[int] = None
+    role_name: Optional[str] = None
+    is_active: bool = True
+    photographer_id: Optional[int] = None
+    permissions: FrozenSet[str] = frozenset()
+
+    class Config:
+        frozen = True
+
+class PrincipalCache:
+    """
+    Thread-safe TTL + LRU cache of principals keyed by user id. The TTL bounds how long
+    another worker process can keep serving a role or user that was edited elsewhere;
+    in this process edits invalidate the entries right away.
+    """
+    def __init__(self, max_entries: int = 10000, ttl: int = 60):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[int, tuple[Principal, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int) -> Principal | None:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            principal, valid_until = entry
+            if valid_until <= time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return principal
+
+    def set(self, principal: Principal):
+        if self.max_entries <= 0 or self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[principal.user_id] = (principal, time.monotonic() + self.ttl)
+            self._entries.move_to_end(principal.user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate_user(self, user_id: int | None):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def invalidate_role(self, role_id: int):
+        with self._lock:
+            for user_id in [uid for uid, (principal, _) in self._entries.items() if principal.role_id == role_id]:
+                del self._entries[user_id]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+principal_cache = PrincipalCache(
+    max_entries=settings.PRINCIPAL_CACHE_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
+
+class PrincipalService(BaseService):
+    def get_principal(self, user_id: int) -> Principal | None:
+        """Returns the cached principal of a user, loading it with a single query on a miss."""
+        principal = principal_cache.get(user_id)
+        if principal is not None:
+            return principal
+
+        rows = self.db.execute(
+            select(User.id, User.role_id, User.is_active, Role.name, Photographer.id, Permission.name)
+            .outerjoin(Role, Role.id == User.role_id)
+            .outerjoin(role_permissions, role_permissions.c.role_id == Role.id)
+            .outerjoin(Permission, Permission.id == role_permissions.c.permission_id)
+            .outerjoin(Photographer, Photographer.user_id == User.id)
+            .where(User.id == user_id)
+        ).all()
+        if not rows:
+            return None
+
+        _, role_id, is_active, role_name, photographer_id, _ = rows[0]
+        principal = Principal(
+            user_id=user_id,
+            role_id=role_id,
+            role_name=role_name,
+            is_active=bool(is_active),
+            photographer_id=photographer_id,
+            permissions=frozenset(row[5] for row in rows if row[5] is not None),
+        )
+        principal_cache.set(principal)
+        return principal
@@ -0,0 +1,118 @@
+import io
+import logging
+from typing import Dict, List, Tuple
+
+from pydantic import BaseModel
+
+from core.config import settings
+
+# Pydantic models for service contract
+class RenditionSpec(BaseModel):
+    prefix: str
+    max_size: int
+    quality: int = 82
+    watermark: bool = False
+
+# Renditions derived from every original. Keys are deterministic and always end in a JPEG
+# extension, since every rendition is encoded as JPEG:
+#   photos/<uuid>.jpg -> photos/<prefix><uuid>.jpg
+#   photos/<uuid>.png -> photos/<prefix><uuid>.png.jpg
+RENDITIONS: Dict[str, RenditionSpec] = {
+    "thumb": RenditionSpec(prefix="thumb_", max_size=400, quality=75),
+    "preview": RenditionSpec(prefix="preview_", max_size=1200),
+    "web": RenditionSpec(prefix="wm_", max_size=1600, watermark=True),
+}
+
+JPEG_EXTENSIONS = (".jpg", ".jpeg")
+RENDITION_EXTENSION = ".jpg"
+
+def rendition_key(object_name: str, kind: str) -> str:
+    """photos/<name> -> photos/<prefix><name>, plus .jpg when <name> is not a JPEG."""
+    directory, _, base = object_name.rpartition("/")
+    key = f"{RENDITIONS[kind].prefix}{base}"
+    if not base.lower().endswith(JPEG_EXTENSIONS):
+        key += RENDITION_EXTENSION
+    return f"{directory}/{key}" if directory else key
+
+def rendition_keys(object_name: str) -> List[str]:
+    return [rendition_key(object_name, kind) for kind in RENDITIONS]
+
+def resolve_original(object_name: str) -> Tuple[str | None, str]:
+    """
+    Returns (kind, original_object_name) for a rendition key, or (None, object_name)
+    when the key is already an original. Assumes originals are named <uuid>.<ext>, as
+    prepare_upload_urls does: "x.png.jpg" comes from "x.png", "x.jpg" from "x.jpg".
+    """
+    directory, _, base = object_name.rpartition("/")
+    for kind, spec in RENDITIONS.items():
+        if base.startswith(spec.prefix) and len(base) > len(spec.prefix):
+            original = base[len(spec.prefix):]
+            stem = original[:-len(RENDITION_EXTENSION)]
+            if original.endswith(RENDITION_EXTENSION) and "." in stem and not stem.lower().endswith(JPEG_EXTENSIONS):
+                original = stem
+            return kind, f"{directory}/{original}" if directory else original
+    return None, object_name
+
+def _apply_watermark(image, text: str):
+    from PIL import Image, ImageDraw, ImageFont
+
+    overlay = Image.new("RGBA", image.size, (255, 255, 255, 0))
+    draw = ImageDraw.Draw(overlay)
+    font_size = max(16, image.width // 18)
+    try:
+        font = ImageFont.load_default(size=font_size)
+    except TypeError:  # Pillow < 10.1 no acepta size
+        font = ImageFont.load_default()
+
+    left, top, right, bottom = draw.textbbox((0, 0), text, font=font)
+    step_x = (right - left) + font_size * 2
+    step_y = (bottom - top) + font_size * 3
+    for row, y in enumerate(range(0, image.height, step_y)):
+        offset = (step_x // 2) if row % 2 else 0
+        for x in range(-offset, image.width, step_x):
+            draw.text((x, y), text, font=font, fill=(255, 255, 255, 90))
+
+    return Image.alpha_composite(image.convert("RGBA"), overlay).convert("RGB")
+
+def render(original: bytes, watermark_text: str) -> Dict[str, bytes]:
+    """
+    Builds every rendition of an original image. Pure CPU work, meant to run in a
+    worker process. Output is always JPEG, whatever the original format.
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(io.BytesIO(original)) as source:
+        source = ImageOps.exif_transpose(source).convert("RGB")
+        renditions = {}
+        for kind, spec in RENDITIONS.items():
+            image = source.copy()
+            image.thumbnail((spec.max_size, spec.max_size), Image.LANCZOS)
+            if spec.watermark:
+                image = _apply_watermark(image, watermark_text)
+            buffer = io.BytesIO()
+            image.save(buffer, format="JPEG", quality=spec.quality, optimize=True, progressive=True)
+            renditions[kind] = buffer.getvalue()
+    return renditions
+
+def process_photo(object_name: str) -> Dict[str, int]:
+    """
+    Worker-process entry point: downloads the original, renders it and uploads every
+    rendition under its deterministic (.jpg) key. Returns the size in bytes of the original
+    and of each rendition, for the storage usage ledger.
+    """
+    from services.storage import storage_service
+
+    s3 = storage_service.s3_client
+    original = s3.get_object(Bucket=storage_service.bucket_name, Key=object_name)["Body"].read()
+    sizes = {"original": len(original)}
+    for kind, data in render(original, settings.RENDITION_WATERMARK_TEXT).items():
+        s3.put_object(
+            Bucket=storage_service.bucket_name,
+            Key=rendition_key(object_name, kind),
+            Body=data,
+            ContentType="image/jpeg",
+            CacheControl="public, max-age=31536000, immutable",
+        )
+        sizes[kind] = len(data)
+    logging.info(f"Renditions generated for {object_name}")
+    return sizes
@@ -0,0 +1,213 @@
+import hashlib
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Lo que cambia cada servicio. Las rutas cacheadas declaran de cuáles dependen (middleware/response_cache.py).
+ALBUMS = "albums"
+SESSIONS = "sessions"
+PHOTOS = "photos"
+TAGS = "tags"
+COMBOS = "combos"
+
+@dataclass(frozen=True)
+class CachedResponse:
+    body: bytes
+    etag: str
+    media_type: str
+
+class CacheBackend(ABC):
+    """Byte storage shared by the response cache: entries with a TTL plus integer counters."""
+
+    @abstractmethod
+    async def get_many(self, keys: list[str]) -> list[bytes | None]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: int):
+        ...
+
+    @abstractmethod
+    def incr(self, key: str) -> int:
+        """Sync on purpose: it runs from the services, after the commit."""
+
+    @abstractmethod
+    def clear(self):
+        ...
+
+class LocalCacheBackend(CacheBackend):
+    """
+    In-process LRU with a TTL and a byte budget. Invalidations only reach the current
+    process: with several uvicorn workers the others serve their copy until the TTL.
+    """
+    def __init__(self, max_entries: int = 1000, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, tuple[bytes, float]]" = OrderedDict()
+        self._counters: dict[str, int] = {}
+        self._size = 0
+        self._lock = threading.Lock()
+
+    async def get_many(self, keys: list[str]) -> list[bytes | None]:
+        with self._lock:
+            return [self._get(key) for key in keys]
+
+    def _get(self, key: str) -> bytes | None:
+        if key in self._counters:
+            return str(self._counters[key]).encode()
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, valid_until = entry
+        if valid_until <= time.monotonic():
+            self._pop(key)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _pop(self, key: str):
+        value, _ = self._entries.pop(key)
+        self._size -= len(value)
+
+    async def set(self, key: str, value: bytes, ttl: int):
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._pop(key)
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._size += len(value)
+            while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+                self._pop(next(iter(self._entries)))
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._counters.clear()
+            self._size = 0
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Any server that speaks the Redis protocol (Redis, Valkey, or fakeredis' TcpFakeServer
+    as a local stand-in). Entries and counters are shared by every worker process.
+    Counters have no TTL: with a memory limit use `maxmemory-policy volatile-lru`, so
+    only entries are evicted (a counter that goes back to 0 would revive old entries).
+    """
+    def __init__(self, client, async_client, key_prefix: str = ""):
+        self.client = client
+        self.async_client = async_client
+        self.key_prefix = key_prefix
+
+    @classmethod
+    def from_url(cls, url: str, key_prefix: str = "") -> "RedisCacheBackend":
+        import redis
+        import redis.asyncio
+
+        return cls(redis.Redis.from_url(url), redis.asyncio.Redis.from_url(url), key_prefix)
+
+    async def get_many(self, keys: list[str]) -> list[bytes | None]:
+        return await self.async_client.mget(keys)
+
+    async def set(self, key: str, value: bytes, ttl: int):
+        await self.async_client.set(key, value, ex=ttl)
+
+    def incr(self, key: str) -> int:
+        return self.client.incr(key)
+
+    def clear(self):
+        keys = list(self.client.scan_iter(match=f"{self.key_prefix}*"))
+        if keys:
+            self.client.delete(*keys)
+
+class ResponseCache:
+    """
+    Serialized JSON responses keyed by route and query string. Every namespace (what a
+    service writes) has a version counter; an entry stores the versions it was built from
+    and is a miss once any of them moved. Versions are read before the response is built,
+    so a write that commits meanwhile makes the new entry stale instead of serving it.
+    """
+    def __init__(self, backend: CacheBackend | None, ttl: int = 300, key_prefix: str = "respcache:"):
+        self.backend = backend
+        self.ttl = ttl
+        self.key_prefix = key_prefix
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None and self.ttl > 0
+
+    def _version_key(self, namespace: str) -> str:
+        return f"{self.key_prefix}version:{namespace}"
+
+    def _entry_key(self, key: str) -> str:
+        return f"{self.key_prefix}entry:{key}"
+
+    async def lookup(self, key: str, namespaces: tuple[str, ...]) -> tuple[CachedResponse | None, str]:
+        """Returns the cached response (if still valid) and the versions to store a new one with. One round trip."""
+        values = await self.backend.get_many([self._entry_key(key)] + [self._version_key(ns) for ns in namespaces])
+        versions = ".".join((value or b"0").decode() for value in values[1:])
+        if values[0] is None:
+            return None, versions
+        header, _, body = values[0].partition(b"\n")
+        entry_versions, etag, media_type = header.decode().split(" ", 2)
+        if entry_versions != versions:
+            return None, versions
+        return CachedResponse(body=body, etag=etag, media_type=media_type), versions
+
+    async def store(self, key: str, versions: str, body: bytes, media_type: str) -> CachedResponse:
+        response = CachedResponse(body=body, etag=f'"{hashlib.sha1(body).hexdigest()}"', media_type=media_type)
+        await self.backend.set(self._entry_key(key), f"{versions} {response.etag} {media_type}\n".encode() + body, self.ttl)
+        return response
+
+    def invalidate(self, *namespaces: str):
+        if not self.enabled:
+            return
+        for namespace in namespaces:
+            try:
+                self.backend.incr(self._version_key(namespace))
+            except Exception as e:
+                # El dato ya está guardado: a lo sumo se sirve la versión vieja hasta que venza el TTL.
+                logger.warning(f"Could not invalidate cached responses for '{namespace}': {e}")
+
+    def clear(self):
+        if self.backend is not None:
+            self.backend.clear()
+
+def build_backend() -> CacheBackend | None:
+    if settings.RESPONSE_CACHE_BACKEND == "local":
+        return LocalCacheBackend(max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES, max_bytes=settings.RESPONSE_CACHE_MAX_BYTES)
+    if settings.RESPONSE_CACHE_BACKEND == "redis":
+        return RedisCacheBackend.from_url(settings.REDIS_URL, key_prefix="respcache:")
+    return None
+
+response_cache = ResponseCache(build_backend(), ttl=settings.RESPONSE_CACHE_TTL_SECONDS)
+
+def invalidate_on_commit(db: Session, *namespaces: str):
+    """Marks cached responses of `namespaces` for invalidation once `db` commits (nothing happens on rollback)."""
+    db.info.setdefault("response_cache_namespaces", set()).update(namespaces)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session: Session):
+    namespaces = session.info.pop("response_cache_namespaces", None)
+    if namespaces:
+        response_cache.invalidate(*sorted(namespaces))
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_pending(session: Session, transaction):
+    # Rollback o close(): lo que no se confirmó no invalida nada. Tras un commit ya se consumió en after_commit.
+    if transaction.parent is None:
+        session.info.pop("response_cache_namespaces", None)
@@ -2,6 +2,7 @@ from sqlalchemy.orm import Session, joinedload
 from fastapi import HTTPException, status
 from models.role import Role, RoleCreateSchema, RoleUpdateSchema
 from services.base import BaseService
+from services.principals import principal_cache
 
 class RoleService(BaseService):
     def list_roles(self) -> list[Role]:
@@ -32,13 +33,16 @@ class RoleService(BaseService):
         update_data = role_in.model_dump(exclude_unset=True)
         for field, value in update_data.items():
             setattr(db_role, field, value)
-            
-        return self._save_and_refresh(db_role)
+
+        db_role = self._save_and_refresh(db_role)
+        principal_cache.invalidate_role(role_id)
+        return db_role
 
     def delete_role(self, role_id: int):
         """Deletes a role."""
         db_role = self.get_role(role_id)
-        return self._delete_and_refresh(db_role)
+        self._delete_and_refresh(db_role)
+        principal_cache.invalidate_role(role_id)
 
     # TODO: Implement logic for assigning/revoking permissions
     # def assign_permission_to_role(self, role_id: int, permission_id: int):
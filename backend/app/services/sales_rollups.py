@@ -0,0 +1,170 @@
+import logging
+from datetime import date, datetime
+
+from sqlalchemy import select, delete, func, literal, DateTime
+
+from db.upsert import upsert_insert
+from models.earning import Earning
+from models.order import Order, OrderItem, PaymentStatus
+from models.photo import Photo
+from models.photo_session import PhotoSession
+from models.photographer import Photographer
+from models.sales_rollup import DailySales, DailyPhotographerSales
+from services.base import BaseService
+
+ROLLUP_COUNTERS = {
+    DailySales: ("orders", "photos_sold", "gross_revenue"),
+    DailyPhotographerSales: ("orders", "photos_sold", "gross_sales", "net_earnings", "earned_photo_fraction"),
+}
+
+class SalesRollupService(BaseService):
+    """
+    Daily sales rollups (daily_sales, daily_photographer_sales). mark_order_as_paid adds
+    the paid order to them in the same transaction, and editing or deleting a paid order
+    takes it out first; the dashboard reads them instead of aggregating orders, items and
+    earnings. `rebuild` recomputes them from the raw tables.
+    """
+
+    def _upsert(self, model, query):
+        """INSERT ... SELECT `query` into `model`, adding the counters to an existing row of the same key."""
+        columns = [column.name for column in model.__table__.primary_key] + list(ROLLUP_COUNTERS[model]) + ["updated_at"]
+        stmt = upsert_insert(self.db, model.__table__).from_select(columns, query)
+        table = model.__table__
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[column.name for column in table.primary_key],
+            set_={
+                **{name: table.c[name] + stmt.excluded[name] for name in ROLLUP_COUNTERS[model]},
+                "updated_at": stmt.excluded.updated_at,
+            },
+        )
+        self.db.execute(stmt)
+
+    def _add_orders(self, paid_orders, sign: int = 1):
+        """
+        Adds the orders of `paid_orders` (a subquery with order_id, total and day) to both
+        rollups, or subtracts them with sign=-1.
+        """
+        now = literal(datetime.utcnow(), type_=DateTime)
+        photos_per_order = (
+            select(OrderItem.order_id, func.sum(OrderItem.quantity).label("quantity"))
+            .where(OrderItem.order_id.in_(select(paid_orders.c.order_id)))
+            .group_by(OrderItem.order_id)
+            .subquery()
+        )
+        self._upsert(DailySales, (
+            select(
+                paid_orders.c.day,
+                sign * func.count(paid_orders.c.order_id),
+                sign * func.coalesce(func.sum(photos_per_order.c.quantity), 0),
+                sign * func.coalesce(func.sum(paid_orders.c.total), 0),
+                now,
+            )
+            .select_from(paid_orders)
+            .outerjoin(photos_per_order, photos_per_order.c.order_id == paid_orders.c.order_id)
+            .group_by(paid_orders.c.day)
+        ))
+
+        album_id = func.coalesce(PhotoSession.album_id, 0)
+        self._upsert(DailyPhotographerSales, (
+            select(
+                paid_orders.c.day,
+                Photo.photographer_id,
+                album_id,
+                sign * func.count(func.distinct(OrderItem.order_id)),
+                sign * func.sum(OrderItem.quantity),
+                sign * func.sum(OrderItem.price * OrderItem.quantity),
+                sign * func.coalesce(func.sum(Earning.amount), 0),
+                sign * func.coalesce(func.sum(Earning.earned_photo_fraction), 0),
+                now,
+            )
+            .select_from(paid_orders)
+            .join(OrderItem, OrderItem.order_id == paid_orders.c.order_id)
+            .join(Photo, Photo.id == OrderItem.photo_id)
+            .outerjoin(PhotoSession, PhotoSession.id == Photo.session_id)
+            .outerjoin(Earning, Earning.order_item_id == OrderItem.id)
+            .where(Photo.photographer_id.isnot(None))
+            .group_by(paid_orders.c.day, Photo.photographer_id, album_id)
+        ))
+
+    @staticmethod
+    def _paid_orders():
+        """
+        (order_id, total, day) of the paid orders, grouped per order. The day of an order is
+        the date its earnings were recorded, or its creation date when it has none.
+        """
+        day = func.coalesce(func.date(func.min(Earning.created_at)), func.date(Order.created_at))
+        return (
+            select(Order.id.label("order_id"), Order.total.label("total"), day.label("day"))
+            .outerjoin(Earning, Earning.order_id == Order.id)
+            .where(Order.payment_status == PaymentStatus.PAID)
+            .group_by(Order.id, Order.total, Order.created_at)
+        ), day
+
+    def record_paid_order(self, order_id: int):
+        """
+        Adds a paid order (and the earnings recorded for it) to the rollups with two upserts.
+        Does nothing if the order is not paid. Does not commit: it runs inside the caller's
+        transaction (mark_order_as_paid, edit_order).
+        """
+        self.db.flush() # el estado de la orden y los Earning recién agregados tienen que estar en la base
+        paid_orders, _ = self._paid_orders()
+        self._add_orders(paid_orders.where(Order.id == order_id).subquery())
+
+    def remove_paid_order(self, order_id: int):
+        """
+        Subtracts a paid order from the rollups, on the same day it was added, and drops the
+        rows left without orders. Must run before the order, its items or its earnings change
+        (edit_order, delete_order). Does nothing if the order is not paid. Does not commit.
+        """
+        self.db.flush()
+        paid_orders, _ = self._paid_orders()
+        paid_order = paid_orders.where(Order.id == order_id).subquery()
+        days = select(paid_order.c.day).scalar_subquery()
+        self._add_orders(paid_order, sign=-1)
+        for model in (DailySales, DailyPhotographerSales):
+            self.db.execute(delete(model).where(model.day == days, model.orders <= 0))
+
+    def rebuild(self, since: date | None = None):
+        """
+        Recomputes the rollups from orders, items and earnings (all days, or from `since` on)
+        in one transaction.
+        """
+        paid_orders, day = self._paid_orders()
+        if since is not None:
+            paid_orders = paid_orders.having(day >= since)
+        try:
+            for model in (DailySales, DailyPhotographerSales):
+                stmt = delete(model)
+                if since is not None:
+                    stmt = stmt.where(model.day >= since)
+                self.db.execute(stmt)
+            self._add_orders(paid_orders.subquery())
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        logging.info(f"Sales rollups rebuilt{f' since {since}' if since else ''}.")
+
+    def get_totals(self):
+        """Global totals: orders, photos_sold and gross_revenue (one row per day in the table)."""
+        return self.db.execute(
+            select(
+                func.coalesce(func.sum(DailySales.orders), 0).label("orders"),
+                func.coalesce(func.sum(DailySales.photos_sold), 0).label("photos_sold"),
+                func.coalesce(func.sum(DailySales.gross_revenue), 0).label("gross_revenue"),
+            )
+        ).one()
+
+    def get_photographer_totals(self):
+        """(id, name, gross_sales, net_earnings) of every photographer, by name."""
+        return self.db.execute(
+            select(
+                Photographer.id,
+                Photographer.name,
+                func.sum(DailyPhotographerSales.gross_sales),
+                func.sum(DailyPhotographerSales.net_earnings),
+            )
+            .outerjoin(DailyPhotographerSales, DailyPhotographerSales.photographer_id == Photographer.id)
+            .group_by(Photographer.id, Photographer.name)
+            .order_by(Photographer.name)
+        ).all()
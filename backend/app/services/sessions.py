@@ -2,6 +2,7 @@ from sqlalchemy.orm import Session, joinedload
 from fastapi import HTTPException, status
 from models.photo_session import PhotoSession, PhotoSessionCreateSchema, PhotoSessionUpdateSchema
 from services.base import BaseService
+from services.response_cache import SESSIONS, invalidate_on_commit
 from models.album import Album
 
 class SessionService(BaseService):
@@ -23,6 +24,7 @@ class SessionService(BaseService):
 
     def create_session(self, session_in: PhotoSessionCreateSchema) -> PhotoSession:
         """Creates a new photo session."""
+        invalidate_on_commit(self.db, SESSIONS)
         data = session_in.model_dump(exclude={"album_id"})
         db_session = PhotoSession(**data)
         if session_in.album_id is not None:
@@ -34,6 +36,7 @@ class SessionService(BaseService):
         return self._save_and_refresh(db_session)
     
     def update_session(self, session_id: int, session_in: PhotoSessionUpdateSchema) -> PhotoSession:
+        invalidate_on_commit(self.db, SESSIONS)
         db_session = self.get_session(session_id)
         data = session_in.model_dump(exclude_unset=True)
 
@@ -55,6 +58,7 @@ class SessionService(BaseService):
 
     def delete_session(self, session_id: int):
         """Deletes a photo session."""
+        invalidate_on_commit(self.db, SESSIONS)
         db_session = self.get_session(session_id)
         return self._delete_and_refresh(db_session)
 
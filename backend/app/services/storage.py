@@ -3,9 +3,13 @@ from botocore.client import Config
 from botocore.exceptions import ClientError
 from fastapi import HTTPException, status
 import logging
+import threading
+import time
 import uuid
-from typing import List
-from datetime import datetime, timedelta, timezone
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List
+from starlette.concurrency import run_in_threadpool
 
 from core.config import settings
 from pydantic import BaseModel
@@ -22,6 +26,65 @@ class PresignedURLData(BaseModel):
     object_name: str
     original_filename: str
 
+def readable_size(total_size: int) -> str:
+    """Convert size to a more readable format."""
+    if total_size < 1024:
+        return f"{total_size} Bytes"
+    elif total_size < 1024**2:
+        return f"{total_size/1024:.2f} KB"
+    elif total_size < 1024**3:
+        return f"{total_size/1024**2:.2f} MB"
+    return f"{total_size/1024**3:.2f} GB"
+
+# Límite de S3 para delete_objects.
+DELETE_BATCH_SIZE = 1000
+
+class PresignedUrlCache:
+    """
+    Thread-safe LRU of signed GET URLs keyed by (object_name, expiration).
+    An entry is served until `refresh_margin` seconds before the URL expires, so the
+    same URL is reused across page loads (which also lets browsers cache the image).
+    """
+    def __init__(self, max_entries: int = 10000, refresh_margin: int = 300):
+        self.max_entries = max_entries
+        self.refresh_margin = refresh_margin
+        self._entries: "OrderedDict[tuple[str, int], tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, object_name: str, expiration: int) -> str | None:
+        key = (object_name, expiration)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            url, valid_until = entry
+            if valid_until <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return url
+
+    def set(self, object_name: str, expiration: int, url: str, signed_at: float):
+        if self.max_entries <= 0:
+            return
+        # Nunca servir una URL durante la última parte de su vida útil.
+        margin = min(self.refresh_margin, expiration // 2)
+        with self._lock:
+            self._entries[(object_name, expiration)] = (url, signed_at + expiration - margin)
+            self._entries.move_to_end((object_name, expiration))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, object_names: Iterable[str]):
+        names = set(object_names)
+        with self._lock:
+            for key in [key for key in self._entries if key[0] in names]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
 class StorageService:
     def __init__(self):
         if not all([settings.S3_ENDPOINT_URL, settings.S3_ACCESS_KEY_ID, settings.S3_SECRET_ACCESS_KEY, settings.S3_BUCKET_NAME]):
@@ -36,6 +99,10 @@ class StorageService:
             config=Config(signature_version='s3v4')
         )
         self.bucket_name = settings.S3_BUCKET_NAME
+        self.url_cache = PresignedUrlCache(
+            max_entries=settings.PRESIGNED_URL_CACHE_SIZE,
+            refresh_margin=settings.PRESIGNED_URL_REFRESH_MARGIN_SECONDS,
+        )
 
         # Ensure the bucket exists, create it if it does not.
         try:
@@ -64,12 +131,7 @@ class StorageService:
                 },
                 ExpiresIn=expiration
             )
-            # Replace the internal endpoint URL with the public one for browser access.
-            # e.g., http://localstack:4566 -> http://localhost:4566
-            if settings.ENVIRONMENT == "local" and settings.S3_PUBLIC_URL and settings.S3_ENDPOINT_URL:
-                response = response.replace(settings.S3_ENDPOINT_URL, settings.S3_PUBLIC_URL)
-
-            return response
+            return self._to_public_url(response)
         except ClientError as e:
             logging.error(f"Error generating presigned PUT URL: {e}")
             raise HTTPException(
@@ -77,28 +139,52 @@ class StorageService:
                 detail="Could not generate upload URL."
             )
 
+    def _to_public_url(self, url: str) -> str:
+        # Replace the internal endpoint URL with the public one for browser access.
+        # e.g., http://localstack:4566 -> http://localhost:4566
+        if settings.ENVIRONMENT == "local" and settings.S3_PUBLIC_URL and settings.S3_ENDPOINT_URL:
+            return url.replace(settings.S3_ENDPOINT_URL, settings.S3_PUBLIC_URL)
+        return url
+
     def generate_presigned_get_url(self, object_name: str, expiration: int = 3600) -> str:
         """
-        Generate a presigned URL to view an object from S3.
+        Generate a presigned URL to view an object from S3 (cached, see generate_presigned_get_urls).
         """
-        try:
-            response = self.s3_client.generate_presigned_url(
-                'get_object',
-                Params={'Bucket': self.bucket_name, 'Key': object_name},
-                ExpiresIn=expiration
-            )
-            # Replace the internal endpoint URL with the public one for browser access.
-            # e.g., http://localstack:4566 -> http://localhost:4566
-            if settings.ENVIRONMENT == "local" and settings.S3_PUBLIC_URL and settings.S3_ENDPOINT_URL:
-                response = response.replace(settings.S3_ENDPOINT_URL, settings.S3_PUBLIC_URL)
-                
-            return response
-        except ClientError as e:
-            logging.error(f"Error generating presigned GET URL: {e}")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Could not generate view URL."
-            )
+        return self.generate_presigned_get_urls([object_name], expiration=expiration)[object_name]
+
+    def generate_presigned_get_urls(self, object_names: Iterable[str], expiration: int = 3600) -> Dict[str, str]:
+        """
+        Signs GET URLs for many objects in one call and returns them keyed by object name.
+        Signed URLs are cached per (object_name, expiration) until shortly before they
+        expire, so repeated page loads of the same order or album don't re-sign the same keys.
+        """
+        urls: Dict[str, str] = {}
+        for object_name in dict.fromkeys(object_names):
+            cached = self.url_cache.get(object_name, expiration)
+            if cached is not None:
+                urls[object_name] = cached
+                continue
+            signed_at = time.monotonic()
+            try:
+                response = self.s3_client.generate_presigned_url(
+                    'get_object',
+                    Params={'Bucket': self.bucket_name, 'Key': object_name},
+                    ExpiresIn=expiration
+                )
+            except ClientError as e:
+                logging.error(f"Error generating presigned GET URL: {e}")
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail="Could not generate view URL."
+                )
+            url = self._to_public_url(response)
+            self.url_cache.set(object_name, expiration, url, signed_at)
+            urls[object_name] = url
+        return urls
+
+    async def agenerate_presigned_get_urls(self, object_names: Iterable[str], expiration: int = 3600) -> Dict[str, str]:
+        """Async variant of generate_presigned_get_urls; signing runs off the event loop."""
+        return await run_in_threadpool(self.generate_presigned_get_urls, list(object_names), expiration)
 
     def delete_file(self, object_name: str):
         """
@@ -110,6 +196,7 @@ class StorageService:
                 Bucket=self.bucket_name,
                 Key=object_name
             )
+            self.url_cache.invalidate([object_name])
             logging.info(f"Successfully deleted {object_name} from bucket {self.bucket_name}")
         except ClientError as e:
             logging.error(f"Error deleting file {object_name} from S3: {e}")
@@ -119,9 +206,51 @@ class StorageService:
                 detail=f"Could not delete file from storage."
             )
 
+    def _delete_batch(self, keys: List[str]) -> Dict[str, str]:
+        try:
+            response = self.s3_client.delete_objects(
+                Bucket=self.bucket_name,
+                Delete={'Objects': [{'Key': key} for key in keys], 'Quiet': True}
+            )
+        except ClientError as e:
+            logging.error(f"Error deleting a batch of {len(keys)} files from S3: {e}")
+            return {key: str(e) for key in keys}
+        # En modo Quiet la respuesta solo trae las claves que fallaron.
+        failed = {error['Key']: error.get('Message') or error.get('Code', 'Unknown error') for error in response.get('Errors', [])}
+        self.url_cache.invalidate(key for key in keys if key not in failed)
+        return failed
+
+    def delete_files(self, object_names: Iterable[str], max_workers: int = settings.STORAGE_DELETE_CONCURRENCY) -> Dict[str, str]:
+        """
+        Deletes many objects with delete_objects, in batches of up to 1000 keys sent concurrently.
+        Missing keys count as deleted. Returns the keys that could not be deleted, with the reason.
+        """
+        keys = list(dict.fromkeys(object_names))
+        batches = [keys[i:i + DELETE_BATCH_SIZE] for i in range(0, len(keys), DELETE_BATCH_SIZE)]
+        if not batches:
+            return {}
+
+        failed: Dict[str, str] = {}
+        if len(batches) == 1:
+            failed.update(self._delete_batch(batches[0]))
+        else:
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(batches)))) as executor:
+                for batch_failures in executor.map(self._delete_batch, batches):
+                    failed.update(batch_failures)
+        logging.info(f"Deleted {len(keys) - len(failed)} of {len(keys)} files from bucket {self.bucket_name}")
+        return failed
+
+    def iter_objects(self, prefix: str = ""):
+        """Streams every object of the bucket (Key, Size, LastModified), page by page."""
+        paginator = self.s3_client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket_name, Prefix=prefix):
+            yield from page.get('Contents', [])
+
     def get_bucket_usage(self) -> dict:
         """
-        Calculates the total size of all objects in the bucket.
+        Calculates the total size of all objects in the bucket by listing it entirely.
+        Slow on large buckets: the /usage endpoint answers from the usage ledger instead
+        (services/storage_usage.py); this is kept for ad-hoc checks.
         """
         total_size = 0
         try:
@@ -132,17 +261,7 @@ class StorageService:
                     for obj in page['Contents']:
                         total_size += obj['Size']
             
-            # Convert size to a more readable format
-            if total_size < 1024:
-                readable_size = f"{total_size} Bytes"
-            elif total_size < 1024**2:
-                readable_size = f"{total_size/1024:.2f} KB"
-            elif total_size < 1024**3:
-                readable_size = f"{total_size/1024**2:.2f} MB"
-            else:
-                readable_size = f"{total_size/1024**3:.2f} GB"
-
-            return {"total_size_bytes": total_size, "readable_size": readable_size}
+            return {"total_size_bytes": total_size, "readable_size": readable_size(total_size)}
         except ClientError as e:
             logging.error(f"Error calculating bucket size: {e}")
             raise HTTPException(
@@ -150,48 +269,6 @@ class StorageService:
                 detail="Could not calculate bucket size."
             )
 
-    def delete_old_files(self, days_older: int):
-        """
-        Deletes files older than a specified number of days.
-        """
-        if days_older <= 0:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Number of days must be positive."
-            )
-
-        try:
-            cutoff_date = datetime.now(timezone.utc) - timedelta(days=days_older)
-            objects_to_delete = []
-            
-            paginator = self.s3_client.get_paginator('list_objects_v2')
-            pages = paginator.paginate(Bucket=self.bucket_name)
-
-            for page in pages:
-                if "Contents" in page:
-                    for obj in page['Contents']:
-                        if obj['LastModified'] < cutoff_date:
-                            objects_to_delete.append({'Key': obj['Key']})
-            
-            if not objects_to_delete:
-                return {"message": "No files found older than specified date.", "deleted_count": 0}
-
-            # S3 delete_objects can handle up to 1000 keys at a time
-            for i in range(0, len(objects_to_delete), 1000):
-                chunk = objects_to_delete[i:i + 1000]
-                self.s3_client.delete_objects(
-                    Bucket=self.bucket_name,
-                    Delete={'Objects': chunk}
-                )
-            
-            return {"message": f"Successfully deleted {len(objects_to_delete)} old files.", "deleted_count": len(objects_to_delete)}
-        except ClientError as e:
-            logging.error(f"Error deleting old files: {e}")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Could not delete old files."
-            )
-
     def _sanitize_object_name(self, object_name: str) -> str:
         if ".." in object_name:
             raise HTTPException(
@@ -0,0 +1,128 @@
+import heapq
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List
+
+from pydantic import BaseModel
+from sqlalchemy import select
+
+from core.config import settings
+from models.photo import Photo
+from services.base import BaseService
+from services.renditions import RENDITIONS, rendition_key
+from services.storage import storage_service, DELETE_BATCH_SIZE
+
+# Pydantic models for service contract
+class OrphanGCReport(BaseModel):
+    dry_run: bool
+    grace_hours: int
+    scanned_count: int = 0
+    referenced_count: int = 0
+    orphan_count: int = 0
+    orphan_bytes: int = 0
+    recent_orphan_count: int = 0 # huérfanos dentro del período de gracia (subidas en curso)
+    deleted_count: int = 0
+    failed: Dict[str, str] = {}
+    sample: List[str] = [] # primeros huérfanos encontrados, para revisar un dry-run
+
+class OrphanGCError(Exception):
+    pass
+
+class StorageGCService(BaseService):
+    """
+    Finds bucket objects that no photo references (uploads that never reached
+    /photos/complete-upload, leftovers of failed deletes) and removes them.
+
+    The bucket listing (S3 returns keys in byte order) is merge-joined against the
+    photos table read in the same order, so memory stays bounded whatever the size
+    of the bucket: only one page of each side and one delete batch are held at a time.
+    """
+    STREAM_CHUNK_SIZE = 5000
+    REPORT_LIMIT = 100
+
+    def _ordered_object_names(self) -> Iterator[str]:
+        column = Photo.object_name
+        if self.db.get_bind().dialect.name == "postgresql":
+            # Orden por bytes, igual que el listado de S3 (la collation de la base puede diferir).
+            column = column.collate("C")
+        result = self.db.execute(
+            select(Photo.object_name).where(Photo.object_name.is_not(None)).order_by(column),
+            execution_options={"yield_per": self.STREAM_CHUNK_SIZE},
+        )
+        for object_name in result.scalars():
+            yield object_name
+
+    @staticmethod
+    def _checked(keys: Iterator[str], source: str) -> Iterator[str]:
+        # El merge join solo es correcto si ambos lados vienen ordenados: si no, se aborta
+        # antes de borrar algo que sí estaba referenciado.
+        previous = None
+        for key in keys:
+            if previous is not None and key < previous:
+                raise OrphanGCError(f"{source} is not sorted ({previous!r} before {key!r}); aborting.")
+            previous = key
+            yield key
+
+    def referenced_keys(self) -> Iterator[str]:
+        """Every key referenced by a photo (originals and their renditions), in byte order."""
+        streams = [self._checked(self._ordered_object_names(), "photos")]
+        for kind in RENDITIONS:
+            streams.append(self._checked(self._derived_keys(kind), f"{kind} renditions"))
+        return heapq.merge(*streams)
+
+    def _derived_keys(self, kind: str) -> Iterator[str]:
+        for object_name in self._ordered_object_names():
+            yield rendition_key(object_name, kind)
+
+    def collect(self, dry_run: bool = True, grace_hours: int = settings.ORPHAN_GC_GRACE_HOURS, prefix: str = "photos/") -> OrphanGCReport:
+        if grace_hours < 0:
+            raise ValueError("grace_hours must not be negative.")
+        report = OrphanGCReport(dry_run=dry_run, grace_hours=grace_hours)
+        cutoff = datetime.now(timezone.utc) - timedelta(hours=grace_hours)
+        referenced = self.referenced_keys()
+        current_ref = next(referenced, None)
+        pending: List[str] = []
+
+        def flush():
+            if not dry_run and pending:
+                failed = storage_service.delete_files(pending)
+                report.deleted_count += len(pending) - len(failed)
+                for key, reason in failed.items():
+                    if len(report.failed) < self.REPORT_LIMIT:
+                        report.failed[key] = reason
+            pending.clear()
+
+        for obj in self._checked_objects(prefix):
+            key = obj["Key"]
+            report.scanned_count += 1
+            while current_ref is not None and current_ref < key:
+                current_ref = next(referenced, None)
+            if current_ref == key:
+                report.referenced_count += 1
+                continue
+
+            if obj["LastModified"] >= cutoff:
+                report.recent_orphan_count += 1
+                continue
+            report.orphan_count += 1
+            report.orphan_bytes += obj["Size"]
+            if len(report.sample) < self.REPORT_LIMIT:
+                report.sample.append(key)
+            pending.append(key)
+            if len(pending) >= DELETE_BATCH_SIZE:
+                flush()
+        flush()
+
+        logging.info(
+            f"Orphan GC ({'dry run' if dry_run else 'delete'}): scanned {report.scanned_count}, "
+            f"orphans {report.orphan_count} ({report.orphan_bytes} bytes), deleted {report.deleted_count}"
+        )
+        return report
+
+    def _checked_objects(self, prefix: str) -> Iterator[dict]:
+        previous = None
+        for obj in storage_service.iter_objects(prefix):
+            if previous is not None and obj["Key"] < previous:
+                raise OrphanGCError(f"Bucket listing is not sorted ({previous!r} before {obj['Key']!r}); aborting.")
+            previous = obj["Key"]
+            yield obj
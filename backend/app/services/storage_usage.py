@@ -0,0 +1,144 @@
+import logging
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, Tuple
+
+from sqlalchemy import func
+
+from db.upsert import upsert_insert
+from models.photo import Photo
+from models.photo_session import PhotoSession
+from models.storage_usage import StorageUsage, StorageUsageSchema, StorageUsageBreakdownSchema
+from services.base import BaseService
+from services.renditions import resolve_original
+from services.storage import storage_service, readable_size
+
+# (photographer_id, album_id, rendition) -> [bytes, objects]
+UsageDeltas = Dict[Tuple[int, int, str], List[int]]
+
+class StorageUsageService(BaseService):
+    RECONCILE_CHUNK_SIZE = 1000
+
+    @staticmethod
+    def new_deltas() -> UsageDeltas:
+        return defaultdict(lambda: [0, 0])
+
+    @staticmethod
+    def add_delta(deltas: UsageDeltas, photographer_id: int | None, album_id: int | None, rendition: str, size: int, count: int = 1):
+        entry = deltas[(photographer_id or 0, album_id or 0, rendition)]
+        entry[0] += size
+        entry[1] += count
+
+    def record(self, deltas: UsageDeltas):
+        """
+        Applies the deltas to the ledger with a single multi-row upsert. Does not commit:
+        it runs inside the caller's transaction so the ledger moves together with the photos.
+        """
+        rows = [
+            {"photographer_id": ph, "album_id": album, "rendition": rendition,
+             "total_bytes": size, "object_count": count, "updated_at": datetime.utcnow()}
+            for (ph, album, rendition), (size, count) in deltas.items()
+            if size or count
+        ]
+        if not rows:
+            return
+        stmt = upsert_insert(self.db, StorageUsage.__table__).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["photographer_id", "album_id", "rendition"],
+            set_={
+                "total_bytes": StorageUsage.__table__.c.total_bytes + stmt.excluded.total_bytes,
+                "object_count": StorageUsage.__table__.c.object_count + stmt.excluded.object_count,
+                "updated_at": stmt.excluded.updated_at,
+            },
+        )
+        self.db.execute(stmt)
+
+    def record_photo_removal(self, photo_ids: Iterable[int]):
+        """Subtracts the original and the generated renditions of the given photos from the ledger."""
+        photo_ids = list(photo_ids)
+        if not photo_ids:
+            return
+        rows = (
+            self.db.query(Photo.photographer_id, PhotoSession.album_id, Photo.size_bytes, Photo.rendition_sizes)
+            .outerjoin(PhotoSession, PhotoSession.id == Photo.session_id)
+            .filter(Photo.id.in_(photo_ids))
+            .all()
+        )
+        deltas = self.new_deltas()
+        for photographer_id, album_id, size_bytes, rendition_sizes in rows:
+            self.add_delta(deltas, photographer_id, album_id, "original", -(size_bytes or 0), -1)
+            for kind, size in (rendition_sizes or {}).items():
+                self.add_delta(deltas, photographer_id, album_id, kind, -size, -1)
+        self.record(deltas)
+
+    def get_usage(self) -> StorageUsageSchema:
+        """Answers from the ledger: a handful of GROUP BYs over a small table."""
+        def breakdown(column) -> List[StorageUsageBreakdownSchema]:
+            rows = (
+                self.db.query(column, func.sum(StorageUsage.total_bytes), func.sum(StorageUsage.object_count))
+                .group_by(column)
+                .order_by(func.sum(StorageUsage.total_bytes).desc())
+                .all()
+            )
+            return [StorageUsageBreakdownSchema(key=key, total_bytes=size or 0, object_count=count or 0) for key, size, count in rows]
+
+        total_bytes, object_count, updated_at = self.db.query(
+            func.coalesce(func.sum(StorageUsage.total_bytes), 0),
+            func.coalesce(func.sum(StorageUsage.object_count), 0),
+            func.max(StorageUsage.updated_at),
+        ).one()
+        return StorageUsageSchema(
+            total_size_bytes=total_bytes,
+            readable_size=readable_size(total_bytes),
+            object_count=object_count,
+            by_photographer=breakdown(StorageUsage.photographer_id),
+            by_album=breakdown(StorageUsage.album_id),
+            by_rendition=breakdown(StorageUsage.rendition),
+            updated_at=updated_at,
+        )
+
+    def _attribute_chunk(self, deltas: UsageDeltas, objects: List[dict]):
+        originals = {obj["Key"]: resolve_original(obj["Key"]) for obj in objects}
+        owners = {
+            object_name: (photographer_id, album_id)
+            for object_name, photographer_id, album_id in (
+                self.db.query(Photo.object_name, Photo.photographer_id, PhotoSession.album_id)
+                .outerjoin(PhotoSession, PhotoSession.id == Photo.session_id)
+                .filter(Photo.object_name.in_({original for _, original in originals.values()}))
+                .all()
+            )
+        }
+        for obj in objects:
+            kind, original = originals[obj["Key"]]
+            owner = owners.get(original)
+            if owner is None:
+                # Objetos sin foto asociada (subidas abandonadas, etc.).
+                self.add_delta(deltas, None, None, "untracked", obj["Size"])
+            else:
+                self.add_delta(deltas, owner[0], owner[1], kind or "original", obj["Size"])
+
+    def reconcile(self) -> StorageUsageSchema:
+        """
+        Rebuilds the ledger from a full bucket listing. Keys are attributed to photos one
+        page at a time (one IN query per page), and the ledger is swapped in one transaction.
+        Meant to run in the background; the /usage endpoint never waits for it.
+        """
+        deltas = self.new_deltas()
+        chunk: List[dict] = []
+        for obj in storage_service.iter_objects():
+            chunk.append(obj)
+            if len(chunk) >= self.RECONCILE_CHUNK_SIZE:
+                self._attribute_chunk(deltas, chunk)
+                chunk = []
+        if chunk:
+            self._attribute_chunk(deltas, chunk)
+
+        try:
+            self.db.query(StorageUsage).delete(synchronize_session=False)
+            self.record(deltas)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        logging.info(f"Storage usage ledger reconciled: {sum(count for _, count in deltas.values())} objects.")
+        return self.get_usage()
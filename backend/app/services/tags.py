@@ -1,8 +1,11 @@
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 from typing import List
 
+from db.upsert import upsert_insert
 from models.tag import Tag, TagCreateSchema, TagUpdateSchema
+from services.response_cache import TAGS, invalidate_on_commit
 
 class TagService:
     def __init__(self, db: Session):
@@ -17,9 +20,39 @@ class TagService:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tag not found")
         return tag
 
+    def _find_by_name(self, name: str) -> Tag | None:
+        # lower(name) = lower(:name) usa uq_tags_lower_name; ilike no (y trataba "_" y "%" como comodines).
+        return self.db.query(Tag).filter(func.lower(Tag.name) == name.lower()).first()
+
+    def get_or_create_tags(self, names: List[str]) -> List[Tag]:
+        """
+        Resolves tag names case-insensitively in one query and creates the missing ones with
+        a single multi-row INSERT. Blank and repeated names are skipped; the result keeps
+        the order of `names`, and new tags keep the spelling they were first written with.
+        """
+        wanted: dict[str, str] = {}
+        for name in names:
+            name = name.strip()
+            if name and name.lower() not in wanted:
+                wanted[name.lower()] = name
+        if not wanted:
+            return []
+
+        by_name = {tag.name.lower(): tag for tag in self.db.scalars(select(Tag).where(func.lower(Tag.name).in_(wanted)))}
+        missing = [name for key, name in wanted.items() if key not in by_name]
+        if missing:
+            stmt = upsert_insert(self.db, Tag).values([{"name": name} for name in missing]).on_conflict_do_nothing()
+            by_name.update((tag.name.lower(), tag) for tag in self.db.scalars(stmt.returning(Tag)))
+            # Los que otro request creó entre la consulta y el INSERT no vuelven en el RETURNING.
+            raced = [name.lower() for name in missing if name.lower() not in by_name]
+            if raced:
+                by_name.update((tag.name.lower(), tag) for tag in self.db.scalars(select(Tag).where(func.lower(Tag.name).in_(raced))))
+        return [by_name[key] for key in wanted]
+
     def create_tag(self, tag_in: TagCreateSchema) -> Tag:
+        invalidate_on_commit(self.db, TAGS)
         # Check if tag with the same name already exists (case-insensitive)
-        existing_tag = self.db.query(Tag).filter(Tag.name.ilike(tag_in.name)).first()
+        existing_tag = self._find_by_name(tag_in.name)
         if existing_tag:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -33,12 +66,13 @@ class TagService:
         return db_tag
 
     def update_tag(self, tag_id: int, tag_in: TagUpdateSchema) -> Tag:
+        invalidate_on_commit(self.db, TAGS)
         tag = self.get_tag(tag_id)
         
         # Check if new name is already taken by another tag
         if tag_in.name and tag.name != tag_in.name:
-            existing_tag = self.db.query(Tag).filter(Tag.name.ilike(tag_in.name)).first()
-            if existing_tag:
+            existing_tag = self._find_by_name(tag_in.name)
+            if existing_tag and existing_tag.id != tag.id:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail=f"Tag with name '{tag_in.name}' already exists."
@@ -50,6 +84,7 @@ class TagService:
         return tag
 
     def delete_tag(self, tag_id: int) -> None:
+        invalidate_on_commit(self.db, TAGS)
         tag = self.get_tag(tag_id)
         self.db.delete(tag)
         self.db.commit()
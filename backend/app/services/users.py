@@ -5,6 +5,7 @@ from models.user import User, UserCreateSchema, UserUpdateSchema
 from models.role import Role
 from core.security import get_password_hash
 from services.base import BaseService
+from services.principals import principal_cache
 
 class UserService(BaseService):
     def get_user_by_email(self, email: str) -> User | None:
@@ -55,9 +56,11 @@ class UserService(BaseService):
             setattr(db_user, field, value)
             
         self._save_and_refresh(db_user) # Saves and refreshes, potentially expiring relationships
+        principal_cache.invalidate_user(user_id)
         return self.get_user(user_id) # Re-fetch to ensure relationships are loaded after refresh
 
     def delete_user(self, user_id: int):
         """Deletes a user."""
         db_user = self.get_user(user_id)
-        return self._delete_and_refresh(db_user)
\ No newline at end of file
+        self._delete_and_refresh(db_user)
+        principal_cache.invalidate_user(user_id)
\ No newline at end of file
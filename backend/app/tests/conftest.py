@@ -14,7 +14,8 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..',
 
 from db.base import Base
 from main import app
-from deps import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from deps import get_db, get_async_db
 from db.init_db import init_db as init_roles_and_permissions
 from models.user import User, UserCreateSchema # Added UserCreateSchema
 from models.role import Role # Added import
@@ -25,6 +26,8 @@ from models.photo import Photo
 from models.album import Album
 from models.photo_session import PhotoSession
 from services.users import UserService
+from services.principals import principal_cache
+from services.response_cache import response_cache
 from app.core.config import settings
 
 # --- Test Database Setup ---
@@ -71,6 +74,9 @@ def db_session(setup_database) -> Generator[Session, Any, None]:
         db.close()
         transaction.rollback()
         connection.close()
+        # Los ids se reutilizan tras el rollback: no arrastrar principals ni respuestas cacheadas entre tests.
+        principal_cache.clear()
+        response_cache.clear()
 
 @pytest.fixture(scope="function")
 def client(db_session: Session) -> Generator[TestClient, Any, None]:
@@ -78,7 +84,18 @@ def client(db_session: Session) -> Generator[TestClient, Any, None]:
     def override_get_db():
         yield db_session
 
+    async def override_get_async_db():
+        # AsyncSession sobre la misma conexión (y transacción) que db_session, para que los
+        # endpoints async vean los datos de los fixtures. Con pysqlite no hay I/O async real.
+        async_db = AsyncSession()
+        async_db.sync_session.bind = db_session.bind
+        try:
+            yield async_db
+        finally:
+            await async_db.close()
+
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
     yield TestClient(app)
     app.dependency_overrides.clear()
 
@@ -212,8 +229,7 @@ def test_photo(db_session: Session, test_album: Album) -> Photo:
         filename="test_photo.jpg",
         description="A photo for testing.",
         price=10.0,
-        url="http://example.com/test_photo.jpg",
-        watermark_url="http://example.com/test_photo_wm.jpg",
+        object_name="photos/test_photo.jpg",
         photographer_id=photographer.id,
         session_id=photo_session.id,
     )
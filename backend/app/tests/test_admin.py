@@ -0,0 +1,186 @@
+import pytest
+from fastapi.testclient import TestClient
+
+def test_db_pool_metrics_requires_full_access(supervisor_client: TestClient):
+    response = supervisor_client.get("/admin/metrics/db-pool")
+    assert response.status_code == 403, response.text
+
+def test_db_pool_metrics(admin_client: TestClient):
+    response = admin_client.get("/admin/metrics/db-pool")
+
+    assert response.status_code == 200, response.text
+    metrics = response.json()
+    assert metrics["pool_class"] in ("InstrumentedQueuePool", "NullPool")
+    assert metrics["timeouts"] >= 0 and metrics["p95_wait_ms"] >= 0
+
+def test_instrumented_pool_counts_waits_and_timeouts():
+    from sqlalchemy import create_engine, exc
+    from db.pool_metrics import InstrumentedQueuePool, PoolMetrics, instrument_engine
+    import db.pool_metrics as module
+
+    metrics = PoolMetrics()
+    original = module.pool_metrics
+    module.pool_metrics = metrics
+    try:
+        engine = create_engine("sqlite://", poolclass=InstrumentedQueuePool, pool_size=1, max_overflow=0, pool_timeout=0.05)
+        instrument_engine(engine)
+        held = engine.connect()
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+        held.close()
+        engine.connect().close()
+
+        snapshot = metrics.snapshot(engine.pool)
+        assert snapshot["timeouts"] == 1
+        assert snapshot["checkouts"] == 2
+        assert snapshot["peak_checked_out"] == 1
+        assert snapshot["pool_size"] == 1 and snapshot["checked_out"] == 0
+    finally:
+        module.pool_metrics = original
+
+def test_sync_and_async_engines_share_the_connection_budget():
+    """Per process, both pools together stay within DB_POOL_SIZE + DB_MAX_OVERFLOW."""
+    from pydantic import ValidationError
+    from core.config import Settings, settings
+    from db.session import async_engine, engine
+
+    if settings.DB_PGBOUNCER_MODE:
+        pytest.skip("Con PgBouncer no hay pool propio")
+    assert engine.pool.size() + async_engine.pool.size() == settings.DB_POOL_SIZE
+    assert engine.pool._max_overflow + async_engine.pool._max_overflow == settings.DB_MAX_OVERFLOW
+    with pytest.raises(ValidationError):
+        Settings(DB_POOL_SIZE=5, DB_ASYNC_POOL_SIZE=5)
+    with pytest.raises(ValidationError):
+        Settings(DB_MAX_OVERFLOW=2, DB_ASYNC_MAX_OVERFLOW=3)
+
+def _paid_orders_for_dashboard(db_session, user_factory):
+    """Two paid orders: 3 photos of an album plus 1 without album for one photographer, 1 photo of another."""
+    from datetime import datetime, timezone
+    from models.album import Album
+    from models.order import Order, OrderItem, PaymentMethod
+    from models.photo import Photo
+    from models.photo_session import PhotoSession
+    from services.orders import OrderService
+
+    ana = user_factory("Photographer", "rollup.ana@test.com").photographer
+    beto = user_factory("Photographer", "rollup.beto@test.com").photographer
+    ana.commission_percentage, beto.commission_percentage = 20.0, 50.0
+    album = Album(name="Rollup Album")
+    db_session.add(album)
+    db_session.flush()
+    with_album = PhotoSession(event_name="Rollup", event_date=datetime.now(timezone.utc), location="Esquel",
+                              photographer_id=ana.id, album_id=album.id)
+    loose = PhotoSession(event_name="Rollup loose", event_date=datetime.now(timezone.utc), location="Esquel",
+                         photographer_id=ana.id)
+    db_session.add_all([with_album, loose])
+    db_session.flush()
+    photos = [Photo(filename=f"rollup_{i}.jpg", price=100.0, object_name=f"photos/rollup-{i}.jpg", photographer_id=ana.id,
+                    session_id=with_album.id) for i in range(3)]
+    photos.append(Photo(filename="rollup_loose.jpg", price=100.0, object_name="photos/rollup-loose.jpg",
+                        photographer_id=ana.id, session_id=loose.id))
+    photos.append(Photo(filename="rollup_beto.jpg", price=100.0, object_name="photos/rollup-beto.jpg",
+                        photographer_id=beto.id, session_id=loose.id))
+    first, second = Order(total=350.0, payment_method=PaymentMethod.MP), Order(total=200.0, payment_method=PaymentMethod.MP)
+    db_session.add_all(photos + [first, second])
+    db_session.flush()
+    db_session.add_all([OrderItem(order_id=first.id, photo_id=p.id, quantity=1, price=100.0) for p in photos[:4]])
+    db_session.add_all([OrderItem(order_id=second.id, photo_id=photos[0].id, quantity=1, price=100.0),
+                        OrderItem(order_id=second.id, photo_id=photos[4].id, quantity=1, price=100.0)])
+    db_session.flush()
+    for order in (first, second):
+        OrderService(db_session).mark_order_as_paid(order.id, PaymentMethod.MP)
+    return ana, beto, album
+
+def test_dashboard_reads_sales_rollups(admin_client: TestClient, db_session, user_factory):
+    ana, beto, _ = _paid_orders_for_dashboard(db_session, user_factory)
+
+    response = admin_client.get("/admin/dashboard")
+
+    assert response.status_code == 200, response.text
+    dashboard = response.json()
+    # Una fila por orden, no por ítem: 2 órdenes, 6 fotos, 350 + 200.
+    assert (dashboard["total_orders"], dashboard["total_photos_sold"], dashboard["total_gross_revenue"]) == (2, 6, 550.0)
+    by_photographer = {row["photographer_id"]: row for row in dashboard["commissions_by_photographer"]}
+    assert (by_photographer[ana.id]["total_gross_sales"], by_photographer[ana.id]["total_commission"]) == (500.0, 100.0)
+    assert (by_photographer[beto.id]["total_gross_sales"], by_photographer[beto.id]["total_commission"]) == (100.0, 50.0)
+    assert dashboard["total_commissions"] == 150.0
+
+def test_rebuild_sales_rollups_matches_incremental_rows(db_session, user_factory):
+    from models.sales_rollup import DailySales, DailyPhotographerSales
+    from services.sales_rollups import SalesRollupService
+
+    ana, _, album = _paid_orders_for_dashboard(db_session, user_factory)
+
+    def snapshot():
+        columns = lambda model: [c for c in model.__table__.columns if c.name != "updated_at"]
+        return [sorted(tuple(row) for row in db_session.query(*columns(model)).all()) for model in (DailySales, DailyPhotographerSales)]
+
+    incremental = snapshot()
+    ana_rows = {row.album_id: row for row in db_session.query(DailyPhotographerSales).filter_by(photographer_id=ana.id)}
+    assert (ana_rows[album.id].orders, ana_rows[album.id].photos_sold, ana_rows[album.id].net_earnings) == (2, 4, 320.0)
+    assert (ana_rows[0].orders, ana_rows[0].photos_sold) == (1, 1)
+
+    SalesRollupService(db_session).rebuild()
+
+    assert snapshot() == incremental
+
+def _rollup_snapshot(db_session):
+    from models.sales_rollup import DailySales, DailyPhotographerSales
+    columns = lambda model: [c for c in model.__table__.columns if c.name != "updated_at"]
+    return [sorted(tuple(row) for row in db_session.query(*columns(model)).all()) for model in (DailySales, DailyPhotographerSales)]
+
+def _assert_rollups_match_rebuild(db_session):
+    from services.sales_rollups import SalesRollupService
+    incremental = _rollup_snapshot(db_session)
+    SalesRollupService(db_session).rebuild()
+    assert _rollup_snapshot(db_session) == incremental
+
+def test_editing_a_paid_order_updates_the_dashboard(admin_client: TestClient, db_session, user_factory):
+    from models.order import Order
+    _, beto, _ = _paid_orders_for_dashboard(db_session, user_factory)
+    second = db_session.query(Order).filter(Order.total == 200.0).one()
+
+    response = admin_client.put(f"/orders/{second.id}", json={"total": 150.0})
+    assert response.status_code == 200, response.text
+    dashboard = admin_client.get("/admin/dashboard").json()
+    assert (dashboard["total_orders"], dashboard["total_photos_sold"], dashboard["total_gross_revenue"]) == (2, 6, 500.0)
+    _assert_rollups_match_rebuild(db_session)
+
+    # Volver la orden a pendiente la saca del dashboard.
+    response = admin_client.put(f"/orders/{second.id}", json={"payment_status": "pending"})
+    assert response.status_code == 200, response.text
+    dashboard = admin_client.get("/admin/dashboard").json()
+    assert (dashboard["total_orders"], dashboard["total_photos_sold"], dashboard["total_gross_revenue"]) == (1, 4, 350.0)
+    by_photographer = {row["photographer_id"]: row for row in dashboard["commissions_by_photographer"]}
+    assert not by_photographer.get(beto.id, {}).get("total_gross_sales")
+    _assert_rollups_match_rebuild(db_session)
+
+def test_deleting_a_paid_order_updates_the_dashboard(admin_client: TestClient, db_session, user_factory):
+    from models.order import Order
+    from models.sales_rollup import DailyPhotographerSales
+    _, beto, _ = _paid_orders_for_dashboard(db_session, user_factory)
+    second = db_session.query(Order).filter(Order.total == 200.0).one()
+
+    response = admin_client.delete(f"/orders/{second.id}")
+
+    assert response.status_code == 200, response.text
+    dashboard = admin_client.get("/admin/dashboard").json()
+    assert (dashboard["total_orders"], dashboard["total_photos_sold"], dashboard["total_gross_revenue"]) == (1, 4, 350.0)
+    assert dashboard["total_commissions"] == 80.0
+    # Las filas que se quedan sin órdenes se borran, como si se hubieran reconstruido.
+    assert db_session.query(DailyPhotographerSales).filter_by(photographer_id=beto.id).count() == 0
+    _assert_rollups_match_rebuild(db_session)
+
+def test_paying_an_order_twice_counts_it_once(db_session, user_factory):
+    from fastapi import HTTPException
+    from models.order import Order, PaymentMethod
+    from services.orders import OrderService
+    _paid_orders_for_dashboard(db_session, user_factory)
+    second = db_session.query(Order).filter(Order.total == 200.0).one()
+    before = _rollup_snapshot(db_session)
+
+    with pytest.raises(HTTPException) as exc_info:
+        OrderService(db_session).mark_order_as_paid(second.id, PaymentMethod.MP)
+
+    assert exc_info.value.status_code == 400
+    assert _rollup_snapshot(db_session) == before
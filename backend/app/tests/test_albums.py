@@ -100,4 +100,104 @@ def test_update_album_permission_denied_customer(customer_client: TestClient, ad
     # 2. Attempt to update as customer
     update_data = {"name": "Customer Attempt"}
     response = customer_client.put(f"/albums/{album_id}", json=update_data)
-    assert response.status_code == 403, response.text # Forbidden
\ No newline at end of file
+    assert response.status_code == 403, response.text # Forbidden
+
+def test_list_albums_summary(photographer_client: TestClient, db_session):
+    """Summary mode returns per-album counters and a cover without embedding photos."""
+    from datetime import datetime
+    from models.photo import Photo
+    from models.photo_session import PhotoSession
+
+    album_id = photographer_client.post("/albums/", json={"name": "Summary Album"}).json()["id"]
+    photographer_id = photographer_client.user.photographer.id
+    sessions = [
+        PhotoSession(event_name=f"Summary {i}", event_date=datetime.utcnow(), location="Bariloche",
+                     photographer_id=photographer_id, album_id=album_id)
+        for i in range(2)
+    ]
+    db_session.add_all(sessions)
+    db_session.flush()
+    db_session.add_all([
+        Photo(filename=f"s{i}.jpg", price=5.0, object_name=f"photos/s{i}.jpg",
+              photographer_id=photographer_id, session_id=sessions[i % 2].id)
+        for i in range(3)
+    ])
+    db_session.flush()
+
+    response = photographer_client.get("/albums/", params={"summary": True, "limit": 100})
+    assert response.status_code == 200, response.text
+    data = response.json()
+    summary = next(a for a in data["items"] if a["id"] == album_id)
+    assert data["total"] >= 1
+    assert summary["session_count"] == 2
+    assert summary["photo_count"] == 3
+    assert summary["cover_object_name"] == "photos/s2.jpg"
+    assert "sessions" not in summary
+
+    photos_response = photographer_client.get(f"/sessions/{sessions[0].id}/photos")
+    assert photos_response.status_code == 200, photos_response.text
+    assert [p["filename"] for p in photos_response.json()["items"]] == ["s2.jpg", "s0.jpg"]
+
+def test_list_albums_full_tree(photographer_client: TestClient, db_session):
+    """Without summary, albums embed sessions with photos (and skip empty sessions)."""
+    from datetime import datetime
+    from models.photo import Photo
+    from models.photo_session import PhotoSession
+
+    album_id = photographer_client.post("/albums/", json={"name": "Tree Album"}).json()["id"]
+    photographer_id = photographer_client.user.photographer.id
+    full, empty = [
+        PhotoSession(event_name=name, event_date=datetime.utcnow(), location="Madryn",
+                     photographer_id=photographer_id, album_id=album_id)
+        for name in ("Full", "Empty")
+    ]
+    db_session.add_all([full, empty])
+    db_session.flush()
+    db_session.add(Photo(filename="t.jpg", price=5.0, object_name="photos/t.jpg",
+                         photographer_id=photographer_id, session_id=full.id))
+    db_session.flush()
+
+    response = photographer_client.get("/albums/")
+    assert response.status_code == 200, response.text
+    album = next(a for a in response.json() if a["id"] == album_id)
+    assert [s["event_name"] for s in album["sessions"]] == ["Full"]
+    photo = album["sessions"][0]["photos"][0]
+    assert photo["album_id"] == album_id
+    assert photo["photographer"]["id"] == photographer_id
+
+def test_stream_album(photographer_client: TestClient, db_session):
+    """The NDJSON stream sends the album, then each session followed by its photo chunks."""
+    import json
+    from datetime import datetime
+    from models.photo import Photo
+    from models.photo_session import PhotoSession
+
+    album_id = photographer_client.post("/albums/", json={"name": "Streamed Album"}).json()["id"]
+    photographer_id = photographer_client.user.photographer.id
+    session = PhotoSession(event_name="Stream", event_date=datetime.utcnow(), location="Esquel",
+                           photographer_id=photographer_id, album_id=album_id)
+    empty_session = PhotoSession(event_name="Empty", event_date=datetime.utcnow(), location="Esquel",
+                                 photographer_id=photographer_id, album_id=album_id)
+    db_session.add_all([session, empty_session])
+    db_session.flush()
+    db_session.add_all([
+        Photo(filename=f"st{i}.jpg", price=5.0, object_name=f"photos/st{i}.jpg",
+              photographer_id=photographer_id, session_id=session.id)
+        for i in range(5)
+    ])
+    db_session.flush()
+
+    response = photographer_client.get(f"/albums/{album_id}/stream", params={"chunk_size": 2})
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+
+    assert [line["type"] for line in lines] == ["album", "session", "photos", "photos", "photos"]
+    assert lines[0]["data"]["name"] == "Streamed Album"
+    assert lines[1]["data"]["id"] == session.id
+    assert [len(line["data"]) for line in lines[2:]] == [2, 2, 1]
+    assert lines[2]["data"][0]["album_id"] == album_id
+
+def test_stream_album_not_found(client: TestClient):
+    response = client.get("/albums/999999/stream")
+    assert response.status_code == 404, response.text
@@ -8,6 +8,8 @@ from models.photographer import Photographer
 from models.album import Album
 from models.photo_session import PhotoSession
 from models.photo import Photo
+from models.cart import Cart, CartItemCreateSchema
+from services.cart import CartService
 
 # --- Fixtures for Cart Test Setup ---
 
@@ -20,15 +22,8 @@ def photographer_for_cart(db_session: Session, user_factory) -> Photographer:
     return user.photographer
 
 @pytest.fixture(scope="function")
-def photo_for_cart(db_session: Session, photographer_for_cart: Photographer, monkeypatch) -> Photo:
+def photo_for_cart(db_session: Session, photographer_for_cart: Photographer) -> Photo:
     """Creates a complete photo entity for use in cart tests."""
-    # Mock the storage service to avoid actual S3 calls
-    mock_get_url = "http://minio:9000/fotopatagonia/mocked_cart_photo.jpg"
-    monkeypatch.setattr(
-        "app.services.storage.StorageService.generate_presigned_get_url",
-        lambda self, object_name: mock_get_url
-    )
-
     album = Album(
         name="Test Album Cart",
         description="An album for cart tests"
@@ -51,8 +46,7 @@ def photo_for_cart(db_session: Session, photographer_for_cart: Photographer, mon
         filename="test_photo_cart.jpg",
         description="Test Photo Cart",
         price=10.0,
-        url="http://example.com/photos/cart-test-photo.jpg",
-        watermark_url="http://example.com/photos/cart-test-photo-watermark.jpg",
+        object_name="photos/cart-test-photo.jpg",
         photographer_id=photographer_for_cart.id,
         session_id=photo_session.id
     )
@@ -125,4 +119,78 @@ def test_empty_cart(customer_client: TestClient, photo_for_cart: Photo):
     assert response.status_code == 200, response.text
     cart = response.json()
     assert len(cart["items"]) == 0
-    assert cart["total"] == 0
\ No newline at end of file
+    assert cart["total"] == 0
+
+def test_adding_same_photo_twice_sums_quantity(customer_client: TestClient, photo_for_cart: Photo):
+    """Adding a photo that is already in the cart bumps its quantity instead of adding a second row."""
+    customer_client.post("/cart/items", json={"photo_id": photo_for_cart.id, "quantity": 1})
+    response = customer_client.post("/cart/items", json={"photo_id": photo_for_cart.id, "quantity": 2})
+
+    assert response.status_code == 200, response.text
+    cart = response.json()
+    assert len(cart["items"]) == 1
+    assert cart["items"][0]["quantity"] == 3
+    assert cart["total"] == photo_for_cart.price * 3
+
+def test_guest_cart_is_created_on_first_item(client: TestClient, photo_for_cart: Photo):
+    """A guest without a cart gets one created by the first add."""
+    headers = {"X-Guest-ID": "guest-cart-upsert"}
+    response = client.post("/cart/items", json={"photo_id": photo_for_cart.id}, headers=headers)
+
+    assert response.status_code == 200, response.text
+    cart = response.json()
+    assert cart["guest_id"] == "guest-cart-upsert"
+    assert [item["photo"]["id"] for item in cart["items"]] == [photo_for_cart.id]
+
+def test_adding_unknown_photo_returns_404(client: TestClient, db_session: Session):
+    """An unknown photo is a 404, checked before any cart is created."""
+    headers = {"X-Guest-ID": "guest-cart-missing-photo"}
+    response = client.post("/cart/items", json={"photo_id": 999999}, headers=headers)
+
+    assert response.status_code == 404, response.text
+    assert db_session.query(Cart).filter_by(guest_id="guest-cart-missing-photo").count() == 0
+
+def test_cannot_change_item_of_another_cart(client: TestClient, photo_for_cart: Photo):
+    """Items are only reachable through the cart that owns them."""
+    owner = {"X-Guest-ID": "guest-cart-owner"}
+    other = {"X-Guest-ID": "guest-cart-other"}
+    item_id = client.post("/cart/items", json={"photo_id": photo_for_cart.id}, headers=owner).json()["items"][0]["id"]
+
+    assert client.put(f"/cart/items/{item_id}", json={"quantity": 4}, headers=other).status_code == 404
+    assert client.delete(f"/cart/items/{item_id}", headers=other).status_code == 404
+    cart = client.get("/cart/", headers=owner).json()
+    assert cart["items"][0]["quantity"] == 1
+
+def test_update_to_zero_removes_item(customer_client: TestClient, photo_for_cart: Photo):
+    """Setting the quantity to zero removes the item."""
+    item_id = customer_client.post("/cart/items", json={"photo_id": photo_for_cart.id}).json()["items"][0]["id"]
+
+    response = customer_client.put(f"/cart/items/{item_id}", json={"quantity": 0})
+
+    assert response.status_code == 200, response.text
+    assert response.json()["items"] == []
+
+def test_merge_guest_cart_into_user_cart(customer_client: TestClient, photo_for_cart: Photo, db_session: Session):
+    """Merging sums the quantities of photos already in the user cart, moves the rest and drops the guest cart."""
+    other_photo = Photo(filename="merge.jpg", price=4.0, object_name="photos/cart-merge.jpg",
+                        photographer_id=photo_for_cart.photographer_id, session_id=photo_for_cart.session_id)
+    db_session.add(other_photo)
+    db_session.flush()
+
+    customer_client.post("/cart/items", json={"photo_id": photo_for_cart.id, "quantity": 1})
+    guest_carts = CartService(db_session)
+    guest_carts.add_item_to_cart(None, "guest-cart-merge", CartItemCreateSchema(photo_id=photo_for_cart.id, quantity=2))
+    guest_carts.add_item_to_cart(None, "guest-cart-merge", CartItemCreateSchema(photo_id=other_photo.id, quantity=1))
+    assert customer_client.get("/cart/").json()["items"][0]["quantity"] == 1
+
+    response = customer_client.post("/cart/merge", json={"guest_id": "guest-cart-merge"})
+    assert response.status_code == 204, response.text
+
+    cart = customer_client.get("/cart/").json()
+    assert {item["photo"]["id"]: item["quantity"] for item in cart["items"]} == {photo_for_cart.id: 3, other_photo.id: 1}
+    assert db_session.query(Cart).filter(Cart.guest_id == "guest-cart-merge").first() is None
+
+    # Un segundo merge (otra pestaña) no encuentra nada que mover.
+    assert customer_client.post("/cart/merge", json={"guest_id": "guest-cart-merge"}).status_code == 204
+    cart = customer_client.get("/cart/").json()
+    assert {item["photo"]["id"]: item["quantity"] for item in cart["items"]} == {photo_for_cart.id: 3, other_photo.id: 1}
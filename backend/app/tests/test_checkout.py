@@ -0,0 +1,340 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+import payment_worker
+from models.order import Order, OrderItem, PaymentMethod, PaymentStatus
+from models.payment_notification import PaymentNotification, NotificationStatus
+from models.photo import Photo
+from services import payment_notifications
+from services.payment_gateway import (
+    FakePaymentGateway, LatencyHistogram, PaymentGatewayError, gateway_metrics, set_payment_gateway,
+)
+from services.payment_notifications import payment_status_cache
+
+WEBHOOK_URL = "/checkout/mercadopago/webhook"
+
+
+@pytest.fixture
+def pending_order(db_session: Session) -> Order:
+    order = Order(total=30.0, payment_method=PaymentMethod.MP, customer_email="mp@test.com")
+    db_session.add(order)
+    db_session.commit()
+    return order
+
+@pytest.fixture
+def fake_gateway():
+    gateway = FakePaymentGateway()
+    set_payment_gateway(gateway)
+    gateway_metrics.reset()
+    payment_status_cache.clear()
+    yield gateway
+    set_payment_gateway(None)
+    gateway_metrics.reset()
+    payment_status_cache.clear()
+
+def _process(db_session: Session) -> int:
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        return payment_worker.PaymentNotificationProcessor(executor, session_factory=lambda: db_session, batch_size=10).run_once()
+
+def _notification(db_session: Session, payment_id: str) -> PaymentNotification:
+    return db_session.query(PaymentNotification).filter_by(payment_id=payment_id).one()
+
+def test_webhook_stores_and_deduplicates_notifications(client: TestClient, db_session: Session):
+    # Mercado Pago manda la misma notificación por topic (query) y por type (body), y la reintenta.
+    assert client.post(WEBHOOK_URL, params={"topic": "payment", "id": "555"}).json() == {"status": "webhook received"}
+    assert client.post(WEBHOOK_URL, params={"type": "payment", "data.id": "555"}).status_code == 200
+    assert client.post(f"{WEBHOOK_URL}?type=payment", json={"type": "payment", "data": {"id": 555}}).status_code == 200
+    assert "ignored" in client.post(WEBHOOK_URL, params={"topic": "merchant_order", "id": "1"}).json()["status"]
+
+    notification = _notification(db_session, "555")
+    assert notification.status == NotificationStatus.PENDING
+    assert notification.received_count == 3
+
+def _lookups() -> int:
+    return gateway_metrics.snapshot("fake")["operations"]["get_payment"]["count"]
+
+def test_worker_marks_approved_order_as_paid_once(client: TestClient, db_session: Session, pending_order: Order, fake_gateway: FakePaymentGateway):
+    order_id = pending_order.id
+    fake_gateway.register_payment("777", "approved", str(order_id))
+    client.post(WEBHOOK_URL, params={"topic": "payment", "id": "777"})
+
+    assert _process(db_session) == 1
+
+    assert db_session.get(Order, order_id).payment_status == PaymentStatus.PAID
+    notification = _notification(db_session, "777")
+    assert notification.status == NotificationStatus.PROCESSED
+    assert (notification.payment_status, notification.order_id) == ("approved", order_id)
+
+    # Un duplicado de un pago ya aprobado no vuelve a consultar Mercado Pago.
+    client.post(WEBHOOK_URL, params={"topic": "payment", "id": "777"})
+    assert _process(db_session) == 0
+    assert _lookups() == 1
+    assert _notification(db_session, "777").received_count == 2
+
+def test_pending_payment_is_checked_again_on_next_notification(client: TestClient, db_session: Session, pending_order: Order, fake_gateway: FakePaymentGateway):
+    order_id = pending_order.id
+    fake_gateway.register_payment("888", "in_process", str(order_id))
+    client.post(WEBHOOK_URL, params={"topic": "payment", "id": "888"})
+    _process(db_session)
+    assert _notification(db_session, "888").status == NotificationStatus.PROCESSED
+    assert db_session.get(Order, order_id).payment_status == PaymentStatus.PENDING
+
+    fake_gateway.register_payment("888", "approved", str(order_id))
+    client.post(WEBHOOK_URL, params={"topic": "payment", "id": "888"})
+    assert _notification(db_session, "888").status == NotificationStatus.PENDING
+    _process(db_session)
+    assert db_session.get(Order, order_id).payment_status == PaymentStatus.PAID
+
+def test_failed_lookup_is_retried_with_backoff(client: TestClient, db_session: Session, fake_gateway: FakePaymentGateway):
+    # El fake responde 404 a los pagos que no conoce.
+    client.post(WEBHOOK_URL, params={"topic": "payment", "id": "999"})
+
+    _process(db_session)
+
+    notification = _notification(db_session, "999")
+    assert notification.status == NotificationStatus.PENDING
+    assert notification.attempts == 1 and "404" in notification.last_error
+    assert _process(db_session) == 0 # todavía no llegó su próximo intento
+
+def test_fetch_payment_caches_only_final_statuses(fake_gateway: FakePaymentGateway):
+    fake_gateway.register_payment("1", "approved", "10")
+    fake_gateway.register_payment("2", "pending", "10")
+    for _ in range(2):
+        assert payment_notifications.fetch_payment("1")["status"] == "approved"
+        assert payment_notifications.fetch_payment("2")["status"] == "pending"
+    assert _lookups() == 3
+
+def test_create_preference_uses_the_gateway(client: TestClient, db_session: Session, fake_gateway: FakePaymentGateway, user_factory):
+    photographer = user_factory("Photographer").photographer
+    photo = Photo(filename="pref.jpg", description="Largada", price=25.0, object_name="photos/pref.jpg", photographer_id=photographer.id)
+    order = Order(total=25.0, payment_method=PaymentMethod.MP)
+    db_session.add_all([photo, order])
+    db_session.flush()
+    db_session.add(OrderItem(order_id=order.id, photo_id=photo.id, quantity=1, price=25.0))
+    db_session.flush()
+
+    response = client.post("/checkout/mercadopago/create-preference", json={"order_id": order.id})
+
+    assert response.status_code == 200, response.text
+    preference_id = response.json()["preference_id"]
+    preference = fake_gateway.preferences[preference_id]
+    assert preference["external_reference"] == str(order.id)
+    assert preference["items"][0]["unit_price"] == 25.0
+    assert preference_id in response.json()["init_point"]
+
+def _album_photos(db_session: Session, test_photo: Photo, prices: list) -> list[Photo]:
+    """Photos in the session (and album) of test_photo."""
+    photos = [
+        Photo(filename=f"album-{i}.jpg", price=price, object_name=f"photos/album-{i}.jpg",
+              photographer_id=test_photo.photographer_id, session_id=test_photo.session_id)
+        for i, price in enumerate(prices)
+    ]
+    db_session.add_all(photos)
+    db_session.flush()
+    return photos
+
+def _order_payload(items: list, **fields) -> dict:
+    return {"total": 1.0, "payment_method": "mp", "customer_email": "buyer@test.com", "items": items, **fields}
+
+def test_create_order_prices_items_on_the_server(client: TestClient, db_session: Session, test_photo: Photo):
+    """Client prices, total and payment status are ignored: photo prices and print packs are used."""
+    photos = _album_photos(db_session, test_photo, [20.0, 30.0])
+    items = [
+        {"photo_id": photos[0].id, "price": 0.01},
+        {"photo_id": photos[1].id, "price": 0.01},
+        {"photo_id": photos[0].id, "price": 0.01, "format": "Polaroid Mini"},
+        {"photo_id": photos[1].id, "price": 0.01, "format": "Polaroid Mini"},
+    ]
+    response = client.post("/checkout/create-order", json=_order_payload(items, payment_status="paid"))
+
+    assert response.status_code == 201, response.text
+    order = response.json()
+    # Un pack de Polaroid Mini (6 fotos) repartido entre las 2 impresas.
+    assert [item["price"] for item in order["items"]] == [20.0, 30.0, pytest.approx(416.665), pytest.approx(416.665)]
+    assert order["total"] == pytest.approx(883.33)
+    assert order["payment_status"] == "pending"
+    assert order["items"][0]["photo"]["id"] == photos[0].id
+
+    db_order = db_session.get(Order, order["id"])
+    assert db_order.total == pytest.approx(883.33)
+    assert db_session.query(OrderItem).filter_by(order_id=db_order.id).count() == 4
+
+def test_create_order_applies_album_combos_and_discount(client: TestClient, db_session: Session, test_photo: Photo):
+    from models.combo import Combo
+    from models.discount import Discount
+    album = test_photo.session.album
+    combo = Combo(name="Pack x3", price=100.0, totalPhotos=3, isFullAlbum=False)
+    full = Combo(name="Álbum completo", price=300.0, totalPhotos=0, isFullAlbum=True)
+    discount = Discount(code="PATAGONIA10", percentage=10.0)
+    db_session.add_all([combo, full, discount])
+    db_session.flush()
+    album.combos.extend([combo, full])
+
+    # 4 fotos: el combo x3 cubre las 3 más caras y la otra se cobra a su precio.
+    photos = _album_photos(db_session, test_photo, [40.0, 60.0, 60.0, 60.0])
+    response = client.post("/checkout/create-order", json=_order_payload(
+        [{"photo_id": photo.id, "price": 1.0} for photo in photos], discount_code="patagonia10",
+    ))
+    assert response.status_code == 201, response.text
+    order = response.json()
+    assert [item["price"] for item in order["items"]] == [40.0] + [pytest.approx(100.0 / 3)] * 3
+    assert order["total"] == pytest.approx((40.0 + 100.0) * 0.9)
+    assert order["discount"]["code"] == "PATAGONIA10"
+
+    # Desde 11 fotos aplica el combo del álbum completo.
+    photos = _album_photos(db_session, test_photo, [60.0] * 11)
+    response = client.post("/checkout/create-order", json=_order_payload([{"photo_id": photo.id, "price": 1.0} for photo in photos]))
+    assert response.status_code == 201, response.text
+    assert response.json()["total"] == pytest.approx(300.0)
+
+def test_quote_applies_combos_per_album(client: TestClient, db_session: Session, test_photo: Photo):
+    """A cart mixing albums: each album's combos only cover its own photos, in the quote and the order."""
+    from models.album import Album
+    from models.combo import Combo
+    from models.photo_session import PhotoSession
+    combo = Combo(name="Pack x3", price=45.0, totalPhotos=3, isFullAlbum=False)
+    other_album = Album(name="Otro álbum")
+    db_session.add_all([combo, other_album])
+    db_session.flush()
+    test_photo.session.album.combos.append(combo)
+    other_album.combos.append(combo)
+    other_session = PhotoSession(event_name="Otra sesión", event_date=test_photo.session.event_date, location="Otro lugar",
+                                 album_id=other_album.id, photographer_id=test_photo.photographer_id)
+    db_session.add(other_session)
+    db_session.flush()
+
+    # 3 fotos del álbum de test_photo (combo) + 2 del otro (sin combo: menos de 3).
+    photos = _album_photos(db_session, test_photo, [20.0, 20.0, 20.0])
+    other_photos = [
+        Photo(filename=f"other-{i}.jpg", price=30.0, object_name=f"photos/other-{i}.jpg",
+              photographer_id=test_photo.photographer_id, session_id=other_session.id)
+        for i in range(2)
+    ]
+    db_session.add_all(other_photos)
+    db_session.flush()
+    items = [{"photo_id": photo.id, "price": 1.0} for photo in photos + other_photos]
+    items.append({"photo_id": photos[0].id, "price": 1.0, "format": "Estándar 10x15"})
+
+    response = client.post("/checkout/quote", json={"items": items})
+    assert response.status_code == 200, response.text
+    quote = response.json()
+    assert [item["price"] for item in quote["items"]] == [15.0, 15.0, 15.0, 30.0, 30.0, 5000.0]
+    assert quote["digital_subtotal"] == 105.0
+    assert quote["prints_subtotal"] == 5000.0
+    assert quote["subtotal"] == 5105.0
+    assert db_session.query(Order).count() == 0
+
+    response = client.post("/checkout/create-order", json=_order_payload(items))
+    assert response.status_code == 201, response.text
+    assert response.json()["total"] == quote["subtotal"]
+
+def test_create_order_only_applies_discounts_by_code(client: TestClient, db_session: Session, test_photo: Photo):
+    """A guessed discount id never gets the discount: only its (secret) code does."""
+    from models.discount import Discount
+    discount = Discount(code="SECRETO50", percentage=50.0)
+    db_session.add(discount)
+    db_session.flush()
+    items = [{"photo_id": test_photo.id, "price": 1.0}]
+
+    for discount_id in (discount.id, discount.id + 1):
+        response = client.post("/checkout/create-order", json=_order_payload(items, discount_id=discount_id))
+        assert response.status_code == 400, response.text
+    response = client.post("/checkout/create-order", json=_order_payload(items, discount_code="SECRETO5"))
+    assert response.status_code == 404, response.text
+    assert db_session.query(Order).filter(Order.discount_id == discount.id).count() == 0
+
+    response = client.post("/checkout/create-order", json=_order_payload(items, discount_code="secreto50"))
+    assert response.status_code == 201, response.text
+    assert response.json()["total"] == pytest.approx(test_photo.price * 0.5)
+
+def test_create_order_honours_staff_total_overrides(client: TestClient, db_session: Session, test_photo: Photo, user_factory):
+    """Only callers who can edit orders may set the total by hand; item prices stay server-side."""
+    from app.tests.conftest import get_auth_headers
+    items = [{"photo_id": test_photo.id, "price": 1.0}]
+
+    # Invitado y fotógrafo (sin EDIT_ORDER): el override se rechaza.
+    response = client.post("/checkout/create-order", json=_order_payload(items, override_total=1.0))
+    assert response.status_code == 403, response.text
+    client.headers = get_auth_headers(client, user_factory("Photographer", "override.photographer@test.com").email)
+    response = client.post("/checkout/create-order", json=_order_payload(items, override_total=1.0))
+    assert response.status_code == 403, response.text
+    assert db_session.query(Order).count() == 0
+
+    client.headers = get_auth_headers(client, user_factory("Supervisor", "override.supervisor@test.com").email)
+    response = client.post("/checkout/create-order", json=_order_payload(items, override_total=7.5))
+    assert response.status_code == 201, response.text
+    order = response.json()
+    assert order["total"] == 7.5
+    assert order["items"][0]["price"] == test_photo.price
+
+def test_create_preference_charges_the_order_total(client: TestClient, db_session: Session, test_photo: Photo, fake_gateway: FakePaymentGateway, user_factory):
+    """Mercado Pago charges the server total: discounts and staff overrides included."""
+    from app.tests.conftest import get_auth_headers
+    from models.discount import Discount
+    db_session.add(Discount(code="MITAD", percentage=50.0))
+    db_session.flush()
+    photos = _album_photos(db_session, test_photo, [20.0, 30.0])
+    items = [{"photo_id": photo.id, "price": 1.0} for photo in photos]
+
+    def charged(order_id: int) -> list:
+        response = client.post("/checkout/mercadopago/create-preference", json={"order_id": order_id})
+        assert response.status_code == 200, response.text
+        return fake_gateway.preferences[response.json()["preference_id"]]["items"]
+
+    # Sin descuento: un ítem por foto, que suman el total.
+    order = client.post("/checkout/create-order", json=_order_payload(items)).json()
+    assert [item["unit_price"] for item in charged(order["id"])] == [20.0, 30.0]
+
+    order = client.post("/checkout/create-order", json=_order_payload(items, discount_code="mitad")).json()
+    assert order["total"] == 25.0
+    preference_items = charged(order["id"])
+    assert [(item["quantity"], item["unit_price"]) for item in preference_items] == [(1, 25.0)]
+
+    client.headers = get_auth_headers(client, user_factory("Supervisor", "preference.supervisor@test.com").email)
+    order = client.post("/checkout/create-order", json=_order_payload(items, override_total=42.5)).json()
+    assert sum(item["quantity"] * item["unit_price"] for item in charged(order["id"])) == 42.5
+
+    order = client.post("/checkout/create-order", json=_order_payload(items, override_total=0)).json()
+    response = client.post("/checkout/mercadopago/create-preference", json={"order_id": order["id"]})
+    assert response.status_code == 400, response.text
+
+def test_create_order_rejects_invalid_items(client: TestClient, db_session: Session, test_photo: Photo):
+    def create(items):
+        return client.post("/checkout/create-order", json=_order_payload(items)).status_code
+
+    assert create([]) == 400
+    assert create([{"photo_id": 999999, "price": 1.0}]) == 404
+    assert create([{"photo_id": test_photo.id, "price": 1.0}, {"photo_id": test_photo.id, "price": 1.0}]) == 400
+    assert create([{"photo_id": test_photo.id, "price": 1.0, "quantity": 5}]) == 400
+    assert create([{"photo_id": test_photo.id, "price": 1.0, "format": "Gigantografía"}]) == 400
+    assert db_session.query(Order).count() == 0
+
+def test_unit_price_falls_back_to_album_default(test_photo: Photo):
+    from services.pricing import PricingService
+    test_photo.session.album.default_photo_price = 50
+    assert PricingService._unit_price(test_photo) == 10.0
+    assert PricingService._unit_price(Photo(price=None, session=test_photo.session)) == 50.0
+
+def test_payment_gateway_metrics(admin_client: TestClient, fake_gateway: FakePaymentGateway):
+    fake_gateway.create_preference({"items": []})
+    with pytest.raises(PaymentGatewayError):
+        fake_gateway.get_payment("missing")
+
+    metrics = admin_client.get("/admin/metrics/payment-gateway").json()
+
+    assert metrics["operations"]["create_preference"]["count"] == 1
+    assert metrics["operations"]["get_payment"]["errors"] == 1
+    assert metrics["operations"]["get_payment"]["buckets"]["10000"] == 1
+
+def test_latency_histogram_quantiles():
+    histogram = LatencyHistogram()
+    for elapsed_ms in [3] * 90 + [40] * 9 + [20000]:
+        histogram.observe(elapsed_ms, error=False)
+
+    assert histogram.quantile(0.5) == 5
+    assert histogram.quantile(0.95) == 50
+    assert histogram.quantile(1.0) == 20000 # bucket +Inf: la llamada más lenta vista
+    assert histogram.snapshot()["buckets"]["5"] == 90
@@ -0,0 +1,60 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from sqlalchemy.orm import Session
+
+import email_worker
+from models.email_outbox import EmailOutbox, EmailStatus
+from services.email_outbox import EmailOutboxService
+
+
+def _queue(db_session: Session, *recipients: str) -> list[int]:
+    service = EmailOutboxService(db_session)
+    for to_email in recipients:
+        service.enqueue(to_email, "Tus fotos", "<p>Hola</p>", html=True)
+    db_session.commit()
+    return [e.id for e in db_session.query(EmailOutbox).filter(EmailOutbox.to_email.in_(recipients))]
+
+def _dispatch(db_session: Session, max_attempts: int = 3) -> email_worker.EmailDispatcher:
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        dispatcher = email_worker.EmailDispatcher(executor, session_factory=lambda: db_session, batch_size=10, max_attempts=max_attempts)
+        dispatcher.run_once()
+    return dispatcher
+
+def test_dispatcher_sends_and_schedules_retries(db_session: Session, monkeypatch):
+    def fake_deliver(to_email, subject, body, html=False):
+        if to_email == "down@test.com":
+            raise RuntimeError("429 rate limited")
+        return f"re_{to_email}"
+    monkeypatch.setattr(email_worker, "deliver_email", fake_deliver)
+    ids = _queue(db_session, "ok@test.com", "down@test.com")
+
+    _dispatch(db_session)
+
+    emails = {e.to_email: e for e in db_session.query(EmailOutbox).filter(EmailOutbox.id.in_(ids))}
+    sent, retried = emails["ok@test.com"], emails["down@test.com"]
+    assert sent.status == EmailStatus.SENT and sent.provider_message_id == "re_ok@test.com" and sent.sent_at is not None
+    assert retried.status == EmailStatus.PENDING and retried.attempts == 1
+    assert "429" in retried.last_error
+    assert retried.next_attempt_at > datetime.utcnow() + timedelta(seconds=10)
+
+    # Hasta que llegue su próximo intento, el dispatcher no lo vuelve a tomar.
+    retried_id = retried.id
+    _dispatch(db_session)
+    assert db_session.get(EmailOutbox, retried_id).attempts == 1
+
+def test_dispatcher_gives_up_after_max_attempts(db_session: Session, monkeypatch):
+    def failing_deliver(*args, **kwargs):
+        raise RuntimeError("provider down")
+    monkeypatch.setattr(email_worker, "deliver_email", failing_deliver)
+    [email_id] = _queue(db_session, "never@test.com")
+    db_session.query(EmailOutbox).filter_by(id=email_id).update({"attempts": 2})
+    db_session.commit()
+
+    dispatcher = _dispatch(db_session)
+
+    email = db_session.get(EmailOutbox, email_id)
+    assert email.status == EmailStatus.FAILED and email.attempts == 3
+    assert dispatcher.requeue([EmailStatus.FAILED]) >= 1
+    email = db_session.get(EmailOutbox, email_id)
+    assert email.status == EmailStatus.PENDING and email.attempts == 0
@@ -49,11 +49,10 @@ def test_photo(db_session: Session, test_photographer: Photographer, monkeypatch
     db_session.add(photo_session)
 
     photo = Photo(
-        filename="test_photo_order.jpg", # Use filename instead of object_name
+        filename="test_photo_order.jpg",
         description="Test Photo Order",
         price=15.0,
-        url="http://example.com/photos/order-test-photo.jpg", # Provide a dummy URL
-        watermark_url="http://example.com/photos/order-test-photo-watermark.jpg", # Provide a dummy watermark URL
+        object_name="photos/order-test-photo.jpg",
         photographer_id=test_photographer.id,
         session_id=photo_session.id
     )
@@ -124,6 +123,32 @@ def test_process_earnings_for_order_item(db_session: Session, test_order: Order)
     db_earning = db_session.query(Earning).filter_by(id=earning.id).one()
     assert db_earning.amount == expected_amount
 
+def test_process_earnings_for_order_is_set_based_and_idempotent(db_session: Session, test_order: Order, test_photo: Photo):
+    """
+    All the items of an order get their earning from one INSERT ... SELECT; recording the
+    order again inserts nothing, and items without a photographer are skipped.
+    """
+    from services.orders import OrderService
+    test_photo.photographer.commission_percentage = 20.0
+    orphan_photo = Photo(filename="orphan.jpg", price=30.0, object_name="photos/orphan.jpg")
+    db_session.add(orphan_photo)
+    db_session.flush()
+    db_session.add_all([
+        OrderItem(order_id=test_order.id, photo_id=test_photo.id, quantity=3, price=10.0),
+        OrderItem(order_id=test_order.id, photo_id=orphan_photo.id, quantity=1, price=30.0),
+    ])
+
+    service = OrderService(db_session)
+    assert service.process_earnings_for_order(test_order) == 2
+    assert service.process_earnings_for_order(test_order) == 0
+
+    earnings = db_session.query(Earning).filter(Earning.order_id == test_order.id).order_by(Earning.order_item_id).all()
+    assert [(e.amount, e.earned_photo_fraction) for e in earnings] == [
+        pytest.approx((15.0 * 0.8, 0.8)), pytest.approx((30.0 * 0.8, 2.4)),
+    ]
+    assert all(e.commission_applied == 20.0 and e.photographer_id == test_photo.photographer_id for e in earnings)
+    assert all(e.created_at is not None for e in earnings)
+
 # --- API Layer Tests ---
 
 def test_list_all_orders_as_supervisor(supervisor_client: TestClient, test_order: Order):
@@ -255,4 +280,66 @@ def test_mark_order_as_paid_requires_payment_method(supervisor_client: TestClien
     if isinstance(detail, list):
         assert any("payment_method" in str(err).lower() for err in detail)
     else:
-        assert "payment method" in detail.lower()
\ No newline at end of file
+        assert "payment method" in detail.lower()
+
+
+def test_get_public_order_details(client: TestClient, db_session: Session, test_photographer: Photographer, user_factory):
+    """The public order page is served by the async read path, with signed photo URLs."""
+    photo_session = PhotoSession(event_name="Public Order", event_date=datetime.now(timezone.utc),
+                                 location="Esquel", photographer_id=test_photographer.id)
+    db_session.add(photo_session)
+    db_session.flush()
+    photo = Photo(filename="public.jpg", price=15.0, object_name="photos/public-order.jpg",
+                  photographer_id=test_photographer.id, session_id=photo_session.id)
+    customer = user_factory("Customer", "customer.public@test.com")
+    order = Order(user_id=customer.id, total=15.0, payment_method=PaymentMethod.MP)
+    db_session.add_all([photo, order])
+    db_session.flush()
+    db_session.add(OrderItem(order_id=order.id, photo_id=photo.id, quantity=1, price=15.0))
+    db_session.flush()
+
+    response = client.get(f"/orders/public/{order.public_id}")
+
+    assert response.status_code == 200, response.text
+    data = response.json()
+    assert data["user"]["email"] == "customer.public@test.com"
+    assert data["items"][0]["photo"]["photographer"]["id"] == test_photographer.id
+    assert "X-Amz-Signature" in data["items"][0]["photo"]["url"]
+
+def test_get_public_order_details_unknown_id(client: TestClient):
+    assert client.get("/orders/public/not-a-uuid").status_code == 404
+    assert client.get("/orders/public/00000000-0000-0000-0000-000000000000").status_code == 404
+
+def test_mark_order_as_paid_queues_confirmation_email(db_session: Session, test_photographer: Photographer, user_factory, monkeypatch):
+    """The confirmation email is written to the outbox in the payment transaction, not sent inline."""
+    import resend
+    from models.email_outbox import EmailOutbox, EmailStatus
+    from services.email_outbox import EmailOutboxService
+    from services.orders import OrderService
+
+    def fail_send(params):
+        raise AssertionError("The email must not be sent inside the request.")
+    monkeypatch.setattr(resend.Emails, "send", fail_send)
+
+    photo_session = PhotoSession(event_name="Outbox", event_date=datetime.now(timezone.utc),
+                                 location="Bariloche", photographer_id=test_photographer.id)
+    db_session.add(photo_session)
+    db_session.flush()
+    photo = Photo(filename="outbox.jpg", price=20.0, object_name="photos/outbox.jpg",
+                  photographer_id=test_photographer.id, session_id=photo_session.id)
+    customer = user_factory("Customer", "customer.outbox@test.com")
+    order = Order(user_id=customer.id, customer_email="buyer@test.com", total=20.0, payment_method=PaymentMethod.MP)
+    db_session.add_all([photo, order])
+    db_session.flush()
+    db_session.add(OrderItem(order_id=order.id, photo_id=photo.id, quantity=1, price=20.0))
+    db_session.flush()
+
+    OrderService(db_session).mark_order_as_paid(order.id, PaymentMethod.MP, external_payment_id="123")
+
+    email = db_session.query(EmailOutbox).filter_by(dedupe_key=f"order_confirmation:{order.id}").one()
+    assert email.to_email == "buyer@test.com"
+    assert email.status == EmailStatus.PENDING
+    assert email.html and "Outbox" in email.subject
+    assert str(order.public_id) in email.body
+    # Volver a encolarlo (p. ej. un webhook repetido) no duplica el email.
+    assert EmailOutboxService(db_session).enqueue("buyer@test.com", "again", "body", dedupe_key=f"order_confirmation:{order.id}") is False
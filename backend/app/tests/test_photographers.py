@@ -2,7 +2,7 @@
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
-from datetime import datetime, timedelta, timezone
+from datetime import date, datetime, timedelta, timezone
 
 # Import models
 from models.photographer import Photographer
@@ -32,9 +32,8 @@ def photographer_with_earnings(db_session: Session, user_factory) -> Photographe
     photo = Photo(
         photographer_id=photographer.id,
         price=100.0, # Base price of 100 for easy math
-        filename="earnings/photo.jpg", # Use filename instead of object_name
-        url="http://example.com/earnings/photo.jpg",
-        watermark_url="http://example.com/earnings/photo-watermark.jpg",
+        filename="earnings/photo.jpg",
+        object_name="photos/earnings/photo.jpg",
         description="Photo for earnings test"
     )
     db_session.add(photo)
@@ -101,8 +100,8 @@ def test_photographer_can_get_own_earnings(photographer_client: TestClient, phot
     response = photographer_client.get(f"/photographers/{photographer_id}/earnings")
     assert response.status_code == 200, response.text
     data = response.json()
-    assert len(data) == 3
-    assert data[0]["amount"] == 75.0
+    assert data["total"] == 3
+    assert data["items"][0]["amount"] == 75.0
 
 def test_photographer_cannot_get_other_earnings(photographer_client: TestClient, photographer_with_earnings: Photographer):
     """A photographer should NOT be able to access another's earnings."""
@@ -119,7 +118,7 @@ def test_supervisor_can_get_any_earnings(supervisor_client: TestClient, photogra
     response = supervisor_client.get(f"/photographers/{photographer_id}/earnings")
     assert response.status_code == 200, response.text
     data = response.json()
-    assert len(data) == 3
+    assert len(data["items"]) == 3
 
 def test_get_earnings_with_date_filter(supervisor_client: TestClient, photographer_with_earnings: Photographer):
     """Test filtering earnings by start_date and end_date."""
@@ -132,14 +131,60 @@ def test_get_earnings_with_date_filter(supervisor_client: TestClient, photograph
     response = supervisor_client.get(url)
     assert response.status_code == 200, response.text
     data = response.json()
-    assert len(data) == 2
+    assert len(data["items"]) == 2
 
     # Test only start_date
     start_date = (now - timedelta(days=2)).date().isoformat() # Should include 1 earning
     url = f"/photographers/{photographer_id}/earnings?start_date={start_date}"
     response = supervisor_client.get(url)
     assert response.status_code == 200, response.text
-    assert len(response.json()) == 1
+    assert len(response.json()["items"]) == 1
+
+def test_get_earnings_by_cursor(supervisor_client: TestClient, photographer_with_earnings: Photographer):
+    """Cursor pagination walks the earnings newest first; the total only comes with the first page."""
+    photographer_id = photographer_with_earnings.id
+    url = f"/photographers/{photographer_id}/earnings?pagination=cursor&limit=2&total=exact"
+    response = supervisor_client.get(url)
+    assert response.status_code == 200, response.text
+    first = response.json()
+    assert first["total"] == 3 and first["total_is_estimate"] is False
+    assert len(first["items"]) == 2 and first["next_cursor"]
+
+    response = supervisor_client.get(f"{url}&cursor={first['next_cursor']}")
+    assert response.status_code == 200, response.text
+    second = response.json()
+    assert len(second["items"]) == 1 and second["next_cursor"] is None
+    assert second["total"] is None
+
+    items = first["items"] + second["items"]
+    assert [item["created_at"] for item in items] == sorted((item["created_at"] for item in items), reverse=True)
+    assert all(item["photo_filename"] == "earnings/photo.jpg" for item in items)
+
+    # Sin pedir el total (SQLite no tiene estimación: "estimate" cae en el conteo exacto).
+    response = supervisor_client.get(f"/photographers/{photographer_id}/earnings?pagination=cursor&total=estimate")
+    assert response.json()["total"] == 3
+    response = supervisor_client.get(f"/photographers/{photographer_id}/earnings?pagination=cursor")
+    assert response.json()["total"] is None
+
+    response = supervisor_client.get(f"/photographers/{photographer_id}/earnings?cursor=not-a-cursor")
+    assert response.status_code == 400, response.text
+
+def test_earnings_offset_total_past_last_page(supervisor_client: TestClient, photographer_with_earnings: Photographer):
+    """The total is the same on every page, including an empty one past the end."""
+    photographer_id = photographer_with_earnings.id
+    for skip, expected_items in ((0, 2), (2, 1), (10, 0)):
+        response = supervisor_client.get(f"/photographers/{photographer_id}/earnings?skip={skip}&limit=2")
+        assert response.status_code == 200, response.text
+        data = response.json()
+        assert (data["total"], len(data["items"])) == (3, expected_items)
+
+    response = supervisor_client.get(f"/photographers/{photographer_id}/earnings/summary_by_photo")
+    assert response.status_code == 200, response.text
+    data = response.json()
+    assert data["total"] == 1
+    assert data["items"][0]["total_earnings"] == pytest.approx(225.0)
+    response = supervisor_client.get(f"/photographers/{photographer_id}/earnings/summary_by_photo?skip=5")
+    assert response.json() == {"total": 1, "items": []}
 
 # --- Earnings Summary API Tests ---
 
@@ -212,4 +257,48 @@ def test_supervisor_can_update_photographer(supervisor_client: TestClient, photo
     
     response = supervisor_client.put(f"/photographers/{photographer_id}", json=update_data)
     assert response.status_code == 200, response.text
-    assert response.json()["commission_percentage"] == 50.0
\ No newline at end of file
+    assert response.json()["commission_percentage"] == 50.0
+# --- Earnings Time Series Tests ---
+
+def test_get_earnings_timeseries(supervisor_client: TestClient, photographer_with_earnings: Photographer, db_session: Session):
+    """Earnings are bucketed by day/week/month, with zero points for days without sales."""
+    from services.sales_rollups import SalesRollupService
+    photographer_id = photographer_with_earnings.id
+    today = datetime.now(timezone.utc).date()
+    start_date = (today - timedelta(days=10)).isoformat()
+
+    response = supervisor_client.get(f"/photographers/{photographer_id}/earnings/timeseries?start_date={start_date}")
+    assert response.status_code == 200, response.text
+    points = response.json()["points"]
+    assert [p["bucket_start"] for p in points] == [(today - timedelta(days=d)).isoformat() for d in range(10, -1, -1)]
+    assert [p["earnings"] for p in points if p["orders"]] == [75.0, 75.0, 75.0]
+    assert sum(p["earned_photo_fraction"] for p in points) == pytest.approx(2.25)
+
+    response = supervisor_client.get(f"/photographers/{photographer_id}/earnings/timeseries?bucket=month")
+    assert response.status_code == 200, response.text
+    months = response.json()["points"]
+    assert months[0]["bucket_start"] == (today - timedelta(days=10)).replace(day=1).isoformat()
+    assert sum(p["orders"] for p in months) == 3
+    assert sum(p["earnings"] for p in months) == pytest.approx(225.0)
+
+    response = supervisor_client.get(f"/photographers/{photographer_id}/earnings/timeseries?bucket=week")
+    weeks = response.json()["points"]
+    assert all(date.fromisoformat(p["bucket_start"]).weekday() == 0 for p in weeks)
+    assert sum(p["earnings"] for p in weeks) == pytest.approx(225.0)
+
+    # La misma serie desde los rollups diarios.
+    SalesRollupService(db_session).rebuild()
+    response = supervisor_client.get(f"/photographers/{photographer_id}/earnings/timeseries?bucket=month&source=rollups")
+    assert response.status_code == 200, response.text
+    assert response.json()["points"] == months
+
+    response = supervisor_client.get("/earnings/timeseries?bucket=week")
+    assert response.status_code == 200, response.text
+    assert sum(p["earnings"] for p in response.json()["points"]) == pytest.approx(225.0)
+
+def test_earnings_timeseries_permission_denied(photographer_client: TestClient, photographer_with_earnings: Photographer):
+    """A photographer cannot chart another photographer's earnings nor everyone's."""
+    response = photographer_client.get(f"/photographers/{photographer_with_earnings.id}/earnings/timeseries")
+    assert response.status_code == 403, response.text
+    response = photographer_client.get("/earnings/timeseries")
+    assert response.status_code == 403, response.text
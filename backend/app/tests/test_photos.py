@@ -44,23 +44,18 @@ def session_for_photo(db_session: Session, photographer_for_photo: Photographer)
 
 # --- Photo API Tests ---
 
-def test_complete_upload_single_photo(photographer_client: TestClient, monkeypatch, session_for_photo: PhotoSession):
+def test_complete_upload_single_photo(photographer_client: TestClient, db_session: Session, session_for_photo: PhotoSession):
     """
     Test the complete-upload endpoint for a single photo.
-    Mocks the storage service to avoid actual S3 calls.
+    The photo is registered in a new batch session and returned with its object_name.
     """
+    from models.photo import Photo
+
     # Authenticate as the specific photographer from the fixture
     from app.tests.conftest import get_auth_headers
     photographer_user = session_for_photo.photographer.user
     photographer_client.headers = get_auth_headers(photographer_client, photographer_user.email)
 
-    # Mock the storage_service where it's used: in the photos service.
-    mock_get_url = "http://minio:9000/fotopatagonia/mocked_photo.jpg?presigned-token"
-    monkeypatch.setattr(
-        "app.services.photos.storage_service.generate_presigned_get_url",
-        lambda object_name: mock_get_url
-    )
-
     completion_request = {
         "photos": [
             {
@@ -82,33 +77,36 @@ def test_complete_upload_single_photo(photographer_client: TestClient, monkeypat
     
     photo = created_photos[0]
     assert photo["filename"] == "beach_sunset.jpg"
+    assert photo["description"] == "A beautiful sunset"
     assert photo["price"] == 15.99
-    assert photo["url"] == mock_get_url
+    assert photo["object_name"] == "photos/some-uuid.jpg"
     assert photo["photographer"]["id"] == session_for_photo.photographer_id
-    assert photo["session_id"] == session_for_photo.id
+    assert photo["rendition_status"] == "pending"
+    assert photo["tags"] == []
 
-def test_complete_upload_multiple_photos(photographer_client: TestClient, monkeypatch, session_for_photo: PhotoSession):
+    # La foto queda en la sesión generada para el lote, no en la del request.
+    db_photo = db_session.get(Photo, photo["id"])
+    assert db_photo.object_name == "photos/some-uuid.jpg"
+    assert db_photo.session_id == photo["session_id"]
+    batch_session = db_session.get(PhotoSession, photo["session_id"])
+    assert batch_session.id != session_for_photo.id
+    assert batch_session.photographer_id == session_for_photo.photographer_id
+    assert batch_session.album_id is None
+
+def test_complete_upload_multiple_photos(photographer_client: TestClient, db_session: Session, session_for_photo: PhotoSession):
     """
     Test the complete-upload endpoint for a list of photos.
+    The whole batch shares one session and comes back in request order.
     """
+    from models.photo import Photo
+
     # Authenticate as the specific photographer from the fixture
     from app.tests.conftest import get_auth_headers
     photographer_user = session_for_photo.photographer.user
     photographer_client.headers = get_auth_headers(photographer_client, photographer_user.email)
 
-    mock_urls = [
-        "http://minio:9000/fotopatagonia/mocked_photo_1.jpg?token",
-        "http://minio:9000/fotopatagonia/mocked_photo_2.png?token"
-    ]
-    
-    # Use a generator to yield mock URLs
-    url_generator = (url for url in mock_urls)
-    monkeypatch.setattr(
-        "app.services.photos.storage_service.generate_presigned_get_url",
-        lambda object_name: next(url_generator)
-    )
-
     completion_request = {
+        "album_id": session_for_photo.album_id,
         "photos": [
             {
                 "object_name": "photos/uuid-1.jpg",
@@ -134,5 +132,161 @@ def test_complete_upload_multiple_photos(photographer_client: TestClient, monkey
     assert len(created_photos) == 2
     assert created_photos[0]["filename"] == "photo1.jpg"
     assert created_photos[1]["filename"] == "photo2.png"
-    assert created_photos[0]["url"] == mock_urls[0]
-    assert created_photos[1]["url"] == mock_urls[1]
\ No newline at end of file
+    assert [p["object_name"] for p in created_photos] == ["photos/uuid-1.jpg", "photos/uuid-2.png"]
+    assert [p["price"] for p in created_photos] == [10.0, 20.0]
+    assert {p["album_id"] for p in created_photos} == {session_for_photo.album_id}
+
+    session_ids = {p["session_id"] for p in created_photos}
+    assert len(session_ids) == 1
+    batch_session = db_session.get(PhotoSession, session_ids.pop())
+    assert batch_session.album_id == session_for_photo.album_id
+    db_photos = db_session.query(Photo).filter(Photo.session_id == batch_session.id).order_by(Photo.id).all()
+    assert [p.object_name for p in db_photos] == ["photos/uuid-1.jpg", "photos/uuid-2.png"]
+
+def _create_photos(db_session: Session, session: PhotoSession, count: int):
+    from models.photo import Photo
+    photos = [
+        Photo(
+            filename=f"cursor_{i}.jpg",
+            price=10.0,
+            object_name=f"photos/cursor-{i}.jpg",
+            photographer_id=session.photographer_id,
+            session_id=session.id,
+        )
+        for i in range(count)
+    ]
+    db_session.add_all(photos)
+    db_session.flush()
+    return photos
+
+def test_list_photos_cursor_pagination(client: TestClient, db_session: Session, session_for_photo: PhotoSession):
+    """Cursor mode walks every photo of the session once, newest first, and ends with no cursor."""
+    photos = _create_photos(db_session, session_for_photo, 5)
+    expected_ids = sorted((p.id for p in photos), reverse=True)
+
+    seen_ids = []
+    params = {"pagination": "cursor", "limit": 2, "session_id": session_for_photo.id}
+    while True:
+        response = client.get("/photos/", params=params)
+        assert response.status_code == 200, response.text
+        page = response.json()
+        seen_ids.extend(p["id"] for p in page["items"])
+        if not page["next_cursor"]:
+            break
+        params["cursor"] = page["next_cursor"]
+
+    assert seen_ids == expected_ids
+
+def test_list_photos_cursor_filters_by_album(client: TestClient, db_session: Session, session_for_photo: PhotoSession):
+    _create_photos(db_session, session_for_photo, 2)
+
+    response = client.get("/photos/", params={"pagination": "cursor", "album_id": session_for_photo.album_id + 1000})
+    assert response.status_code == 200, response.text
+    assert response.json() == {"items": [], "next_cursor": None}
+
+    response = client.get("/photos/", params={"pagination": "cursor", "album_id": session_for_photo.album_id})
+    assert len(response.json()["items"]) == 2
+
+def test_list_photos_invalid_cursor(client: TestClient):
+    response = client.get("/photos/", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400, response.text
+
+def test_complete_upload_bulk_uses_album_default_price(photographer_client: TestClient, db_session: Session):
+    """The whole batch is inserted at once, in order, with the album's default price."""
+    from models.photo import Photo
+    album = Album(name="Bulk Album", default_photo_price=2500)
+    db_session.add(album)
+    db_session.flush()
+    photographer_id = photographer_client.user.photographer.id
+
+    request = {
+        "album_id": album.id,
+        "photos": [
+            {"object_name": f"photos/bulk-{i}.jpg", "original_filename": f"bulk_{i}.jpg",
+             "price": 10.0, "photographer_id": photographer_id}
+            for i in range(3)
+        ],
+    }
+    response = photographer_client.post("/photos/complete-upload", json=request)
+
+    assert response.status_code == 201, response.text
+    created = response.json()
+    assert [p["filename"] for p in created] == ["bulk_0.jpg", "bulk_1.jpg", "bulk_2.jpg"]
+    assert all(p["price"] == 2500 and p["album_id"] == album.id for p in created)
+    assert created[0]["photographer"]["id"] == photographer_id
+    assert db_session.query(Photo).filter(Photo.session_id == created[0]["session_id"]).count() == 3
+
+def test_complete_upload_rejects_whole_batch_for_foreign_photographer(photographer_client: TestClient, db_session: Session, session_for_photo: PhotoSession):
+    """If one file belongs to another photographer nothing from the batch is written."""
+    from models.photo import Photo
+    own_id = photographer_client.user.photographer.id
+    request = {
+        "photos": [
+            {"object_name": "photos/mine.jpg", "original_filename": "mine.jpg", "price": 10.0, "photographer_id": own_id},
+            {"object_name": "photos/theirs.jpg", "original_filename": "theirs.jpg", "price": 10.0,
+             "photographer_id": session_for_photo.photographer_id},
+        ]
+    }
+    response = photographer_client.post("/photos/complete-upload", json=request)
+
+    assert response.status_code == 403, response.text
+    assert db_session.query(Photo).filter(Photo.object_name == "photos/mine.jpg").count() == 0
+
+def test_search_photos_by_tags(client: TestClient, db_session: Session, session_for_photo: PhotoSession):
+    """match=all needs every tag, match=any one of them; names are case-insensitive and pages follow the cursor."""
+    from models.tag import Tag
+    photos = _create_photos(db_session, session_for_photo, 5)
+    nieve, lago = Tag(name="Nieve"), Tag(name="Lago")
+    photos[0].tags = [nieve]
+    photos[1].tags = [nieve, lago]
+    photos[2].tags = [lago]
+    photos[3].tags = [nieve, lago]
+    db_session.flush()
+
+    def search(**params):
+        ids, cursor = [], None
+        while True:
+            response = client.get("/photos/search", params={**params, "limit": 1, **({"cursor": cursor} if cursor else {})})
+            assert response.status_code == 200, response.text
+            page = response.json()
+            ids.extend(p["id"] for p in page["items"])
+            cursor = page["next_cursor"]
+            if not cursor:
+                return ids
+
+    assert search(tags=["nieve", "LAGO"]) == [photos[3].id, photos[1].id]
+    assert search(tags=["nieve", "lago"], match="any") == [photos[3].id, photos[2].id, photos[1].id, photos[0].id]
+    assert search(tags=["nieve", "no-existe"]) == []
+    assert search(tags=["nieve", "no-existe"], match="any") == [photos[3].id, photos[1].id, photos[0].id]
+
+def test_search_photos_by_text(client: TestClient, db_session: Session, session_for_photo: PhotoSession):
+    """Every word has to match a photo field, a tag or the session; photo text ranks above tags and the session."""
+    from models.tag import Tag
+    photos = _create_photos(db_session, session_for_photo, 4)
+    photos[0].filename = "bib_1234_llegada.jpg"
+    photos[1].description = "Dorsal 1234 en la largada"
+    photos[2].filename = "studio_portrait.jpg"
+    photos[3].tags = [Tag(name="Bariloche")]
+    db_session.flush()
+
+    def search(q):
+        ids, cursor = [], None
+        while True:
+            response = client.get("/photos/search/text", params={"q": q, "limit": 1, **({"cursor": cursor} if cursor else {})})
+            assert response.status_code == 200, response.text
+            page = response.json()
+            ids.extend(p["id"] for p in page["items"])
+            cursor = page["next_cursor"]
+            if not cursor:
+                return ids
+
+    assert search("1234") == [photos[1].id, photos[0].id]
+    assert search("BARILOCHE") == [photos[3].id]
+    assert search("1234 studio") == [photos[1].id, photos[0].id]  # "studio" matches the session location of every photo
+    assert search("studio")[0] == photos[2].id
+    assert sorted(search("studio")) == sorted(p.id for p in photos)
+    assert search("1234 bariloche") == []
+    assert search("100%") == []
+    scoped = client.get("/photos/search/text", params={"q": "1234", "session_id": session_for_photo.id + 1})
+    assert scoped.json()["items"] == []
+    assert client.get("/photos/search/text", params={"q": "1234", "cursor": "bad"}).status_code == 400
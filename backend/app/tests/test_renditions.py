@@ -0,0 +1,85 @@
+import io
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pytest
+from PIL import Image
+from sqlalchemy.orm import Session
+
+from models.photo import Photo, RenditionStatus
+from models.photo_session import PhotoSession
+from services.renditions import RENDITIONS, rendition_key, rendition_keys, resolve_original, render
+
+
+def test_rendition_keys_are_deterministic():
+    assert rendition_key("photos/abc.jpg", "thumb") == "photos/thumb_abc.jpg"
+    assert rendition_keys("photos/abc.jpg") == ["photos/thumb_abc.jpg", "photos/preview_abc.jpg", "photos/wm_abc.jpg"]
+    assert resolve_original("photos/wm_abc.jpg") == ("web", "photos/abc.jpg")
+    assert resolve_original("photos/abc.jpg") == (None, "photos/abc.jpg")
+
+def test_rendition_keys_use_the_jpeg_extension():
+    """Renditions are always JPEG, so non-JPEG originals get a .jpg key that still resolves back."""
+    assert rendition_key("photos/abc.png", "thumb") == "photos/thumb_abc.png.jpg"
+    assert rendition_key("photos/abc.JPEG", "preview") == "photos/preview_abc.JPEG"
+    for original in ("photos/abc.png", "photos/abc.webp", "photos/abc.jpeg", "photos/abc.JPG"):
+        for kind in RENDITIONS:
+            assert resolve_original(rendition_key(original, kind)) == (kind, original)
+
+def test_render_builds_every_rendition_within_its_size():
+    buffer = io.BytesIO()
+    Image.new("RGB", (3000, 2000), (30, 90, 160)).save(buffer, format="PNG")
+
+    renditions = render(buffer.getvalue(), "Fotos Patagonia")
+
+    assert set(renditions) == set(RENDITIONS)
+    for kind, data in renditions.items():
+        with Image.open(io.BytesIO(data)) as image:
+            assert image.format == "JPEG"
+            assert max(image.size) == RENDITIONS[kind].max_size
+
+@pytest.fixture
+def pending_photos(db_session: Session, user_factory) -> list[Photo]:
+    photographer = user_factory("Photographer").photographer
+    session = PhotoSession(event_name="Renditions", event_date=datetime.utcnow(), location="Ushuaia",
+                           photographer_id=photographer.id)
+    db_session.add(session)
+    db_session.flush()
+    photos = [
+        Photo(filename=f"r{i}.jpg", price=1.0, object_name=f"photos/r{i}.jpg",
+              photographer_id=photographer.id, session_id=session.id)
+        for i in range(3)
+    ]
+    db_session.add_all(photos)
+    db_session.commit()
+    return photos
+
+def test_pipeline_marks_ready_and_failed(db_session: Session, pending_photos, monkeypatch):
+    import rendition_worker
+
+    def fake_process(object_name):
+        if object_name == "photos/r1.jpg":
+            raise RuntimeError("corrupt image")
+        return {"thumb": 1}
+    monkeypatch.setattr(rendition_worker, "process_photo", fake_process)
+    photo_ids = [p.id for p in pending_photos]
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        pipeline = rendition_worker.RenditionPipeline(executor, session_factory=lambda: db_session, batch_size=10)
+        claimed = pipeline.run_once()
+
+    assert claimed >= 3
+    statuses = {p.object_name: p.rendition_status for p in db_session.query(Photo).filter(Photo.id.in_(photo_ids))}
+    assert statuses == {
+        "photos/r0.jpg": RenditionStatus.READY,
+        "photos/r1.jpg": RenditionStatus.FAILED,
+        "photos/r2.jpg": RenditionStatus.READY,
+    }
+    assert pipeline.requeue([RenditionStatus.FAILED]) >= 1
+
+def test_rendition_keys_resolve_to_their_photo(client, pending_photos):
+    response = client.get("/photos/presigned-url/", params={"object_name": "photos/wm_r0.jpg"})
+    assert response.status_code == 200, response.text
+    assert "wm_r0.jpg" in response.json()["url"]
+
+    response = client.get("/photos/presigned-url/", params={"object_name": "photos/wm_missing.jpg"})
+    assert response.status_code == 404
@@ -0,0 +1,172 @@
+import asyncio
+
+import fakeredis
+import fakeredis.aioredis
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from models.tag import Tag
+from services.response_cache import (
+    LocalCacheBackend, RedisCacheBackend, ResponseCache, TAGS, invalidate_on_commit, response_cache,
+)
+
+
+@pytest.fixture(params=["local", "redis"])
+def cache_backend(request, monkeypatch):
+    """Runs the test with the in-process LRU and with a Redis-protocol server (fakeredis)."""
+    if request.param == "local":
+        backend = LocalCacheBackend()
+    else:
+        server = fakeredis.FakeServer()
+        backend = RedisCacheBackend(fakeredis.FakeRedis(server=server), fakeredis.aioredis.FakeRedis(server=server))
+    monkeypatch.setattr(response_cache, "backend", backend)
+    return backend
+
+
+def test_second_read_is_served_from_cache(client: TestClient, db_session: Session, cache_backend):
+    db_session.add(Tag(name="cached-tag"))
+    db_session.flush()
+
+    first = client.get("/tags/")
+    assert first.status_code == 200
+    assert first.headers["x-cache"] == "MISS"
+
+    # Escrito sin pasar por TagService: la respuesta cacheada no se entera.
+    db_session.add(Tag(name="not-yet-visible"))
+    db_session.flush()
+
+    second = client.get("/tags/")
+    assert second.headers["x-cache"] == "HIT"
+    assert second.content == first.content
+    assert second.headers["etag"] == first.headers["etag"]
+    assert "not-yet-visible" not in [tag["name"] for tag in second.json()]
+
+
+def test_if_none_match_returns_304(client: TestClient, db_session: Session, cache_backend):
+    db_session.add(Tag(name="etag-tag"))
+    db_session.flush()
+    etag = client.get("/tags/").headers["etag"]
+
+    response = client.get("/tags/", headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+    assert client.get("/tags/", headers={"If-None-Match": '"other"'}).status_code == 200
+
+
+def test_query_string_is_part_of_the_key(client: TestClient, cache_backend):
+    assert client.get("/albums/?summary=true&limit=5").headers["x-cache"] == "MISS"
+    assert client.get("/albums/?limit=5&summary=true").headers["x-cache"] == "HIT"
+    assert client.get("/albums/?summary=true&limit=6").headers["x-cache"] == "MISS"
+
+
+def test_service_write_invalidates_cached_responses(admin_client: TestClient, cache_backend):
+    admin_client.get("/tags/")
+    assert admin_client.get("/tags/").headers["x-cache"] == "HIT"
+    admin_client.get("/albums/")
+
+    response = admin_client.post("/tags/", json={"name": "fresh-tag"})
+    assert response.status_code == 201, response.text
+
+    tags = admin_client.get("/tags/")
+    assert tags.headers["x-cache"] == "MISS"
+    assert "fresh-tag" in [tag["name"] for tag in tags.json()]
+    # Los álbumes embeben tags; los combos no dependen de ellos.
+    assert admin_client.get("/albums/").headers["x-cache"] == "MISS"
+
+
+def test_errors_are_not_cached(client: TestClient, cache_backend):
+    assert client.get("/tags/999999").status_code == 404
+    response = client.get("/tags/999999")
+    assert response.status_code == 404
+    assert "x-cache" not in response.headers
+
+
+def test_invalidation_waits_for_commit(db_session: Session, monkeypatch):
+    monkeypatch.setattr(response_cache, "backend", LocalCacheBackend())
+
+    def tags_version():
+        return asyncio.run(response_cache.lookup("/tags/?", (TAGS,)))[1]
+
+    db_session.add(Tag(name="rolled-back"))
+    db_session.flush()
+    invalidate_on_commit(db_session, TAGS)
+    db_session.rollback()
+    db_session.commit()
+    assert tags_version() == "0"
+
+    invalidate_on_commit(db_session, TAGS)
+    assert tags_version() == "0"
+    db_session.commit()
+    assert tags_version() == "1"
+
+
+def test_entry_built_before_a_write_is_not_served():
+    """A response computed from data older than the latest write is stored but never served."""
+    cache = ResponseCache(LocalCacheBackend())
+
+    async def scenario():
+        _, versions = await cache.lookup("/tags/?", (TAGS,))
+        cache.invalidate(TAGS) # commit concurrente mientras se armaba la respuesta
+        await cache.store("/tags/?", versions, b"[]", "application/json")
+        return await cache.lookup("/tags/?", (TAGS,))
+
+    cached, _ = asyncio.run(scenario())
+    assert cached is None
+
+
+def test_local_backend_evicts_least_recently_used_by_bytes():
+    backend = LocalCacheBackend(max_entries=10, max_bytes=10)
+
+    async def scenario():
+        await backend.set("a", b"12345", ttl=60)
+        await backend.set("b", b"12345", ttl=60)
+        await backend.get_many(["a"])
+        await backend.set("c", b"12345", ttl=60)
+        return await backend.get_many(["a", "b", "c"])
+
+    assert asyncio.run(scenario()) == [b"12345", None, b"12345"]
+
+
+def test_concurrent_misses_build_the_response_once():
+    from middleware.response_cache import ResponseCacheMiddleware
+
+    calls = 0
+
+    async def endpoint(scope, receive, send):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/json")]})
+        await send({"type": "http.response.body", "body": b'["slow"]'})
+
+    middleware = ResponseCacheMiddleware(endpoint, cache=ResponseCache(LocalCacheBackend()))
+    scope = {"type": "http", "method": "GET", "path": "/tags/", "query_string": b"", "headers": []}
+
+    async def request():
+        messages = []
+
+        async def send(message):
+            messages.append(message)
+
+        await middleware(scope, None, send)
+        return messages
+
+    async def scenario():
+        return await asyncio.gather(*(request() for _ in range(5)))
+
+    responses = asyncio.run(scenario())
+    assert calls == 1
+    assert all(messages[1]["body"] == b'["slow"]' for messages in responses)
+    assert sorted(dict(messages[0]["headers"])[b"x-cache"] for messages in responses) == [b"HIT"] * 4 + [b"MISS"]
+
+
+def test_ttl_is_clamped_below_the_presigned_url_refresh_margin():
+    """Cached bodies embed presigned URLs, so they must expire well before those URLs are refreshed."""
+    from core.config import Settings
+
+    assert Settings(RESPONSE_CACHE_TTL_SECONDS=300, PRESIGNED_URL_REFRESH_MARGIN_SECONDS=300).RESPONSE_CACHE_TTL_SECONDS == 150
+    assert Settings(RESPONSE_CACHE_TTL_SECONDS=60, PRESIGNED_URL_REFRESH_MARGIN_SECONDS=300).RESPONSE_CACHE_TTL_SECONDS == 60
+    assert response_cache.ttl <= Settings().PRESIGNED_URL_REFRESH_MARGIN_SECONDS // 2
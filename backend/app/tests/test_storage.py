@@ -72,4 +72,211 @@ def test_request_upload_url_bad_body(photographer_client: TestClient):
     """
     # Using a body that doesn't match the expected Pydantic model
     response = photographer_client.post("/request-upload-urls", json={"filenames": ["test.jpg"]})
-    assert response.status_code == 422 # Unprocessable Entity
\ No newline at end of file
+    assert response.status_code == 422 # Unprocessable Entity
+
+def test_presigned_url_cache_reuses_and_expires(monkeypatch):
+    """Cached URLs are reused until the refresh margin before expiry, then dropped."""
+    from services.storage import PresignedUrlCache
+    now = [1000.0]
+    monkeypatch.setattr("services.storage.time.monotonic", lambda: now[0])
+
+    cache = PresignedUrlCache(max_entries=2, refresh_margin=300)
+    cache.set("photos/a.jpg", 3600, "url-a", signed_at=now[0])
+    assert cache.get("photos/a.jpg", 3600) == "url-a"
+    assert cache.get("photos/a.jpg", 60) is None  # otra expiración, otra entrada
+
+    now[0] += 3600 - 300
+    assert cache.get("photos/a.jpg", 3600) is None
+
+def test_presigned_url_cache_is_bounded_lru():
+    import time
+    from services.storage import PresignedUrlCache
+    cache = PresignedUrlCache(max_entries=2)
+    now = time.monotonic()
+    cache.set("a", 3600, "url-a", signed_at=now)
+    cache.set("b", 3600, "url-b", signed_at=now)
+    cache.get("a", 3600)
+    cache.set("c", 3600, "url-c", signed_at=now)
+    assert cache.get("b", 3600) is None
+    assert cache.get("a", 3600) == "url-a"
+    cache.invalidate(["a"])
+    assert cache.get("a", 3600) is None
+
+def test_batch_presigned_urls_only_sign_known_photos(client: TestClient, test_photo_object):
+    from services.storage import storage_service
+    storage_service.url_cache.clear()
+    object_names = [test_photo_object, "photos/thumb_" + test_photo_object[len("photos/"):], "photos/unknown.jpg"]
+
+    response = client.post("/photos/presigned-urls", json={"object_names": object_names})
+
+    assert response.status_code == 200, response.text
+    urls = response.json()["urls"]
+    assert set(urls) == set(object_names[:2])
+    assert "X-Amz-Signature" in urls[test_photo_object]
+    # La segunda firma del mismo objeto sale de la caché y es idéntica.
+    assert storage_service.generate_presigned_get_url(test_photo_object) == urls[test_photo_object]
+
+@pytest.fixture
+def test_photo_object(db_session, user_factory) -> str:
+    from datetime import datetime
+    from models.photo import Photo
+    from models.photo_session import PhotoSession
+    photographer = user_factory("Photographer").photographer
+    session = PhotoSession(event_name="Presign", event_date=datetime.utcnow(), location="Trelew",
+                           photographer_id=photographer.id)
+    db_session.add(session)
+    db_session.flush()
+    photo = Photo(filename="p.jpg", price=1.0, object_name="photos/presign-test.jpg",
+                  photographer_id=photographer.id, session_id=session.id)
+    db_session.add(photo)
+    db_session.flush()
+    return photo.object_name
+
+def test_usage_ledger_follows_uploads_and_deletes(photographer_client: TestClient, db_session, monkeypatch):
+    from models.album import Album
+    from services.storage import storage_service
+    from services.storage_usage import StorageUsageService
+    monkeypatch.setattr(storage_service, "delete_files", lambda object_names: {})
+    album = Album(name="Usage Album")
+    db_session.add(album)
+    db_session.flush()
+    photographer_id = photographer_client.user.photographer.id
+
+    request = {
+        "album_id": album.id,
+        "photos": [
+            {"object_name": f"photos/usage-{i}.jpg", "original_filename": f"usage_{i}.jpg", "price": 10.0,
+             "photographer_id": photographer_id, "size_bytes": 1000 * (i + 1)}
+            for i in range(3)
+        ],
+    }
+    response = photographer_client.post("/photos/complete-upload", json=request)
+    assert response.status_code == 201, response.text
+
+    usage = StorageUsageService(db_session).get_usage()
+    assert usage.total_size_bytes == 6000
+    assert usage.object_count == 3
+    assert {(b.key, b.total_bytes) for b in usage.by_album} == {(album.id, 6000)}
+
+    deleted_ids = [photo["id"] for photo in response.json()[:2]]
+    response = photographer_client.request("DELETE", "/photos/", json={"photo_ids": deleted_ids})
+    assert response.status_code == 200, response.text
+
+    usage = StorageUsageService(db_session).get_usage()
+    assert usage.total_size_bytes == 3000
+    assert usage.object_count == 1
+
+def test_usage_endpoint_reads_ledger(admin_client: TestClient, db_session):
+    from services.storage_usage import StorageUsageService
+    usage_service = StorageUsageService(db_session)
+    deltas = usage_service.new_deltas()
+    usage_service.add_delta(deltas, 7, 3, "original", 5 * 1024 * 1024)
+    usage_service.add_delta(deltas, 7, 3, "thumb", 1024 * 1024)
+    usage_service.record(deltas)
+    db_session.flush()
+
+    response = admin_client.get("/usage")
+
+    assert response.status_code == 200, response.text
+    usage = response.json()
+    assert usage["total_size_bytes"] == 6 * 1024 * 1024
+    assert usage["readable_size"] == "6.00 MB"
+    assert {b["key"] for b in usage["by_rendition"]} == {"original", "thumb"}
+
+class FakeDeleteClient:
+    """Records delete_objects calls; keys listed in `failing` come back as per-key errors."""
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.batches = []
+
+    def delete_objects(self, Bucket, Delete):
+        keys = [obj["Key"] for obj in Delete["Objects"]]
+        self.batches.append(keys)
+        return {"Errors": [{"Key": key, "Code": "AccessDenied", "Message": "Access Denied"} for key in keys if key in self.failing]}
+
+def test_delete_files_batches_and_reports_failures(monkeypatch):
+    from services.storage import storage_service
+    client = FakeDeleteClient(failing={"photos/1500.jpg"})
+    monkeypatch.setattr(storage_service, "s3_client", client)
+
+    failed = storage_service.delete_files([f"photos/{i}.jpg" for i in range(2500)])
+
+    assert sorted(len(batch) for batch in client.batches) == [500, 1000, 1000]
+    assert failed == {"photos/1500.jpg": "Access Denied"}
+
+def test_bulk_delete_removes_renditions(photographer_client: TestClient, db_session, monkeypatch):
+    from models.photo import Photo
+    from services.storage import storage_service
+    client = FakeDeleteClient(failing={"photos/thumb_bulk-del-1.jpg"})
+    monkeypatch.setattr(storage_service, "s3_client", client)
+    photographer_id = photographer_client.user.photographer.id
+    photos = [Photo(filename=f"d{i}.jpg", price=1.0, object_name=f"photos/bulk-del-{i}.jpg", photographer_id=photographer_id)
+              for i in range(2)]
+    db_session.add_all(photos)
+    db_session.flush()
+    photo_ids = [p.id for p in photos]
+
+    response = photographer_client.request("DELETE", "/photos/", json={"photo_ids": photo_ids})
+
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body["deleted_count"] == 2
+    assert body["storage_errors"] == {"photos/thumb_bulk-del-1.jpg": "Access Denied"}
+    assert len(client.batches) == 1
+    assert set(client.batches[0]) == {
+        "photos/bulk-del-0.jpg", "photos/thumb_bulk-del-0.jpg", "photos/preview_bulk-del-0.jpg", "photos/wm_bulk-del-0.jpg",
+        "photos/bulk-del-1.jpg", "photos/thumb_bulk-del-1.jpg", "photos/preview_bulk-del-1.jpg", "photos/wm_bulk-del-1.jpg",
+    }
+    assert db_session.query(Photo).filter(Photo.id.in_(photo_ids)).count() == 0
+
+@pytest.fixture
+def fake_bucket(monkeypatch):
+    """Bucket listing served from a dict {key: age_in_hours}, in byte order like S3."""
+    from datetime import datetime, timedelta, timezone
+    from services.storage import storage_service
+    bucket, deleted = {}, []
+
+    def iter_objects(prefix=""):
+        now = datetime.now(timezone.utc)
+        for key in sorted(bucket):
+            if key.startswith(prefix):
+                yield {"Key": key, "Size": 10, "LastModified": now - timedelta(hours=bucket[key])}
+
+    def delete_files(keys):
+        deleted.extend(keys)
+        return {}
+
+    monkeypatch.setattr(storage_service, "iter_objects", iter_objects)
+    monkeypatch.setattr(storage_service, "delete_files", delete_files)
+    return bucket, deleted
+
+def test_orphan_gc_only_deletes_old_unreferenced_objects(db_session, fake_bucket, test_photo_object):
+    from services.storage_gc import StorageGCService
+    bucket, deleted = fake_bucket
+    bucket.update({
+        test_photo_object: 500,
+        "photos/thumb_presign-test.jpg": 500,
+        "photos/wm_presign-test.jpg": 500,
+        "photos/abandoned.jpg": 500,
+        "photos/thumb_abandoned.jpg": 500,
+        "photos/uploading.jpg": 1,
+    })
+
+    report = StorageGCService(db_session).collect(dry_run=True, grace_hours=24)
+    assert (report.scanned_count, report.referenced_count, report.orphan_count, report.recent_orphan_count) == (6, 3, 2, 1)
+    assert report.sample == ["photos/abandoned.jpg", "photos/thumb_abandoned.jpg"]
+    assert deleted == []
+
+    report = StorageGCService(db_session).collect(dry_run=False, grace_hours=24)
+    assert report.deleted_count == 2
+    assert deleted == ["photos/abandoned.jpg", "photos/thumb_abandoned.jpg"]
+
+def test_cleanup_endpoint_reports_orphans(admin_client: TestClient, fake_bucket):
+    bucket, deleted = fake_bucket
+    bucket.update({"photos/old-orphan.jpg": 24 * 10})
+
+    response = admin_client.delete("/cleanup", params={"days_older": 7, "dry_run": True})
+
+    assert response.status_code == 200, response.text
+    assert response.json()["sample"] == ["photos/old-orphan.jpg"]
+    assert deleted == []
@@ -52,7 +52,14 @@ def test_delete_tag(supervisor_client: TestClient, db_session: Session):
 
 # --- Photo-Tag Association Tests ---
 
-def test_set_tags_for_own_photo(photographer_client: TestClient, test_photo: Photo):
+def _owned_by(client: TestClient, photo: Photo, db_session: Session) -> Photo:
+    """`test_photo` belongs to the first photographer in the DB; hand it to the client's one."""
+    photo.photographer_id = client.user.photographer.id
+    db_session.commit()
+    return photo
+
+def test_set_tags_for_own_photo(photographer_client: TestClient, test_photo: Photo, db_session: Session):
+    _owned_by(photographer_client, test_photo, db_session)
     response = photographer_client.post(
         f"/photos/{test_photo.id}/tags",
         json={"tag_names": TAG_NAMES}
@@ -80,7 +87,8 @@ def test_set_tags_fails_for_other_user_photo(another_photographer_client: TestCl
     )
     assert response.status_code == 403
 
-def test_set_tags_replaces_old_tags(photographer_client: TestClient, test_photo: Photo):
+def test_set_tags_replaces_old_tags(photographer_client: TestClient, test_photo: Photo, db_session: Session):
+    _owned_by(photographer_client, test_photo, db_session)
     # Set initial tags
     photographer_client.post(f"/photos/{test_photo.id}/tags", json={"tag_names": ["viejo_tag"]})
     
@@ -114,3 +122,30 @@ def test_set_tags_for_album_fails_as_photographer(photographer_client: TestClien
     )
     # Based on our permissions, only users with EDIT_ANY_ALBUM can do this
     assert response.status_code == 403
+
+def test_set_tags_resolves_names_case_insensitively(supervisor_client: TestClient, test_photo: Photo, db_session: Session):
+    """Existing tags are reused whatever their case; blanks and repeats are dropped; new ones are created once."""
+    existing = supervisor_client.post("/tags/", json={"name": "Ruta 40"}).json()
+
+    response = supervisor_client.post(
+        f"/photos/{test_photo.id}/tags",
+        json={"tag_names": ["ruta 40", " Nieve ", "", "NIEVE", "lago"]}
+    )
+
+    assert response.status_code == 200, response.text
+    tags = response.json()["tags"]
+    assert sorted(tag["name"] for tag in tags) == ["Nieve", "Ruta 40", "lago"]
+    assert existing["id"] in [tag["id"] for tag in tags]
+    from models.tag import Tag
+    assert db_session.query(Tag).filter(Tag.name.in_(["Nieve", "NIEVE", "lago"])).count() == 2
+
+def test_create_tag_rejects_case_insensitive_duplicate(supervisor_client: TestClient):
+    supervisor_client.post("/tags/", json={"name": "Patagonia"})
+    response = supervisor_client.post("/tags/", json={"name": "patagonia"})
+    assert response.status_code == 400
+
+def test_rename_tag_changing_only_its_case(supervisor_client: TestClient):
+    tag_id = supervisor_client.post("/tags/", json={"name": "glaciar"}).json()["id"]
+    response = supervisor_client.put(f"/tags/{tag_id}", json={"name": "Glaciar"})
+    assert response.status_code == 200, response.text
+    assert response.json()["name"] == "Glaciar"
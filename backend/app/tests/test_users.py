@@ -78,3 +78,43 @@ def test_delete_user(supervisor_client: TestClient, role_for_user_test: int):
 
     get_response = supervisor_client.get(f"/users/{user_id}")
     assert get_response.status_code == 404, get_response.text
+
+def test_role_change_invalidates_cached_principal(supervisor_client: TestClient, role_for_user_test: int, db_session: Session):
+    """Permissions are cached per user, but editing the user drops the cached entry."""
+    from services.principals import principal_cache
+    user_data = {"email": "test_principal@example.com", "password": "testpass", "role_id": role_for_user_test}
+    create_response = supervisor_client.post("/users/", json=user_data)
+    assert create_response.status_code == 201, create_response.text
+    user_id = create_response.json()["id"]
+
+    login = supervisor_client.post("/auth/login", data={"username": user_data["email"], "password": "testpass"})
+    user_headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    response = supervisor_client.get("/users/", headers=user_headers)
+    assert response.status_code == 403, response.text
+    assert principal_cache.get(user_id).permissions == frozenset()
+
+    supervisor_role_id = db_session.query(Role).filter(Role.name == "Supervisor").first().id
+    response = supervisor_client.put(f"/users/{user_id}", json={"email": user_data["email"], "role_id": supervisor_role_id})
+    assert response.status_code == 200, response.text
+    assert principal_cache.get(user_id) is None
+
+    response = supervisor_client.get("/users/", headers=user_headers)
+    assert response.status_code == 200, response.text
+    assert principal_cache.get(user_id).role_id == supervisor_role_id
+
+def test_principal_cache_expires_and_is_bounded(monkeypatch):
+    from services.principals import Principal, PrincipalCache
+    now = [1000.0]
+    monkeypatch.setattr("services.principals.time.monotonic", lambda: now[0])
+    cache = PrincipalCache(max_entries=2, ttl=60)
+    for user_id in (1, 2, 3):
+        cache.set(Principal(user_id=user_id, role_id=7))
+
+    assert cache.get(1) is None # desalojado por LRU
+    assert cache.get(2).role_id == 7
+    cache.invalidate_role(7)
+    assert cache.get(2) is None and cache.get(3) is None
+
+    cache.set(Principal(user_id=4))
+    now[0] += 61
+    assert cache.get(4) is None
@@ -24,6 +24,7 @@ import { Button } from "@/components/ui/button"
 import { Input } from "@/components/ui/input"
 import { Label } from "@/components/ui/label"
 import { Tabs, TabsContent, TabsList, TabsTrigger } from "@/components/ui/tabs"
+import { useOrderQuote } from "@/hooks/checkout/useOrderQuote"
 import { useCombos } from "@/hooks/combos/useCombos"
 import { usePhotos } from "@/hooks/photos/usePhotos"
 import { useToast } from "@/hooks/use-toast"
@@ -33,7 +34,7 @@ import { mapBackendPhotoToPhoto } from "@/lib/mappers/photos"
 import { getPackSize } from "@/lib/print-formats"
 import { useAuthStore, useCartStore } from "@/lib/store"
 import { isAdmin } from "@/lib/types"
-import { isStaff } from "@/lib/permissions"
+import { canOverrideOrderTotals, isStaff } from "@/lib/permissions"
 import type { Photo, PrintFormat } from "@/lib/types"
 import Loading from "./loading"
 import { formatARS } from "@/lib/formatCurrency"
@@ -104,6 +105,8 @@ export default function CarritoPage() {
   const [viewerIndex, setViewerIndex] = useState<number | null>(null)
   const [activeTab, setActiveTab] = useState<"all" | "favorites" | "printer">("all")
 
+  const { quote } = useOrderQuote(items, printSelections)
+
   // --- Referencias
   const photoCache = useRef(new Map<string, Photo>())
 
@@ -138,6 +141,10 @@ export default function CarritoPage() {
   }, [mappedPhotos])
 
   const isStaffUser = useMemo(() => !!(isAuthenticated && isStaff(user)), [isAuthenticated, user])
+  const canEditTotals = useMemo(
+    () => isStaffUser && canOverrideOrderTotals(user),
+    [isStaffUser, user]
+  )
 
   const activeAlbumId = useMemo(() => {
     const albumIds = new Set<string>()
@@ -210,10 +217,12 @@ export default function CarritoPage() {
   const autoDigitalSubtotal = useMemo(() => {
     if (digitalManualEnabled) return null
     if (comboResolution.applied.length === 0) return null
+    // El precio con combo es el que cobra el backend; la cuenta local solo mientras cotiza.
+    if (quote) return quote.digital_subtotal
     return (
       comboResolution.totalComboPrice + comboResolution.remainingPhotos * digitalUnitPrice
     )
-  }, [comboResolution, digitalManualEnabled, digitalUnitPrice])
+  }, [comboResolution, digitalManualEnabled, digitalUnitPrice, quote])
 
   const originalPhotosSubtotal = useMemo(() => {
     const sum = items.reduce((acc, item) => {
@@ -413,9 +422,10 @@ export default function CarritoPage() {
   
 
   useEffect(() => {
-    updateTotals(mappedPhotos, { isStaff: isStaffUser })
+    updateTotals(mappedPhotos, { isStaff: isStaffUser, quote })
   }, [
     mappedPhotosKey,
+    quote,
     printSelections,
     selectedCombo,
     discountInfo,
@@ -426,12 +436,12 @@ export default function CarritoPage() {
   
 
   useEffect(() => {
-    if (!isStaffUser) {
+    if (!canEditTotals) {
       if (printsManualEnabled) resetManualPrintsSubtotal()
       if (digitalManualEnabled) resetManualDigitalSubtotal()
     }
   }, [
-    isStaffUser,
+    canEditTotals,
     printsManualEnabled,
     digitalManualEnabled,
     resetManualPrintsSubtotal,
@@ -1106,6 +1116,7 @@ export default function CarritoPage() {
                             <Input
                               type="number"
                               value={effectiveSubtotalImpresas}
+                              readOnly={!canEditTotals}
                               onChange={(e) => {
                                 const newImpresas = Number(e.target.value)
                                 setManualPrintsSubtotal(newImpresas)
@@ -1145,6 +1156,7 @@ export default function CarritoPage() {
                           <Input
                             type="number"
                             value={effectiveSubtotalFotos}
+                            readOnly={!canEditTotals}
                             onChange={(e) => {
                               const newFotos = Number(e.target.value)
                               setManualDigitalSubtotal(newFotos)
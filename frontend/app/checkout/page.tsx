@@ -33,7 +33,6 @@ import { Badge } from "@/components/ui/badge";
 import { mapBackendPhotoToPhoto } from "@/lib/mappers/photos";
 import { useCheckout } from "@/hooks/checkout/useCheckout";
 import { usePresignedUrl } from "@/hooks/photos/usePresignedUrl";
-import { buildThumbObjectName } from "@/lib/photo-thumbnails";
 import { getPackSize } from "@/lib/print-formats";
 import { formatPhotoDate } from "@/lib/datetime";
 
@@ -45,7 +44,7 @@ type MercadoPagoPreferenceResponse = {
 // Sub-componente para cargar la imagen de la foto del checkout
 function CheckoutPhotoThumbnail({ photo }: { photo: Photo }) {
   const previewObjectName =
-    photo.previewObjectName ?? buildThumbObjectName(photo.objectName);
+    photo.previewObjectName ?? photo.objectName;
   const { url, loading, error } = usePresignedUrl(previewObjectName);
 
   if (loading) {
@@ -87,6 +86,7 @@ export default function CheckoutPage() {
     printsSubtotalEffective,
     digitalSubtotalEffective,
     totalEffective,
+    discountCode,
   
     // 🧠 flags de edición
     printsManualEnabled,
@@ -279,7 +279,10 @@ export default function CheckoutPage() {
     order_status: "pending",
     external_payment_id: null,
     user_id: isAuthenticated ? user?.id ?? null : null,
-    discount_id: null,
+    // El backend recalcula precios y total; el descuento se valida y aplica allá por su código.
+    discount_code: discountCode ?? null,
+    // Solo si el personal editó un subtotal a mano; si no, vale el total calculado por el backend.
+    override_total: printsManualEnabled || digitalManualEnabled ? effectiveTotal : null,
   
     items: orderItemsForBackend,
   
@@ -7,7 +7,7 @@ import { Card } from "@/components/ui/card";
 import { Button } from "@/components/ui/button";
 import { cn } from "@/lib/utils";
 import { usePresignedUrl } from "@/hooks/photos/usePresignedUrl";
-import { buildThumbObjectName } from "@/lib/photo-thumbnails";
+import { renditionOrOriginal } from "@/lib/photo-thumbnails";
 import type { BackendPhoto } from "@/hooks/photos/usePhotos"; // Ajusta la ruta si es necesario
 
 interface AdminPhotoCardProps {
@@ -25,8 +25,11 @@ export function AdminPhotoCard({
   onEdit,
   onDelete,
 }: AdminPhotoCardProps) {
-  const previewObjectName =
-    photo.thumbnail_object_name ?? buildThumbObjectName(photo.object_name);
+  const previewObjectName = renditionOrOriginal(
+    photo.object_name,
+    photo.rendition_status,
+    "thumb"
+  );
   const { url: imageUrl, loading: imageLoading } =
     usePresignedUrl(previewObjectName);
 
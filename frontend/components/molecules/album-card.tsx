@@ -5,7 +5,6 @@ import Link from "next/link";
 import Image from "next/image";
 import { Camera, Calendar } from "lucide-react";
 import { usePresignedUrl } from "@/hooks/photos/usePresignedUrl";
-import { buildThumbObjectName } from "@/lib/photo-thumbnails";
 import { formatDateOnly } from "@/lib/datetime";
 import type { AlbumListItem } from "@/lib/types";
 
@@ -35,7 +34,8 @@ export function AlbumCard({ album }: { album: AlbumListItem }) {
     return () => observer.disconnect();
   }, [isVisible]);
 
-  const thumbObjectName = buildThumbObjectName(album.coverPhotoObjectName);
+  // El mapper ya resuelve el thumb_ de la portada (o el original si aún no está listo).
+  const thumbObjectName = album.coverPhotoObjectName;
   const { url: coverPhotoUrl, loading: isLoading } = usePresignedUrl(thumbObjectName, {
     enabled: isVisible,
   });
@@ -8,7 +8,6 @@ import { cn } from "@/lib/utils"
 import WatermarkedImage from "@/components/organisms/WatermarkedImage"
 import { Badge } from "@/components/ui/badge"
 import { usePresignedUrl } from "@/hooks/photos/usePresignedUrl"
-import { buildThumbObjectName } from "@/lib/photo-thumbnails"
 import { memo } from "react"
 import {
   DropdownMenu,
@@ -43,7 +42,7 @@ function CartItemComponent({
   isStaffUser,
 }: CartItemProps) {
   const previewObjectName =
-    photo.previewObjectName ?? buildThumbObjectName(photo.objectName)
+    photo.previewObjectName ?? photo.objectName
   const { url: imageUrl, loading: imageLoading, error: imageError } =
     usePresignedUrl(previewObjectName)
   const [imageRatio, setImageRatio] = useState<number | null>(null)
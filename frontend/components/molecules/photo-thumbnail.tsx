@@ -8,7 +8,6 @@ import { cn } from "@/lib/utils"
 import { Check, Heart, Printer, Image as ImageIcon } from "lucide-react"
 import WatermarkedImage from "@/components/organisms/WatermarkedImage"
 import { usePresignedUrl } from "@/hooks/photos/usePresignedUrl"
-import { buildThumbObjectName } from "@/lib/photo-thumbnails"
 
 interface PhotoThumbnailProps {
   photo: Photo
@@ -39,7 +38,7 @@ export function PhotoThumbnail({
   // NOTE: Assuming `photo` object now has an `objectName` property.
   // The Photo type in `lib/types.ts` and the mapper must be updated accordingly.
   const previewObjectName =
-    photo.previewObjectName ?? buildThumbObjectName(photo.objectName)
+    photo.previewObjectName ?? photo.objectName
   const { url: imageUrl, loading: imageLoading, error: imageError } = usePresignedUrl(previewObjectName)
 
   const handleClick = (e: React.MouseEvent) => {
@@ -34,10 +34,7 @@ function PrintablePhotoRow({
   photo: Photo
   assignedFormat?: PrintFormat
 }) {
-  const objectName =
-    (photo as any).previewObjectName ??
-    (photo as any).thumbObjectName ??
-    (photo as any).objectName
+  const objectName = photo.previewObjectName ?? photo.objectName
 
   const { url, loading } = usePresignedUrl(objectName)
 
@@ -15,7 +15,6 @@ import { isAdmin } from "@/lib/types"
 import { useRouter } from "next/navigation"
 import Link from "next/link"
 import { usePresignedUrl } from "@/hooks/photos/usePresignedUrl"
-import { buildThumbObjectName } from "@/lib/photo-thumbnails"
 import { PhotoViewerItemActions } from "@/components/atoms/PhotoViewerItemActions"
 import { isStaff } from "@/lib/permissions";
 
@@ -35,14 +34,15 @@ export function PhotoViewerModal({ photo,  nextPhoto, onClose, onNext, onPrev }:
   const {
     displayUrl,
     previewUrl,
-    originalUrl,
+    fullUrl,
     previewLoading,
-    originalLoading,
+    fullLoading,
+    watermarkedByServer,
     error: imageError,
   } = usePhotoViewerImage(photo)
 
-  const isInitialLoading = (previewLoading || originalLoading) && !displayUrl
-  const showError = !!imageError || (!displayUrl && !previewLoading && !originalLoading)
+  const isInitialLoading = (previewLoading || fullLoading) && !displayUrl
+  const showError = !!imageError || (!displayUrl && !previewLoading && !fullLoading)
 
   const cartItem = items.find((item) => item.photoId === photo.id)
   const isInCart = !!cartItem
@@ -104,7 +104,7 @@ export function PhotoViewerModal({ photo,  nextPhoto, onClose, onNext, onPrev }:
 
   function NextPhotoPreview({ photo }: { photo: Photo }) {
     const previewObjectName =
-      photo.previewObjectName ?? buildThumbObjectName(photo.objectName)
+      photo.previewObjectName ?? photo.objectName
   
     const { url } = usePresignedUrl(previewObjectName)
   
@@ -169,6 +169,7 @@ export function PhotoViewerModal({ photo,  nextPhoto, onClose, onNext, onPrev }:
                 {displayUrl && (
                   <WatermarkedImage
                     src={displayUrl}
+                    showWatermark={watermarkedByServer && displayUrl === fullUrl ? false : undefined}
                     alt={`Foto de ${photo.place || "Patagonia"}`}
                     fill
                     objectFit="contain"
@@ -354,9 +355,9 @@ export function PhotoViewerModal({ photo,  nextPhoto, onClose, onNext, onPrev }:
     </button>
 
     {/* Imagen alta calidad */}
-    {originalUrl && (
+    {fullUrl && (
       <img
-        src={originalUrl}
+        src={fullUrl}
         alt={`Foto en alta resolución de ${photo.place || "Patagonia"}`}
         className="max-h-screen max-w-screen object-contain"
         draggable={false}
@@ -364,7 +365,7 @@ export function PhotoViewerModal({ photo,  nextPhoto, onClose, onNext, onPrev }:
       />
     )}
 
-    {!originalUrl && (
+    {!fullUrl && (
       <div className="text-white">Cargando alta resolución…</div>
     )}
   </div>
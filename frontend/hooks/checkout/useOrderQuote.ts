@@ -0,0 +1,81 @@
+"use client";
+
+import { useEffect, useMemo, useState } from "react";
+import { apiFetch } from "@/lib/api";
+import type { CartItem, OrderQuote, PrintSelection } from "@/lib/types";
+
+/**
+ * Ítems del carrito como los recibe el backend: toda foto se compra en digital y
+ * las impresas suman una línea por formato (igual que el checkout).
+ */
+export function buildQuoteItems(items: CartItem[], printSelections: PrintSelection[]) {
+  const digital = items.map((item) => ({
+    photo_id: Number(item.photoId),
+    price: 0,
+    quantity: 1,
+  }));
+  const prints = printSelections.flatMap((selection) =>
+    selection.photoIds.map((photoId) => ({
+      photo_id: Number(photoId),
+      price: 0,
+      quantity: 1,
+      format: selection.format.name,
+    }))
+  );
+  return [...digital, ...prints];
+}
+
+/**
+ * Pide al backend el precio del carrito - POST /checkout/quote.
+ * Es la misma cuenta que hace create-order, así el carrito muestra lo que se cobra.
+ */
+export function useOrderQuote(items: CartItem[], printSelections: PrintSelection[]) {
+  const [quote, setQuote] = useState<OrderQuote | null>(null);
+  const [loading, setLoading] = useState(false);
+  const [error, setError] = useState<string | null>(null);
+
+  const quoteItems = useMemo(
+    () => buildQuoteItems(items, printSelections),
+    [items, printSelections]
+  );
+  const quoteKey = useMemo(
+    () => quoteItems.map((item) => `${item.photo_id}:${item.format ?? ""}`).join(","),
+    [quoteItems]
+  );
+
+  useEffect(() => {
+    if (quoteItems.length === 0) {
+      setQuote(null);
+      setError(null);
+      return;
+    }
+
+    let isCancelled = false;
+    setLoading(true);
+    apiFetch<OrderQuote>("/checkout/quote", {
+      method: "POST",
+      body: JSON.stringify({ items: quoteItems }),
+    })
+      .then((result) => {
+        if (isCancelled) return;
+        setQuote(result);
+        setError(null);
+      })
+      .catch((err: any) => {
+        if (isCancelled) return;
+        setQuote(null);
+        setError(err?.message || "No pudimos calcular el precio del carrito.");
+      })
+      .finally(() => {
+        if (!isCancelled) setLoading(false);
+      });
+
+    return () => {
+      isCancelled = true;
+    };
+    // quoteKey resume quoteItems: solo se vuelve a cotizar si cambian fotos o formatos.
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [quoteKey]);
+
+  return { quote, loading, error };
+}
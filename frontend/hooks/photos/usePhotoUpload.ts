@@ -2,15 +2,12 @@
 
 import { useState } from "react";
 import { apiFetch } from "@/lib/api";
-import {
-  buildThumbObjectName,
-  generateThumbnailBlob,
-} from "@/lib/photo-thumbnails";
 import { compressImageVisuallyLossless } from "@/lib/image-compression";
 import type { BackendPhoto } from "@/hooks/photos/usePhotos";
 import { ApiError } from "@/lib/api";
 
-type FileKind = "original" | "thumbnail";
+// Solo se suben originales: thumb_/preview_/wm_ los genera el backend (rendition_worker).
+type FileKind = "original";
 
 type UploadFileStatus = "pending" | "uploading" | "success" | "failed";
 
@@ -40,14 +37,12 @@ export interface UploadBatchResult {
   status: "success" | "partial" | "error";
   createdPhotos: BackendPhoto[];
   originals: UploadFileResult[];
-  thumbnails: UploadFileResult[];
   failedFiles: FailedFileInfo[];
 }
 
 interface FileInfo {
   filename: string;
   contentType: string;
-  objectName?: string;
 }
 
 interface PresignedURLData {
@@ -86,20 +81,6 @@ export function usePhotoUpload(refetchPhotos?: () => void) {
   const [progress, setProgress] = useState(0);
   const [error, setError] = useState<string | null>(null);
 
-  // Normaliza el nombre de archivo de thumbnail para evitar carpetas duplicadas.
-  const getThumbFilename = (
-    originalObjectName?: string,
-    fallbackName?: string
-  ): string => {
-    const base =
-      originalObjectName?.split("/").pop() ??
-      fallbackName?.split("/").pop() ??
-      "thumbnail.jpg";
-    // Garantiza no duplicar el prefijo si ya viene con thumb_
-    const sanitized = base.startsWith("thumb_") ? base.slice(6) : base;
-    return `thumb_${sanitized}`;
-  };
-
   // ... (requestUploadUrls and uploadToStorage remain the same)
   /**
    * Paso 1: Solicitar URLs presigned para subir archivos
@@ -228,7 +209,6 @@ export function usePhotoUpload(refetchPhotos?: () => void) {
 
     const maxAttempts = 3;
     const originalResults: UploadFileResult[] = [];
-    const thumbnailResults: UploadFileResult[] = [];
 
     const buildFailedInfo = (result: UploadFileResult): FailedFileInfo => ({
       name: result.filename,
@@ -262,59 +242,10 @@ export function usePhotoUpload(refetchPhotos?: () => void) {
       const originalPresigned = await requestUploadUrls(processedFiles);
       pushProgress(5);
 
-      // 1) Generar thumbnails localmente por archivo (tolerante a fallos individuales)
-      const thumbnailFiles: Array<File | null> = await Promise.all(
-        processedFiles.map(async (file) => {
-          try {
-            const thumbBlob = await generateThumbnailBlob(file);
-            return new File([thumbBlob], `thumb_${file.name}`, {
-              type: "image/jpeg",
-            });
-          } catch (err) {
-            console.warn("⚠️ No se pudo generar thumbnail de", file.name, err);
-            return null;
-          }
-        })
-      );
-      pushProgress(8);
-
-      // 2) Pedir URLs de thumbnails; si falla, continuamos sin ellos.
-      let thumbnailPresigned: PresignedURLData[] = [];
-      try {
-        const validThumbs = thumbnailFiles
-          .map((thumb, index) => ({ thumb, index }))
-          .filter((t) => t.thumb !== null) as Array<{
-          thumb: File;
-          index: number;
-        }>;
-
-        if (validThumbs.length > 0) {
-          const response = await apiFetch<{ urls: PresignedURLData[] }>(
-            "/request-upload-urls",
-            {
-              method: "POST",
-              body: JSON.stringify({
-                files: validThumbs.map(({ thumb, index }) => ({
-                  filename: getThumbFilename(
-                    originalPresigned[index]?.object_name,
-                    thumb.name
-                  ),
-                  contentType: thumb.type,
-                  objectName: buildThumbObjectName(
-                    originalPresigned[index]?.object_name
-                  ),
-                })),
-              }),
-            }
-          );
-          thumbnailPresigned = response.urls;
-        }
-      } catch (err) {
-        console.warn("⚠️ No se pudieron obtener URLs de thumbnail:", err);
-        thumbnailPresigned = [];
-      }
+      // Los thumbnails ya no se generan en el navegador: el backend crea
+      // thumb_/preview_/wm_ a partir del original una vez registrado.
 
-      // 3) Preparar tareas de upload con estado por archivo
+      // 1) Preparar tareas de upload con estado por archivo
       type UploadTask = {
         kind: FileKind;
         file: File;
@@ -345,65 +276,6 @@ export function usePhotoUpload(refetchPhotos?: () => void) {
         });
       });
 
-      // Mapear thumbnails con sus URLs (si existen), de lo contrario marcarlos como fallidos inmediatos.
-      let thumbUrlCursor = 0;
-      thumbnailFiles.forEach((thumbFile, index) => {
-        const originalObj = originalPresigned[index]?.object_name;
-        const filename = getThumbFilename(originalObj, thumbFile?.name);
-        if (!thumbFile) {
-          const objectNameFallback = `thumb_${filename ?? "unknown"}`;
-          thumbnailResults.push({
-            kind: "thumbnail",
-            filename,
-            objectName: buildThumbObjectName(originalObj) ?? objectNameFallback,
-            size: 0,
-            status: "failed",
-            attempts: 0,
-            maxAttempts,
-            retryable: false,
-            errorMessage: "No se pudo generar thumbnail local",
-          });
-          return;
-        }
-
-        const urlData = thumbnailPresigned[thumbUrlCursor];
-        thumbUrlCursor += 1;
-
-        if (!urlData) {
-          thumbnailResults.push({
-            kind: "thumbnail",
-            filename,
-            objectName:
-              buildThumbObjectName(originalObj) ?? `thumb_${filename}`,
-            size: thumbFile.size,
-            status: "failed",
-            attempts: 0,
-            maxAttempts,
-            retryable: false,
-            errorMessage: "No se obtuvo URL para subir el thumbnail",
-          });
-          return;
-        }
-
-        const result: UploadFileResult = {
-          kind: "thumbnail",
-          filename: urlData.original_filename,
-          objectName: urlData.object_name,
-          size: thumbFile.size,
-          status: "pending",
-          attempts: 0,
-          maxAttempts,
-          retryable: true,
-        };
-        thumbnailResults.push(result);
-        uploadTasks.push({
-          kind: "thumbnail",
-          file: thumbFile,
-          urlData,
-          resultRef: result,
-        });
-      });
-
       const totalBytes = uploadTasks.reduce(
         (acc, task) => acc + task.file.size,
         0
@@ -459,7 +331,7 @@ export function usePhotoUpload(refetchPhotos?: () => void) {
         }
       };
 
-      // 4) Ejecutar uploads en paralelo limitada
+      // 2) Ejecutar uploads en paralelo limitada
       const maxConcurrentUploads = 3;
       await new Promise<void>((resolve) => {
         let cursor = 0;
@@ -488,16 +360,13 @@ export function usePhotoUpload(refetchPhotos?: () => void) {
 
       pushProgress(92);
 
-      // 5) Completar upload solo con originales exitosos
+      // 3) Completar upload solo con originales exitosos
       const successfulOriginals = originalResults.filter(
         (r) => r.status === "success"
       );
       const failedOriginals = originalResults.filter(
         (r) => r.status === "failed"
       );
-      const failedThumbs = thumbnailResults.filter(
-        (r) => r.status === "failed"
-      );
 
       if (successfulOriginals.length > 0) {
         const photosData: PhotoCompletionData[] = successfulOriginals.map(
@@ -516,22 +385,16 @@ export function usePhotoUpload(refetchPhotos?: () => void) {
       }
 
       const status: UploadBatchResult["status"] =
-        failedOriginals.length > 0 || failedThumbs.length > 0
-          ? "partial"
-          : "success";
+        failedOriginals.length > 0 ? "partial" : "success";
 
       pushProgress(100);
 
-      const failedFiles: FailedFileInfo[] = [
-        ...failedOriginals.map(buildFailedInfo),
-        ...failedThumbs.map(buildFailedInfo),
-      ];
+      const failedFiles: FailedFileInfo[] = failedOriginals.map(buildFailedInfo);
 
       const batchResult: UploadBatchResult = {
         status,
         createdPhotos,
         originals: originalResults,
-        thumbnails: thumbnailResults,
         failedFiles,
       };
 
@@ -547,15 +410,9 @@ export function usePhotoUpload(refetchPhotos?: () => void) {
         status: "error",
         createdPhotos,
         originals: originalResults,
-        thumbnails: thumbnailResults,
-        failedFiles: [
-          ...originalResults
-            .filter((r) => r.status !== "success")
-            .map(buildFailedInfo),
-          ...thumbnailResults
-            .filter((r) => r.status === "failed")
-            .map(buildFailedInfo),
-        ],
+        failedFiles: originalResults
+          .filter((r) => r.status !== "success")
+          .map(buildFailedInfo),
       };
 
       if (err instanceof Error) {
@@ -1,20 +1,36 @@
 import { useMemo } from "react"
 import type { Photo } from "@/lib/types"
-import { buildThumbObjectName } from "@/lib/photo-thumbnails"
 import { usePresignedUrl } from "@/hooks/photos/usePresignedUrl"
+import { useAuthStore } from "@/lib/store"
+import { isStaff } from "@/lib/permissions"
 
 /**
  * Obtiene las URLs necesarias para el visor:
- * - Usa thumbnail/previsualización como placeholder inmediato.
- * - Pide la original sólo cuando el visor está montado (modal abierta).
- * - Prioriza la original en cuanto esté lista.
+ * - Usa el thumbnail como placeholder inmediato.
+ * - Pide la versión grande sólo cuando el visor está montado (modal abierta):
+ *   wm_ (con marca de agua del servidor) para el público, preview_ para el personal.
+ *   Mientras el backend no generó las versiones, el original.
+ * - Prioriza la versión grande en cuanto esté lista.
  */
 export function usePhotoViewerImage(photo: Photo | null) {
+  const user = useAuthStore((state) => state.user)
+  const staff = !!user && isStaff(user)
+
   const previewObjectName = useMemo(() => {
     if (!photo) return null
-    return photo.previewObjectName ?? buildThumbObjectName(photo.objectName)
+    return photo.previewObjectName ?? photo.objectName
   }, [photo?.previewObjectName, photo?.objectName])
 
+  const fullObjectName = useMemo(() => {
+    if (!photo) return null
+    const rendition = staff ? photo.webObjectName : photo.watermarkedObjectName
+    return rendition ?? photo.objectName
+  }, [photo?.webObjectName, photo?.watermarkedObjectName, photo?.objectName, staff])
+
+  // La marca de agua ya viene en la imagen: no hace falta superponerla en el navegador.
+  const watermarkedByServer =
+    !staff && photo?.renditionStatus === "ready" && !!photo?.watermarkedObjectName
+
   const {
     url: previewUrl,
     loading: previewLoading,
@@ -24,33 +40,33 @@ export function usePhotoViewerImage(photo: Photo | null) {
   })
 
   const {
-    url: originalUrl,
-    loading: originalLoading,
-    error: originalError,
-  } = usePresignedUrl(photo?.objectName, {
-    enabled: !!photo?.objectName,
+    url: fullUrl,
+    loading: fullLoading,
+    error: fullError,
+  } = usePresignedUrl(fullObjectName, {
+    enabled: !!fullObjectName,
   })
 
-  const originalReady = !!originalUrl && !originalLoading && !originalError
+  const fullReady = !!fullUrl && !fullLoading && !fullError
   const previewReady = !!previewUrl && !previewLoading && !previewError
 
   const displayUrl = useMemo(() => {
-    if (originalReady) return originalUrl
+    if (fullReady) return fullUrl
     if (previewReady) return previewUrl
     return undefined
-  }, [originalReady, originalUrl, previewReady, previewUrl])
+  }, [fullReady, fullUrl, previewReady, previewUrl])
   
 
   // Sólo mostramos error si ambas fuentes fallan
-  const error = previewError && originalError ? "No se pudo cargar la foto" : null
+  const error = previewError && fullError ? "No se pudo cargar la foto" : null
 
   return {
     displayUrl,
     previewUrl: previewReady ? previewUrl : undefined,
-    originalUrl: originalReady ? originalUrl : undefined,
+    fullUrl: fullReady ? fullUrl : undefined,
     previewLoading,
-    originalLoading,
+    fullLoading,
+    watermarkedByServer,
     error,
   }
 }
-
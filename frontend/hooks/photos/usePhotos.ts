@@ -2,6 +2,7 @@
 
 import { useState, useCallback } from "react";
 import { apiFetch } from "@/lib/api";
+import type { RenditionStatus } from "@/lib/photo-thumbnails";
 
 export interface BackendPhotoSession {
   id?: number;
@@ -25,7 +26,8 @@ export interface BackendPhoto {
   // url: string;
   // watermark_url?: string;
   object_name: string;
-  thumbnail_object_name?: string;
+  // Estado de las versiones (thumb_/preview_/wm_) que genera el backend
+  rendition_status?: RenditionStatus;
   photographer_id: number;
   session_id: number;
   photographer?: {
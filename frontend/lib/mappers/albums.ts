@@ -1,3 +1,4 @@
+import { renditionOrOriginal } from "@/lib/photo-thumbnails"
 import { AlbumListItem, AlbumDetail } from "@/lib/types"
 
 export function mapBackendAlbumToListItem(album: any): AlbumListItem {
@@ -26,7 +27,11 @@ export function mapBackendAlbumToListItem(album: any): AlbumListItem {
     id: album.id,
     name: album.name,
     description: album.description,
-    coverPhotoObjectName: firstSession?.photos?.[0]?.object_name,
+    coverPhotoObjectName: renditionOrOriginal(
+      firstSession?.photos?.[0]?.object_name,
+      firstSession?.photos?.[0]?.rendition_status,
+      "thumb"
+    ),
     createdAt: firstSession?.event_date,
     location: firstSession?.location,
     event: firstSession?.event_name,
@@ -1,6 +1,6 @@
 import type { BackendPhoto, BackendPhotoSession } from "@/hooks/photos/usePhotos"
 import type { Photo } from "@/lib/types"
-import { buildThumbObjectName } from "@/lib/photo-thumbnails"
+import { renditionOrOriginal } from "@/lib/photo-thumbnails"
 
 interface PhotoMappingOptions {
   session?: BackendPhotoSession | null
@@ -24,8 +24,8 @@ export function mapBackendPhotoToPhoto(photo: BackendPhoto, options?: PhotoMappi
   const photographerName =
     photo.photographer?.name ?? session?.photographer?.name ?? undefined
 
-  const thumbnailObjectName =
-    photo.thumbnail_object_name ?? buildThumbObjectName(photo.object_name)
+  // Hasta que el backend genere las versiones se usa el original.
+  const thumbnailObjectName = renditionOrOriginal(photo.object_name, photo.rendition_status, "thumb")
 
   return {
     id: String(photo.id),
@@ -41,7 +41,10 @@ export function mapBackendPhotoToPhoto(photo: BackendPhoto, options?: PhotoMappi
     tags: photo.tags?.map((tag) => tag.name) ?? [],
     objectName: photo.object_name,
     thumbnailObjectName,
-    previewObjectName: thumbnailObjectName ?? undefined,
+    previewObjectName: thumbnailObjectName,
+    webObjectName: renditionOrOriginal(photo.object_name, photo.rendition_status, "preview"),
+    watermarkedObjectName: renditionOrOriginal(photo.object_name, photo.rendition_status, "web"),
+    renditionStatus: photo.rendition_status,
     // urls: {
     //   thumb: photo.watermark_url || photo.url,
     //   web: photo.watermark_url || photo.url,
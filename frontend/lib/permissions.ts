@@ -1,4 +1,4 @@
-import { isAdmin, getUserRoleName } from "@/lib/types";
+import { isAdmin, getUserRoleName, hasPermission } from "@/lib/types";
 
 export function isStaff(user: any) {
   if (!user) return false;
@@ -11,3 +11,8 @@ export function isStaff(user: any) {
     !!user.photographer_id
   );
 }
+
+// Subtotales manuales en el carrito: el backend solo acepta el override de quien puede editar órdenes.
+export function canOverrideOrderTotals(user: any) {
+  return isAdmin(user) || hasPermission(user, "edit_order");
+}
@@ -1,20 +1,51 @@
-// Utilidades de thumbnails para evitar usar la imagen original en previsualizaciones.
-// Se generan en el cliente usando canvas y se guardan como JPEG comprimido.
+// Claves de las versiones que el backend genera de cada original (services/renditions.py):
+// thumb_ (400px), preview_ (1200px) y wm_ (1600px con marca de agua), siempre en JPEG.
+// El navegador ya no genera ni sube thumbnails: solo sube el original.
 
-export const buildThumbObjectName = (
-  objectName?: string | null
+export type RenditionKind = "thumb" | "preview" | "web";
+export type RenditionStatus = "pending" | "processing" | "ready" | "failed";
+
+const RENDITION_PREFIXES: Record<RenditionKind, string> = {
+  thumb: "thumb_",
+  preview: "preview_",
+  web: "wm_",
+};
+
+export const buildRenditionObjectName = (
+  objectName: string | null | undefined,
+  kind: RenditionKind
 ): string | undefined => {
   if (!objectName) return undefined;
-  // Mantener la carpeta original y solo prefijar el nombre del archivo.
-  // Ej: photos/abc.png -> photos/thumb_abc.png
+  // Mantener la carpeta original, prefijar el nombre y terminar en .jpg (las versiones son JPEG).
+  // Ej: photos/abc.jpg -> photos/thumb_abc.jpg, photos/abc.png -> photos/thumb_abc.png.jpg
   const lastSlash = objectName.lastIndexOf("/");
   const dir = lastSlash >= 0 ? objectName.slice(0, lastSlash + 1) : "";
   const base = lastSlash >= 0 ? objectName.slice(lastSlash + 1) : objectName;
-  return `${dir}thumb_${base}`;
+  const extension = /\.jpe?g$/i.test(base) ? "" : ".jpg";
+  return `${dir}${RENDITION_PREFIXES[kind]}${base}${extension}`;
+};
+
+export const buildThumbObjectName = (
+  objectName?: string | null
+): string | undefined => buildRenditionObjectName(objectName, "thumb");
+
+/**
+ * La versión pedida si el backend ya la generó (rendition_status "ready"); si no, el original.
+ */
+export const renditionOrOriginal = (
+  objectName: string | null | undefined,
+  renditionStatus: RenditionStatus | null | undefined,
+  kind: RenditionKind
+): string | undefined => {
+  if (!objectName) return undefined;
+  return renditionStatus === "ready"
+    ? buildRenditionObjectName(objectName, kind)
+    : objectName;
 };
 
 /**
- * Genera un Blob JPEG reducido a partir de un File de imagen.
+ * Genera un Blob JPEG reducido a partir de un File de imagen, solo para previsualizar
+ * en el navegador los archivos elegidos antes de subirlos (no se sube).
  */
 export async function generateThumbnailBlob(
   file: File,
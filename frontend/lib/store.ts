@@ -23,6 +23,7 @@ import type {
   PrintFormat,
   PrintSelection,
   CartComboSelection,
+  OrderQuote,
 } from "./types"
 import { getPackSize } from "./print-formats"
 
@@ -72,7 +73,7 @@ interface CartStore extends CartState {
   saveSession: () => Promise<string>
   loadSession: (sessionId: string) => Promise<void>
   clearCart: () => void
-  updateTotals: (photos: Photo[], options?: { isStaff?: boolean }) => void
+  updateTotals: (photos: Photo[], options?: { isStaff?: boolean; quote?: OrderQuote | null }) => void
   setSelectedCombo: (combo: CartComboSelection | null) => void
   setManualPrintsSubtotal: (value: number) => void
   setManualDigitalSubtotal: (value: number) => void
@@ -429,7 +430,7 @@ export const useCartStore = create<CartStore>()(
           }
         }),
 
-      updateTotals: (photos: Photo[], _options) => {
+      updateTotals: (photos: Photo[], options) => {
         const {
           items,
           printSelections,
@@ -469,12 +470,20 @@ export const useCartStore = create<CartStore>()(
         }
 
         // Impresiones: packs x precio formato
-        const printsCalculated = printSelections.reduce((sum, selection) => {
+        let printsCalculated = printSelections.reduce((sum, selection) => {
           const packSize = getPackSize(selection.format)
           const packs = Math.ceil(selection.photoIds.length / packSize)
           return sum + packs * selection.format.price
         }, 0)
 
+        // La cotización del backend manda (combos por álbum, igual que create-order);
+        // lo calculado acá solo se muestra mientras llega.
+        const quote = options?.quote
+        if (quote) {
+          digitalCalculated = quote.digital_subtotal
+          printsCalculated = quote.prints_subtotal
+        }
+
         const printsEffective = printsManualEnabled
           ? normalizeAmount(printsSubtotalManual)
           : printsCalculated
@@ -12,10 +12,13 @@ export interface Photo {
   description?: string;
   tags?: string[]; // Added tags field for photo categorization
   objectName: string; // Nombre del objeto ORIGINAL en S3 (alta calidad)
-  // Thumbnail generado en frontend y subido a storage con prefijo `thumb_`
-  thumbnailObjectName?: string;
+  // Versiones generadas por el backend; mientras no estén listas apuntan al original
+  thumbnailObjectName?: string; // thumb_ (400px)
   // Objeto a usar para previsualizaciones ligeras (thumb)
   previewObjectName?: string;
+  webObjectName?: string; // preview_ (1200px, sin marca de agua)
+  watermarkedObjectName?: string; // wm_ (1600px, con marca de agua)
+  renditionStatus?: "pending" | "processing" | "ready" | "failed";
   // urls: {
   //   thumb: string;
   //   web: string; // with watermark (web)
@@ -166,6 +169,15 @@ export interface OrderItem {
   priceAtPurchase?: number;
 }
 
+// Precio del carrito calculado por el backend (POST /checkout/quote), con las mismas
+// reglas que create-order: combos por álbum y packs de impresión.
+export interface OrderQuote {
+  items: Array<{ photo_id: number; price: number; quantity: number; format?: string | null }>;
+  digital_subtotal: number;
+  prints_subtotal: number;
+  subtotal: number;
+}
+
 // Enums para consistencia con el backend
 export enum OrderStatus {
   PENDING = "pending",